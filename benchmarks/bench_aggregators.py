@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Aggregator Benchmark
+Location: benchmarks/bench_aggregators.py
+
+Compares the list-of-dicts aggregators in dashboard/utils/aggregators.py
+(aggregate_by_model, aggregate_by_agent, aggregate_by_operation,
+calculate_cost_breakdown, calculate_routing_metrics,
+calculate_cache_metrics, calculate_quality_metrics - one walk each) with
+the pandas engine in dashboard/utils/frame_aggregators.py
+(`aggregate_calls`, one frame for all of them), on synthetic call dicts
+shaped like `get_llm_calls(include_bodies=False)`.
+
+The engine is timed twice: from the dicts, and from a CallView of the
+dashboard call window (dashboard/utils/call_window.py), whose columns are
+already arrays. Building the window itself isn't counted - it happens once
+per refresh, not per page. Each engine time is split into frame build and
+aggregation, and every result is checked against the functions.
+
+Requires the dashboard extra (pandas, streamlit):
+    pip install -e ".[dashboard]"
+
+Run from project root:
+    python benchmarks/bench_aggregators.py                      # 100k and 1M calls
+    python benchmarks/bench_aggregators.py --rows 50000 --repeat 5
+"""
+
+import argparse
+import math
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from dashboard.utils.aggregators import (
+    aggregate_by_model,
+    aggregate_by_agent,
+    aggregate_by_operation,
+    calculate_cost_breakdown,
+    calculate_routing_metrics,
+    calculate_cache_metrics,
+    calculate_quality_metrics,
+)
+from dashboard.utils.frame_aggregators import calls_to_frame, aggregate_calls
+from dashboard.utils.call_window import WindowSnapshot, CallView, encode_calls
+
+
+MODELS = ["gpt-4o", "gpt-4o-mini", "claude-sonnet-4", "mistral-small"]
+AGENTS = ["planner", "retriever", "writer", "critic", None]
+OPERATIONS = ["chat", "search", "summarize", "classify", "extract", "route"]
+STRATEGIES = ["cost", "quality", "latency", None]
+FAILURE_REASONS = ["off_topic", "incomplete", "format", None]
+
+
+def generate_calls(n: int, seed: int = 42):
+    """Call dicts with routing / cache / quality metadata on a share of calls."""
+    rng = random.Random(seed)
+    start = datetime.utcnow() - timedelta(days=7)
+    calls = []
+    for i in range(n):
+        prompt_tokens = rng.randint(50, 4000)
+        completion_tokens = rng.randint(10, 1000)
+        success = rng.random() > 0.03
+        call = {
+            'id': f"call-{i}",
+            'session_id': f"session-{i // 20}",
+            'timestamp': start + timedelta(seconds=i * 0.5),
+            'provider': "openai",
+            'model_name': rng.choice(MODELS),
+            'agent_name': rng.choice(AGENTS),
+            'operation': rng.choice(OPERATIONS),
+            'prompt_tokens': prompt_tokens,
+            'completion_tokens': completion_tokens,
+            'total_tokens': prompt_tokens + completion_tokens,
+            'prompt_cost': prompt_tokens * 2e-6,
+            'completion_cost': completion_tokens * 2e-6,
+            'total_cost': (prompt_tokens + completion_tokens) * 2e-6,
+            'latency_ms': rng.lognormvariate(6.5, 0.6),
+            'success': success,
+            'error': None if success else "timeout",
+            'prompt': None,
+            'prompt_normalized': None,
+            'response_text': None,
+            'prompt_variant_id': None,
+            'test_dataset_id': None,
+            'metadata': {},
+            'routing_decision': None,
+            'cache_metadata': None,
+            'quality_evaluation': None,
+            'prompt_breakdown': None,
+            'prompt_metadata': None,
+        }
+        if rng.random() < 0.3:
+            call['routing_decision'] = {
+                'chosen_model': rng.choice(MODELS),
+                'routing_strategy': rng.choice(STRATEGIES),
+                'complexity_score': rng.random(),
+                'estimated_cost_savings': rng.random() / 100,
+            }
+        if rng.random() < 0.4:
+            call['cache_metadata'] = {
+                'cache_hit': rng.random() < 0.35,
+                'cache_cluster_id': f"cluster-{rng.randint(0, 50)}",
+                'cache_key_candidates': rng.choice([None, ["user_id", "query"], ["query"]]),
+            }
+        if rng.random() < 0.2:
+            call['quality_evaluation'] = {
+                'judge_score': rng.uniform(3, 10),
+                'hallucination_flag': rng.random() < 0.05,
+                'factual_error': rng.random() < 0.03,
+                'failure_reason': rng.choice(FAILURE_REASONS),
+            }
+        calls.append(call)
+    return calls
+
+
+def window_view(calls) -> CallView:
+    """All calls as a view of one call-window snapshot."""
+    dictionaries = {}
+    snapshot = WindowSnapshot(encode_calls(calls, dictionaries), dictionaries, complete=True)
+    return CallView(snapshot, np.arange(len(calls)))
+
+
+def aggregate_with_functions(calls):
+    return {
+        'by_model': aggregate_by_model(calls),
+        'by_agent': aggregate_by_agent(calls),
+        'by_operation': aggregate_by_operation(calls),
+        'cost_breakdown': calculate_cost_breakdown(calls),
+        'routing_metrics': calculate_routing_metrics(calls),
+        'cache_metrics': calculate_cache_metrics(calls),
+        'quality_metrics': calculate_quality_metrics(calls),
+    }
+
+
+def assert_same(expected, actual, path="metrics"):
+    """Values match (floats to 1e-9 relative; models_used in any order)."""
+    if isinstance(expected, dict):
+        assert set(expected) == set(actual), f"{path}: keys differ"
+        for key in expected:
+            assert_same(expected[key], actual[key], f"{path}.{key}")
+    elif isinstance(expected, list) and path.endswith("models_used"):
+        assert set(expected) == set(actual), f"{path}: {expected} != {actual}"
+    elif isinstance(expected, list):
+        assert len(expected) == len(actual), f"{path}: lengths differ"
+        for e, a in zip(expected, actual):
+            assert_same(e, a, path)
+    elif isinstance(expected, float) or isinstance(actual, float):
+        assert math.isclose(expected, actual, rel_tol=1e-9, abs_tol=1e-12), f"{path}: {expected} != {actual}"
+    else:
+        assert expected == actual, f"{path}: {expected} != {actual}"
+
+
+def median_time(fn, repeat: int):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), result
+
+
+def bench(n: int, repeat: int):
+    calls = generate_calls(n)
+    view = window_view(calls)
+
+    functions_time, expected = median_time(lambda: aggregate_with_functions(calls), repeat)
+    print(f"{n:>10,} {'functions':<12} {functions_time * 1000:>10.0f} {'':>10} {'':>10}")
+
+    for source, data in (("engine/dicts", calls), ("engine/view", view)):
+        frame_time, frame = median_time(lambda: calls_to_frame(data), repeat)
+        aggregate_time, actual = median_time(lambda: aggregate_calls(frame), repeat)
+        assert_same(expected, actual)
+
+        total = frame_time + aggregate_time
+        print(
+            f"{'':>10} {source:<12} {total * 1000:>10.0f} {frame_time * 1000:>10.0f} "
+            f"{aggregate_time * 1000:>10.0f} {functions_time / total:>8.1f}x"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dashboard aggregators")
+    parser.add_argument("--rows", type=int, nargs="+", default=[100000, 1000000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("AGGREGATOR BENCHMARK (median ms; results checked equal)")
+    print("=" * 70)
+    print(f"{'calls':>10} {'':<12} {'total':>10} {'frame':>10} {'aggregate':>10} {'speedup':>9}")
+    for n in args.rows:
+        bench(n, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
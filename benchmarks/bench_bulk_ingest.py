@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Bulk Ingestion Benchmark
+Location: benchmarks/bench_bulk_ingest.py
+
+Compares per-call recording (Observatory.record_call) against the bulk API
+(Observatory.record_calls_bulk) on a fresh SQLite database.
+
+Run from project root:
+    python benchmarks/bench_bulk_ingest.py                  # 10k and 1M rows
+    python benchmarks/bench_bulk_ingest.py --rows 10000     # single size
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from observatory import Observatory, Storage, ModelProvider, CacheMetadata
+
+
+MODELS = ["gpt-4o", "gpt-4o-mini", "claude-sonnet-4", "mistral-small"]
+OPERATIONS = ["chat", "search", "summarize", "classify"]
+
+
+def generate_calls(n: int, seed: int = 42):
+    """Yield n synthetic record_call argument dicts."""
+    rng = random.Random(seed)
+    start = datetime.utcnow() - timedelta(days=30)
+    for i in range(n):
+        yield {
+            "provider": ModelProvider.OPENAI,
+            "model_name": rng.choice(MODELS),
+            "prompt_tokens": rng.randint(50, 4000),
+            "completion_tokens": rng.randint(10, 800),
+            "latency_ms": rng.uniform(100, 5000),
+            "agent_name": f"agent_{i % 8}",
+            "operation": rng.choice(OPERATIONS),
+            "prompt": f"Prompt {i % 500}",
+            "response_text": f"Response {i}",
+            "cache_metadata": CacheMetadata(cache_hit=rng.random() < 0.3),
+            "timestamp": start + timedelta(seconds=i),
+        }
+
+
+def bench_per_call(n: int) -> float:
+    """Rows/sec using one record_call (and one commit) per row."""
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = Storage(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        obs = Observatory(project_name="bench", enabled=True, storage=storage)
+        session = obs.start_session("bench")
+
+        t0 = time.perf_counter()
+        for call in generate_calls(n):
+            call.pop("timestamp")
+            obs.record_call(session=session, **call)
+        elapsed = time.perf_counter() - t0
+
+        storage.engine.dispose()
+        return n / elapsed
+
+
+def bench_bulk(n: int, chunk_size: int) -> float:
+    """Rows/sec using record_calls_bulk with chunked transactions."""
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = Storage(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        obs = Observatory(project_name="bench", enabled=True, storage=storage)
+        session = obs.start_session("bench")
+
+        t0 = time.perf_counter()
+        recorded = obs.record_calls_bulk(generate_calls(n), session=session, chunk_size=chunk_size)
+        elapsed = time.perf_counter() - t0
+
+        assert recorded == n
+        assert storage.get_call_count() == n
+        storage.engine.dispose()
+        return n / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark bulk LLM call ingestion")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 1_000_000])
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument(
+        "--per-call-rows",
+        type=int,
+        default=2000,
+        help="Rows for the per-call baseline (kept small; it commits once per row)",
+    )
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("BULK INGESTION BENCHMARK (SQLite)")
+    print("=" * 60)
+
+    baseline = bench_per_call(args.per_call_rows)
+    print(f"record_call       {args.per_call_rows:>10,} rows  {baseline:>12,.0f} rows/sec")
+
+    for n in args.rows:
+        rate = bench_bulk(n, args.chunk_size)
+        print(
+            f"record_calls_bulk {n:>10,} rows  {rate:>12,.0f} rows/sec"
+            f"  ({rate / baseline:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Compression Benchmark
+Location: benchmarks/bench_compression.py
+
+Compares database size and write/read throughput of Storage with
+compression disabled, zlib, and zstd (when `zstandard` is installed) on a
+fresh SQLite database. Every call has distinct, compressible prompt and
+response text plus a chat history, so the numbers reflect compression
+rather than blob deduplication.
+
+Run from project root:
+    python benchmarks/bench_compression.py
+    python benchmarks/bench_compression.py --rows 5000 --prompt-kb 30
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from observatory import Observatory, Storage, ModelProvider, PromptBreakdown
+from observatory.storage import CODECS
+
+
+WORDS = (
+    "the agent should retrieve relevant documents and answer the user question "
+    "using only the provided context include citations when possible if the "
+    "context does not contain the answer say so clearly and suggest next steps "
+    "customer order invoice refund shipping account password reset policy "
+    "summary analysis report table json field value error status pending"
+).split()
+
+
+def generate_text(rng: random.Random, size: int) -> str:
+    """Pseudo-natural text of roughly `size` characters."""
+    words = []
+    length = 0
+    while length < size:
+        word = rng.choice(WORDS)
+        words.append(word)
+        length += len(word) + 1
+    return " ".join(words)
+
+
+def generate_calls(n: int, prompt_kb: int, seed: int = 42):
+    """Yield n record_call argument dicts with distinct large bodies."""
+    rng = random.Random(seed)
+    for i in range(n):
+        history = [
+            {"role": "user" if turn % 2 == 0 else "assistant", "content": generate_text(rng, 600)}
+            for turn in range(6)
+        ]
+        yield {
+            "provider": ModelProvider.OPENAI,
+            "model_name": "gpt-4o",
+            "prompt_tokens": rng.randint(2000, 12000),
+            "completion_tokens": rng.randint(100, 2000),
+            "latency_ms": rng.uniform(300, 5000),
+            "operation": "chat",
+            "prompt": f"#{i} " + generate_text(rng, prompt_kb * 1024),
+            "response_text": f"#{i} " + generate_text(rng, prompt_kb * 256),
+            "prompt_breakdown": PromptBreakdown(chat_history=history, chat_history_count=len(history)),
+        }
+
+
+def bench(compression, n: int, prompt_kb: int, chunk_size: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        storage = Storage(f"sqlite:///{path}", compression=compression)
+        obs = Observatory(project_name="bench", enabled=True, storage=storage)
+        session = obs.start_session("bench")
+
+        calls = list(generate_calls(n, prompt_kb))
+        t0 = time.perf_counter()
+        obs.record_calls_bulk(calls, session=session, chunk_size=chunk_size)
+        write_rate = n / (time.perf_counter() - t0)
+
+        t0 = time.perf_counter()
+        loaded = storage.get_llm_calls(limit=n)
+        read_rate = len(loaded) / (time.perf_counter() - t0)
+        assert loaded and loaded[0].prompt.startswith("#")
+
+        storage.engine.dispose()
+        conn = sqlite3.connect(path)
+        conn.execute("VACUUM")
+        conn.close()
+
+        return {
+            "size_mb": os.path.getsize(path) / (1024 * 1024),
+            "write": write_rate,
+            "read": read_rate,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark storage compression")
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--prompt-kb", type=int, default=20, help="Approximate prompt size")
+    parser.add_argument("--chunk-size", type=int, default=500)
+    args = parser.parse_args()
+
+    print("=" * 68)
+    print(f"COMPRESSION BENCHMARK (SQLite, {args.rows:,} calls, ~{args.prompt_kb} KB prompts)")
+    print("=" * 68)
+    print(f"{'codec':<8} {'db size':>12} {'write rows/s':>14} {'read rows/s':>14}")
+
+    baseline = None
+    for codec in [None] + sorted(CODECS):
+        result = bench(codec, args.rows, args.prompt_kb, args.chunk_size)
+        baseline = baseline or result
+        print(
+            f"{codec or 'none':<8} {result['size_mb']:>9.1f} MB {result['write']:>14,.0f} "
+            f"{result['read']:>14,.0f}"
+            + (f"   ({baseline['size_mb'] / result['size_mb']:.1f}x smaller)" if codec else "")
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Project-Scoped Query Benchmark
+Location: benchmarks/bench_project_queries.py
+
+Compares the project-scoped dashboard queries before and after
+denormalizing project_name onto llm_calls, on one SQLite database:
+
+- before: filter through sessions (`session_id IN (SELECT id FROM sessions
+  WHERE project_name = ?)`), with the composite indexes dropped
+- after:  filter on llm_calls.project_name with the composite indexes
+  (project_name, timestamp), (project_name, operation, timestamp) and
+  (session_id, timestamp)
+
+Prints the EXPLAIN QUERY PLAN and median latency of each query.
+
+Run from project root:
+    python benchmarks/bench_project_queries.py                    # 2M calls
+    python benchmarks/bench_project_queries.py --rows 200000 --keep /tmp/bench.db
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from observatory import Storage
+
+
+MODELS = ["gpt-4o", "gpt-4o-mini", "claude-sonnet-4", "mistral-small"]
+OPERATIONS = ["chat", "search", "summarize", "classify", "extract", "route"]
+COMPOSITE_INDEXES = (
+    "ix_llm_calls_project_time",
+    "ix_llm_calls_project_operation_time",
+    "ix_llm_calls_session_time",
+)
+DAYS = 30
+
+PROJECT_FILTER_BEFORE = "session_id IN (SELECT id FROM sessions WHERE project_name = :project)"
+PROJECT_FILTER_AFTER = "project_name = :project"
+
+# name -> SQL with {project} standing for the project filter
+QUERIES = {
+    "call count": "SELECT count(id) FROM llm_calls WHERE {project}",
+    "cost, last 7 days": (
+        "SELECT sum(total_cost) FROM llm_calls WHERE {project} AND timestamp >= :week_ago"
+    ),
+    "latest 100 calls": (
+        "SELECT id, timestamp, model_name, total_cost, latency_ms FROM llm_calls "
+        "WHERE {project} ORDER BY timestamp DESC LIMIT 100"
+    ),
+    "operation, last 24h": (
+        "SELECT id, timestamp, latency_ms FROM llm_calls "
+        "WHERE {project} AND operation = :operation AND timestamp >= :day_ago "
+        "ORDER BY timestamp DESC LIMIT 500"
+    ),
+    "distinct models": "SELECT DISTINCT model_name FROM llm_calls WHERE {project}",
+}
+
+
+def build_database(path: str, rows: int, projects: int, sessions: int, seed: int = 42):
+    """Create the schema through Storage, then bulk load synthetic rows."""
+    Storage(f"sqlite:///{path}", rollups=False).engine.dispose()
+
+    rng = random.Random(seed)
+    start = datetime.utcnow() - timedelta(days=DAYS)
+    session_projects = [f"project_{i % projects}" for i in range(sessions)]
+
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.executemany(
+        "INSERT INTO sessions (id, project_name, start_time, total_llm_calls) VALUES (?, ?, ?, 0)",
+        [
+            (f"s{i}", project, str(start + timedelta(seconds=i * DAYS * 86400 / sessions)))
+            for i, project in enumerate(session_projects)
+        ],
+    )
+
+    chunk = 100000
+    step = DAYS * 86400 / rows
+    for offset in range(0, rows, chunk):
+        batch = []
+        for i in range(offset, min(offset + chunk, rows)):
+            session = int(i * sessions / rows)
+            batch.append((
+                f"c{i}", f"s{session}", session_projects[session],
+                str(start + timedelta(seconds=i * step)),
+                "openai", rng.choice(MODELS), rng.choice(OPERATIONS),
+                rng.randint(50, 4000), rng.randint(10, 800), rng.uniform(0.0001, 0.05),
+                rng.uniform(100, 5000), 1,
+            ))
+        conn.executemany(
+            "INSERT INTO llm_calls (id, session_id, project_name, timestamp, provider, model_name, "
+            "operation, prompt_tokens, completion_tokens, total_cost, latency_ms, success) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            batch,
+        )
+        conn.commit()
+    conn.execute("ANALYZE")
+    conn.commit()
+    conn.close()
+
+
+def run_queries(conn: sqlite3.Connection, project_filter: str, repeat: int) -> dict:
+    now = datetime.utcnow()
+    params = {
+        "project": "project_3",
+        "operation": "search",
+        "week_ago": str(now - timedelta(days=7)),
+        "day_ago": str(now - timedelta(days=1)),
+    }
+    results = {}
+    for name, template in QUERIES.items():
+        sql = template.format(project=project_filter)
+        plan = [row[-1] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+        timings = []
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            conn.execute(sql, params).fetchall()
+            timings.append(time.perf_counter() - t0)
+        results[name] = {"plan": plan, "ms": statistics.median(timings) * 1000}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark project-scoped queries")
+    parser.add_argument("--rows", type=int, default=2000000)
+    parser.add_argument("--projects", type=int, default=20)
+    parser.add_argument("--sessions", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--keep", metavar="PATH", help="Build (or reuse) the database at PATH")
+    args = parser.parse_args()
+
+    tmp = None
+    path = args.keep
+    if not path:
+        tmp = tempfile.TemporaryDirectory()
+        path = os.path.join(tmp.name, "bench.db")
+
+    if not os.path.exists(path):
+        t0 = time.perf_counter()
+        build_database(path, args.rows, args.projects, args.sessions)
+        print(f"Built {args.rows:,} calls in {time.perf_counter() - t0:.0f}s")
+
+    conn = sqlite3.connect(path)
+    for index in COMPOSITE_INDEXES:
+        conn.execute(f"DROP INDEX IF EXISTS {index}")
+    conn.execute("ANALYZE")
+    before = run_queries(conn, PROJECT_FILTER_BEFORE, args.repeat)
+    conn.close()
+
+    # Reopening Storage recreates the missing indexes
+    Storage(f"sqlite:///{path}", rollups=False).engine.dispose()
+    conn = sqlite3.connect(path)
+    conn.execute("ANALYZE")
+    after = run_queries(conn, PROJECT_FILTER_AFTER, args.repeat)
+    conn.close()
+
+    print("=" * 78)
+    print(f"PROJECT-SCOPED QUERIES (SQLite, {args.rows:,} calls, {args.projects} projects)")
+    print("=" * 78)
+    print(f"{'query':<22} {'before ms':>12} {'after ms':>12} {'speedup':>10}")
+    for name in QUERIES:
+        b, a = before[name]["ms"], after[name]["ms"]
+        print(f"{name:<22} {b:>12.1f} {a:>12.1f} {b / a if a else float('inf'):>9.1f}x")
+
+    print()
+    for name in QUERIES:
+        print(f"-- {name}")
+        print("   before: " + "\n           ".join(before[name]["plan"]))
+        print("   after:  " + "\n           ".join(after[name]["plan"]))
+
+    if tmp:
+        tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+SQLite Concurrency Benchmark
+Location: benchmarks/bench_sqlite_concurrency.py
+
+Runs N writer processes (one Storage.record_llm_call / commit per call,
+like agents with background_writes off) against M reader processes (dashboard-style
+queries) on one SQLite file, for two engine profiles:
+
+- default: what `create_engine(url)` gave before - rollback journal,
+  synchronous=FULL, no mmap, pysqlite's 5s lock timeout
+- tuned:   create_storage_engine defaults - WAL, synchronous=NORMAL,
+  busy_timeout, mmap, larger page cache
+
+Reports throughput, write latency percentiles and "database is locked"
+errors for each.
+
+Run from project root:
+    python benchmarks/bench_sqlite_concurrency.py                     # 4 writers, 4 readers, 10s
+    python benchmarks/bench_sqlite_concurrency.py --writers 8 --readers 2 --seconds 20
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from observatory import Observatory, Storage, Session, ModelProvider
+from observatory.collector import build_llm_call
+
+
+MODELS = ["gpt-4o", "gpt-4o-mini", "claude-sonnet-4", "mistral-small"]
+OPERATIONS = ["chat", "search", "summarize", "classify"]
+
+# pragma overrides reproducing the pre-factory engine (None = SQLite default)
+PROFILES = {
+    "default": {
+        "journal_mode": "DELETE",
+        "synchronous": "FULL",
+        "busy_timeout": None,
+        "mmap_size": None,
+        "cache_size": None,
+        "temp_store": None,
+    },
+    "tuned": {},
+}
+
+
+def is_locked_error(error: Exception) -> bool:
+    return "locked" in str(error) or "busy" in str(error)
+
+
+def writer(url: str, pragmas: dict, deadline: float, seed: int, results):
+    # Straight to Storage: Observatory would absorb lock errors in its circuit breaker
+    storage = Storage(url, pragmas=pragmas)
+    session = Session(id=str(uuid.uuid4()), project_name="bench", start_time=datetime.utcnow())
+    storage.save_session(session)
+    rng = random.Random(seed)
+
+    latencies, errors = [], 0
+    while time.time() < deadline:
+        t0 = time.perf_counter()
+        try:
+            storage.record_llm_call(build_llm_call(
+                session_id=session.id,
+                provider=ModelProvider.OPENAI,
+                model_name=rng.choice(MODELS),
+                prompt_tokens=rng.randint(50, 4000),
+                completion_tokens=rng.randint(10, 800),
+                latency_ms=rng.uniform(100, 5000),
+                operation=rng.choice(OPERATIONS),
+                prompt=f"Prompt {rng.randint(0, 500)}",
+                response_text="Response",
+            ))
+            latencies.append(time.perf_counter() - t0)
+        except Exception as e:
+            if not is_locked_error(e):
+                raise
+            errors += 1
+    storage.engine.dispose()
+    results.put(("write", latencies, errors))
+
+
+def reader(url: str, pragmas: dict, deadline: float, results):
+    storage = Storage(url, rollups=False, pragmas=pragmas)
+    latencies, errors = [], 0
+    while time.time() < deadline:
+        t0 = time.perf_counter()
+        try:
+            storage.get_llm_calls(project_name="bench", limit=500, include_bodies=False)
+            storage.aggregate(group_by=["model_name"], metrics=["count", "sum_cost", "avg_latency"])
+            storage.get_call_count(project_name="bench")
+            latencies.append(time.perf_counter() - t0)
+        except Exception as e:
+            if not is_locked_error(e):
+                raise
+            errors += 1
+    storage.engine.dispose()
+    results.put(("read", latencies, errors))
+
+
+def run_profile(name: str, writers: int, readers: int, seconds: float, seed_rows: int) -> dict:
+    pragmas = PROFILES[name]
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+
+        # Seed so the readers' queries do real work
+        storage = Storage(url, pragmas=pragmas)
+        obs = Observatory(project_name="bench", enabled=True, storage=storage)
+        session = obs.start_session("seed")
+        rng = random.Random(0)
+        obs.record_calls_bulk(
+            (
+                {
+                    "provider": ModelProvider.OPENAI,
+                    "model_name": rng.choice(MODELS),
+                    "prompt_tokens": 100,
+                    "completion_tokens": 50,
+                    "latency_ms": rng.uniform(100, 5000),
+                    "operation": rng.choice(OPERATIONS),
+                }
+                for _ in range(seed_rows)
+            ),
+            session=session,
+        )
+        storage.engine.dispose()
+
+        results = multiprocessing.Queue()
+        deadline = time.time() + 2 + seconds  # 2s for the processes to start
+        processes = [
+            multiprocessing.Process(target=writer, args=(url, pragmas, deadline, i, results))
+            for i in range(writers)
+        ] + [
+            multiprocessing.Process(target=reader, args=(url, pragmas, deadline, results))
+            for _ in range(readers)
+        ]
+        for process in processes:
+            process.start()
+        collected = [results.get() for _ in processes]
+        for process in processes:
+            process.join()
+
+    stats = {}
+    for kind in ("write", "read"):
+        latencies = sorted(l for k, ls, _ in collected if k == kind for l in ls)
+        stats[kind] = {
+            "ops": len(latencies) / seconds,
+            "errors": sum(e for k, _, e in collected if k == kind),
+            "p50": statistics.median(latencies) * 1000 if latencies else None,
+            "p99": latencies[int(len(latencies) * 0.99)] * 1000 if latencies else None,
+        }
+    return stats
+
+
+def fmt(value) -> str:
+    return f"{value:.1f}" if value is not None else "-"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark concurrent SQLite readers and writers")
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--seed-rows", type=int, default=20000)
+    args = parser.parse_args()
+
+    print("=" * 78)
+    print(f"SQLITE CONCURRENCY ({args.writers} writers, {args.readers} readers, {args.seconds:g}s)")
+    print("=" * 78)
+    print(f"{'profile':<9} {'kind':<6} {'ops/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'locked errors':>14}")
+    for name in PROFILES:
+        stats = run_profile(name, args.writers, args.readers, args.seconds, args.seed_rows)
+        for kind, s in stats.items():
+            print(
+                f"{name:<9} {kind:<6} {s['ops']:>9.1f} {fmt(s['p50']):>9} "
+                f"{fmt(s['p99']):>9} {s['errors']:>14}"
+            )
+
+
+if __name__ == "__main__":
+    main()
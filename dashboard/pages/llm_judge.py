@@ -18,19 +18,18 @@ import json
 # =============================================================================
 
 @st.cache_resource
-def get_connection():
-    """Get database connection."""
-    import sqlite3
+def get_judge_storage():
+    """Get Storage for the judge page (honors OBSERVATORY_DB_PATH)."""
     import os
+    from dashboard.utils.data_fetcher import get_storage, open_storage
     
-    db_path = os.environ.get('OBSERVATORY_DB_PATH', 
-        os.path.join(os.path.dirname(__file__), '..', '..', 'observatory.db'))
-    
-    if not os.path.exists(db_path):
-        st.error(f"Database not found: {db_path}")
-        return None
-    
-    return sqlite3.connect(db_path, check_same_thread=False)
+    db_path = os.environ.get('OBSERVATORY_DB_PATH')
+    if db_path:
+        if not os.path.exists(db_path):
+            st.error(f"Database not found: {db_path}")
+            return None
+        return open_storage(f"sqlite:///{db_path}")
+    return get_storage()
 
 
 # =============================================================================
@@ -40,33 +39,37 @@ def get_connection():
 @st.cache_data(ttl=60)
 def load_judge_data(start_date: str, end_date: str) -> pd.DataFrame:
     """Load LLM calls that have quality evaluations."""
-    conn = get_connection()
-    if conn is None:
+    storage = get_judge_storage()
+    if storage is None:
         return pd.DataFrame()
     
-    query = """
-        SELECT 
-            id,
-            timestamp,
-            agent_name,
-            operation,
-            model_name,
-            prompt,
-            response_text,
-            quality_evaluation,
-            prompt_tokens,
-            completion_tokens,
-            latency_ms,
-            success
-        FROM llm_calls
-        WHERE quality_evaluation IS NOT NULL 
-          AND quality_evaluation != ''
-          AND timestamp BETWEEN ? AND ?
-        ORDER BY timestamp DESC
-    """
-    
     try:
-        df = pd.read_sql_query(query, conn, params=(start_date, end_date))
+        # Read through Storage so prompt/response bodies kept in the
+        # blobs table are rehydrated. Only evaluated calls are read
+        # (has_quality_eval is filtered in SQL), all of the period, in pages.
+        calls = storage.iter_llm_calls(
+            newest_first=True,
+            start_time=datetime.strptime(start_date, '%Y-%m-%d %H:%M:%S'),
+            end_time=datetime.strptime(end_date, '%Y-%m-%d %H:%M:%S'),
+            has_quality_eval=True,
+        )
+        df = pd.DataFrame([
+            {
+                'id': call.id,
+                'timestamp': call.timestamp,
+                'agent_name': call.agent_name,
+                'operation': call.operation,
+                'model_name': call.model_name,
+                'prompt': call.prompt,
+                'response_text': call.response_text,
+                'quality_evaluation': call.quality_evaluation.model_dump_json(),
+                'prompt_tokens': call.prompt_tokens,
+                'completion_tokens': call.completion_tokens,
+                'latency_ms': call.latency_ms,
+                'success': call.success,
+            }
+            for call in calls
+        ])
         
         # Parse quality_evaluation JSON
         if not df.empty:
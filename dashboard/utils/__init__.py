@@ -34,16 +34,25 @@ from dashboard.utils.aggregators import (
     calculate_session_kpis,
     group_by_time_period,
     calculate_prompt_breakdown_metrics,
+    merge_groups,
+)
+
+from dashboard.utils.frame_aggregators import (
+    calls_to_frame,
+    aggregate_calls,
 )
 
 from dashboard.utils.data_fetcher import (
     get_storage,
+    get_call_window,
     get_available_projects,
     get_available_models,
     get_available_agents,
     get_available_operations,
     get_sessions,
     get_llm_calls,
+    get_call_metrics,
+    search_llm_calls,
     get_project_overview,
     get_time_series_data,
     get_comparative_metrics,
@@ -98,15 +107,23 @@ __all__ = [
     'calculate_session_kpis',
     'group_by_time_period',
     'calculate_prompt_breakdown_metrics',
+    'merge_groups',
+    
+    # Vectorized aggregators
+    'calls_to_frame',
+    'aggregate_calls',
     
     # Data Fetchers
     'get_storage',
+    'get_call_window',
     'get_available_projects',
     'get_available_models',
     'get_available_agents',
     'get_available_operations',
     'get_sessions',
     'get_llm_calls',
+    'get_call_metrics',
+    'search_llm_calls',
     'get_project_overview',
     'get_time_series_data',
     'get_comparative_metrics',
@@ -8,6 +8,7 @@ Updated with:
 - Enhanced quality metrics (failure reasons, factual errors)
 - Prompt breakdown analysis
 - Cache key pattern analysis
+- Merging of SQL GROUP BY results from Storage.aggregate
 """
 
 import numpy as np
@@ -443,6 +444,36 @@ def calculate_time_series(
     return result
 
 
+# =============================================================================
+# SQL AGGREGATE RESULTS
+# =============================================================================
+
+def merge_groups(
+    groups: List[Dict[str, Any]],
+    key: Optional[str],
+    metrics: List[str],
+    default: str = "Unknown"
+) -> Dict[Any, Dict[str, Any]]:
+    """
+    Re-group `Storage.aggregate` rows by a single dimension.
+    
+    Additive `metrics` (counts and sums) are summed per value of `key`. Every
+    other dimension in the rows is kept as a {value: call count} breakdown
+    under "by_<dimension>". With key=None all rows merge into one entry.
+    """
+    merged = {}
+    for group in groups:
+        name = (group.get(key) or default) if key else None
+        target = merged.setdefault(name, {metric: 0 for metric in metrics})
+        for metric in metrics:
+            target[metric] += group.get(metric) or 0
+        for dimension, value in group.items():
+            if dimension != key and dimension not in metrics and dimension != 'bucket':
+                breakdown = target.setdefault(f'by_{dimension}', defaultdict(int))
+                breakdown[value] += group.get('count') or 0
+    return merged
+
+
 # =============================================================================
 # SESSION KPIS
 # =============================================================================
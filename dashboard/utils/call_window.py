@@ -0,0 +1,404 @@
+"""
+Call Window - Shared Columnar Cache of Recent Calls
+Location: dashboard/utils/call_window.py
+
+One process-wide copy of the most recent LLM calls, shared by every page
+and every browser session, instead of one pickled list of dicts per
+`get_llm_calls` argument combination.
+
+Calls are held column by column: NumPy arrays for numbers and timestamps,
+dictionary-encoded (int32 codes + one list of distinct values) for
+project, model, agent, operation and the other repeated strings, and
+object arrays for text and metadata. Pages ask for a filtered view; the
+filters run as vectorized comparisons over the columns and the view keeps
+only the matching row positions. Dicts are built when the page reads them.
+
+The window is refreshed incrementally: every REFRESH_INTERVAL seconds it
+loads calls at or after its newest timestamp (minus LATE_ARRIVAL_GRACE, for
+calls written with a slightly older timestamp) and drops the oldest rows
+beyond `max_rows`. A full reload every FULL_RELOAD_INTERVAL picks up
+deleted and updated calls.
+
+A view is only returned when the window can answer exactly: `limit`
+matching calls are in the window, or the filter's start_time lies inside
+it, or the window holds all calls. Otherwise `select` returns None and the
+caller queries Storage.
+
+Usage:
+    window = CallWindow(storage, convert=_llm_call_to_dict)
+    view = window.select(limit=1000, project_name="My App", has_routing=True)
+    if view is not None:
+        calls = view.to_dicts()
+        costs = view.column('total_cost')    # NumPy array
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta
+from itertools import islice
+from typing import Optional, List, Dict, Any, Callable, Iterable, Tuple
+
+import numpy as np
+
+from observatory import Storage
+from observatory.models import LLMCall
+from observatory.partitions import find_archives
+
+
+DEFAULT_WINDOW_ROWS = 20000  # above the largest page limit (10,000)
+REFRESH_INTERVAL = 10  # seconds
+FULL_RELOAD_INTERVAL = 600  # seconds
+LATE_ARRIVAL_GRACE = timedelta(minutes=5)
+
+# Column layout (keys of data_fetcher._llm_call_to_dict, plus project_name)
+DICTIONARY_COLUMNS = (
+    'project_name', 'session_id', 'provider', 'model_name', 'agent_name',
+    'operation', 'prompt_variant_id', 'test_dataset_id',
+)
+FLOAT_COLUMNS = ('latency_ms', 'prompt_cost', 'completion_cost', 'total_cost')
+INT_COLUMNS = ('prompt_tokens', 'completion_tokens', 'total_tokens')
+BOOL_COLUMNS = ('success',)
+OBJECT_COLUMNS = (
+    'id', 'error', 'routing_decision', 'cache_metadata', 'quality_evaluation',
+    'prompt_metadata', 'prompt', 'prompt_normalized', 'response_text',
+    'prompt_breakdown', 'metadata',
+)
+
+# Nested metadata fields also kept as their own object columns
+# ("routing_decision.chosen_model"), so aggregations over the window
+# (frame_aggregators.py) don't visit the dicts
+NESTED_COLUMNS = {
+    'routing_decision': ('chosen_model', 'routing_strategy', 'complexity_score', 'estimated_cost_savings'),
+    'cache_metadata': ('cache_hit', 'cache_cluster_id', 'cache_key_candidates'),
+    'quality_evaluation': ('judge_score', 'hallucination_flag', 'factual_error', 'failure_reason'),
+}
+
+# What get_llm_calls(include_bodies=False) returns for the body fields
+BODY_DEFAULTS = {
+    'prompt': None,
+    'prompt_normalized': None,
+    'response_text': None,
+    'prompt_breakdown': None,
+}
+
+
+# =============================================================================
+# COLUMNS
+# =============================================================================
+
+class WindowSnapshot:
+    """
+    Column arrays of the window at one refresh, oldest call first.
+    
+    Never modified after it is built; a refresh builds a new snapshot, so
+    views taken from an older one stay valid.
+    """
+
+    def __init__(
+        self,
+        columns: Dict[str, np.ndarray],
+        dictionaries: Dict[str, List[Any]],
+        complete: bool,
+    ):
+        self.columns = columns
+        self.dictionaries = dictionaries
+        self.codes = {
+            name: {value: code for code, value in enumerate(values)}
+            for name, values in dictionaries.items()
+        }
+        self.complete = complete  # True if no older calls exist outside the window
+        self.size = len(columns['timestamp'])
+
+    @property
+    def start(self) -> Optional[datetime]:
+        """Oldest timestamp in the window."""
+        return self.columns['timestamp'][0].astype(datetime) if self.size else None
+
+    @property
+    def end(self) -> Optional[datetime]:
+        """Newest timestamp in the window."""
+        return self.columns['timestamp'][-1].astype(datetime) if self.size else None
+
+    def decoded(self, name: str, rows: np.ndarray) -> np.ndarray:
+        """Values of a column at `rows` (dictionary columns decoded)."""
+        if name in self.dictionaries:
+            return np.asarray(self.dictionaries[name], dtype=object)[self.columns[name][rows]]
+        return self.columns[name][rows]
+
+
+def encode_calls(
+    calls: List[Dict[str, Any]],
+    dictionaries: Dict[str, List[Any]],
+) -> Dict[str, np.ndarray]:
+    """
+    Column arrays for a batch of call dicts. New distinct values are
+    appended to `dictionaries` (codes already handed out stay valid).
+    """
+    columns: Dict[str, np.ndarray] = {
+        'timestamp': np.array([call['timestamp'] for call in calls], dtype='datetime64[us]'),
+    }
+    for name in DICTIONARY_COLUMNS:
+        values = dictionaries.setdefault(name, [])
+        index = {value: code for code, value in enumerate(values)}
+        codes = np.empty(len(calls), dtype=np.int32)
+        for i, call in enumerate(calls):
+            value = call.get(name)
+            code = index.get(value)
+            if code is None:
+                code = index[value] = len(values)
+                values.append(value)
+            codes[i] = code
+        columns[name] = codes
+    for name in FLOAT_COLUMNS:
+        columns[name] = np.array([call[name] for call in calls], dtype=np.float64)
+    for name in INT_COLUMNS:
+        columns[name] = np.array([call[name] for call in calls], dtype=np.int64)
+    for name in BOOL_COLUMNS:
+        columns[name] = np.array([call[name] for call in calls], dtype=bool)
+    for name in OBJECT_COLUMNS:
+        column = np.empty(len(calls), dtype=object)
+        column[:] = [call.get(name) for call in calls]
+        columns[name] = column
+    for field, keys in NESTED_COLUMNS.items():
+        for key in keys:
+            column = np.empty(len(calls), dtype=object)
+            column[:] = [call[field].get(key) if call[field] else None for call in calls]
+            columns[f"{field}.{key}"] = column
+    
+    # Filter columns (cache_hit_flag: -1 = no cache metadata, 0 = miss, 1 = hit)
+    columns['cache_hit_flag'] = np.array(
+        [int(bool(call['cache_metadata']['cache_hit'])) if call['cache_metadata'] else -1 for call in calls],
+        dtype=np.int8,
+    )
+    columns['has_routing'] = np.array([call['routing_decision'] is not None for call in calls], dtype=bool)
+    columns['has_quality_eval'] = np.array([call['quality_evaluation'] is not None for call in calls], dtype=bool)
+    return columns
+
+
+def concat_columns(parts: Iterable[Dict[str, np.ndarray]]) -> Dict[str, np.ndarray]:
+    parts = [part for part in parts if part and len(part['timestamp'])]
+    if not parts:
+        return {}
+    return {name: np.concatenate([part[name] for part in parts]) for name in parts[0]}
+
+
+def take_rows(columns: Dict[str, np.ndarray], rows) -> Dict[str, np.ndarray]:
+    return {name: column[rows] for name, column in columns.items()}
+
+
+# =============================================================================
+# VIEWS
+# =============================================================================
+
+class CallView:
+    """Calls of a snapshot matching a page's filters, newest first."""
+
+    def __init__(self, snapshot: WindowSnapshot, rows: np.ndarray):
+        self.snapshot = snapshot
+        self.rows = rows
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def column(self, name: str) -> np.ndarray:
+        """One column as an array (strings decoded), in view order."""
+        return self.snapshot.decoded(name, self.rows)
+
+    def codes(self, name: str) -> Tuple[np.ndarray, List[Any]]:
+        """A dictionary-encoded column as (codes in view order, values)."""
+        return self.snapshot.columns[name][self.rows], self.snapshot.dictionaries[name]
+
+    def to_dicts(self, include_bodies: bool = True) -> List[Dict[str, Any]]:
+        """
+        The calls as `data_fetcher.get_llm_calls` dicts. Nested metadata
+        dicts are shared with the window; treat them as read-only.
+        """
+        keys = ['timestamp', *DICTIONARY_COLUMNS[1:], *FLOAT_COLUMNS, *INT_COLUMNS, *BOOL_COLUMNS, *OBJECT_COLUMNS]
+        if not include_bodies:
+            keys = [key for key in keys if key not in BODY_DEFAULTS and key != 'metadata']
+        # datetime64[us] -> datetime, int64 -> int, ...
+        values = [self.column(key).tolist() for key in keys]
+        
+        calls = [dict(zip(keys, row)) for row in zip(*values)]
+        if not include_bodies:
+            for call in calls:
+                call.update(BODY_DEFAULTS, metadata={})
+        return calls
+
+
+# =============================================================================
+# WINDOW
+# =============================================================================
+
+class CallWindow:
+    """Process-wide columnar window over the newest `max_rows` calls."""
+
+    def __init__(
+        self,
+        storage: Storage,
+        convert: Callable[[LLMCall], Dict[str, Any]],
+        max_rows: int = DEFAULT_WINDOW_ROWS,
+        refresh_interval: float = REFRESH_INTERVAL,
+        full_reload_interval: float = FULL_RELOAD_INTERVAL,
+    ):
+        """
+        Args:
+            storage: Storage to load calls from
+            convert: LLMCall -> page dict (data_fetcher._llm_call_to_dict)
+            max_rows: Calls kept in memory (newest first)
+            refresh_interval: Seconds between incremental refreshes
+            full_reload_interval: Seconds between full reloads
+        """
+        self.storage = storage
+        self.convert = convert
+        self.max_rows = max(1, max_rows)
+        self.refresh_interval = refresh_interval
+        self.full_reload_interval = full_reload_interval
+        
+        self._snapshot: Optional[WindowSnapshot] = None
+        self._refreshed_at = 0.0
+        self._reloaded_at = 0.0
+        self._lock = threading.Lock()
+
+    # =========================================================================
+    # QUERIES
+    # =========================================================================
+
+    def select(
+        self,
+        limit: int = 1000,
+        project_name: Optional[str] = None,
+        session_id: Optional[str] = None,
+        model_name: Optional[str] = None,
+        agent_name: Optional[str] = None,
+        operation: Optional[str] = None,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        success_only: Optional[bool] = None,
+        has_quality_eval: Optional[bool] = None,
+        has_routing: Optional[bool] = None,
+        has_cache: Optional[bool] = None,
+        cache_hit: Optional[bool] = None,
+    ) -> Optional[CallView]:
+        """
+        Newest `limit` calls matching the filters (same semantics as
+        `Storage.get_llm_calls`), or None if the window can't answer exactly.
+        """
+        snapshot = self.snapshot()
+        columns = snapshot.columns
+        mask = np.ones(snapshot.size, dtype=bool)
+        
+        for name, value in (
+            ('project_name', project_name),
+            ('session_id', session_id),
+            ('model_name', model_name),
+            ('agent_name', agent_name),
+            ('operation', operation),
+        ):
+            if value:
+                code = snapshot.codes[name].get(value)
+                if code is None:
+                    mask[:] = False
+                else:
+                    mask &= columns[name] == code
+        
+        if start_time:
+            mask &= columns['timestamp'] >= np.datetime64(start_time, 'us')
+        if end_time:
+            mask &= columns['timestamp'] < np.datetime64(end_time, 'us')
+        if success_only is not None:
+            mask &= columns['success'] == success_only
+        if has_quality_eval is not None:
+            mask &= columns['has_quality_eval'] == has_quality_eval
+        if has_routing is not None:
+            mask &= columns['has_routing'] == has_routing
+        if has_cache is not None:
+            mask &= (columns['cache_hit_flag'] >= 0) == has_cache
+        if cache_hit is not None:
+            mask &= columns['cache_hit_flag'] == int(cache_hit)
+        
+        rows = np.flatnonzero(mask)[::-1][:limit]
+        covered = (
+            len(rows) >= limit
+            or snapshot.complete
+            or (start_time is not None and snapshot.start is not None and start_time > snapshot.start)
+        )
+        return CallView(snapshot, rows) if covered else None
+
+    def snapshot(self) -> WindowSnapshot:
+        """Current snapshot, refreshed first if it is due."""
+        if self._snapshot is None or time.monotonic() - self._refreshed_at >= self.refresh_interval:
+            # Only the first load waits; later, readers use the old snapshot
+            # while one thread refreshes
+            if self._lock.acquire(blocking=self._snapshot is None):
+                try:
+                    self._refresh()
+                finally:
+                    self._lock.release()
+        return self._snapshot
+
+    # =========================================================================
+    # LOADING
+    # =========================================================================
+
+    def _refresh(self):
+        now = time.monotonic()
+        if self._snapshot is not None and now - self._refreshed_at < self.refresh_interval:
+            return  # refreshed by another thread while this one waited
+        if (
+            self._snapshot is None
+            or self._snapshot.end is None
+            or now - self._reloaded_at >= self.full_reload_interval
+        ):
+            self._snapshot = self._load_all()
+            self._reloaded_at = now
+        else:
+            self._snapshot = self._load_since(self._snapshot)
+        self._refreshed_at = now
+
+    def _load_all(self) -> WindowSnapshot:
+        """The newest `max_rows` calls."""
+        calls = list(islice(self.storage.iter_llm_calls(newest_first=True), self.max_rows))
+        calls.reverse()
+        dictionaries: Dict[str, List[Any]] = {}
+        columns = encode_calls(self._to_dicts(calls) if calls else [], dictionaries)
+        # Archived SQLite months are only read for start_time filters
+        archived = self.storage.archive_database is not None and find_archives(self.storage.archive_database)
+        return WindowSnapshot(
+            columns,
+            dictionaries,
+            complete=len(calls) < self.max_rows and not archived,
+        )
+
+    def _load_since(self, snapshot: WindowSnapshot) -> WindowSnapshot:
+        """Append calls newer than the snapshot and trim it to `max_rows`."""
+        since = snapshot.end - LATE_ARRIVAL_GRACE
+        known = set(snapshot.columns['id'][snapshot.columns['timestamp'] >= np.datetime64(since, 'us')])
+        calls = [call for call in self.storage.iter_llm_calls(start_time=since) if call.id not in known]
+        if not calls:
+            return snapshot
+        
+        dictionaries = {name: list(values) for name, values in snapshot.dictionaries.items()}
+        columns = concat_columns([snapshot.columns, encode_calls(self._to_dicts(calls), dictionaries)])
+        
+        # Late arrivals can land before the previous newest call
+        timestamps = columns['timestamp']
+        if np.any(timestamps[1:] < timestamps[:-1]):
+            columns = take_rows(columns, np.argsort(timestamps, kind='stable'))
+        
+        complete = snapshot.complete
+        if len(columns['timestamp']) > self.max_rows:
+            columns = take_rows(columns, slice(-self.max_rows, None))
+            complete = False
+        return WindowSnapshot(columns, dictionaries, complete)
+
+    def _to_dicts(self, calls: List[LLMCall]) -> List[Dict[str, Any]]:
+        """Page dicts of the calls, with their project (not on LLMCall)."""
+        rows = self.storage.query_calls(['id', 'project_name'], start_time=calls[0].timestamp)
+        projects = dict(rows)
+        converted = []
+        for call in calls:
+            data = self.convert(call)
+            data['project_name'] = projects.get(call.id)
+            converted.append(data)
+        return converted
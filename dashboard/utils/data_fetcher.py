@@ -8,24 +8,33 @@ Pages should use these functions instead of querying storage directly.
 UPDATED: 
 - Fixed field name mappings for QualityEvaluation (confidence_score, not confidence)
 - Now properly passes all filters (operation, start_time, end_time, success_only) to storage layer
+- Added get_call_metrics: column projections for charts (no bodies, no model hydration)
+- Overview totals and time series are computed in SQL (Storage.aggregate) over all history
+- Overview, time series and period comparison read the rollup tables (O(buckets))
+- Overview latency percentiles come from the rollup latency sketches (all history)
+- get_llm_calls metadata filters (has_*, cache_hit) run in SQL on promoted columns
+- Reads go through a read-only engine ($DATABASE_READ_URL, default: DATABASE_URL)
+- Added search_llm_calls: indexed full-text search (Storage.search_calls) over all history
+- get_llm_calls reads recent calls from a shared columnar window (call_window.py),
+  refreshed incrementally, instead of one cached copy per filter combination
+- Overview routing/cache/quality metrics come from one pandas pass (frame_aggregators.py)
+  over the call window's columns (aggregator functions when the window can't answer)
 """
 
 import streamlit as st
-from typing import Optional, List, Dict, Any, Union
+from typing import Optional, List, Dict, Any, Union, Tuple
 from datetime import datetime, timedelta
 
 from observatory import Storage
 from observatory.models import Session, LLMCall, ModelProvider
+from dashboard.utils.call_window import CallWindow
+from dashboard.utils.frame_aggregators import aggregate_calls
 from dashboard.utils.aggregators import (
+    merge_groups,
     calculate_session_kpis,
-    aggregate_by_model,
-    aggregate_by_agent,
-    aggregate_by_operation,
-    calculate_cost_breakdown,
     calculate_routing_metrics,
     calculate_cache_metrics,
     calculate_quality_metrics,
-    calculate_time_series,
     group_by_time_period
 )
 
@@ -75,12 +84,25 @@ def parse_period_to_days(period: Union[str, int, float, None], default: float =
 # STORAGE ACCESS
 # =============================================================================
 
+def open_storage(database_url: str) -> Storage:
+    """
+    Storage whose reads use a separate read-only engine.
+    
+    $DATABASE_READ_URL can point at a Postgres replica or a SQLite snapshot;
+    by default reads open `database_url` itself read-only, so page loads
+    never take the write lock or use the ingest connections.
+    """
+    import os
+    read_url = os.getenv("DATABASE_READ_URL", database_url)
+    return Storage(database_url=database_url, read_url=read_url)
+
+
 @st.cache_resource
 def get_storage() -> Storage:
     """Get cached Storage instance."""
     import os
     db_path = os.getenv("DATABASE_URL", "sqlite:///observatory.db")
-    return Storage(database_url=db_path)
+    return open_storage(db_path)
 
 
 # =============================================================================
@@ -133,7 +155,12 @@ def get_sessions(
     )
 
 
-@st.cache_data(ttl=30)
+@st.cache_resource
+def get_call_window() -> CallWindow:
+    """Get the process-wide window of recent calls (see call_window.py)."""
+    return CallWindow(get_storage(), convert=_llm_call_to_dict)
+
+
 def get_llm_calls(
     project_name: Optional[str] = None,
     session_id: Optional[str] = None,
@@ -146,7 +173,9 @@ def get_llm_calls(
     has_quality_eval: Optional[bool] = None,
     has_routing: Optional[bool] = None,
     has_cache: Optional[bool] = None,
-    limit: int = 1000
+    cache_hit: Optional[bool] = None,
+    limit: int = 1000,
+    include_bodies: bool = True
 ) -> List[Dict[str, Any]]:
     """
     Get LLM calls with optional filters.
@@ -158,16 +187,60 @@ def get_llm_calls(
         agent_name: Filter by agent name
         operation: Filter by operation name
         start_time: Filter calls on or after this time
-        end_time: Filter calls on or before this time
+        end_time: Filter calls before this time
         success_only: If True, only return successful calls
         has_quality_eval: If True, only return calls with quality evaluation
         has_routing: If True, only return calls with routing decision
         has_cache: If True, only return calls with cache metadata
+        cache_hit: If True, only cache hits; if False, only cache misses
         limit: Maximum number of calls to return
+        include_bodies: If False, skip prompt/response text, prompt breakdown
+            and metadata (much faster for metric-only views)
     
     Returns:
         List of LLM call dictionaries
     """
+    filters = dict(
+        project_name=project_name,
+        session_id=session_id,
+        model_name=model_name,
+        agent_name=agent_name,
+        operation=operation,
+        start_time=start_time,
+        end_time=end_time,
+        success_only=success_only,
+        has_quality_eval=has_quality_eval,
+        has_routing=has_routing,
+        has_cache=has_cache,
+        cache_hit=cache_hit,
+    )
+    
+    # Recent calls come from the shared in-memory window
+    view = get_call_window().select(limit=limit, **filters)
+    if view is not None:
+        return view.to_dicts(include_bodies=include_bodies)
+    
+    return _fetch_llm_calls(limit=limit, include_bodies=include_bodies, **filters)
+
+
+@st.cache_data(ttl=30)
+def _fetch_llm_calls(
+    project_name: Optional[str] = None,
+    session_id: Optional[str] = None,
+    model_name: Optional[str] = None,
+    agent_name: Optional[str] = None,
+    operation: Optional[str] = None,
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+    success_only: Optional[bool] = None,
+    has_quality_eval: Optional[bool] = None,
+    has_routing: Optional[bool] = None,
+    has_cache: Optional[bool] = None,
+    cache_hit: Optional[bool] = None,
+    limit: int = 1000,
+    include_bodies: bool = True
+) -> List[Dict[str, Any]]:
+    """get_llm_calls from Storage, for queries the call window can't answer."""
     storage = get_storage()
     
     # Pass all supported filters to storage layer
@@ -180,29 +253,98 @@ def get_llm_calls(
         start_time=start_time,
         end_time=end_time,
         success_only=success_only,
-        limit=limit
+        has_quality_eval=has_quality_eval,
+        has_routing=has_routing,
+        has_cache=has_cache,
+        cache_hit=cache_hit,
+        limit=limit,
+        include_bodies=include_bodies
     )
     
     # Convert to dicts
-    result = [_llm_call_to_dict(call) for call in calls]
+    return [_llm_call_to_dict(call) for call in calls]
+
+
+# Columns most metric-only views need
+METRIC_COLUMNS = ('timestamp', 'total_cost', 'total_tokens', 'latency_ms')
+
+
+@st.cache_data(ttl=30)
+def get_call_metrics(
+    columns: Tuple[str, ...] = METRIC_COLUMNS,
+    project_name: Optional[str] = None,
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+    limit: int = 10000
+) -> List[Dict[str, Any]]:
+    """
+    Get selected llm_calls columns as lightweight dicts.
+    
+    Reads only the requested columns via Storage.query_calls, skipping
+    bodies, JSON decoding of unused fields and LLMCall validation. Use for
+    pages that only chart cost, tokens or latency.
+    
+    Args:
+        columns: llm_calls column names to fetch
+        project_name: Filter by project name
+        start_time: Filter calls on or after this time
+        end_time: Filter calls before this time
+        limit: Maximum number of calls to return
     
-    # Apply additional filters that storage doesn't support natively
-    if has_quality_eval is True:
-        result = [c for c in result if c.get('quality_evaluation') is not None]
-    elif has_quality_eval is False:
-        result = [c for c in result if c.get('quality_evaluation') is None]
+    Returns:
+        List of {column: value} dicts, newest first
+    """
+    storage = get_storage()
+    rows = storage.query_calls(
+        list(columns),
+        project_name=project_name,
+        start_time=start_time,
+        end_time=end_time,
+        limit=limit
+    )
+    return [dict(zip(columns, row)) for row in rows]
+
+
+@st.cache_data(ttl=30)
+def search_llm_calls(
+    query: str,
+    project_name: Optional[str] = None,
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+    limit: int = 100
+) -> List[Dict[str, Any]]:
+    """
+    Full-text search over prompts, responses and errors.
     
-    if has_routing is True:
-        result = [c for c in result if c.get('routing_decision') is not None]
-    elif has_routing is False:
-        result = [c for c in result if c.get('routing_decision') is None]
+    Runs against the database's search index (Storage.search_calls), so it
+    covers the full history instead of the calls already loaded on a page.
+    Pair with components.render_search_filter.
     
-    if has_cache is True:
-        result = [c for c in result if c.get('cache_metadata') is not None]
-    elif has_cache is False:
-        result = [c for c in result if c.get('cache_metadata') is None]
+    Args:
+        query: Search text from the search box
+        project_name: Filter by project name
+        start_time: Filter calls on or after this time
+        end_time: Filter calls before this time
+        limit: Maximum number of hits
     
-    return result
+    Returns:
+        LLM call dictionaries, best match first, each with "search_score"
+        and "search_snippet" (matched words in [brackets])
+    """
+    if not query:
+        return []
+    storage = get_storage()
+    hits = storage.search_calls(
+        query,
+        limit=limit,
+        project_name=project_name,
+        start_time=start_time,
+        end_time=end_time,
+    )
+    return [
+        {**_llm_call_to_dict(hit['call']), 'search_score': hit['score'], 'search_snippet': hit['snippet']}
+        for hit in hits
+    ]
 
 
 # =============================================================================
@@ -336,12 +478,46 @@ def _llm_call_to_dict(call: LLMCall) -> Dict[str, Any]:
 # HIGH-LEVEL ANALYSIS FUNCTIONS
 # =============================================================================
 
+# Additive metrics behind the overview (summed across SQL groups)
+OVERVIEW_METRICS = [
+    'count', 'sum_cost', 'sum_tokens', 'sum_prompt_tokens', 'sum_completion_tokens',
+    'sum_latency', 'errors', 'scored', 'sum_judge_score',
+]
+
+# Columns of the recent-call window used for the JSON-metadata distributions
+OVERVIEW_WINDOW_COLUMNS = (
+    'model_name', 'total_cost', 'total_tokens', 'latency_ms',
+    'routing_decision', 'cache_metadata', 'quality_evaluation',
+)
+
+# get_time_series_data metric -> Storage.aggregate metric
+TIME_SERIES_METRICS = {
+    'cost': 'sum_cost',
+    'tokens': 'sum_tokens',
+    'latency': 'sum_latency',
+    'avg_latency': 'avg_latency',
+    'count': 'count',
+}
+
+
 @st.cache_data(ttl=60)
 def get_project_overview(project_name: Optional[str] = None) -> Dict[str, Any]:
-    """Get comprehensive project overview with all metrics."""
-    llm_calls = get_llm_calls(project_name=project_name, limit=5000)
+    """
+    Get comprehensive project overview with all metrics.
     
-    if not llm_calls:
+    Totals, per-model/agent/operation breakdowns, KPIs and latency
+    percentiles come from the daily rollups (and their latency sketches) over
+    all history. The routing, cache and quality distributions are computed
+    from the 5,000 most recent calls.
+    """
+    storage = get_storage()
+    groups = storage.aggregate_rollups(
+        group_by=['model_name', 'agent_name', 'operation'],
+        metrics=OVERVIEW_METRICS,
+        project_name=project_name,
+    )
+    
+    if not groups:
         return {
             'kpis': {
                 'total_calls': 0,
@@ -361,28 +537,88 @@ def get_project_overview(project_name: Optional[str] = None) -> Dict[str, Any]:
             'quality_metrics': {},
         }
     
-    # Calculate all metrics
-    by_model = aggregate_by_model(llm_calls)
-    by_agent = aggregate_by_agent(llm_calls)
-    by_operation = aggregate_by_operation(llm_calls)
-    cost_breakdown = calculate_cost_breakdown(llm_calls)
-    routing_metrics = calculate_routing_metrics(llm_calls)
-    cache_metrics = calculate_cache_metrics(llm_calls)
-    quality_metrics = calculate_quality_metrics(llm_calls)
+    percentiles = {
+        row['model_name'] or 'Unknown': row
+        for row in storage.latency_quantiles(
+            quantiles=(0.5, 0.95), group_by=['model_name'], project_name=project_name
+        )
+    }
+    
+    # Recent window for JSON-metadata distributions: the call window's
+    # pre-flattened columns when it covers them, else a column projection
+    recent_calls = get_call_window().select(limit=5000, project_name=project_name)
+    
+    def avg_quality(data):
+        return data['sum_judge_score'] / data['scored'] if data['scored'] else None
+    
+    by_model = {}
+    for model, data in merge_groups(groups, 'model_name', OVERVIEW_METRICS).items():
+        count = data['count']
+        by_model[model] = {
+            'count': count,
+            'total_cost': data['sum_cost'],
+            'avg_cost': data['sum_cost'] / count,
+            'total_tokens': data['sum_tokens'],
+            'avg_tokens': data['sum_tokens'] / count,
+            'avg_latency_ms': data['sum_latency'] / count,
+            'p50_latency_ms': percentiles.get(model, {}).get('p50') or 0.0,
+            'p95_latency_ms': percentiles.get(model, {}).get('p95') or 0.0,
+            'avg_quality_score': avg_quality(data),
+        }
+    
+    by_agent = {}
+    for agent, data in merge_groups(groups, 'agent_name', OVERVIEW_METRICS).items():
+        count = data['count']
+        by_agent[agent] = {
+            'count': count,
+            'total_cost': data['sum_cost'],
+            'avg_cost': data['sum_cost'] / count,
+            'total_tokens': data['sum_tokens'],
+            'avg_tokens': data['sum_tokens'] / count,
+            'avg_latency_ms': data['sum_latency'] / count,
+            'models_used': [m for m in data['by_model_name'] if m],
+            'operations': {op: n for op, n in data['by_operation'].items() if op},
+            'error_rate': data['errors'] / count,
+        }
+    
+    by_operation = {}
+    for operation, data in merge_groups(groups, 'operation', OVERVIEW_METRICS).items():
+        count = data['count']
+        by_operation[operation] = {
+            'count': count,
+            'total_cost': data['sum_cost'],
+            'avg_cost': data['sum_cost'] / count,
+            'avg_tokens': data['sum_tokens'] / count,
+            'avg_prompt_tokens': data['sum_prompt_tokens'] / count,
+            'avg_completion_tokens': data['sum_completion_tokens'] / count,
+            'avg_latency_ms': data['sum_latency'] / count,
+            'avg_quality_score': avg_quality(data),
+            'error_rate': data['errors'] / count,
+        }
+    
+    cost_breakdown = {model: data['total_cost'] for model, data in by_model.items()}
+    if recent_calls is not None:
+        recent_metrics = aggregate_calls(recent_calls)
+        routing_metrics = recent_metrics['routing_metrics']
+        cache_metrics = recent_metrics['cache_metrics']
+        quality_metrics = recent_metrics['quality_metrics']
+    else:
+        recent_calls = get_call_metrics(OVERVIEW_WINDOW_COLUMNS, project_name=project_name, limit=5000)
+        routing_metrics = calculate_routing_metrics(recent_calls)
+        cache_metrics = calculate_cache_metrics(recent_calls)
+        quality_metrics = calculate_quality_metrics(recent_calls)
     
     # Calculate KPIs
-    total_cost = sum(c['total_cost'] for c in llm_calls)
-    total_tokens = sum(c['total_tokens'] for c in llm_calls)
-    total_latency = sum(c['latency_ms'] for c in llm_calls)
-    successful = sum(1 for c in llm_calls if c.get('success', True))
+    totals = merge_groups(groups, None, OVERVIEW_METRICS)[None]
+    total_calls = totals['count']
     
     kpis = {
-        'total_calls': len(llm_calls),
-        'total_cost': total_cost,
-        'total_tokens': total_tokens,
-        'avg_latency_ms': total_latency / len(llm_calls) if llm_calls else 0,
-        'avg_cost_per_call': total_cost / len(llm_calls) if llm_calls else 0,
-        'success_rate': successful / len(llm_calls) if llm_calls else 1.0,
+        'total_calls': total_calls,
+        'total_cost': totals['sum_cost'],
+        'total_tokens': totals['sum_tokens'],
+        'avg_latency_ms': totals['sum_latency'] / total_calls if total_calls else 0,
+        'avg_cost_per_call': totals['sum_cost'] / total_calls if total_calls else 0,
+        'success_rate': (total_calls - totals['errors']) / total_calls if total_calls else 1.0,
     }
     
     return {
@@ -404,17 +640,26 @@ def get_time_series_data(
     interval: str = 'hour',
     period: str = '24h'
 ) -> Dict[datetime, float]:
-    """Get time series data for charts."""
+    """
+    Get time series data for charts.
+    
+    Reads the rollup table matching `interval`, so the cost is proportional
+    to the number of buckets, not calls. The first bucket is counted whole.
+    """
+    if metric not in TIME_SERIES_METRICS:
+        raise ValueError(f"Invalid metric: {metric}")
+    
     days = parse_period_to_days(period)
     start_time = datetime.utcnow() - timedelta(days=days)
+    aggregate_metric = TIME_SERIES_METRICS[metric]
     
-    llm_calls = get_llm_calls(
+    rows = get_storage().aggregate_rollups(
+        metrics=[aggregate_metric],
+        bucket=interval,
         project_name=project_name,
         start_time=start_time,
-        limit=10000
     )
-    
-    return calculate_time_series(llm_calls, metric=metric, interval=interval)
+    return {row['bucket']: row[aggregate_metric] for row in rows}
 
 
 @st.cache_data(ttl=60)
@@ -422,45 +667,39 @@ def get_comparative_metrics(
     project_name: Optional[str] = None,
     period: str = '24h'
 ) -> Dict[str, Any]:
-    """Get comparative metrics between current and previous period."""
+    """Get comparative metrics between current and previous period (from rollups)."""
     days = parse_period_to_days(period)
-    now = datetime.utcnow()
+    # Minute-aligned bounds so both periods map onto whole rollup buckets
+    now = datetime.utcnow().replace(second=0, microsecond=0)
     current_start = now - timedelta(days=days)
     previous_start = current_start - timedelta(days=days)
     
-    current_calls = get_llm_calls(
-        project_name=project_name,
-        start_time=current_start,
-        limit=5000
-    )
-    
-    previous_calls = get_llm_calls(
-        project_name=project_name,
-        start_time=previous_start,
-        end_time=current_start,
-        limit=5000
-    )
+    storage = get_storage()
     
-    def calc_metrics(calls):
-        if not calls:
-            return {'cost': 0, 'tokens': 0, 'latency': 0, 'count': 0}
+    def calc_metrics(start_time, end_time=None):
+        totals = storage.aggregate_rollups(
+            metrics=['sum_cost', 'sum_tokens', 'avg_latency', 'count'],
+            project_name=project_name,
+            start_time=start_time,
+            end_time=end_time,
+        )[0]
         return {
-            'cost': sum(c['total_cost'] for c in calls),
-            'tokens': sum(c['total_tokens'] for c in calls),
-            'latency': sum(c['latency_ms'] for c in calls) / len(calls),
-            'count': len(calls),
+            'cost': totals['sum_cost'],
+            'tokens': totals['sum_tokens'],
+            'latency': totals['avg_latency'] or 0,
+            'count': totals['count'],
         }
     
     return {
-        'current': calc_metrics(current_calls),
-        'previous': calc_metrics(previous_calls),
+        'current': calc_metrics(current_start),
+        'previous': calc_metrics(previous_start, current_start),
     }
 
 
 @st.cache_data(ttl=60)
 def get_routing_analysis(project_name: Optional[str] = None) -> Dict[str, Any]:
     """Get routing analysis for Model Router page."""
-    llm_calls = get_llm_calls(project_name=project_name, limit=5000)
+    llm_calls = get_llm_calls(project_name=project_name, limit=5000, include_bodies=False)
     
     routing_metrics = calculate_routing_metrics(llm_calls)
     
@@ -793,7 +1032,7 @@ def get_cost_forecast(
     model_mix: Optional[Dict[str, float]] = None
 ) -> Dict[str, Any]:
     """Forecast costs based on projected usage."""
-    llm_calls = get_llm_calls(project_name=project_name, limit=1000)
+    llm_calls = get_call_metrics(('total_cost',), project_name=project_name, limit=1000)
     
     if llm_calls:
         actual_avg_cost = sum(c['total_cost'] for c in llm_calls) / len(llm_calls)
@@ -836,7 +1075,7 @@ def get_cost_forecast(
 def get_database_stats() -> Dict[str, Any]:
     """Get database statistics."""
     sessions = get_sessions(limit=10000)
-    llm_calls = get_llm_calls(limit=10000)
+    llm_calls = get_llm_calls(limit=10000, include_bodies=False)
     
     import os
     db_path = os.getenv("DATABASE_URL", "sqlite:///observatory.db")
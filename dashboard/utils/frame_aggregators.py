@@ -0,0 +1,395 @@
+"""
+Vectorized Aggregators - DataFrame Engine
+Location: dashboard/utils/frame_aggregators.py
+
+pandas versions of the call aggregations in aggregators.py. Calls are
+converted to one DataFrame once (nested routing / cache / quality fields
+flattened into columns), then every aggregation runs as vectorized column
+operations:
+
+- by model, agent and operation: one groupby over the factorized
+  (model, agent, operation) key for the additive metrics, rolled up per
+  dimension; latency quantiles per model with groupby().quantile()
+- routing, cache and quality metrics: masks, sums and value_counts over the
+  flattened columns
+
+Strings are kept as object columns (not pandas' Arrow-backed str dtype):
+they're only factorized and counted, and converting them to Arrow and back
+costs more than the aggregation itself.
+
+`aggregate_calls` returns the same values as aggregate_by_model,
+aggregate_by_agent, aggregate_by_operation, calculate_cost_breakdown,
+calculate_routing_metrics, calculate_cache_metrics and
+calculate_quality_metrics, without walking the list once per function.
+
+Benchmark: benchmarks/bench_aggregators.py
+
+Usage:
+    metrics = aggregate_calls(get_llm_calls(project_name, limit=5000, include_bodies=False))
+    metrics['by_model']['gpt-4o']['p95_latency_ms']
+    metrics['cache_metrics']['hit_rate']
+"""
+
+import numpy as np
+import pandas as pd
+from collections import Counter
+from typing import List, Dict, Any, Union, Tuple
+
+from dashboard.utils.call_window import CallView
+
+
+# Scalar call fields: name -> (dtype, value when absent from the dicts)
+CALL_FIELDS = {
+    'model_name': ('category', None),
+    'agent_name': ('category', None),
+    'operation': ('category', None),
+    'total_cost': (np.float64, 0.0),
+    'total_tokens': (np.int64, 0),
+    'prompt_tokens': (np.int64, 0),
+    'completion_tokens': (np.int64, 0),
+    'latency_ms': (np.float64, 0.0),
+}
+
+# Nested metadata: dict field -> {key: (flattened column, dtype)}; bool
+# columns hold the truthiness of the value
+NESTED_FIELDS = {
+    'routing_decision': {
+        'chosen_model': ('routed_model', object),
+        'routing_strategy': ('routing_strategy', object),
+        'complexity_score': ('complexity_score', np.float64),
+        'estimated_cost_savings': ('cost_savings', np.float64),
+    },
+    'cache_metadata': {
+        'cache_hit': ('cache_hit', bool),
+        'cache_cluster_id': ('cache_cluster_id', object),
+        'cache_key_candidates': ('cache_key_candidates', object),
+    },
+    'quality_evaluation': {
+        'judge_score': ('judge_score', np.float64),
+        'hallucination_flag': ('hallucination_flag', bool),
+        'factual_error': ('factual_error', bool),
+        'failure_reason': ('failure_reason', object),
+    },
+}
+
+# Sums per (model, agent, operation) group, rolled up per dimension
+GROUP_SUMS = ('count', 'total_cost', 'total_tokens', 'total_prompt_tokens',
+              'total_completion_tokens', 'total_latency_ms', 'errors', 'scored', 'sum_judge_score')
+
+
+# =============================================================================
+# FRAME
+# =============================================================================
+
+def calls_to_frame(llm_calls: Union[List[Dict[str, Any]], CallView]) -> pd.DataFrame:
+    """
+    One row per call: CALL_FIELDS, `error`, and the flattened NESTED_FIELDS.
+    
+    Accepts `get_llm_calls` / `get_call_metrics` dicts (missing fields get
+    their defaults) or a CallView, whose columns (including the flattened
+    NESTED_COLUMNS) are used without building or visiting dicts.
+    has_routing / has_cache / has_quality mark calls with metadata;
+    flattened fields are NaN / None / False for calls without it.
+    """
+    view = isinstance(llm_calls, CallView)
+
+    def values(name: str, default: Any = None, dtype: Any = object) -> np.ndarray:
+        if view:
+            return llm_calls.column(name)
+        return np.fromiter((call.get(name, default) for call in llm_calls), dtype=dtype, count=len(llm_calls))
+
+    def categorical(name: str) -> pd.Categorical:
+        if not view:
+            codes, uniques = pd.factorize(values(name))
+            return pd.Categorical.from_codes(codes, categories=pd.Index(uniques, dtype=object))
+        # Reuse the window's dictionary encoding (None -> code -1)
+        codes, dictionary = llm_calls.codes(name)
+        categories = [value for value in dictionary if value is not None]
+        position = {value: i for i, value in enumerate(categories)}
+        remap = np.array([position.get(value, -1) for value in dictionary], dtype=np.int32)
+        return pd.Categorical.from_codes(remap[codes], categories=pd.Index(categories, dtype=object))
+    
+    frame = pd.DataFrame({
+        name: categorical(name) if dtype == 'category' else values(name, default, dtype)
+        for name, (dtype, default) in CALL_FIELDS.items()
+    })
+    frame['error'] = ~values('success', True).astype(bool)  # not call.get('success', True)
+    
+    for field, keys in NESTED_FIELDS.items():
+        nested = values(field)
+        present = np.not_equal(nested, None)
+        frame[f"has_{field.split('_')[0]}"] = present
+        
+        if view:
+            # Flattened by the window when it loaded the calls
+            for key, (column, dtype) in keys.items():
+                flattened = llm_calls.column(f"{field}.{key}")
+                if dtype is bool:
+                    flattened = np.fromiter(map(bool, flattened), dtype=bool, count=len(flattened))
+                elif dtype is not object:
+                    flattened = np.array(flattened, dtype=dtype)  # None -> NaN
+                frame[column] = pd.Series(flattened, dtype=dtype)
+            continue
+        
+        # Only calls with the metadata are visited
+        rows = np.flatnonzero(present)
+        dicts = nested[rows].tolist()
+        for key, (column, dtype) in keys.items():
+            if dtype is bool:
+                flattened = np.zeros(len(frame), dtype=bool)
+                flattened[rows] = [bool(value.get(key)) for value in dicts]
+            elif dtype is object:
+                flattened = np.full(len(frame), None, dtype=object)
+                flattened[rows] = [value.get(key) for value in dicts]
+            else:
+                flattened = np.full(len(frame), np.nan)
+                flattened[rows] = [value.get(key) for value in dicts]
+            frame[column] = pd.Series(flattened, dtype=dtype)
+    return frame
+
+
+def _truthy(column: pd.Series) -> np.ndarray:
+    """Python truthiness of an object column (None counts as False)."""
+    return np.fromiter(map(bool, column), dtype=bool, count=len(column))
+
+
+def _factorize(column: pd.Series, falsy: Any = None) -> Tuple[np.ndarray, List[Any]]:
+    """
+    Integer codes and distinct values (None kept as a value). With `falsy`,
+    every falsy value ('' and None) is merged into that one value.
+    """
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        codes, values = column.cat.codes.to_numpy(), list(column.cat.categories)
+    else:
+        codes, uniques = pd.factorize(column.to_numpy(dtype=object))
+        values = list(uniques)
+    if (codes < 0).any():
+        codes = np.where(codes < 0, len(values), codes)
+        values.append(None)
+    if falsy is not None:
+        values = [value or falsy for value in values]
+        distinct = list(dict.fromkeys(values))
+        position = {value: i for i, value in enumerate(distinct)}
+        codes = np.array([position[value] for value in values], dtype=np.intp)[codes]
+        values = distinct
+    return codes, values
+
+
+def _value_counts(column: pd.Series) -> Dict[Any, int]:
+    codes, uniques = _factorize(column)
+    return dict(zip(uniques, np.bincount(codes, minlength=len(uniques)).tolist()))
+
+
+def _float(value) -> Any:
+    """numpy float -> float, NaN -> None."""
+    return None if np.isnan(value) else float(value)
+
+
+# =============================================================================
+# AGGREGATION
+# =============================================================================
+
+def aggregate_calls(llm_calls: Union[List[Dict[str, Any]], CallView, pd.DataFrame]) -> Dict[str, Any]:
+    """
+    All call aggregations from one frame.
+    
+    Returns:
+        {'by_model', 'by_agent', 'by_operation', 'cost_breakdown',
+         'routing_metrics', 'cache_metrics', 'quality_metrics'}, each as
+        returned by the aggregators.py function of the same purpose
+    """
+    frame = llm_calls if isinstance(llm_calls, pd.DataFrame) else calls_to_frame(llm_calls)
+    by_model, by_agent, by_operation = _group_metrics(frame)
+    return {
+        'by_model': by_model,
+        'by_agent': by_agent,
+        'by_operation': by_operation,
+        'cost_breakdown': {model: data['total_cost'] for model, data in by_model.items()},
+        'routing_metrics': _routing_metrics(frame),
+        'cache_metrics': _cache_metrics(frame),
+        'quality_metrics': _quality_metrics(frame),
+    }
+
+
+def _group_metrics(frame: pd.DataFrame):
+    """by_model, by_agent and by_operation from one (model, agent, operation) groupby."""
+    if frame.empty:
+        return {}, {}, {}
+    
+    # Falsy agent / operation -> "" (reported as "Unknown")
+    model_codes, models = _factorize(frame['model_name'])
+    agent_codes, agents = _factorize(frame['agent_name'], falsy="")
+    operation_codes, operations = _factorize(frame['operation'], falsy="")
+    key = (model_codes * len(agents) + agent_codes) * len(operations) + operation_codes
+    
+    scored = frame['judge_score'].notna()
+    groups = pd.DataFrame({
+        'count': np.ones(len(frame), dtype=np.int64),
+        'total_cost': frame['total_cost'],
+        'total_tokens': frame['total_tokens'],
+        'total_prompt_tokens': frame['prompt_tokens'],
+        'total_completion_tokens': frame['completion_tokens'],
+        'total_latency_ms': frame['latency_ms'],
+        'errors': frame['error'].astype(np.int64),
+        'scored': scored.astype(np.int64),
+        'sum_judge_score': frame['judge_score'].where(scored, 0.0),
+    }).groupby(key, sort=False).sum()
+    
+    # Decode the group key back into its three codes
+    groups['operation'], rest = groups.index % len(operations), groups.index // len(operations)
+    groups['agent'], groups['model'] = rest % len(agents), rest // len(agents)
+
+    def rollup(code: str) -> pd.DataFrame:
+        totals = groups.groupby(code, sort=False)[list(GROUP_SUMS)].sum()
+        totals['avg_quality_score'] = totals['sum_judge_score'] / totals['scored'].where(totals['scored'] > 0)
+        return totals
+    
+    latency = frame['latency_ms'].groupby(model_codes, sort=False).quantile([0.5, 0.95]).unstack()
+
+    def common(data) -> Dict[str, Any]:
+        count = int(data['count'])
+        return {
+            'count': count,
+            'total_cost': float(data['total_cost']),
+            'avg_cost': float(data['total_cost']) / count,
+            'avg_latency_ms': float(data['total_latency_ms']) / count,
+        }
+    
+    by_model = {}
+    for code, data in rollup('model').iterrows():
+        by_model[models[code]] = {
+            **common(data),
+            'total_tokens': int(data['total_tokens']),
+            'avg_tokens': int(data['total_tokens']) / data['count'],
+            'p50_latency_ms': float(latency.at[code, 0.5]),
+            'p95_latency_ms': float(latency.at[code, 0.95]),
+            'avg_quality_score': _float(data['avg_quality_score']),
+        }
+    
+    # Models and operations of each agent come from the same groups
+    has_operation = np.array([bool(operation) for operation in operations])
+    by_agent = {}
+    for code, data in rollup('agent').iterrows():
+        members = groups[groups['agent'] == code]
+        agent_operations = members[has_operation[members['operation']]].groupby('operation', sort=False)['count'].sum()
+        by_agent[agents[code] or "Unknown"] = {
+            **common(data),
+            'total_tokens': int(data['total_tokens']),
+            'avg_tokens': int(data['total_tokens']) / data['count'],
+            'models_used': [models[model] for model in members['model'].unique()],
+            'operations': {operations[op]: int(n) for op, n in agent_operations.items()},
+            'error_rate': int(data['errors']) / data['count'],
+        }
+    
+    by_operation = {}
+    for code, data in rollup('operation').iterrows():
+        by_operation[operations[code] or "Unknown"] = {
+            **common(data),
+            'avg_tokens': int(data['total_tokens']) / data['count'],
+            'avg_prompt_tokens': int(data['total_prompt_tokens']) / data['count'],
+            'avg_completion_tokens': int(data['total_completion_tokens']) / data['count'],
+            'avg_quality_score': _float(data['avg_quality_score']),
+            'error_rate': int(data['errors']) / data['count'],
+        }
+    
+    return by_model, by_agent, by_operation
+
+
+def _routing_metrics(frame: pd.DataFrame) -> Dict[str, Any]:
+    routed = frame.loc[frame['has_routing'], ['routed_model', 'routing_strategy', 'complexity_score', 'cost_savings']]
+    if routed.empty:
+        return {
+            'total_decisions': 0,
+            'total_savings': 0.0,
+            'avg_savings_per_decision': 0.0,
+            'model_distribution': {},
+            'complexity_scores': [],
+            'strategy_distribution': {},
+        }
+    
+    total_savings = float(routed['cost_savings'].fillna(0.0).sum())
+    strategies = routed['routing_strategy'].where(_truthy(routed['routing_strategy']), 'unknown')
+    complexity_scores = routed['complexity_score'].dropna()
+    return {
+        'total_decisions': len(routed),
+        'total_savings': total_savings,
+        'avg_savings_per_decision': total_savings / len(routed),
+        'model_distribution': _value_counts(routed['routed_model']),
+        'strategy_distribution': _value_counts(strategies),
+        'complexity_scores': complexity_scores.tolist(),
+        'avg_complexity': float(complexity_scores.mean()) if len(complexity_scores) else None,
+    }
+
+
+def _cache_metrics(frame: pd.DataFrame) -> Dict[str, Any]:
+    cached = frame.loc[
+        frame['has_cache'], ['cache_hit', 'cache_cluster_id', 'cache_key_candidates', 'total_tokens', 'total_cost']
+    ]
+    if cached.empty:
+        return {
+            'total_requests': 0,
+            'cache_hits': 0,
+            'cache_misses': 0,
+            'hit_rate': 0.0,
+            'tokens_saved': 0,
+            'cost_saved': 0.0,
+            'clusters': set(),
+            'cache_key_patterns': {},
+        }
+    
+    hit = cached['cache_hit'].to_numpy()
+    hits = int(hit.sum())
+    clusters = cached['cache_cluster_id'][_truthy(cached['cache_cluster_id'])]
+    
+    # Sort and join each distinct candidate list once
+    candidates = cached['cache_key_candidates'][_truthy(cached['cache_key_candidates'])]
+    cache_key_patterns = Counter()
+    for keys, n in Counter(map(tuple, candidates)).items():
+        cache_key_patterns[','.join(sorted(keys))] += n
+    
+    return {
+        'total_requests': len(cached),
+        'cache_hits': hits,
+        'cache_misses': len(cached) - hits,
+        'hit_rate': hits / len(cached),
+        'tokens_saved': int(cached['total_tokens'][hit].sum()),
+        'cost_saved': float(cached['total_cost'][hit].sum()),
+        'cluster_count': len(_value_counts(clusters)),
+        'cache_key_patterns': dict(cache_key_patterns),
+    }
+
+
+def _quality_metrics(frame: pd.DataFrame) -> Dict[str, Any]:
+    evaluated = frame.loc[
+        frame['has_quality'], ['judge_score', 'hallucination_flag', 'factual_error', 'failure_reason']
+    ]
+    if evaluated.empty:
+        return {
+            'total_evaluated': 0,
+            'avg_judge_score': None,
+            'hallucinations': 0,
+            'hallucination_rate': 0.0,
+            'factual_errors': 0,
+            'factual_error_rate': 0.0,
+            'failure_reasons': {},
+            'scores': []
+        }
+    
+    scores = evaluated['judge_score'].dropna()
+    hallucinations = int(evaluated['hallucination_flag'].sum())
+    factual_errors = int(evaluated['factual_error'].sum())
+    reasons = evaluated['failure_reason'][_truthy(evaluated['failure_reason'])]
+    has_scores = len(scores) > 0
+    return {
+        'total_evaluated': len(evaluated),
+        'avg_judge_score': float(scores.mean()) if has_scores else None,
+        'min_score': float(scores.min()) if has_scores else None,
+        'max_score': float(scores.max()) if has_scores else None,
+        'p50_score': float(scores.quantile(0.5)) if has_scores else None,
+        'hallucinations': hallucinations,
+        'hallucination_rate': hallucinations / len(evaluated),
+        'factual_errors': factual_errors,
+        'factual_error_rate': factual_errors / len(evaluated),
+        'failure_reasons': _value_counts(reasons),
+        'scores': scores.tolist(),
+    }
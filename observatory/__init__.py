@@ -6,6 +6,7 @@ Comprehensive monitoring and optimization toolkit for AI/LLM applications.
 
 Core Components:
 - Observatory: Main tracking interface
+- AsyncObservatory: asyncio tracking interface (await obs.record_call(...))
 - LLMJudge: Quality evaluation with LLM-as-judge
 - CacheManager: Response caching with tracking
 - ModelRouter: Intelligent model selection
@@ -45,6 +46,16 @@ from observatory.collector import (
 )
 
 from observatory.storage import Storage
+from observatory.engine import create_storage_engine
+from observatory.retention import RetentionJob, RetentionPolicy
+from observatory.writer import BackgroundWriter
+from observatory.spool import SpoolWriter, SpoolCompactor
+from observatory.backpressure import CircuitBreaker
+from observatory.sketch import DDSketch
+from observatory.async_storage import AsyncStorage
+from observatory.parquet_archive import ParquetArchiver
+from observatory.duckdb_storage import DuckDBStorage
+from observatory.async_collector import AsyncObservatory
 
 # =============================================================================
 # MODEL IMPORTS
@@ -230,6 +241,18 @@ __all__ = [
     "Observatory",
     "MetricsCollector",
     "Storage",
+    "BackgroundWriter",
+    "SpoolWriter",
+    "SpoolCompactor",
+    "CircuitBreaker",
+    "DDSketch",
+    "AsyncObservatory",
+    "AsyncStorage",
+    "create_storage_engine",
+    "RetentionJob",
+    "RetentionPolicy",
+    "ParquetArchiver",
+    "DuckDBStorage",
     
     # SDK components
     "LLMJudge",
@@ -0,0 +1,229 @@
+"""
+Async Observatory - asyncio Tracking Interface
+Location: observatory/async_collector.py
+
+Awaitable counterpart of `Observatory` for asyncio agents. Calls are built
+exactly like the sync collector (costs, combined prompt, prompt hash) and
+persisted through `AsyncStorage`, so hundreds of concurrent coroutines can
+record without blocking the event loop.
+
+Usage:
+    obs = AsyncObservatory(project_name="My App")
+
+    async with obs.track("chat") as session:
+        await obs.record_call(
+            provider=ModelProvider.OPENAI,
+            model_name="gpt-4o-mini",
+            prompt_tokens=120,
+            completion_tokens=40,
+            latency_ms=850,
+        )
+
+    await obs.close()
+"""
+
+import os
+import uuid
+from contextvars import ContextVar
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Optional, Dict, Any, List, Iterable
+
+from observatory.models import LLMCall, Session
+from observatory.async_storage import AsyncStorage
+from observatory.collector import build_llm_call, apply_call_to_session
+from observatory.storage import DEFAULT_BULK_CHUNK_SIZE
+
+
+class AsyncObservatory:
+    """
+    Main tracking interface for asyncio applications.
+    Mirrors the `Observatory` API with awaitable methods.
+    """
+
+    def __init__(
+        self,
+        project_name: str = "default",
+        enabled: Optional[bool] = None,
+        storage: Optional[AsyncStorage] = None,
+    ):
+        if enabled is None:
+            enabled = os.getenv("ENABLE_OBSERVATORY", "true").lower() == "true"
+
+        self.project_name = project_name
+        self.enabled = enabled
+        self.storage = storage or AsyncStorage()
+
+        # Current session is scoped to the running asyncio task
+        self._session_var: ContextVar[Optional[Session]] = ContextVar(
+            f"observatory_async_session_{id(self)}", default=None
+        )
+
+    @property
+    def current_session(self) -> Optional[Session]:
+        """Active session of the calling asyncio task."""
+        return self._session_var.get()
+
+    @current_session.setter
+    def current_session(self, session: Optional[Session]):
+        self._session_var.set(session)
+
+    # =========================================================================
+    # SESSION LIFECYCLE
+    # =========================================================================
+
+    async def start_session(self, operation_type: Optional[str] = None, **metadata) -> Session:
+        """Start a tracking session."""
+        if not self.enabled:
+            return Session(
+                id="disabled",
+                project_name=self.project_name,
+                operation_type=operation_type,
+            )
+
+        session = Session(
+            id=str(uuid.uuid4()),
+            project_name=self.project_name,
+            operation_type=operation_type,
+            metadata=metadata,
+        )
+
+        self.current_session = session
+        await self.storage.save_session(session)
+        return session
+
+    async def end_session(
+        self,
+        session: Optional[Session] = None,
+        success: bool = True,
+        error: Optional[str] = None,
+    ) -> Session:
+        """End a tracking session and finalize metrics."""
+        if not self.enabled:
+            return session or Session(id="disabled", project_name=self.project_name)
+
+        target_session = session or self.current_session
+        if not target_session:
+            raise ValueError("No active session to end")
+
+        target_session.end_time = datetime.utcnow()
+        target_session.success = success
+        target_session.error = error
+
+        # Calculate average quality score
+        quality_scores = [
+            call.quality_evaluation.judge_score
+            for call in target_session.llm_calls
+            if call.quality_evaluation and call.quality_evaluation.judge_score is not None
+        ]
+        if quality_scores:
+            target_session.avg_quality_score = sum(quality_scores) / len(quality_scores)
+
+        await self.storage.finalize_session(target_session)
+
+        if target_session == self.current_session:
+            self.current_session = None
+
+        return target_session
+
+    @asynccontextmanager
+    async def track(self, operation_type: str, **metadata):
+        """
+        Async context manager for tracking a session.
+
+        The session is current only inside the block and only for the calling
+        task, so concurrent tasks sharing one AsyncObservatory each record
+        into their own session.
+        """
+        previous = self.current_session
+        session = await self.start_session(operation_type, **metadata)
+        try:
+            yield session
+        except BaseException as e:
+            await self.end_session(session, success=False, error=str(e))
+            raise
+        else:
+            await self.end_session(session, success=True)
+        finally:
+            self.current_session = previous
+
+    # =========================================================================
+    # RECORDING
+    # =========================================================================
+
+    async def record_call(self, session: Optional[Session] = None, **kwargs) -> LLMCall:
+        """Record an LLM call. Accepts all MetricsCollector.record_llm_call arguments."""
+        if not self.enabled:
+            return LLMCall(
+                id="disabled",
+                session_id="disabled",
+                provider=kwargs["provider"],
+                model_name=kwargs["model_name"],
+                prompt_tokens=kwargs["prompt_tokens"],
+                completion_tokens=kwargs["completion_tokens"],
+                total_tokens=kwargs["prompt_tokens"] + kwargs["completion_tokens"],
+                prompt_cost=0.0,
+                completion_cost=0.0,
+                total_cost=0.0,
+                latency_ms=kwargs["latency_ms"],
+            )
+
+        target_session = session or self.current_session
+
+        # Auto-start session if needed
+        if not target_session:
+            target_session = await self.start_session(operation_type=kwargs.get("operation"))
+
+        llm_call = build_llm_call(session_id=target_session.id, **kwargs)
+
+        # Update session metrics
+        target_session.llm_calls.append(llm_call)
+        apply_call_to_session(target_session, llm_call)
+
+        await self.storage.record_llm_call(llm_call, session=target_session)
+        return llm_call
+
+    async def record_calls_bulk(
+        self,
+        calls: Iterable[Dict[str, Any]],
+        session: Optional[Session] = None,
+        chunk_size: int = DEFAULT_BULK_CHUNK_SIZE,
+    ) -> int:
+        """Record many calls in chunked transactions. Returns the number recorded."""
+        if not self.enabled:
+            return 0
+
+        target_session = session or self.current_session
+        if not target_session:
+            target_session = await self.start_session(operation_type="bulk_import")
+
+        recorded = 0
+        chunk: List[LLMCall] = []
+        for call_kwargs in calls:
+            call_kwargs = dict(call_kwargs)
+            call_kwargs.pop("session", None)
+            llm_call = build_llm_call(session_id=target_session.id, **call_kwargs)
+            apply_call_to_session(target_session, llm_call)
+            chunk.append(llm_call)
+
+            if len(chunk) >= chunk_size:
+                recorded += await self.storage.save_llm_calls(chunk, chunk_size=chunk_size)
+                chunk = []
+
+        if chunk:
+            recorded += await self.storage.save_llm_calls(chunk, chunk_size=chunk_size)
+
+        return recorded
+
+    # =========================================================================
+    # READS
+    # =========================================================================
+
+    async def get_llm_calls(self, **filters) -> List[LLMCall]:
+        """Get LLM calls for this project. Accepts AsyncStorage.get_llm_calls filters."""
+        filters.setdefault("project_name", self.project_name)
+        return await self.storage.get_llm_calls(**filters)
+
+    async def close(self):
+        """Dispose of the storage engine."""
+        await self.storage.close()
@@ -0,0 +1,730 @@
+"""
+Async Storage - asyncio Storage Engine
+Location: observatory/async_storage.py
+
+SQLAlchemy async-engine counterpart of `Storage`, for recording from asyncio
+agents without blocking the event loop on database I/O. Shares row
+conversion and query building with `Storage` through `BaseStorage`.
+
+Requires an async driver:
+    pip install aiosqlite        # SQLite (default)
+    pip install asyncpg          # PostgreSQL
+
+Usage:
+    storage = AsyncStorage("sqlite:///observatory.db")
+    await storage.record_llm_call(llm_call)
+    calls = await storage.get_llm_calls(project_name="My App", limit=100)
+    await storage.close()
+"""
+
+import os
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Optional, List, Dict, Any, Iterable, Sequence, Union, AsyncIterator, TYPE_CHECKING
+
+from sqlalchemy import select, func, insert
+
+from observatory.models import Session, LLMCall, ModelProvider
+from observatory.sketch import DDSketch, DEFAULT_QUANTILES
+from observatory.engine import create_async_storage_engine
+from observatory.storage import (
+    BaseStorage,
+    SessionDB,
+    LLMCallDB,
+    LLMCallBodyDB,
+    LLMCallSearchDB,
+    BlobDB,
+    DEFAULT_BULK_CHUNK_SIZE,
+    DEFAULT_COMPRESSION,
+    ROLLUP_TABLES,
+    ROLLUP_KEY,
+    SKETCH_LOOKUP_CHUNK,
+    merge_session_deltas,
+    merge_session_sketches,
+    merge_rollup_deltas,
+    merge_rollup_sketches,
+    sketch_select,
+    sketch_update,
+    merged_sketch_params,
+    rollup_upsert,
+    rollup_increment,
+    create_schema,
+    ARCHIVED_TABLE_DEFS,
+    blob_refs,
+    resolve_codec,
+    decompress,
+    to_columnar,
+)
+from observatory.partitions import (
+    month_start,
+    next_month,
+    is_partitioned,
+    list_partitions,
+    create_partitions,
+    sqlite_database_path,
+    attach_archives,
+    detach_archives,
+)
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+
+# =============================================================================
+# URL HANDLING
+# =============================================================================
+
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+}
+
+
+def to_async_url(database_url: str) -> str:
+    """
+    Convert a sync database URL to its async-driver equivalent.
+
+    URLs that already name a driver (e.g. "sqlite+aiosqlite://") are
+    returned unchanged.
+
+    Example:
+        >>> to_async_url("sqlite:///observatory.db")
+        'sqlite+aiosqlite:///observatory.db'
+    """
+    scheme, sep, rest = database_url.partition("://")
+    if not sep or "+" in scheme:
+        return database_url
+    return f"{ASYNC_DRIVERS.get(scheme, scheme)}://{rest}"
+
+
+# =============================================================================
+# ASYNC STORAGE
+# =============================================================================
+
+class AsyncStorage(BaseStorage):
+    """
+    Async storage backend with the same read/write API as `Storage`.
+
+    The schema is created lazily on first use. Every method opens its own
+    AsyncSession; use `session()` to run several operations in one
+    transaction.
+    """
+
+    def __init__(
+        self,
+        database_url: Optional[str] = None,
+        compression: Optional[str] = DEFAULT_COMPRESSION,
+        rollups: bool = True,
+        read_url: Optional[str] = None,
+        read_only: bool = False,
+        partitioned: bool = False,
+        search_index: bool = True,
+        **engine_kwargs,
+    ):
+        """See `Storage` for the arguments."""
+        try:
+            from sqlalchemy.ext.asyncio import async_sessionmaker
+        except ImportError as e:
+            raise ImportError(
+                "AsyncStorage requires SQLAlchemy's asyncio extension "
+                "(pip install 'sqlalchemy[asyncio]' aiosqlite)"
+            ) from e
+
+        if database_url is None:
+            database_url = os.getenv("DATABASE_URL", "sqlite:///observatory.db")
+
+        self.compression = resolve_codec(compression)
+        self.rollups = rollups
+        self.read_only = read_only
+        self.partitioned = partitioned
+        self.search_index = search_index
+        self.engine = create_async_storage_engine(
+            to_async_url(database_url), read_only=read_only, **engine_kwargs
+        )
+        self.SessionLocal = async_sessionmaker(bind=self.engine, expire_on_commit=False)
+
+        if read_url:
+            self.read_engine = create_async_storage_engine(
+                to_async_url(read_url), read_only=True, **engine_kwargs
+            )
+        else:
+            self.read_engine = self.engine
+        self.ReadSessionLocal = async_sessionmaker(bind=self.read_engine, expire_on_commit=False)
+        self.archive_database = sqlite_database_path(self.engine.url)
+
+        self._initialized = False
+        self._init_lock: Optional[asyncio.Lock] = None
+        self._known_blobs = set()
+
+    # =========================================================================
+    # LIFECYCLE
+    # =========================================================================
+
+    async def initialize(self):
+        """Create tables if needed. Called automatically on first use."""
+        if self._initialized or self.read_only:
+            return
+        if self._init_lock is None:
+            self._init_lock = asyncio.Lock()
+        async with self._init_lock:
+            if not self._initialized:
+                async with self.engine.begin() as conn:
+                    await conn.run_sync(create_schema, self.partitioned)
+                    if await conn.run_sync(is_partitioned):
+                        self._partition_months = set(await conn.run_sync(list_partitions))
+                self._initialized = True
+                if self._partition_months is not None:
+                    # This month and the next up front, so ingest rarely needs DDL
+                    current = month_start(datetime.utcnow())
+                    await self._create_partitions({current, next_month(current)} - self._partition_months)
+
+    async def close(self):
+        """Dispose of the engines and their connection pools."""
+        await self.engine.dispose()
+        if self.read_engine is not self.engine:
+            await self.read_engine.dispose()
+
+    @asynccontextmanager
+    async def session(self) -> AsyncIterator["AsyncSession"]:
+        """
+        Async context manager yielding a transactional AsyncSession.
+
+        Commits on success and rolls back on error:
+            async with storage.session() as db:
+                await db.execute(...)
+        """
+        await self.initialize()
+        async with self.SessionLocal() as db:
+            try:
+                yield db
+                await db.commit()
+            except BaseException:
+                await db.rollback()
+                raise
+
+    @asynccontextmanager
+    async def read_session(
+        self,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+    ) -> AsyncIterator["AsyncSession"]:
+        """
+        AsyncSession on the read engine (see `read_url`); never commits.
+
+        Attaches the archived SQLite months overlapping [start_time, end_time]
+        (see Storage.read_session).
+        """
+        await self.initialize()
+        archives = self._archives_for(start_time, end_time)
+        async with self.ReadSessionLocal() as db:
+            if not archives:
+                yield db
+                return
+            connection = await db.connection()
+            try:
+                await connection.run_sync(attach_archives, archives, ARCHIVED_TABLE_DEFS)
+                yield db
+            finally:
+                try:
+                    await connection.run_sync(detach_archives, len(archives), ARCHIVED_TABLE_DEFS)
+                except Exception:
+                    # Never hand a connection with the views back to the pool
+                    await connection.invalidate()
+
+    async def _create_partitions(self, months: set):
+        """Create llm_calls partitions for `months` in their own transaction."""
+        if not months:
+            return
+        async with self.engine.begin() as conn:
+            await conn.run_sync(create_partitions, months)
+        self._partition_months.update(months)
+
+    # =========================================================================
+    # SESSION CRUD
+    # =========================================================================
+
+    async def save_session(self, session: Session):
+        async with self.session() as db:
+            await db.merge(self._to_session_db(session))
+
+    async def update_session(self, session: Session):
+        """Overwrite every column of a session with the given snapshot."""
+        await self.save_session(session)
+
+    async def finalize_session(self, session: Session):
+        """Persist end-of-session state without touching the call counters."""
+        async with self.session() as db:
+            result = await db.execute(self._session_end_update(session))
+            if not result.rowcount:
+                await self._insert_sessions(db, [session])
+
+    async def get_session(self, session_id: str) -> Optional[Session]:
+        async with self.read_session() as db:
+            session_db = await db.get(SessionDB, session_id)
+            if not session_db:
+                return None
+
+            session = self._from_session_db(session_db)
+
+        # Load LLM calls (from archived months too, if the session is that old)
+        async with self.read_session(session.start_time, session.end_time) as db:
+            result = await db.execute(
+                select(LLMCallDB).where(LLMCallDB.session_id == session_id)
+            )
+            llm_calls_db = result.scalars().all()
+            bodies = await self._load_bodies(db, llm_calls_db)
+            blobs = await self._load_blobs(db, bodies.values())
+            session.llm_calls = [
+                self._from_llm_call_db(c, bodies.get(c.id), blobs) for c in llm_calls_db
+            ]
+
+        return session
+
+    async def get_sessions(
+        self,
+        project_name: Optional[str] = None,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        limit: int = 100,
+    ) -> List[Session]:
+        stmt = select(SessionDB)
+        if project_name:
+            stmt = stmt.where(SessionDB.project_name == project_name)
+        if start_time:
+            stmt = stmt.where(SessionDB.start_time >= start_time)
+        if end_time:
+            stmt = stmt.where(SessionDB.start_time <= end_time)
+        stmt = stmt.order_by(SessionDB.start_time.desc()).limit(limit)
+
+        async with self.read_session() as db:
+            result = await db.execute(stmt)
+            return [self._from_session_db(s) for s in result.scalars().all()]
+
+    # =========================================================================
+    # LLM CALL CRUD
+    # =========================================================================
+
+    async def record_llm_call(self, llm_call: LLMCall, session: Optional[Session] = None):
+        """
+        Insert an LLM call and bump its session counters in one transaction.
+
+        Args:
+            llm_call: The call to insert
+            session: Session to insert (zeroed counters) if its row doesn't exist yet
+        """
+        async with self.session() as db:
+            projects = await self._load_projects(db, [llm_call], [session] if session else [])
+            written = await self._insert_llm_calls(db, [llm_call], projects)
+            for session_id, delta in merge_session_deltas([llm_call]).items():
+                result = await db.execute(self._session_delta_update(session_id, delta))
+                if not result.rowcount and session is not None:
+                    await self._insert_sessions(db, [session])
+                    await db.execute(self._session_delta_update(session_id, delta))
+            await self._merge_sketches(db, SessionDB.__table__, ('id',), merge_session_sketches([llm_call]))
+            await self._apply_rollups(db, [llm_call], projects)
+        self._remember_blobs(written)
+
+    async def save_llm_calls(
+        self,
+        llm_calls: List[LLMCall],
+        chunk_size: int = DEFAULT_BULK_CHUNK_SIZE,
+    ) -> int:
+        """Bulk insert LLM calls in chunked transactions (see Storage.save_llm_calls)."""
+        chunk_size = max(1, chunk_size)
+        for offset in range(0, len(llm_calls), chunk_size):
+            chunk = llm_calls[offset:offset + chunk_size]
+            async with self.session() as db:
+                projects = await self._load_projects(db, chunk)
+                written = await self._insert_llm_calls(db, chunk, projects)
+                for session_id, delta in merge_session_deltas(chunk).items():
+                    await db.execute(self._session_delta_update(session_id, delta))
+                await self._merge_sketches(db, SessionDB.__table__, ('id',), merge_session_sketches(chunk))
+                await self._apply_rollups(db, chunk, projects)
+            self._remember_blobs(written)
+        return len(llm_calls)
+
+    async def _insert_llm_calls(
+        self,
+        db: "AsyncSession",
+        llm_calls: List[LLMCall],
+        projects: Dict[str, Optional[str]],
+    ) -> List[str]:
+        """Insert call rows and their new blobs; returns the blob hashes written."""
+        await self._create_partitions(self._missing_partitions(llm_calls))
+        rows, body_rows, blobs = self._to_llm_call_rows(llm_calls, projects)
+        written = await self._write_blobs(db, blobs)
+        await db.execute(insert(LLMCallDB.__table__), rows)
+        if body_rows:
+            await db.execute(insert(LLMCallBodyDB.__table__), body_rows)
+        search_rows = self._search_rows(llm_calls)
+        if search_rows:
+            await db.execute(insert(LLMCallSearchDB.__table__), search_rows)
+        return written
+
+    async def _load_projects(
+        self,
+        db: "AsyncSession",
+        llm_calls: List[LLMCall],
+        sessions: Iterable[Session] = (),
+    ) -> Dict[str, Optional[str]]:
+        """session_id -> project_name for the calls (see Storage._load_projects)."""
+        projects = {session.id: session.project_name for session in sessions}
+        missing = list({call.session_id for call in llm_calls} - set(projects))
+        for offset in range(0, len(missing), 500):
+            result = await db.execute(self._project_select(missing[offset:offset + 500]))
+            projects.update(result.all())
+        return projects
+
+    async def _apply_rollups(
+        self,
+        db: "AsyncSession",
+        llm_calls: List[LLMCall],
+        projects: Dict[str, Optional[str]],
+    ):
+        """Add the calls to the minute/hour/day rollups (see Storage._apply_rollups)."""
+        if not self.rollups or not llm_calls:
+            return
+
+        for granularity, rows in merge_rollup_deltas(llm_calls, projects).items():
+            stmt = rollup_upsert(granularity, self.engine.dialect.name)
+            if stmt is not None:
+                await db.execute(stmt, rows)
+                continue
+            for row in rows:
+                result = await db.execute(rollup_increment(granularity, row))
+                if not result.rowcount:
+                    await db.execute(insert(ROLLUP_TABLES[granularity].__table__), [row])
+
+        for granularity, sketches in merge_rollup_sketches(llm_calls, projects).items():
+            await self._merge_sketches(db, ROLLUP_TABLES[granularity].__table__, ROLLUP_KEY, sketches)
+
+    async def _merge_sketches(
+        self,
+        db: "AsyncSession",
+        table,
+        key_columns: Sequence[str],
+        deltas: Dict[tuple, DDSketch],
+    ):
+        """
+        Read-modify-write of stored latency sketches, one SELECT per chunk of
+        keys and one executemany UPDATE (see sketch_select / merged_sketch_params).
+        """
+        keys = list(deltas)
+        params = []
+        for offset in range(0, len(keys), SKETCH_LOOKUP_CHUNK):
+            result = await db.execute(sketch_select(table, key_columns, keys[offset:offset + SKETCH_LOOKUP_CHUNK]))
+            params.extend(merged_sketch_params(key_columns, result.all(), deltas))
+        if params:
+            await db.execute(sketch_update(table, key_columns), params)
+
+    async def _insert_sessions(self, db: "AsyncSession", sessions: List[Session]):
+        """Insert sessions that aren't stored yet, zeroed counters (see Storage._insert_sessions)."""
+        rows = [self._new_session_row(session) for session in sessions]
+        if not rows:
+            return
+
+        stmt = self._session_insert(self.engine.dialect.name)
+        if stmt is None:
+            ids = [row['id'] for row in rows]
+            result = await db.execute(select(SessionDB.id).where(SessionDB.id.in_(ids)))
+            existing = set(result.scalars())
+            rows = [row for row in rows if row['id'] not in existing]
+            stmt = insert(SessionDB.__table__)
+
+        if rows:
+            await db.execute(stmt, rows)
+
+    async def _write_blobs(self, db: "AsyncSession", blobs: Dict[str, bytes]) -> List[str]:
+        """Insert blob bodies that aren't stored yet (see Storage._write_blobs)."""
+        rows = self._new_blob_rows(blobs)
+        if not rows:
+            return []
+
+        stmt = self._blob_insert(self.engine.dialect.name)
+        if stmt is None:
+            hashes = [row['hash'] for row in rows]
+            existing = set()
+            for offset in range(0, len(hashes), 500):
+                result = await db.execute(
+                    select(BlobDB.hash).where(BlobDB.hash.in_(hashes[offset:offset + 500]))
+                )
+                existing.update(result.scalars())
+            rows = [row for row in rows if row['hash'] not in existing]
+            stmt = insert(BlobDB.__table__)
+
+        if rows:
+            await db.execute(stmt, rows)
+        return [row['hash'] for row in rows]
+
+    async def _load_bodies(
+        self,
+        db: "AsyncSession",
+        llm_calls_db: List[LLMCallDB],
+    ) -> Dict[str, LLMCallBodyDB]:
+        """Fetch the llm_call_bodies rows of a result set, keyed by call ID."""
+        call_ids = [call.id for call in llm_calls_db]
+        bodies: Dict[str, LLMCallBodyDB] = {}
+        for offset in range(0, len(call_ids), 500):
+            result = await db.execute(self._body_select(call_ids[offset:offset + 500]))
+            for body_db in result.scalars():
+                bodies[body_db.call_id] = body_db
+        return bodies
+
+    async def _load_blobs(self, db: "AsyncSession", body_dbs: Iterable[LLMCallBodyDB]) -> Dict[str, str]:
+        """Fetch the blobs referenced by a set of body rows."""
+        refs = blob_refs(body_dbs)
+        blobs: Dict[str, str] = {}
+        for offset in range(0, len(refs), 500):
+            result = await db.execute(self._blob_select(refs[offset:offset + 500]))
+            for digest, content, codec in result:
+                blobs[digest] = decompress(content, codec).decode('utf-8')
+        return blobs
+
+    async def get_llm_calls(
+        self,
+        session_id: Optional[str] = None,
+        project_name: Optional[str] = None,
+        provider: Optional[ModelProvider] = None,
+        model_name: Optional[str] = None,
+        agent_name: Optional[str] = None,
+        operation: Optional[str] = None,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        success_only: Optional[bool] = None,
+        cache_hit: Optional[bool] = None,
+        cache_key: Optional[str] = None,
+        hallucination_flag: Optional[bool] = None,
+        min_judge_score: Optional[float] = None,
+        max_judge_score: Optional[float] = None,
+        routed_model: Optional[str] = None,
+        prompt_hash: Optional[str] = None,
+        experiment_id: Optional[str] = None,
+        has_cache: Optional[bool] = None,
+        has_routing: Optional[bool] = None,
+        has_quality_eval: Optional[bool] = None,
+        limit: int = 1000,
+        include_bodies: bool = True,
+    ) -> List[LLMCall]:
+        """Get LLM calls with optional filters (see Storage.get_llm_calls)."""
+        stmt = (
+            select(LLMCallDB)
+            .where(*self._call_filters(
+                session_id=session_id,
+                project_name=project_name,
+                provider=provider,
+                model_name=model_name,
+                agent_name=agent_name,
+                operation=operation,
+                start_time=start_time,
+                end_time=end_time,
+                success_only=success_only,
+                cache_hit=cache_hit,
+                cache_key=cache_key,
+                hallucination_flag=hallucination_flag,
+                min_judge_score=min_judge_score,
+                max_judge_score=max_judge_score,
+                routed_model=routed_model,
+                prompt_hash=prompt_hash,
+                experiment_id=experiment_id,
+                has_cache=has_cache,
+                has_routing=has_routing,
+                has_quality_eval=has_quality_eval,
+            ))
+            .order_by(LLMCallDB.timestamp.desc())
+            .limit(limit)
+        )
+
+        async with self.read_session(start_time, end_time) as db:
+            result = await db.execute(stmt)
+            llm_calls_db = result.scalars().all()
+            if not include_bodies:
+                return [self._from_llm_call_db(c) for c in llm_calls_db]
+
+            bodies = await self._load_bodies(db, llm_calls_db)
+            blobs = await self._load_blobs(db, bodies.values())
+            return [self._from_llm_call_db(c, bodies.get(c.id), blobs) for c in llm_calls_db]
+
+    async def iter_llm_calls(
+        self,
+        batch_size: int = 1000,
+        include_bodies: bool = True,
+        newest_first: bool = False,
+        **filters,
+    ) -> AsyncIterator[LLMCall]:
+        """Stream every matching LLM call in keyset-paginated pages (see Storage.iter_llm_calls)."""
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+
+        after = None
+        while True:
+            stmt = self._keyset_select(batch_size, after, newest_first, filters)
+            async with self.read_session(filters.get('start_time'), filters.get('end_time')) as db:
+                # yield_per needs a streaming (server-side cursor) result
+                llm_calls_db = await (await db.stream(stmt)).scalars().all()
+                if include_bodies:
+                    bodies = await self._load_bodies(db, llm_calls_db)
+                    blobs = await self._load_blobs(db, bodies.values())
+                    page = [self._from_llm_call_db(c, bodies.get(c.id), blobs) for c in llm_calls_db]
+                else:
+                    page = [self._from_llm_call_db(c) for c in llm_calls_db]
+
+            for call in page:
+                yield call
+            if len(llm_calls_db) < batch_size:
+                return
+            after = (llm_calls_db[-1].timestamp, llm_calls_db[-1].id)
+
+    async def query_calls(
+        self,
+        columns: Sequence[str],
+        limit: Optional[int] = None,
+        columnar: bool = False,
+        **filters,
+    ) -> Union[List[Any], Dict[str, List[Any]]]:
+        """Fetch selected llm_calls columns straight from SQL (see Storage.query_calls)."""
+        stmt = self._projection_select(columns, limit, filters)
+        async with self.read_session(filters.get('start_time'), filters.get('end_time')) as db:
+            rows = (await db.execute(stmt)).all()
+        return to_columnar(columns, rows) if columnar else rows
+
+    async def aggregate(
+        self,
+        group_by: Sequence[str] = (),
+        metrics: Sequence[str] = ('count', 'sum_cost'),
+        bucket: Optional[str] = None,
+        **filters,
+    ) -> List[Dict[str, Any]]:
+        """Aggregate calls in SQL with GROUP BY (see Storage.aggregate)."""
+        stmt, keys = self._aggregate_select(group_by, metrics, bucket, filters, self.engine.dialect.name)
+        async with self.read_session(filters.get('start_time'), filters.get('end_time')) as db:
+            rows = (await db.execute(stmt)).all()
+        return self._aggregate_rows(keys, rows, bucket)
+
+    async def search_calls(
+        self,
+        query: str,
+        limit: int = 50,
+        include_bodies: bool = True,
+        **filters,
+    ) -> List[Dict[str, Any]]:
+        """Full-text search over prompt, response and error text (see Storage.search_calls)."""
+        if not any(character.isalnum() for character in query):
+            return []
+        stmt = self._search_select(query, limit, filters, self.read_engine.dialect.name)
+        async with self.read_session(filters.get('start_time'), filters.get('end_time')) as db:
+            rows = (await db.execute(stmt)).all()
+            llm_calls_db = [row[0] for row in rows]
+            bodies, blobs = {}, None
+            if include_bodies:
+                bodies = await self._load_bodies(db, llm_calls_db)
+                blobs = await self._load_blobs(db, bodies.values())
+            return [
+                {
+                    'call': self._from_llm_call_db(llm_call_db, bodies.get(llm_call_db.id), blobs),
+                    'score': score,
+                    'snippet': snippet,
+                }
+                for llm_call_db, score, snippet in rows
+            ]
+
+    async def aggregate_rollups(
+        self,
+        group_by: Sequence[str] = (),
+        metrics: Sequence[str] = ('count', 'sum_cost'),
+        bucket: Optional[str] = None,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        project_name: Optional[str] = None,
+        model_name: Optional[str] = None,
+        agent_name: Optional[str] = None,
+        operation: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Aggregate from the rollup tables (see Storage.aggregate_rollups)."""
+        stmt, keys = self._rollup_select(
+            group_by, metrics, bucket, start_time, end_time,
+            {
+                'project_name': project_name,
+                'model_name': model_name,
+                'agent_name': agent_name,
+                'operation': operation,
+            },
+        )
+        async with self.read_session() as db:
+            rows = (await db.execute(stmt)).all()
+        return self._rollup_rows(keys, rows, metrics)
+
+    async def latency_quantiles(
+        self,
+        quantiles: Sequence[float] = DEFAULT_QUANTILES,
+        group_by: Sequence[str] = (),
+        bucket: Optional[str] = None,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        project_name: Optional[str] = None,
+        model_name: Optional[str] = None,
+        agent_name: Optional[str] = None,
+        operation: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Latency percentiles from the rollup sketches (see Storage.latency_quantiles)."""
+        stmt, keys = self._sketch_select(
+            group_by, bucket, start_time, end_time,
+            {
+                'project_name': project_name,
+                'model_name': model_name,
+                'agent_name': agent_name,
+                'operation': operation,
+            },
+        )
+        async with self.read_session() as db:
+            rows = (await db.execute(stmt)).all()
+        return self._sketch_rows(keys, rows, quantiles)
+
+    async def session_latency_quantiles(
+        self,
+        session_id: str,
+        quantiles: Sequence[float] = DEFAULT_QUANTILES,
+    ) -> Optional[Dict[str, Any]]:
+        """Latency percentiles of one session (see Storage.session_latency_quantiles)."""
+        async with self.read_session() as db:
+            row = (await db.execute(
+                select(SessionDB.latency_sketch).where(SessionDB.id == session_id)
+            )).first()
+        if row is None:
+            return None
+        return self._session_sketch_quantiles(row[0], quantiles)
+
+    # =========================================================================
+    # UTILITY METHODS
+    # =========================================================================
+
+    async def get_call_count(
+        self,
+        project_name: Optional[str] = None,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+    ) -> int:
+        """Get count of LLM calls matching filters."""
+        stmt = select(func.count(LLMCallDB.id)).where(*self._call_filters(
+            project_name=project_name,
+            start_time=start_time,
+            end_time=end_time,
+        ))
+        async with self.read_session(start_time, end_time) as db:
+            return (await db.execute(stmt)).scalar() or 0
+
+    async def get_total_cost(
+        self,
+        project_name: Optional[str] = None,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+    ) -> float:
+        """Get total cost of LLM calls matching filters."""
+        stmt = select(func.sum(LLMCallDB.total_cost)).where(*self._call_filters(
+            project_name=project_name,
+            start_time=start_time,
+            end_time=end_time,
+        ))
+        async with self.read_session(start_time, end_time) as db:
+            return (await db.execute(stmt)).scalar() or 0.0
@@ -0,0 +1,177 @@
+"""
+Backpressure - Overload Policies and Circuit Breaker
+Location: observatory/backpressure.py
+
+Keeps tracking off the critical path when the database is slow or down.
+
+Overload policies (what `BackgroundWriter` does when its queue is full):
+- "block":       wait for space, up to `block_timeout` seconds (default
+                 DEFAULT_BLOCK_TIMEOUT), then drop
+- "drop_oldest": evict the oldest queued record to make room
+- "drop_newest": drop the record being submitted
+- "spill":       append the record to a local spool segment instead
+
+The circuit breaker stops calling a failing `Storage` for a cool-down
+window. While it is open, and when a write fails, records are spilled if a
+spill_dir is configured (whatever the overload policy) or dropped otherwise.
+Everything dropped or spilled is counted and reported by
+`Observatory.get_write_stats()`.
+
+Usage:
+    obs = Observatory(
+        project_name="My App",
+        background_writes=True,
+        overload_policy="spill",
+        spill_dir="/var/spool/observatory",
+    )
+"""
+
+import threading
+import time
+from typing import Optional, Dict, Any, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from observatory.spool import SpoolWriter
+
+
+# =============================================================================
+# OVERLOAD POLICIES
+# =============================================================================
+
+OVERLOAD_BLOCK = "block"
+OVERLOAD_DROP_OLDEST = "drop_oldest"
+OVERLOAD_DROP_NEWEST = "drop_newest"
+OVERLOAD_SPILL = "spill"
+
+# How long "block" holds up the caller by default. Short enough that a
+# stalled database costs each tracked call at most this much (the record is
+# then dropped and counted); pass block_timeout=None to wait without limit.
+DEFAULT_BLOCK_TIMEOUT = 0.1  # seconds
+
+OVERLOAD_POLICIES = (
+    OVERLOAD_BLOCK,
+    OVERLOAD_DROP_OLDEST,
+    OVERLOAD_DROP_NEWEST,
+    OVERLOAD_SPILL,
+)
+
+
+def validate_overload_policy(policy: str, spill: Optional['SpoolWriter']):
+    """Raise ValueError for an unknown policy or "spill" without a spool."""
+    if policy not in OVERLOAD_POLICIES:
+        raise ValueError(
+            f"Unknown overload_policy '{policy}'. Expected one of: {', '.join(OVERLOAD_POLICIES)}"
+        )
+    if policy == OVERLOAD_SPILL and spill is None:
+        raise ValueError("overload_policy='spill' requires spill_dir")
+
+
+def spill_record(spill: 'SpoolWriter', kind: str, record: Any):
+    """Append a writer queue record ("session", "end" or "call") to a spool."""
+    if kind == "session":
+        spill.save_session(record)
+    elif kind == "end":
+        spill.finalize_session(record)
+    else:
+        spill.record_llm_call(record)
+
+
+# =============================================================================
+# CIRCUIT BREAKER
+# =============================================================================
+
+BREAKER_CLOSED = "closed"
+BREAKER_OPEN = "open"
+BREAKER_HALF_OPEN = "half_open"
+
+DEFAULT_FAILURE_THRESHOLD = 3
+DEFAULT_COOLDOWN = 30.0  # seconds
+
+
+class CircuitBreaker:
+    """
+    Trips after `failure_threshold` consecutive storage failures.
+
+    While open, `allow()` returns False until `cooldown` seconds have passed;
+    then a single trial write is let through (half-open). Its success closes
+    the breaker, its failure re-opens it for another cool-down.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+        cooldown: float = DEFAULT_COOLDOWN,
+    ):
+        self.failure_threshold = max(1, failure_threshold)
+        self.cooldown = cooldown
+
+        self._lock = threading.Lock()
+        self._state = BREAKER_CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+
+        # Statistics
+        self._times_opened = 0
+        self._rejected = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == BREAKER_OPEN and time.monotonic() - self._opened_at >= self.cooldown:
+                return BREAKER_HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        """Whether a write should be attempted now."""
+        with self._lock:
+            if self._state == BREAKER_CLOSED:
+                return True
+
+            if self._state == BREAKER_OPEN:
+                if time.monotonic() - self._opened_at < self.cooldown:
+                    self._rejected += 1
+                    return False
+                self._state = BREAKER_HALF_OPEN
+                self._trial_in_flight = False
+
+            # Half-open: one trial at a time
+            if self._trial_in_flight:
+                self._rejected += 1
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._state = BREAKER_CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self) -> bool:
+        """
+        Count a failed write.
+
+        Returns:
+            True if this failure opened the breaker
+        """
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._state == BREAKER_HALF_OPEN or (
+                self._state == BREAKER_CLOSED and self._failures >= self.failure_threshold
+            ):
+                self._state = BREAKER_OPEN
+                self._opened_at = time.monotonic()
+                self._times_opened += 1
+                return True
+            return False
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get breaker statistics."""
+        return {
+            "state": self.state,
+            "consecutive_failures": self._failures,
+            "times_opened": self._times_opened,
+            "rejected": self._rejected,
+        }
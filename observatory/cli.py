@@ -0,0 +1,391 @@
+"""
+Observatory Command Line
+Location: observatory/cli.py
+
+Usage:
+    observatory compact --spool-dir /var/spool/observatory
+    observatory compact --spool-dir /var/spool/observatory --watch 10
+    observatory migrate
+    observatory externalize-bodies
+    observatory rebuild-rollups --hours 2
+    observatory export-calls --project "My App" --hours 24 --output calls.jsonl
+    observatory search "rate limit" --project "My App" --limit 20
+    observatory rebuild-search-index
+    observatory prune --body-days 30 --call-days 365 --policy "Chatbot=7,90"
+    observatory partitions archive 2026-08
+    observatory archive-parquet /data/observatory-parquet --through 2026-08
+"""
+
+import argparse
+import os
+import sys
+from datetime import datetime, timedelta
+from typing import Optional, List
+
+from observatory.storage import Storage
+from observatory.spool import SpoolCompactor, DEFAULT_STALE_AFTER
+from observatory.retention import RetentionJob, RetentionPolicy, DEFAULT_CHUNK_SIZE
+from observatory.partitions import parse_month, format_month, next_month
+from observatory.parquet_archive import ParquetArchiver, DEFAULT_BATCH_SIZE
+
+
+# =============================================================================
+# COMMANDS
+# =============================================================================
+
+def cmd_compact(args: argparse.Namespace) -> int:
+    """Load closed spool segments into the database."""
+    storage = Storage(args.database_url)
+    compactor = SpoolCompactor(storage, args.spool_dir, stale_after=args.stale_after)
+
+    if args.watch:
+        try:
+            compactor.run_forever(interval=args.watch)
+        except KeyboardInterrupt:
+            return 0
+
+    stats = compactor.compact()
+    print(
+        f"✅ Compacted {stats['segments']} segments "
+        f"({stats['llm_calls']} calls, {stats['sessions']} sessions)"
+    )
+    if stats["failed_segments"]:
+        print(f"⚠️ {stats['failed_segments']} segments failed and were left in place")
+        if stats["deferred_segments"]:
+            print(
+                f"⚠️ {stats['deferred_segments']} later segments of the same processes "
+                f"were left for the next run"
+            )
+        return 1
+    return 0
+
+
+def cmd_migrate(args: argparse.Namespace) -> int:
+    """Move bodies of a pre-split llm_calls table and drop its old columns."""
+    storage = Storage(args.database_url, rollups=False)
+    stats = storage.migrate_call_bodies(drop_columns=not args.keep_columns)
+    if not stats["columns"]:
+        print("✅ Schema is up to date")
+        return 0
+    print(f"✅ Copied {stats['copied']} call bodies to llm_call_bodies")
+    if stats["missing"]:
+        print(f"⚠️ {stats['missing']} bodies were not copied; kept {', '.join(stats['columns'])}")
+        return 1
+    if stats["dropped"]:
+        print(f"✅ Dropped {', '.join(stats['columns'])} from llm_calls (run VACUUM to reclaim space)")
+    return 0
+
+
+def cmd_externalize_bodies(args: argparse.Namespace) -> int:
+    """Move inline prompt/response bodies of existing rows into the blobs table."""
+    storage = Storage(args.database_url)
+    rewritten = storage.externalize_inline_bodies(chunk_size=args.chunk_size)
+    print(f"✅ Moved bodies of {rewritten} calls to the blobs table")
+    return 0
+
+
+def cmd_rebuild_rollups(args: argparse.Namespace) -> int:
+    """Recompute minute/hour/day rollups from llm_calls."""
+    storage = Storage(args.database_url, rollups=False)
+    start_time = datetime.utcnow() - timedelta(hours=args.hours) if args.hours else None
+    rows = storage.rebuild_rollups(start_time=start_time)
+    scope = f"the last {args.hours:g}h" if args.hours else "all history"
+    print(f"✅ Rebuilt rollups for {scope} ({rows} rows)")
+    return 0
+
+
+def cmd_export_calls(args: argparse.Namespace) -> int:
+    """Stream LLM calls to JSON Lines, oldest first."""
+    storage = Storage(args.database_url, rollups=False)
+    start_time = datetime.utcnow() - timedelta(hours=args.hours) if args.hours else None
+    calls = storage.iter_llm_calls(
+        batch_size=args.batch_size,
+        include_bodies=not args.no_bodies,
+        project_name=args.project,
+        start_time=start_time,
+    )
+
+    out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    exported = 0
+    try:
+        for call in calls:
+            out.write(call.model_dump_json() + "\n")
+            exported += 1
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    # Keep stdout clean for the JSON Lines when exporting to it
+    print(f"✅ Exported {exported} calls", file=sys.stderr if out is sys.stdout else sys.stdout)
+    return 0
+
+
+def cmd_search(args: argparse.Namespace) -> int:
+    """Full-text search over prompts, responses and errors."""
+    storage = Storage(args.database_url, rollups=False)
+    start_time = datetime.utcnow() - timedelta(hours=args.hours) if args.hours else None
+    hits = storage.search_calls(
+        args.query,
+        limit=args.limit,
+        include_bodies=False,
+        project_name=args.project,
+        start_time=start_time,
+    )
+    for hit in hits:
+        call = hit["call"]
+        snippet = " ".join((hit["snippet"] or "").split())
+        print(f"{call.timestamp:%Y-%m-%d %H:%M:%S}  {call.id}  {call.model_name}  {snippet}")
+    print(f"✅ {len(hits)} matching calls", file=sys.stderr)
+    return 0
+
+
+def cmd_rebuild_search_index(args: argparse.Namespace) -> int:
+    """Re-index prompt/response/error text for full-text search."""
+    storage = Storage(args.database_url, rollups=False)
+    indexed = storage.rebuild_search_index(chunk_size=args.chunk_size)
+    print(f"✅ Indexed {indexed} calls for search")
+    return 0
+
+
+def parse_policy(value: str) -> RetentionPolicy:
+    """Parse "PROJECT=BODY_DAYS,CALL_DAYS" ("-" keeps forever), e.g. "Chatbot=7,90"."""
+    project, sep, days = value.rpartition("=")
+    body_days, _, call_days = days.partition(",")
+    if not sep or not project:
+        raise argparse.ArgumentTypeError(f"Expected PROJECT=BODY_DAYS,CALL_DAYS, got '{value}'")
+    try:
+        return RetentionPolicy(
+            project_name=project,
+            body_days=None if body_days in ("", "-") else float(body_days),
+            call_days=None if call_days in ("", "-") else float(call_days),
+        )
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def cmd_prune(args: argparse.Namespace) -> int:
+    """Apply retention policies: drop old bodies and calls, keep rollups."""
+    storage = Storage(args.database_url, rollups=False)
+    policies = list(args.policy)
+    if args.body_days is not None or args.call_days is not None:
+        policies.append(RetentionPolicy(body_days=args.body_days, call_days=args.call_days))
+    if not policies:
+        print("⚠️ Nothing to prune: pass --body-days/--call-days or --policy")
+        return 1
+
+    job = RetentionJob(
+        storage,
+        policies,
+        chunk_size=args.chunk_size,
+        vacuum=not args.no_vacuum,
+        full_vacuum=args.full_vacuum,
+    )
+    stats = job.run()
+    print(
+        f"✅ Pruned {stats['projects']} projects: {stats['months']} whole months, "
+        f"bodies of {stats['bodies']} calls, {stats['calls']} calls, "
+        f"{stats['sessions']} sessions, {stats['blobs']} blobs"
+    )
+    return 0
+
+
+def month_arg(value: str):
+    try:
+        return parse_month(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def cmd_partitions(args: argparse.Namespace) -> int:
+    """List, archive (SQLite) or drop monthly partitions of llm_calls."""
+    storage = Storage(args.database_url, rollups=False)
+    job = RetentionJob(storage, chunk_size=args.chunk_size, vacuum=not args.no_vacuum)
+
+    if args.action == "list":
+        months = job.months()
+        if not months:
+            print("No partitioned or archived months")
+        for entry in months:
+            print(f"{format_month(entry['month'])}  {entry['location']}")
+        return 0
+
+    if args.month is None:
+        print(f"⚠️ partitions {args.action} needs a MONTH (YYYY-MM)")
+        return 1
+    before = next_month(args.month)
+    if args.action == "archive":
+        stats = job.archive_months(before)
+        print(f"✅ Archived {stats['months']} months ({stats['calls']} calls)")
+    else:
+        stats = job.drop_months(before)
+        print(f"✅ Dropped {stats['months']} months ({stats['blobs']} blobs)")
+    return 0
+
+
+def cmd_archive_parquet(args: argparse.Namespace) -> int:
+    """Write closed months of llm_calls to Parquet files for DuckDB analytics."""
+    storage = Storage(args.database_url, rollups=False)
+    archiver = ParquetArchiver(storage, args.output, batch_size=args.batch_size)
+    stats = archiver.archive_months(next_month(args.through), overwrite=args.overwrite)
+    print(f"✅ Wrote {stats['months']} months to {args.output} ({stats['calls']} calls)")
+    return 0
+
+
+# =============================================================================
+# ENTRY POINT
+# =============================================================================
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="observatory", description="AI Agent Observatory")
+    parser.add_argument(
+        "--database-url",
+        default=os.getenv("DATABASE_URL", "sqlite:///observatory.db"),
+        help="Database URL (default: $DATABASE_URL or sqlite:///observatory.db)",
+    )
+    subparsers = parser.add_subparsers(dest="command")
+
+    compact = subparsers.add_parser("compact", help="Load spool segments into the database")
+    compact.add_argument(
+        "--spool-dir",
+        default=os.getenv("OBSERVATORY_SPOOL_DIR"),
+        required=os.getenv("OBSERVATORY_SPOOL_DIR") is None,
+        help="Spool directory (default: $OBSERVATORY_SPOOL_DIR)",
+    )
+    compact.add_argument(
+        "--stale-after",
+        type=float,
+        default=DEFAULT_STALE_AFTER,
+        help="Seconds before an open segment from another host is treated as abandoned",
+    )
+    compact.add_argument(
+        "--watch",
+        type=float,
+        metavar="SECONDS",
+        help="Keep running, compacting every SECONDS",
+    )
+    compact.set_defaults(func=cmd_compact)
+
+    migrate = subparsers.add_parser(
+        "migrate",
+        help="Move bodies of a pre-split llm_calls table and drop its old columns",
+    )
+    migrate.add_argument(
+        "--keep-columns",
+        action="store_true",
+        help="Only copy the bodies; leave the old llm_calls columns in place",
+    )
+    migrate.set_defaults(func=cmd_migrate)
+
+    externalize = subparsers.add_parser(
+        "externalize-bodies",
+        help="Move inline prompt/response bodies of existing calls into the blobs table",
+    )
+    externalize.add_argument("--chunk-size", type=int, default=1000)
+    externalize.set_defaults(func=cmd_externalize_bodies)
+
+    rollups = subparsers.add_parser(
+        "rebuild-rollups",
+        help="Recompute the minute/hour/day rollup tables from llm_calls",
+    )
+    rollups.add_argument(
+        "--hours",
+        type=float,
+        help="Only rebuild buckets from the last HOURS (default: all history)",
+    )
+    rollups.set_defaults(func=cmd_rebuild_rollups)
+
+    export = subparsers.add_parser(
+        "export-calls",
+        help="Stream LLM calls to JSON Lines in constant memory",
+    )
+    export.add_argument("--output", default="-", help="Output file (default: stdout)")
+    export.add_argument("--project", help="Only calls of this project")
+    export.add_argument("--hours", type=float, help="Only calls from the last HOURS")
+    export.add_argument("--no-bodies", action="store_true", help="Skip prompt/response bodies")
+    export.add_argument("--batch-size", type=int, default=1000)
+    export.set_defaults(func=cmd_export_calls)
+
+    search = subparsers.add_parser(
+        "search",
+        help="Full-text search over prompts, responses and errors (best matches first)",
+    )
+    search.add_argument("query", help='Words to find; "word*" matches prefixes')
+    search.add_argument("--project", help="Only calls of this project")
+    search.add_argument("--hours", type=float, help="Only calls from the last HOURS")
+    search.add_argument("--limit", type=int, default=20)
+    search.set_defaults(func=cmd_search)
+
+    reindex = subparsers.add_parser(
+        "rebuild-search-index",
+        help="Re-index the text of every call (after ingesting with search_index=False)",
+    )
+    reindex.add_argument("--chunk-size", type=int, default=1000)
+    reindex.set_defaults(func=cmd_rebuild_search_index)
+
+    prune = subparsers.add_parser(
+        "prune",
+        help="Delete old bodies and calls per retention policy (rollups are kept)",
+    )
+    prune.add_argument("--body-days", type=float, help="Default: keep prompt/response bodies for N days")
+    prune.add_argument("--call-days", type=float, help="Default: keep calls and sessions for N days")
+    prune.add_argument(
+        "--policy",
+        type=parse_policy,
+        action="append",
+        default=[],
+        metavar="PROJECT=BODY_DAYS,CALL_DAYS",
+        help='Per-project override, e.g. "Chatbot=7,90" ("-" keeps forever); repeatable',
+    )
+    prune.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    prune.add_argument("--no-vacuum", action="store_true", help="Skip VACUUM/ANALYZE afterwards")
+    prune.add_argument(
+        "--full-vacuum",
+        action="store_true",
+        help="Rewrite the whole database (locks it; run once on SQLite files without incremental vacuum)",
+    )
+    prune.set_defaults(func=cmd_prune)
+
+    partitions = subparsers.add_parser(
+        "partitions",
+        help="List, archive (SQLite) or drop whole months of llm_calls",
+    )
+    partitions.add_argument("action", choices=["list", "archive", "drop"])
+    partitions.add_argument(
+        "month",
+        nargs="?",
+        type=month_arg,
+        help="YYYY-MM: archive/drop this month and every earlier one",
+    )
+    partitions.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    partitions.add_argument("--no-vacuum", action="store_true", help="Skip VACUUM/ANALYZE after archiving")
+    partitions.set_defaults(func=cmd_partitions)
+
+    parquet = subparsers.add_parser(
+        "archive-parquet",
+        help="Write closed months of llm_calls to Parquet (month=YYYY-MM/llm_calls.parquet)",
+    )
+    parquet.add_argument("output", help="Archive directory")
+    parquet.add_argument(
+        "--through",
+        required=True,
+        type=month_arg,
+        help="YYYY-MM: archive this month and every earlier one (the current month is skipped)",
+    )
+    parquet.add_argument("--overwrite", action="store_true", help="Rewrite months that already have a file")
+    parquet.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Rows per row group")
+    parquet.set_defaults(func=cmd_archive_parquet)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if not getattr(args, "func", None):
+        parser.print_help()
+        return 1
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
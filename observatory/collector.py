@@ -10,13 +10,26 @@ Collects and manages metrics for AI agent sessions with support for:
 - Prompt/response tracking
 - Prompt breakdown and metadata
 - Auto-generated prompt hash for version detection
+- Optional write-behind mode (background_writes=True) that batches writes
+  on a worker thread instead of hitting the database per call
+- Per-task/per-thread current session (contextvars), so one collector can
+  serve many concurrent sessions; threads don't inherit it (a thread without
+  one starts a new session), so `wrap()` carries the caller's session into
+  worker threads
+- Optional spool mode (spool_dir=...) that appends records to per-process
+  segment files for `observatory compact` to load into the database
+- Overload policies and a storage circuit breaker, so a slow or failing
+  database drops or spills records instead of slowing the application
 """
 
 import os
 import uuid
 import hashlib
+import functools
+import threading
+from contextvars import ContextVar, copy_context
 from datetime import datetime
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Iterable, Callable
 from contextlib import contextmanager
 
 from observatory.models import (
@@ -31,7 +44,21 @@ from observatory.models import (
     PromptBreakdown,
     PromptMetadata,
 )
-from observatory.storage import Storage
+from observatory.storage import Storage, DEFAULT_BULK_CHUNK_SIZE
+from observatory.writer import (
+    BackgroundWriter,
+    DEFAULT_MAX_QUEUE_SIZE,
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_FLUSH_INTERVAL,
+)
+from observatory.spool import SpoolWriter
+from observatory.backpressure import (
+    CircuitBreaker,
+    OVERLOAD_BLOCK,
+    DEFAULT_BLOCK_TIMEOUT,
+    validate_overload_policy,
+    spill_record,
+)
 
 
 # =============================================================================
@@ -82,6 +109,142 @@ def calculate_cost(provider: ModelProvider, model_name: str, prompt_tokens: int,
     return prompt_cost, completion_cost
 
 
+# =============================================================================
+# CALL CONSTRUCTION
+# =============================================================================
+
+def build_llm_call(
+    session_id: str,
+    provider: ModelProvider,
+    model_name: str,
+    prompt_tokens: int,
+    completion_tokens: int,
+    latency_ms: float,
+    agent_name: Optional[str] = None,
+    agent_role: Optional[AgentRole] = None,
+    operation: Optional[str] = None,
+    success: bool = True,
+    error: Optional[str] = None,
+    metadata: Optional[Dict[str, Any]] = None,
+    prompt: Optional[str] = None,
+    prompt_normalized: Optional[str] = None,
+    response_text: Optional[str] = None,
+    system_prompt: Optional[str] = None,
+    user_message: Optional[str] = None,
+    messages: Optional[List[Dict[str, str]]] = None,
+    routing_decision: Optional[RoutingDecision] = None,
+    cache_metadata: Optional[CacheMetadata] = None,
+    quality_evaluation: Optional[QualityEvaluation] = None,
+    prompt_breakdown: Optional[PromptBreakdown] = None,
+    prompt_metadata: Optional[PromptMetadata] = None,
+    prompt_variant_id: Optional[str] = None,
+    test_dataset_id: Optional[str] = None,
+    timestamp: Optional[datetime] = None,
+) -> LLMCall:
+    """Build an LLMCall with costs, combined prompt and prompt hash filled in."""
+    # Calculate costs
+    prompt_cost, completion_cost = calculate_cost(
+        provider, model_name, prompt_tokens, completion_tokens
+    )
+    total_cost = prompt_cost + completion_cost
+    total_tokens = prompt_tokens + completion_tokens
+    
+    # Build combined prompt if not provided but components are
+    if not prompt and (system_prompt or user_message):
+        prompt_parts = []
+        if system_prompt:
+            prompt_parts.append(f"[SYSTEM]\n{system_prompt}")
+        if user_message:
+            prompt_parts.append(f"[USER]\n{user_message}")
+        prompt = "\n\n".join(prompt_parts)
+    elif not prompt and messages:
+        prompt = "\n\n".join([
+            f"[{m.get('role', 'unknown').upper()}]\n{m.get('content', '')}"
+            for m in messages
+        ])
+    
+    # Auto-generate prompt hash
+    if prompt and prompt_metadata and not prompt_metadata.prompt_hash:
+        prompt_metadata.prompt_hash = generate_prompt_hash(prompt)
+    elif prompt and not prompt_metadata:
+        prompt_metadata = PromptMetadata(
+            prompt_hash=generate_prompt_hash(prompt)
+        )
+    
+    # Build metadata with prompt components
+    full_metadata = metadata or {}
+    if system_prompt:
+        full_metadata['system_prompt'] = system_prompt[:2000]
+    if user_message:
+        full_metadata['user_message'] = user_message[:1000]
+    if messages:
+        full_metadata['messages'] = messages
+        full_metadata['message_count'] = len(messages)
+    
+    # Create the LLM call record
+    llm_call = LLMCall(
+        id=str(uuid.uuid4()),
+        session_id=session_id,
+        timestamp=timestamp or datetime.utcnow(),
+        provider=provider,
+        model_name=model_name,
+        prompt_tokens=prompt_tokens,
+        completion_tokens=completion_tokens,
+        total_tokens=total_tokens,
+        prompt_cost=prompt_cost,
+        completion_cost=completion_cost,
+        total_cost=total_cost,
+        latency_ms=latency_ms,
+        agent_name=agent_name,
+        agent_role=agent_role,
+        operation=operation,
+        success=success,
+        error=error,
+        metadata=full_metadata,
+        prompt=prompt,
+        prompt_normalized=prompt_normalized,
+        response_text=response_text,
+        routing_decision=routing_decision,
+        cache_metadata=cache_metadata,
+        quality_evaluation=quality_evaluation,
+        prompt_breakdown=prompt_breakdown,
+        prompt_metadata=prompt_metadata,
+        prompt_variant_id=prompt_variant_id,
+        test_dataset_id=test_dataset_id,
+    )
+    
+    return llm_call
+
+def apply_call_to_session(session: Session, llm_call: LLMCall):
+    """Apply a call's contribution to the in-memory session counters."""
+    session.total_llm_calls += 1
+    session.total_tokens += llm_call.total_tokens
+    session.total_cost += llm_call.total_cost
+    session.total_latency_ms += llm_call.latency_ms
+    
+    # Update routing metrics
+    if llm_call.routing_decision:
+        session.total_routing_decisions += 1
+        if llm_call.routing_decision.estimated_cost_savings:
+            session.routing_cost_savings += llm_call.routing_decision.estimated_cost_savings
+    
+    # Update cache metrics
+    if llm_call.cache_metadata:
+        if llm_call.cache_metadata.cache_hit:
+            session.total_cache_hits += 1
+        else:
+            session.total_cache_misses += 1
+    
+    # Update quality metrics
+    if llm_call.quality_evaluation:
+        if llm_call.quality_evaluation.hallucination_flag:
+            session.total_hallucinations += 1
+    
+    # Update error count
+    if not llm_call.success:
+        session.total_errors += 1
+
+
 # =============================================================================
 # METRICS COLLECTOR
 # =============================================================================
@@ -97,11 +260,201 @@ class MetricsCollector:
         project_name: str = "default",
         enabled: bool = True,
         storage: Optional[Storage] = None,
+        background_writes: bool = False,
+        max_queue_size: int = DEFAULT_MAX_QUEUE_SIZE,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        spool_dir: Optional[str] = None,
+        overload_policy: str = OVERLOAD_BLOCK,
+        block_timeout: Optional[float] = DEFAULT_BLOCK_TIMEOUT,
+        spill_dir: Optional[str] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
     ):
+        if background_writes and spool_dir:
+            raise ValueError("background_writes and spool_dir are mutually exclusive")
+        
         self.project_name = project_name
         self.enabled = enabled
         self.storage = storage or Storage()
-        self.current_session: Optional[Session] = None
+        
+        # Degrade modes: breaker around storage, optional spill spool
+        self.overload_policy = overload_policy
+        self.breaker = circuit_breaker or CircuitBreaker()
+        self.spill: Optional[SpoolWriter] = None
+        if enabled and spill_dir:
+            self.spill = SpoolWriter(spill_dir)
+        if enabled:
+            validate_overload_policy(overload_policy, self.spill)
+        self._total_dropped = 0
+        self._total_spilled = 0
+        self._stats_lock = threading.Lock()
+        
+        # Current session is scoped to the running thread / asyncio task
+        self._session_var: ContextVar[Optional[Session]] = ContextVar(
+            f"observatory_session_{id(self)}", default=None
+        )
+        
+        # Write-behind queue (opt-in)
+        self.writer: Optional[BackgroundWriter] = None
+        if enabled and background_writes:
+            self.writer = BackgroundWriter(
+                self.storage,
+                max_queue_size=max_queue_size,
+                batch_size=batch_size,
+                flush_interval=flush_interval,
+                overload_policy=overload_policy,
+                block_timeout=block_timeout,
+                spill=self.spill,
+                circuit_breaker=self.breaker,
+            )
+        
+        # Per-process spool files, loaded by `observatory compact` (opt-in)
+        self.spool: Optional[SpoolWriter] = None
+        if enabled and spool_dir:
+            self.spool = SpoolWriter(spool_dir)
+
+    @property
+    def current_session(self) -> Optional[Session]:
+        """
+        Active session of the calling thread or asyncio task.
+        
+        Threads don't inherit it (e.g. ThreadPoolExecutor workers); run their
+        work through `wrap()` to record into the caller's session.
+        """
+        return self._session_var.get()
+
+    @current_session.setter
+    def current_session(self, session: Optional[Session]):
+        self._session_var.set(session)
+
+    def wrap(self, fn: Callable) -> Callable:
+        """
+        Bind `fn` to the caller's context, so it records into the caller's
+        current session when run on another thread.
+        
+        Usage:
+            with obs.track("batch"):
+                with ThreadPoolExecutor(4) as pool:
+                    list(pool.map(obs.wrap(process), items))
+        """
+        context = copy_context()
+        
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            # A context can only be entered by one thread at a time
+            return context.copy().run(fn, *args, **kwargs)
+        
+        return wrapper
+
+    # =========================================================================
+    # PERSISTENCE
+    # =========================================================================
+
+    def _persist_session(self, session: Session):
+        """Save a new session directly, through the background writer or to the spool."""
+        if self.writer:
+            self.writer.submit_session(session)
+        elif self.spool:
+            self.spool.save_session(session)
+        else:
+            self._store([("session", session)], lambda: self.storage.save_session(session))
+
+    def _persist_session_end(self, session: Session):
+        """Save end-of-session state without overwriting call counters."""
+        if self.writer:
+            self.writer.submit_session_end(session)
+        elif self.spool:
+            self.spool.finalize_session(session)
+        else:
+            self._store([("end", session)], lambda: self.storage.finalize_session(session))
+
+    def _persist_call(self, llm_call: LLMCall, session: Session):
+        """Save a call and apply its session counter deltas."""
+        if self.writer:
+            self.writer.submit_call(llm_call)
+        elif self.spool:
+            self.spool.record_llm_call(llm_call)
+        else:
+            self._store([("call", llm_call)], lambda: self.storage.record_llm_call(llm_call, session=session))
+
+    def _persist_calls(self, llm_calls: List[LLMCall], session: Session):
+        """Save a chunk of bulk-recorded calls in one transaction."""
+        if self.spool:
+            self.spool.save_llm_calls(llm_calls)
+        else:
+            # save_batch also inserts the session if its row is missing
+            self._store(
+                [("call", llm_call) for llm_call in llm_calls],
+                lambda: self.storage.save_batch([session], llm_calls),
+            )
+
+    def _store(self, records: List[tuple], write):
+        """
+        Run a direct storage write of (kind, record) pairs behind the
+        circuit breaker.
+        
+        Storage errors never reach the caller: while the breaker is open, or
+        when a write fails, the records are spilled (if a spill_dir is set) or
+        dropped and counted.
+        """
+        if self.breaker.allow():
+            try:
+                write()
+                self.breaker.record_success()
+                return
+            except Exception as e:
+                if self.breaker.record_failure():
+                    print(
+                        f"⚠️ Observatory storage failing, pausing writes for "
+                        f"{self.breaker.cooldown:g}s: {e}"
+                    )
+        
+        if self.spill is not None:
+            try:
+                for kind, record in records:
+                    spill_record(self.spill, kind, record)
+                with self._stats_lock:
+                    self._total_spilled += len(records)
+                return
+            except Exception as e:
+                print(f"⚠️ Observatory spill failed: {e}")
+        with self._stats_lock:
+            self._total_dropped += len(records)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until all queued writes are persisted. No-op without background writes."""
+        if self.writer:
+            return self.writer.flush(timeout)
+        return True
+
+    def close(self):
+        """Drain queued writes and stop the background writer / close the spool segment."""
+        if self.writer:
+            self.writer.close()
+        if self.spool:
+            self.spool.close()
+        if self.spill:
+            self.spill.close()
+
+    def get_write_stats(self) -> Dict[str, Any]:
+        """Get dropped/spilled/failed record counts and the circuit breaker state."""
+        stats: Dict[str, Any] = {
+            "mode": "background" if self.writer else "spool" if self.spool else "direct",
+            "total_dropped": self._total_dropped,
+            "total_spilled": self._total_spilled,
+            "breaker": self.breaker.get_stats(),
+        }
+        if self.writer:
+            writer_stats = self.writer.get_stats()
+            writer_stats.pop("breaker_state", None)
+            stats["total_dropped"] += writer_stats.pop("total_dropped")
+            stats["total_spilled"] += writer_stats.pop("total_spilled")
+            stats.update(writer_stats)
+        return stats
+
+    # =========================================================================
+    # SESSION LIFECYCLE
+    # =========================================================================
 
     def start_session(
         self,
@@ -124,7 +477,7 @@ class MetricsCollector:
         )
         
         self.current_session = session
-        self.storage.save_session(session)
+        self._persist_session(session)
         return session
 
     def end_session(
@@ -155,9 +508,9 @@ class MetricsCollector:
             if quality_scores:
                 target_session.avg_quality_score = sum(quality_scores) / len(quality_scores)
         
-        self.storage.update_session(target_session)
+        self._persist_session_end(target_session)
         
-        if target_session == self.current_session:
+        if target_session == self._session_var.get():
             self.current_session = None
         
         return target_session
@@ -263,68 +616,25 @@ class MetricsCollector:
         if not target_session:
             target_session = self.start_session(operation_type=operation)
         
-        # Calculate costs
-        prompt_cost, completion_cost = calculate_cost(
-            provider, model_name, prompt_tokens, completion_tokens
-        )
-        total_cost = prompt_cost + completion_cost
-        total_tokens = prompt_tokens + completion_tokens
-        
-        # Build combined prompt if not provided but components are
-        if not prompt and (system_prompt or user_message):
-            prompt_parts = []
-            if system_prompt:
-                prompt_parts.append(f"[SYSTEM]\n{system_prompt}")
-            if user_message:
-                prompt_parts.append(f"[USER]\n{user_message}")
-            prompt = "\n\n".join(prompt_parts)
-        elif not prompt and messages:
-            prompt = "\n\n".join([
-                f"[{m.get('role', 'unknown').upper()}]\n{m.get('content', '')}"
-                for m in messages
-            ])
-        
-        # Auto-generate prompt hash
-        if prompt and prompt_metadata and not prompt_metadata.prompt_hash:
-            prompt_metadata.prompt_hash = generate_prompt_hash(prompt)
-        elif prompt and not prompt_metadata:
-            prompt_metadata = PromptMetadata(
-                prompt_hash=generate_prompt_hash(prompt)
-            )
-        
-        # Build metadata with prompt components
-        full_metadata = metadata or {}
-        if system_prompt:
-            full_metadata['system_prompt'] = system_prompt[:2000]
-        if user_message:
-            full_metadata['user_message'] = user_message[:1000]
-        if messages:
-            full_metadata['messages'] = messages
-            full_metadata['message_count'] = len(messages)
-        
-        # Create the LLM call record
-        llm_call = LLMCall(
-            id=str(uuid.uuid4()),
+        llm_call = build_llm_call(
             session_id=target_session.id,
-            timestamp=datetime.utcnow(),
             provider=provider,
             model_name=model_name,
             prompt_tokens=prompt_tokens,
             completion_tokens=completion_tokens,
-            total_tokens=total_tokens,
-            prompt_cost=prompt_cost,
-            completion_cost=completion_cost,
-            total_cost=total_cost,
             latency_ms=latency_ms,
             agent_name=agent_name,
             agent_role=agent_role,
             operation=operation,
             success=success,
             error=error,
-            metadata=full_metadata,
+            metadata=metadata,
             prompt=prompt,
             prompt_normalized=prompt_normalized,
             response_text=response_text,
+            system_prompt=system_prompt,
+            user_message=user_message,
+            messages=messages,
             routing_decision=routing_decision,
             cache_metadata=cache_metadata,
             quality_evaluation=quality_evaluation,
@@ -336,39 +646,71 @@ class MetricsCollector:
         
         # Update session metrics
         target_session.llm_calls.append(llm_call)
-        target_session.total_llm_calls += 1
-        target_session.total_tokens += total_tokens
-        target_session.total_cost += total_cost
-        target_session.total_latency_ms += latency_ms
-        
-        # Update routing metrics
-        if routing_decision:
-            target_session.total_routing_decisions += 1
-            if routing_decision.estimated_cost_savings:
-                target_session.routing_cost_savings += routing_decision.estimated_cost_savings
-        
-        # Update cache metrics
-        if cache_metadata:
-            if cache_metadata.cache_hit:
-                target_session.total_cache_hits += 1
-            else:
-                target_session.total_cache_misses += 1
-        
-        # Update quality metrics
-        if quality_evaluation:
-            if quality_evaluation.hallucination_flag:
-                target_session.total_hallucinations += 1
-        
-        # Update error count
-        if not success:
-            target_session.total_errors += 1
+        apply_call_to_session(target_session, llm_call)
         
         # Persist
-        self.storage.save_llm_call(llm_call)
-        self.storage.update_session(target_session)
+        self._persist_call(llm_call, target_session)
         
         return llm_call
 
+    def record_llm_calls_bulk(
+        self,
+        calls: Iterable[Dict[str, Any]],
+        session: Optional[Session] = None,
+        chunk_size: int = DEFAULT_BULK_CHUNK_SIZE,
+    ) -> int:
+        """
+        Record many LLM calls at once (backfills, usage-log replays, batch jobs).
+        
+        Each item is a dict of `record_llm_call` arguments, optionally with a
+        `timestamp` for historical data. Calls are written in chunked
+        transactions with one aggregated session update per chunk. The input
+        may be any iterable (e.g. a generator), so memory stays bounded by
+        `chunk_size` regardless of how many calls are ingested.
+        
+        Unlike `record_llm_call`, calls are not appended to
+        `session.llm_calls`; only the session counters are updated. Chunks
+        go through the circuit breaker like single calls: a failing database
+        spills or drops them instead of raising.
+        
+        Args:
+            calls: Iterable of record_llm_call keyword-argument dicts
+            session: Session to attach to (uses current if None)
+            chunk_size: Number of calls per transaction
+        
+        Returns:
+            Number of calls recorded
+        """
+        if not self.enabled:
+            return 0
+        
+        target_session = session or self.current_session
+        if not target_session:
+            target_session = self.start_session(operation_type="bulk_import")
+        
+        # Make sure the session row exists before deltas are applied to it
+        self.flush()
+        
+        recorded = 0
+        chunk: List[LLMCall] = []
+        for call_kwargs in calls:
+            call_kwargs = dict(call_kwargs)
+            call_kwargs.pop('session', None)
+            llm_call = build_llm_call(session_id=target_session.id, **call_kwargs)
+            apply_call_to_session(target_session, llm_call)
+            chunk.append(llm_call)
+            
+            if len(chunk) >= chunk_size:
+                self._persist_calls(chunk, target_session)
+                recorded += len(chunk)
+                chunk = []
+        
+        if chunk:
+            self._persist_calls(chunk, target_session)
+            recorded += len(chunk)
+        
+        return recorded
+
     # =========================================================================
     # CONVENIENCE RECORDING METHODS
     # =========================================================================
@@ -489,6 +831,7 @@ class MetricsCollector:
             raise ValueError("No session to report on")
         
         if not target_session.llm_calls:
+            self.flush()
             target_session = self.storage.get_session(target_session.id)
         
         total_cost = target_session.total_cost
@@ -537,7 +880,17 @@ class MetricsCollector:
         operation_type: str,
         metadata: Optional[Dict[str, Any]] = None,
     ):
-        """Context manager for tracking a session."""
+        """
+        Context manager for tracking a session.
+        
+        The session is current inside the block for the calling thread or
+        asyncio task (and tasks it creates); the previously current session is
+        restored on exit, so nested and concurrent `track()` blocks don't
+        interfere. Threads started inside the block don't see the session;
+        use `wrap()` to bind their work to it.
+        """
+        # start_session() sets the session; the token restores what was set before
+        token = self._session_var.set(self._session_var.get())
         session = self.start_session(operation_type, metadata)
         try:
             yield session
@@ -545,6 +898,8 @@ class MetricsCollector:
         except Exception as e:
             self.end_session(session, success=False, error=str(e))
             raise
+        finally:
+            self._session_var.reset(token)
 
 
 # =============================================================================
@@ -562,6 +917,15 @@ class Observatory:
         project_name: str = "default",
         enabled: Optional[bool] = None,
         storage: Optional[Storage] = None,
+        background_writes: bool = False,
+        max_queue_size: int = DEFAULT_MAX_QUEUE_SIZE,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        spool_dir: Optional[str] = None,
+        overload_policy: str = OVERLOAD_BLOCK,
+        block_timeout: Optional[float] = DEFAULT_BLOCK_TIMEOUT,
+        spill_dir: Optional[str] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
     ):
         if enabled is None:
             enabled = os.getenv("ENABLE_OBSERVATORY", "true").lower() == "true"
@@ -570,6 +934,15 @@ class Observatory:
             project_name=project_name,
             enabled=enabled,
             storage=storage,
+            background_writes=background_writes,
+            max_queue_size=max_queue_size,
+            batch_size=batch_size,
+            flush_interval=flush_interval,
+            spool_dir=spool_dir,
+            overload_policy=overload_policy,
+            block_timeout=block_timeout,
+            spill_dir=spill_dir,
+            circuit_breaker=circuit_breaker,
         )
     
     def start_session(self, operation_type: Optional[str] = None, **kwargs) -> Session:
@@ -584,6 +957,15 @@ class Observatory:
         """Record an LLM call. Accepts all record_llm_call arguments."""
         return self.collector.record_llm_call(**kwargs)
     
+    def record_calls_bulk(
+        self,
+        calls: Iterable[Dict[str, Any]],
+        session: Optional[Session] = None,
+        chunk_size: int = DEFAULT_BULK_CHUNK_SIZE,
+    ) -> int:
+        """Record many calls in chunked transactions. Returns the number recorded."""
+        return self.collector.record_llm_calls_bulk(calls, session=session, chunk_size=chunk_size)
+    
     def record_with_routing(self, **kwargs) -> LLMCall:
         """Record a call with routing decision."""
         return self.collector.record_with_routing(**kwargs)
@@ -606,4 +988,20 @@ class Observatory:
     
     def track(self, operation_type: str, **metadata):
         """Context manager for tracking a session."""
-        return self.collector.track(operation_type, metadata)
\ No newline at end of file
+        return self.collector.track(operation_type, metadata)
+    
+    def wrap(self, fn: Callable) -> Callable:
+        """Bind `fn` to the caller's current session, for running on worker threads."""
+        return self.collector.wrap(fn)
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until all queued writes are persisted (background_writes mode)."""
+        return self.collector.flush(timeout)
+    
+    def close(self):
+        """Drain queued writes and stop the background writer / close the spool segment."""
+        self.collector.close()
+    
+    def get_write_stats(self) -> Dict[str, Any]:
+        """Get dropped/spilled/failed record counts and the circuit breaker state."""
+        return self.collector.get_write_stats()
\ No newline at end of file
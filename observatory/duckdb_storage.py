@@ -0,0 +1,213 @@
+"""
+DuckDB Storage - Columnar Analytics over the Parquet Archive
+Location: observatory/duckdb_storage.py
+
+Read-only backend for long-range analytics (90-day cost trends, before /
+after comparisons) over the month files written by `ParquetArchiver`
+(observatory/parquet_archive.py). DuckDB scans the Parquet columns a query
+needs with vectorized, multi-threaded execution, in process and without a
+server.
+
+It exposes the `Storage` read API that analytics use - `aggregate`,
+`query_calls`, `get_llm_calls` (without bodies), `get_call_count` and
+`get_total_cost` - built from the same `BaseStorage` filters, metrics and
+time buckets, compiled for PostgreSQL (DuckDB speaks that dialect).
+Queries only scan the month files overlapping start_time/end_time.
+
+Requires duckdb:
+    pip install duckdb
+
+Usage:
+    analytics = DuckDBStorage("/data/observatory-parquet")
+    analytics.aggregate(
+        group_by=["model_name"], metrics=["count", "sum_cost"], bucket="day",
+        project_name="My App", start_time=datetime(2026, 6, 1),
+    )
+"""
+
+import json
+from datetime import datetime
+from typing import Optional, List, Dict, Any, Sequence, Union
+
+from sqlalchemy import JSON, select, func
+from sqlalchemy.dialects import postgresql
+
+from observatory.models import LLMCall
+from observatory.storage import BaseStorage, LLMCallDB, to_columnar
+from observatory.partitions import overlapping_months
+from observatory.parquet_archive import find_parquet_months
+
+
+class DuckDBStorage(BaseStorage):
+    """Storage-style reads over a Parquet archive, executed by DuckDB."""
+
+    def __init__(
+        self,
+        root: str,
+        database: str = ":memory:",
+        threads: Optional[int] = None,
+    ):
+        """
+        Initialize the DuckDB backend.
+
+        Args:
+            root: Directory written by ParquetArchiver (month=YYYY-MM/ files)
+            database: DuckDB database file; the default in-memory database
+                holds nothing but the per-query views
+            threads: DuckDB worker threads (default: one per core)
+        """
+        try:
+            import duckdb
+        except ImportError:
+            raise ImportError("DuckDBStorage requires duckdb (pip install duckdb)")
+
+        self.root = root
+        self.connection = duckdb.connect(database)
+        if threads:
+            self.connection.execute(f"SET threads TO {int(threads)}")
+
+        # qmark: DuckDB's positional parameters
+        self.dialect = postgresql.dialect(paramstyle="qmark")
+        self.json_columns = {
+            column.name for column in LLMCallDB.__table__.columns if isinstance(column.type, JSON)
+        }
+
+    def close(self):
+        self.connection.close()
+
+    def months(self) -> List[datetime]:
+        """Archived months available to queries, oldest first."""
+        return sorted(find_parquet_months(self.root))
+
+    # =========================================================================
+    # EXECUTION
+    # =========================================================================
+
+    def _execute(
+        self,
+        stmt,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+    ) -> Optional[List[tuple]]:
+        """
+        Run a statement against the months overlapping [start_time, end_time].
+
+        llm_calls is a TEMP view over those files. Temp views belong to the
+        cursor, so each query gets its own cursor and concurrent queries
+        (dashboard threads) don't see each other's views.
+
+        Returns:
+            Result rows, or None when no archived month overlaps the range
+        """
+        archives = find_parquet_months(self.root)
+        months = list(archives) if start_time is None else overlapping_months(archives, start_time, end_time)
+        if not months:
+            return None
+
+        compiled = stmt.compile(dialect=self.dialect)
+        params = [compiled.params[name] for name in compiled.positiontup]
+        files = ", ".join("'" + archives[month].replace("'", "''") + "'" for month in sorted(months))
+
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute(
+                f"CREATE OR REPLACE TEMP VIEW {LLMCallDB.__tablename__} AS "
+                f"SELECT * FROM read_parquet([{files}], union_by_name = true)"
+            )
+            return cursor.execute(str(compiled), params).fetchall()
+        finally:
+            cursor.close()
+
+    def _decode_json(self, columns: Sequence[str], rows: List[tuple]) -> List[tuple]:
+        """JSON columns are stored as text in Parquet; return them as dicts."""
+        positions = [i for i, column in enumerate(columns) if column in self.json_columns]
+        if not positions:
+            return rows
+        decoded = []
+        for row in rows:
+            row = list(row)
+            for i in positions:
+                if row[i] is not None:
+                    row[i] = json.loads(row[i])
+            decoded.append(tuple(row))
+        return decoded
+
+    # =========================================================================
+    # QUERIES
+    # =========================================================================
+
+    def query_calls(
+        self,
+        columns: Sequence[str],
+        limit: Optional[int] = None,
+        columnar: bool = False,
+        **filters,
+    ) -> Union[List[Any], Dict[str, List[Any]]]:
+        """Fetch selected llm_calls columns (see `Storage.query_calls`)."""
+        stmt = self._projection_select(columns, limit, filters)
+        rows = self._execute(stmt, filters.get('start_time'), filters.get('end_time')) or []
+        rows = self._decode_json(columns, rows)
+        return to_columnar(columns, rows) if columnar else rows
+
+    def aggregate(
+        self,
+        group_by: Sequence[str] = (),
+        metrics: Sequence[str] = ('count', 'sum_cost'),
+        bucket: Optional[str] = None,
+        **filters,
+    ) -> List[Dict[str, Any]]:
+        """GROUP BY aggregation (see `Storage.aggregate`)."""
+        stmt, keys = self._aggregate_select(group_by, metrics, bucket, filters, self.dialect.name)
+        rows = self._execute(stmt, filters.get('start_time'), filters.get('end_time'))
+        if rows is None:
+            # Same shape as an aggregate over no calls
+            if group_by or bucket:
+                return []
+            rows = [tuple(0 if name == 'count' else None for name in metrics)]
+        return self._aggregate_rows(keys, rows, bucket)
+
+    def get_llm_calls(self, limit: int = 1000, **filters) -> List[LLMCall]:
+        """
+        Get archived calls, newest first (see `Storage.get_llm_calls`).
+
+        Bodies aren't archived: prompt/response fields are None and
+        metadata is empty.
+        """
+        table = LLMCallDB.__table__
+        stmt = self._projection_select(table.c.keys(), limit, filters)
+        rows = self._execute(stmt, filters.get('start_time'), filters.get('end_time')) or []
+        rows = self._decode_json(table.c.keys(), rows)
+        return [
+            self._from_llm_call_db(LLMCallDB(**dict(zip(table.c.keys(), row))))
+            for row in rows
+        ]
+
+    def get_call_count(
+        self,
+        project_name: Optional[str] = None,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+    ) -> int:
+        """Get count of archived LLM calls matching filters."""
+        stmt = select(func.count(LLMCallDB.id)).where(*self._call_filters(
+            project_name=project_name,
+            start_time=start_time,
+            end_time=end_time,
+        ))
+        rows = self._execute(stmt, start_time, end_time)
+        return (rows[0][0] or 0) if rows else 0
+
+    def get_total_cost(
+        self,
+        project_name: Optional[str] = None,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+    ) -> float:
+        """Get total cost of archived LLM calls matching filters."""
+        stmt = select(func.sum(LLMCallDB.total_cost)).where(*self._call_filters(
+            project_name=project_name,
+            start_time=start_time,
+            end_time=end_time,
+        ))
+        rows = self._execute(stmt, start_time, end_time)
+        return (rows[0][0] or 0.0) if rows else 0.0
@@ -0,0 +1,213 @@
+"""
+Engine - Database Engine Factory
+Location: observatory/engine.py
+
+Builds the SQLAlchemy engines used by `Storage` and `AsyncStorage`, tuned
+for concurrent agent writes and dashboard reads.
+
+SQLite (file databases) gets, on every new connection:
+- journal_mode=WAL:      readers no longer block the writer or each other
+- synchronous=NORMAL:    fsync at checkpoints instead of every commit
+                         (durable against process crashes; the last
+                         commits can be lost on power failure)
+- busy_timeout:          wait for a lock instead of failing with
+                         "database is locked"
+- mmap_size, cache_size: serve hot pages from memory
+- temp_store=MEMORY:     sorts and GROUP BY temp tables stay in memory
+- auto_vacuum=INCREMENTAL: lets the retention job return freed pages
+                         without rewriting the file
+
+and a QueuePool of connections usable from any thread
+(check_same_thread=False), so the background writer and request threads
+share it. Server databases (PostgreSQL) get a pre-pinged, recycled pool.
+
+`read_only=True` opens SQLite with `mode=ro` (plus query_only) and
+PostgreSQL sessions as READ ONLY, for dashboards and analyzers that must
+never take the write lock.
+
+Usage:
+    engine = create_storage_engine("sqlite:///observatory.db")
+    reader = create_storage_engine("sqlite:///observatory.db", read_only=True)
+    engine = create_storage_engine(url, pragmas={"cache_size": -262144}, pool_size=10)
+
+    storage = Storage(url, pragmas={"synchronous": "FULL"})   # kwargs are forwarded here
+"""
+
+from typing import Optional, Dict, Any, Tuple
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, URL, make_url
+
+
+# =============================================================================
+# DEFAULTS
+# =============================================================================
+
+SQLITE_PRAGMAS: Dict[str, Any] = {
+    # Before journal_mode: auto_vacuum only applies to a file with no pages yet
+    "auto_vacuum": "INCREMENTAL",
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": 5000,          # ms
+    "mmap_size": 268435456,        # 256 MB
+    "cache_size": -65536,          # negative = KiB, i.e. 64 MB per connection
+    "temp_store": "MEMORY",
+}
+
+# Pragmas that write to the database file; skipped on read-only connections
+SQLITE_WRITE_PRAGMAS = ("journal_mode", "synchronous", "auto_vacuum")
+
+DEFAULT_POOL_SIZE = 5
+DEFAULT_MAX_OVERFLOW = 10
+DEFAULT_POOL_RECYCLE = 1800  # seconds, for server databases
+
+
+def is_sqlite(url: URL) -> bool:
+    return url.get_backend_name() == "sqlite"
+
+
+def is_memory_sqlite(url: URL) -> bool:
+    """True for in-memory SQLite URLs (no WAL, no file, no read-only mode)."""
+    database = url.database or ""
+    return (
+        database in ("", ":memory:")
+        or url.query.get("mode") == "memory"
+        or database.startswith("file::memory:")
+    )
+
+
+def sqlite_pragmas(
+    overrides: Optional[Dict[str, Any]] = None,
+    read_only: bool = False,
+) -> Dict[str, Any]:
+    """
+    Effective pragmas: SQLITE_PRAGMAS updated with `overrides`.
+
+    An override of None removes that pragma (keeps SQLite's default).
+    """
+    pragmas = {**SQLITE_PRAGMAS, **(overrides or {})}
+    pragmas = {name: value for name, value in pragmas.items() if value is not None}
+    if read_only:
+        for name in SQLITE_WRITE_PRAGMAS:
+            pragmas.pop(name, None)
+        pragmas["query_only"] = "ON"
+    return pragmas
+
+
+def sqlite_read_only_url(url: URL) -> URL:
+    """Rewrite a SQLite file URL to open the database with mode=ro."""
+    database = url.database
+    if not database.startswith("file:"):
+        database = f"file:{database}"
+    return url.set(database=database, query={**url.query, "mode": "ro", "uri": "true"})
+
+
+# =============================================================================
+# ENGINE OPTIONS
+# =============================================================================
+
+def engine_options(
+    database_url: str,
+    read_only: bool = False,
+    pragmas: Optional[Dict[str, Any]] = None,
+    **engine_kwargs,
+) -> Tuple[URL, Dict[str, Any], Dict[str, Any]]:
+    """
+    Resolve the URL, create_engine keyword arguments and SQLite pragmas.
+
+    Shared by the sync and async factories; explicit `engine_kwargs` win
+    over the defaults chosen here.
+
+    Returns:
+        (url, engine_kwargs, pragmas) - pragmas is empty for non-SQLite URLs
+    """
+    url = make_url(database_url)
+    options: Dict[str, Any] = {}
+    resolved_pragmas: Dict[str, Any] = {}
+
+    if is_sqlite(url):
+        if not is_memory_sqlite(url):
+            resolved_pragmas = sqlite_pragmas(pragmas, read_only)
+            if read_only:
+                url = sqlite_read_only_url(url)
+            options["pool_size"] = DEFAULT_POOL_SIZE
+            options["max_overflow"] = DEFAULT_MAX_OVERFLOW
+            options["connect_args"] = {"check_same_thread": False}
+    else:
+        options["pool_size"] = DEFAULT_POOL_SIZE
+        options["max_overflow"] = DEFAULT_MAX_OVERFLOW
+        options["pool_pre_ping"] = True
+        options["pool_recycle"] = DEFAULT_POOL_RECYCLE
+
+    connect_args = {**options.get("connect_args", {}), **engine_kwargs.pop("connect_args", {})}
+    options.update(engine_kwargs)
+    if connect_args:
+        options["connect_args"] = connect_args
+    return url, options, resolved_pragmas
+
+
+def install_connect_hooks(
+    engine: Engine,
+    pragmas: Dict[str, Any],
+    read_only: bool = False,
+):
+    """Apply pragmas (SQLite) or READ ONLY (server databases) to every new connection."""
+    server_read_only = read_only and not is_sqlite(engine.url)
+    if not pragmas and not server_read_only:
+        return
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+            if server_read_only:
+                cursor.execute("SET SESSION CHARACTERISTICS AS TRANSACTION READ ONLY")
+        finally:
+            cursor.close()
+
+
+# =============================================================================
+# FACTORIES
+# =============================================================================
+
+def create_storage_engine(
+    database_url: str,
+    read_only: bool = False,
+    pragmas: Optional[Dict[str, Any]] = None,
+    **engine_kwargs,
+) -> Engine:
+    """
+    Create a tuned SQLAlchemy engine for the observatory database.
+
+    Args:
+        database_url: SQLAlchemy URL
+        read_only: Open the database read-only (SQLite mode=ro / Postgres
+            READ ONLY sessions)
+        pragmas: SQLite pragma overrides on top of SQLITE_PRAGMAS (None
+            values drop a pragma)
+        **engine_kwargs: Passed to create_engine (pool_size, echo, ...)
+
+    Example:
+        >>> engine = create_storage_engine("sqlite:///observatory.db", pool_size=10)
+    """
+    url, options, resolved_pragmas = engine_options(database_url, read_only, pragmas, **engine_kwargs)
+    engine = create_engine(url, **options)
+    install_connect_hooks(engine, resolved_pragmas, read_only)
+    return engine
+
+
+def create_async_storage_engine(
+    database_url: str,
+    read_only: bool = False,
+    pragmas: Optional[Dict[str, Any]] = None,
+    **engine_kwargs,
+):
+    """Async counterpart of `create_storage_engine` (URL must name an async driver)."""
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    url, options, resolved_pragmas = engine_options(database_url, read_only, pragmas, **engine_kwargs)
+    engine = create_async_engine(url, **options)
+    install_connect_hooks(engine.sync_engine, resolved_pragmas, read_only)
+    return engine
@@ -0,0 +1,211 @@
+"""
+Parquet Archive - Columnar Export of Closed Months
+Location: observatory/parquet_archive.py
+
+Writes closed months of llm_calls to Parquet, one file per month, in a
+hive-style layout that DuckDB (observatory/duckdb_storage.py), pandas or
+Spark can scan directly:
+
+    <root>/month=2026-08/llm_calls.parquet
+
+Rows are written sorted by timestamp in row groups of `batch_size`, so
+readers can skip row groups outside a time filter using the Parquet
+statistics. Bodies aren't exported: analytics only need tokens, costs,
+latencies and dimensions. JSON columns are stored as JSON text. Reading a
+month streams it from the database (keyset order, yield_per), so memory
+stays bounded by one row group.
+
+Requires pyarrow:
+    pip install pyarrow
+
+Usage:
+    archiver = ParquetArchiver(storage, "/data/observatory-parquet")
+    archiver.archive_months(before=datetime(2026, 9, 1))   # every closed month up to August
+
+    observatory archive-parquet /data/observatory-parquet --through 2026-08
+"""
+
+import json
+import os
+import re
+from datetime import datetime
+from typing import Optional, List, Dict, Any, Sequence, TYPE_CHECKING
+
+from sqlalchemy import JSON, select, func
+
+from observatory.storage import LLMCallDB
+from observatory.partitions import month_start, next_month, parse_month, format_month, find_archives
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # pragma: no cover - optional dependency
+    pyarrow = None
+
+if TYPE_CHECKING:
+    from observatory.storage import Storage
+
+
+DEFAULT_BATCH_SIZE = 50000
+PARQUET_FILE = "llm_calls.parquet"
+PARQUET_COMPRESSION = "zstd"
+
+MONTH_DIR = re.compile(r"^month=(\d{4}-\d{2})$")
+
+
+# =============================================================================
+# LAYOUT
+# =============================================================================
+
+def parquet_path(root: str, month: datetime) -> str:
+    return os.path.join(root, f"month={format_month(month)}", PARQUET_FILE)
+
+
+def find_parquet_months(root: str) -> Dict[datetime, str]:
+    """Archived months under `root`: {month: path}."""
+    months = {}
+    if not os.path.isdir(root):
+        return months
+    for name in os.listdir(root):
+        match = MONTH_DIR.match(name)
+        path = os.path.join(root, name, PARQUET_FILE)
+        if match and os.path.exists(path):
+            months[parse_month(match.group(1))] = path
+    return months
+
+
+def arrow_schema(columns: Sequence[Any]):
+    """Arrow schema for llm_calls columns (JSON columns as text)."""
+    types = {
+        str: pyarrow.string(),
+        int: pyarrow.int64(),
+        float: pyarrow.float64(),
+        bool: pyarrow.bool_(),
+        datetime: pyarrow.timestamp("us"),
+    }
+    return pyarrow.schema([
+        (column.name, pyarrow.string() if isinstance(column.type, JSON) else types[column.type.python_type])
+        for column in columns
+    ])
+
+
+# =============================================================================
+# ARCHIVER
+# =============================================================================
+
+class ParquetArchiver:
+    """Exports closed months of a `Storage` to Parquet files."""
+
+    def __init__(
+        self,
+        storage: 'Storage',
+        root: str,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ):
+        """
+        Initialize the archiver.
+
+        Args:
+            storage: Storage to read calls from (its read engine is used)
+            root: Directory of the month=YYYY-MM/ files
+            batch_size: Rows per Parquet row group (and per database fetch)
+        """
+        if pyarrow is None:
+            raise ImportError("ParquetArchiver requires pyarrow (pip install pyarrow)")
+
+        self.storage = storage
+        self.root = root
+        self.batch_size = max(1, batch_size)
+
+        self.columns = list(LLMCallDB.__table__.columns)
+        self.json_columns = {column.name for column in self.columns if isinstance(column.type, JSON)}
+        self.schema = arrow_schema(self.columns)
+
+    def months(self) -> Dict[datetime, str]:
+        """Months already archived: {month: path}."""
+        return find_parquet_months(self.root)
+
+    def archive_months(
+        self,
+        before: datetime,
+        now: Optional[datetime] = None,
+        overwrite: bool = False,
+    ) -> Dict[str, int]:
+        """
+        Archive every month ending on or before `before`, oldest first.
+
+        The current month is never archived (it's still being written).
+        Months that already have a file are skipped unless `overwrite`.
+
+        Returns:
+            {"months": months written, "calls": calls written}
+        """
+        limit = min(month_start(before), month_start(now or datetime.utcnow()))
+        archived = self.months()
+
+        stats = {"months": 0, "calls": 0}
+        month = self._first_month()
+        while month is not None and month < limit:
+            if overwrite or month not in archived:
+                calls = self.archive_month(month)
+                if calls:
+                    stats["months"] += 1
+                    stats["calls"] += calls
+            month = next_month(month)
+        return stats
+
+    def archive_month(self, month: datetime) -> int:
+        """
+        Write one month's calls to its Parquet file (replacing it).
+
+        The file is written next to its final path and renamed into place,
+        so readers never see a partial month.
+
+        Returns:
+            Number of calls written (no file is written for an empty month)
+        """
+        month = month_start(month)
+        end = next_month(month)
+        path = parquet_path(self.root, month)
+        partial = f"{path}.partial"
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        table = LLMCallDB.__table__
+        stmt = (
+            select(table)
+            .where(table.c.timestamp >= month, table.c.timestamp < end)
+            .order_by(table.c.timestamp, table.c.id)
+        )
+
+        written = 0
+        with self.storage.read_session(month, end) as db:
+            result = db.connection().execution_options(yield_per=self.batch_size).execute(stmt)
+            with pyarrow.parquet.ParquetWriter(partial, self.schema, compression=PARQUET_COMPRESSION) as writer:
+                for rows in result.partitions():
+                    writer.write_table(self._to_arrow(rows))
+                    written += len(rows)
+
+        if written:
+            os.replace(partial, path)
+        else:
+            os.remove(partial)
+        return written
+
+    def _to_arrow(self, rows: List[Any]):
+        """One row group: rows -> Arrow table with `self.schema`."""
+        arrays = []
+        for index, column in enumerate(self.columns):
+            values = [row[index] for row in rows]
+            if column.name in self.json_columns:
+                values = [None if value is None else json.dumps(value) for value in values]
+            arrays.append(pyarrow.array(values, type=self.schema.field(index).type))
+        return pyarrow.Table.from_arrays(arrays, schema=self.schema)
+
+    def _first_month(self) -> Optional[datetime]:
+        """Month of the oldest call, including archived SQLite months."""
+        with self.storage.read_session() as db:
+            oldest = db.execute(select(func.min(LLMCallDB.timestamp))).scalar()
+        candidates = [month_start(oldest)] if oldest is not None else []
+        if self.storage.archive_database is not None:
+            candidates += list(find_archives(self.storage.archive_database))
+        return min(candidates, default=None)
@@ -0,0 +1,261 @@
+"""
+Partitions - Monthly Partitions of llm_calls
+Location: observatory/partitions.py
+
+llm_calls is split by calendar month of `timestamp` (UTC), so time-range
+queries only touch the months they cover and old months are removed whole
+instead of with a large DELETE.
+
+PostgreSQL - declarative partitioning:
+    `Storage(url, partitioned=True)` creates llm_calls PARTITION BY RANGE
+    (timestamp), primary key (id, timestamp), when it creates the database.
+    One partition per month (llm_calls_y2026m10) is created as calls for
+    that month arrive. The planner prunes partitions using the timestamp
+    predicates Storage queries already carry. Dropping a month is
+    DETACH PARTITION + DROP TABLE.
+
+SQLite - monthly archive files:
+    SQLite has no partitioning. Instead, closed months are moved out of the
+    main file into `<database>.YYYY-MM.db` files next to it: the calls and
+    their bodies move, and blobs stay shared in the main file. A read whose
+    start_time reaches back into archived months ATTACHes just the
+    overlapping files. It sees llm_calls and llm_call_bodies through TEMP
+    UNION ALL views, and SQLite pushes the timestamp predicates into each
+    month's own index. Reads without a start_time only see the main file.
+    Dropping a month deletes its file.
+
+Months are archived and dropped by the retention job (observatory/retention.py):
+    observatory partitions list
+    observatory partitions archive 2026-08     # SQLite: every month up to August 2026
+    observatory partitions drop 2026-08
+"""
+
+import glob
+import os
+import re
+from datetime import datetime, timedelta
+from typing import Optional, List, Dict, Iterable, Sequence
+
+from sqlalchemy import Table, MetaData, Column, create_engine, text
+from sqlalchemy.engine import Engine, URL
+from sqlalchemy.pool import NullPool
+
+
+PARTITIONED_TABLE = "llm_calls"
+PARTITION_KEY = ("id", "timestamp")
+
+# Moved to the monthly files on SQLite (blobs stay in the main file)
+ARCHIVED_TABLES = ("llm_calls", "llm_call_bodies")
+
+# SQLITE_MAX_ATTACHED in default SQLite builds
+MAX_ATTACHED_ARCHIVES = 10
+
+# Serializes concurrent CREATE TABLE ... PARTITION OF from several writers
+PARTITION_LOCK_KEY = 0x6F627376
+
+PARTITION_NAME = re.compile(rf"^{PARTITIONED_TABLE}_y(\d{{4}})m(\d{{2}})$")
+ARCHIVE_SUFFIX = re.compile(r"\.(\d{4}-\d{2})$")
+
+
+# =============================================================================
+# MONTHS
+# =============================================================================
+
+def month_start(value: datetime) -> datetime:
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def next_month(month: datetime) -> datetime:
+    return month_start(month_start(month) + timedelta(days=32))
+
+
+def parse_month(value: str) -> datetime:
+    """Parse "YYYY-MM"."""
+    try:
+        return datetime.strptime(value, "%Y-%m")
+    except ValueError:
+        raise ValueError(f"Expected a month as YYYY-MM, got '{value}'")
+
+
+def format_month(month: datetime) -> str:
+    return month.strftime("%Y-%m")
+
+
+def months_of(timestamps: Iterable[Optional[datetime]]) -> set:
+    return {month_start(timestamp) for timestamp in timestamps if timestamp is not None}
+
+
+def overlapping_months(
+    months: Iterable[datetime],
+    start_time: datetime,
+    end_time: Optional[datetime] = None,
+) -> List[datetime]:
+    """Months (oldest first) that overlap [start_time, end_time]."""
+    return sorted(
+        month for month in months
+        if next_month(month) > start_time and (end_time is None or month <= end_time)
+    )
+
+
+# =============================================================================
+# POSTGRESQL
+# =============================================================================
+
+def partition_name(month: datetime) -> str:
+    return f"{PARTITIONED_TABLE}_y{month:%Y}m{month:%m}"
+
+
+def is_partitioned(connection) -> bool:
+    """True if llm_calls is a partitioned table (PostgreSQL only)."""
+    if connection.dialect.name != "postgresql":
+        return False
+    return bool(connection.execute(
+        text("SELECT relkind = 'p' FROM pg_class WHERE oid = to_regclass(:name)"),
+        {"name": PARTITIONED_TABLE},
+    ).scalar())
+
+
+def create_partitioned_table(connection, table: Table):
+    """
+    Create llm_calls as a RANGE-partitioned table.
+
+    Unique constraints of a partitioned table must include the partition
+    key, so the primary key becomes (id, timestamp). Indexes are added by
+    migrate_schema and cascade to every partition.
+    """
+    Table(
+        table.name,
+        MetaData(),
+        *[
+            Column(column.name, column.type, primary_key=column.name in PARTITION_KEY)
+            for column in table.columns
+        ],
+        postgresql_partition_by="RANGE (timestamp)",
+    ).create(connection)
+
+
+def list_partitions(connection) -> List[datetime]:
+    """Months that have a partition, oldest first."""
+    names = connection.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass(:name)"
+        ),
+        {"name": PARTITIONED_TABLE},
+    ).scalars()
+    months = []
+    for name in names:
+        match = PARTITION_NAME.match(name)
+        if match:
+            months.append(datetime(int(match.group(1)), int(match.group(2)), 1))
+    return sorted(months)
+
+
+def create_partitions(connection, months: Iterable[datetime]):
+    """Create the partitions of `months` that don't exist yet."""
+    connection.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": PARTITION_LOCK_KEY})
+    for month in sorted(months):
+        connection.exec_driver_sql(
+            f"CREATE TABLE IF NOT EXISTS {partition_name(month)} PARTITION OF {PARTITIONED_TABLE} "
+            f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{next_month(month):%Y-%m-%d}')"
+        )
+
+
+def drop_partition(connection, month: datetime):
+    """Detach and drop one month's partition."""
+    name = partition_name(month)
+    connection.exec_driver_sql(f"ALTER TABLE {PARTITIONED_TABLE} DETACH PARTITION {name}")
+    connection.exec_driver_sql(f"DROP TABLE {name}")
+
+
+# =============================================================================
+# SQLITE ARCHIVES
+# =============================================================================
+
+def sqlite_database_path(url: URL) -> Optional[str]:
+    """Absolute path of a SQLite file database, None for other databases."""
+    database = url.database or ""
+    if url.get_backend_name() != "sqlite" or database in ("", ":memory:") or url.query.get("mode") == "memory":
+        return None
+    if database.startswith("file:"):
+        database = database[len("file:"):].split("?", 1)[0]
+        if database.startswith(":memory:"):
+            return None
+    return os.path.abspath(database)
+
+
+def archive_path(database_path: str, month: datetime) -> str:
+    """observatory.db -> observatory.2026-08.db"""
+    root, ext = os.path.splitext(database_path)
+    return f"{root}.{format_month(month)}{ext}"
+
+
+def find_archives(database_path: str) -> Dict[datetime, str]:
+    """Archived months of a SQLite database: {month: path}."""
+    root, ext = os.path.splitext(database_path)
+    archives = {}
+    for path in glob.glob(f"{glob.escape(root)}.[0-9][0-9][0-9][0-9]-[0-9][0-9]{glob.escape(ext)}"):
+        match = ARCHIVE_SUFFIX.search(path[:len(path) - len(ext)] if ext else path)
+        if match:
+            archives[parse_month(match.group(1))] = path
+    return archives
+
+
+def archive_engine(path: str) -> Engine:
+    """Unpooled engine on one archive file (creating, scanning, deleting it)."""
+    return create_engine(f"sqlite:///{path}", poolclass=NullPool)
+
+
+def attach_archives(connection, archives: Dict[datetime, str], tables: Sequence[Table]):
+    """
+    Make `tables` on this connection read as main + archives.
+
+    Each archive is attached as archive_<n>, then a TEMP view named like the
+    table shadows it for unqualified queries. Archive rows within the
+    archived months replace main rows of those months, so a month that's
+    being archived is never counted twice. Columns added after an archive
+    was written read as NULL there. Call `detach_archives` before the
+    connection goes back to the pool.
+    """
+    months = sorted(archives)
+    for n, month in enumerate(months):
+        connection.exec_driver_sql(f"ATTACH DATABASE ? AS archive_{n}", (archives[month],))
+
+    # Read-only engines set query_only, which also forbids TEMP views
+    query_only = connection.exec_driver_sql("PRAGMA query_only").scalar()
+    if query_only:
+        connection.exec_driver_sql("PRAGMA query_only=OFF")
+    try:
+        for table in tables:
+            names = [column.name for column in table.columns]
+            branches = [f"SELECT {', '.join(names)} FROM main.{table.name}"]
+            if table.name == PARTITIONED_TABLE:
+                archived = " OR ".join(
+                    f"(timestamp >= '{month}' AND timestamp < '{next_month(month)}')" for month in months
+                )
+                branches[0] += f" WHERE timestamp IS NULL OR NOT ({archived})"
+            for n in range(len(months)):
+                present = {
+                    row[1] for row in connection.exec_driver_sql(f"PRAGMA archive_{n}.table_info({table.name})")
+                }
+                columns = [name if name in present else f"NULL AS {name}" for name in names]
+                branches.append(f"SELECT {', '.join(columns)} FROM archive_{n}.{table.name}")
+            connection.exec_driver_sql(f"CREATE TEMP VIEW {table.name} AS {' UNION ALL '.join(branches)}")
+    finally:
+        if query_only:
+            connection.exec_driver_sql("PRAGMA query_only=ON")
+
+
+def detach_archives(connection, count: int, tables: Sequence[Table]):
+    """Undo `attach_archives`."""
+    query_only = connection.exec_driver_sql("PRAGMA query_only").scalar()
+    if query_only:
+        connection.exec_driver_sql("PRAGMA query_only=OFF")
+    try:
+        for table in tables:
+            connection.exec_driver_sql(f"DROP VIEW IF EXISTS temp.{table.name}")
+    finally:
+        if query_only:
+            connection.exec_driver_sql("PRAGMA query_only=ON")
+    for n in range(count):
+        connection.exec_driver_sql(f"DETACH DATABASE archive_{n}")
@@ -0,0 +1,798 @@
+"""
+Retention - Pruning Old Calls and Bodies
+Location: observatory/retention.py
+
+Per-project retention for the raw tables, so llm_calls and its indexes stay
+small enough to be served from cache:
+
+- body_days: after N days, prompt/response bodies are dropped (the
+  llm_call_bodies text and blob references, prompt components in
+  meta_data, and the prompt/response copies in the search index); blobs
+  no longer referenced by any call are deleted
+- call_days: after M days, llm_calls rows are deleted, along with sessions
+  that have no calls left
+
+Rollups are never pruned. Once raw calls are gone, the minute/hour/day
+rollup tables (with their latency sketches) are the downsampled history, and
+`retention_marks` stops `rebuild_rollups` from recomputing those buckets
+from the calls that are left.
+
+Everything is deleted in chunks of `chunk_size` calls, one short transaction
+each, so agents writing at the same time wait at most one chunk for the
+lock. Afterwards free pages are returned to the OS (SQLite incremental
+vacuum, PostgreSQL VACUUM) and planner statistics are refreshed.
+
+Monthly partitions (see observatory/partitions.py) are dropped whole: once
+every project's call cutoff has passed the end of a month, `run` drops its
+PostgreSQL partition or SQLite archive file before pruning row by row.
+`archive_months` moves closed months out of the main SQLite file; bodies and
+calls in the remaining archive files are pruned per project like those in
+the main file.
+
+Usage:
+    job = RetentionJob(storage, [
+        RetentionPolicy(body_days=30, call_days=365),                     # default
+        RetentionPolicy(project_name="Chatbot", body_days=7, call_days=90),
+    ])
+    stats = job.run()
+
+    observatory prune --body-days 30 --call-days 365 --policy "Chatbot=7,90"
+    observatory partitions archive 2026-08
+"""
+
+import os
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional, List, Dict, Any, Iterable, Iterator, Set, TYPE_CHECKING
+
+from sqlalchemy import select, update, delete, insert, bindparam, union, func, table, column
+
+from observatory.storage import (
+    Base,
+    LLMCallDB,
+    LLMCallBodyDB,
+    LLMCallSearchDB,
+    BlobDB,
+    SessionDB,
+    DayRollupDB,
+    RetentionMarkDB,
+    ARCHIVED_TABLE_DEFS,
+    BLOB_COLUMNS,
+    BLOB_META_KEYS,
+    blob_refs,
+    decompress_json,
+    floor_time,
+    keyset_after,
+)
+from observatory.partitions import (
+    month_start,
+    next_month,
+    partition_name,
+    is_partitioned,
+    list_partitions,
+    drop_partition,
+    archive_path,
+    find_archives,
+    archive_engine,
+)
+
+if TYPE_CHECKING:
+    from observatory.storage import Storage
+
+
+DEFAULT_CHUNK_SIZE = 1000
+
+# Pages freed per incremental_vacuum step (4 KiB pages: ~8 MB per write lock)
+VACUUM_PAGES_PER_STEP = 2000
+
+# Rows sampled per index by ANALYZE (approximate stats, bounded time)
+SQLITE_ANALYSIS_LIMIT = 1000
+
+SQLITE_AUTO_VACUUM_INCREMENTAL = 2
+
+# Tables pruned by the job (VACUUM / ANALYZE targets on PostgreSQL)
+PRUNED_TABLES = ("llm_calls", "llm_call_bodies", "blobs", "sessions")
+
+# Schema name of the archive file being written
+ARCHIVE_SCHEMA = "archive_new"
+
+
+# =============================================================================
+# POLICIES
+# =============================================================================
+
+@dataclass
+class RetentionPolicy:
+    """Retention for one project; project_name=None is the default policy."""
+    project_name: Optional[str] = None
+
+    # Days to keep (None = forever)
+    body_days: Optional[float] = None
+    call_days: Optional[float] = None
+
+    def __post_init__(self):
+        for name in ("body_days", "call_days"):
+            value = getattr(self, name)
+            # Cutoffs are whole days; shorter windows would also race the
+            # storage's known-blob cache (KNOWN_BLOB_CACHE_TTL)
+            if value is not None and value < 1:
+                raise ValueError(f"{name} must be at least 1 day (or None to keep forever)")
+
+
+def cutoff_for(now: datetime, days: Optional[float]) -> Optional[datetime]:
+    """Start of the day `days` before `now`, or None to keep forever."""
+    if days is None:
+        return None
+    return floor_time(now - timedelta(days=days), 'day')
+
+
+def project_filter(column, project_name: Optional[str]):
+    return column.is_(None) if project_name is None else column == project_name
+
+
+def strip_prompt_components(meta_data: Any) -> Dict[str, Any]:
+    """meta_data without the prompt components (BLOB_META_KEYS)."""
+    meta_data = decompress_json(meta_data) or {}
+    return {key: value for key, value in meta_data.items() if key not in BLOB_META_KEYS}
+
+
+# =============================================================================
+# RETENTION JOB
+# =============================================================================
+
+class RetentionJob:
+    """
+    Applies retention policies to a `Storage`.
+
+    Safe to run while agents are writing and to interrupt: every chunk is
+    committed on its own, and the next run picks up where this one stopped.
+    """
+
+    def __init__(
+        self,
+        storage: 'Storage',
+        policies: Iterable[RetentionPolicy] = (),
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        vacuum: bool = True,
+        full_vacuum: bool = False,
+    ):
+        """
+        Initialize the job.
+
+        Args:
+            storage: Storage to prune (not read-only)
+            policies: At most one per project, plus an optional default
+                (project_name=None) for every other project. Projects
+                without a policy are kept forever.
+            chunk_size: Calls deleted per transaction
+            vacuum: Return free pages and refresh statistics afterwards
+            full_vacuum: Rewrite the whole database instead (SQLite VACUUM /
+                VACUUM FULL). Locks it for the duration; needed once to
+                enable incremental vacuum on SQLite files created before
+                auto_vacuum=INCREMENTAL was the default.
+        """
+        if storage.read_only:
+            raise ValueError("RetentionJob needs a writable Storage")
+
+        self.storage = storage
+        self.chunk_size = max(1, chunk_size)
+        self.vacuum = vacuum
+        self.full_vacuum = full_vacuum
+
+        self.policies: Dict[Optional[str], RetentionPolicy] = {}
+        for policy in policies:
+            if policy.project_name in self.policies:
+                raise ValueError(f"Duplicate retention policy for project {policy.project_name!r}")
+            self.policies[policy.project_name] = policy
+
+        # Blob hashes referenced by pruned bodies, checked by collect_garbage()
+        self._freed: Set[str] = set()
+
+    def policy_for(self, project_name: Optional[str]) -> Optional[RetentionPolicy]:
+        """Policy applying to a project (its own, else the default)."""
+        return self.policies.get(project_name) or self.policies.get(None)
+
+    def run(self, now: Optional[datetime] = None) -> Dict[str, int]:
+        """
+        Prune every project according to its policy.
+
+        Returns:
+            Counts: {"projects", "months", "bodies", "calls", "sessions", "blobs"}
+        """
+        now = now or datetime.utcnow()
+        stats = {"projects": 0, "months": 0, "bodies": 0, "calls": 0, "sessions": 0, "blobs": 0}
+
+        expired = self._months_expired_before(now)
+        if expired is not None:
+            stats["months"] = self._drop_months(expired)
+
+        for project_name in self._projects():
+            policy = self.policy_for(project_name)
+            if policy is None:
+                continue
+            call_cutoff = cutoff_for(now, policy.call_days)
+            body_cutoff = cutoff_for(now, policy.body_days)
+            if call_cutoff is None and body_cutoff is None:
+                continue
+            stats["projects"] += 1
+
+            mark = self._get_mark(project_name)
+            if call_cutoff is not None:
+                # Marked first: rollups before the cutoff must survive a
+                # rebuild even if this run is interrupted halfway
+                self._set_mark(project_name, calls_before=call_cutoff)
+                stats["calls"] += self._prune_calls(project_name, call_cutoff)
+                stats["sessions"] += self._prune_sessions(project_name, call_cutoff)
+
+            if body_cutoff is not None:
+                # Bodies before the previous mark (or the call cutoff) are gone
+                # already. Not calls_before: archiving months advances it too,
+                # and archived calls keep their bodies until pruned here
+                since = max(
+                    (t for t in (mark.get("bodies_before"), call_cutoff) if t),
+                    default=None,
+                )
+                if since is None or since < body_cutoff:
+                    stats["bodies"] += self._prune_bodies(project_name, body_cutoff, since)
+                self._set_mark(project_name, bodies_before=body_cutoff)
+
+        stats["blobs"] = self.collect_garbage()
+        if self.vacuum or self.full_vacuum:
+            self.maintain()
+        return stats
+
+    # =========================================================================
+    # PRUNING
+    # =========================================================================
+
+    def _projects(self) -> List[Optional[str]]:
+        """Every project with calls or sessions (None = calls without a project)."""
+        stmt = union(
+            select(LLMCallDB.project_name).distinct(),
+            select(SessionDB.project_name).distinct(),
+        )
+        with self.storage.engine.connect() as connection:
+            return [row[0] for row in connection.execute(stmt)]
+
+    def _all_projects(self) -> Set[Optional[str]]:
+        """Projects with calls, sessions or rollups (including fully pruned ones)."""
+        with self.storage.engine.connect() as connection:
+            rolled_up = connection.execute(select(DayRollupDB.project_name).distinct()).scalars().all()
+        return set(self._projects()) | {project_name or None for project_name in rolled_up}
+
+    def _call_engines(self, before: datetime, since: Optional[datetime] = None) -> Iterator:
+        """
+        Engines holding calls in [since, before): the storage's, then one
+        per SQLite archive file of a month in that range (disposed after use).
+        """
+        yield self.storage.engine
+        if self.storage.archive_database is None:
+            return
+        for month, path in sorted(find_archives(self.storage.archive_database).items()):
+            if month >= before:
+                return
+            if since is not None and next_month(month) <= since:
+                continue
+            engine = archive_engine(path)
+            try:
+                yield engine
+            finally:
+                engine.dispose()
+
+    def _execute_search(self, connection, stmt):
+        """
+        Run a statement on the search index, which lives in the main file:
+        in `connection`'s transaction, or its own one for an archive file.
+        """
+        if connection.engine is self.storage.engine:
+            connection.execute(stmt)
+        else:
+            with self.storage.engine.begin() as main:
+                main.execute(stmt)
+
+    def _prune_calls(self, project_name: Optional[str], cutoff: datetime) -> int:
+        """Delete calls (and their bodies) older than `cutoff`, chunk by chunk."""
+        bodies = LLMCallBodyDB
+        deleted = 0
+        for engine in self._call_engines(cutoff):
+            while True:
+                with engine.begin() as connection:
+                    ids = connection.execute(
+                        select(LLMCallDB.id)
+                        .where(project_filter(LLMCallDB.project_name, project_name), LLMCallDB.timestamp < cutoff)
+                        .limit(self.chunk_size)
+                    ).scalars().all()
+                    if ids:
+                        body_rows = connection.execute(
+                            select(*[bodies.__table__.c[column] for column in BLOB_COLUMNS.values()], bodies.meta_data)
+                            .where(bodies.call_id.in_(ids))
+                        ).all()
+                        self._freed.update(blob_refs(body_rows))
+                        self._execute_search(connection, delete(LLMCallSearchDB).where(LLMCallSearchDB.call_id.in_(ids)))
+                        connection.execute(delete(bodies).where(bodies.call_id.in_(ids)))
+                        connection.execute(delete(LLMCallDB).where(LLMCallDB.id.in_(ids)))
+                deleted += len(ids)
+                if len(ids) < self.chunk_size:
+                    break
+        return deleted
+
+    def _prune_sessions(self, project_name: Optional[str], cutoff: datetime) -> int:
+        """Delete sessions started before `cutoff` that have no calls left."""
+        if self.storage.archive_database is not None:
+            # Calls of archived months aren't in the main file; keep their
+            # sessions until the archive files are dropped
+            archived = find_archives(self.storage.archive_database)
+            if archived:
+                cutoff = min(cutoff, min(archived))
+        has_calls = select(LLMCallDB.id).where(LLMCallDB.session_id == SessionDB.id).exists()
+        deleted = 0
+        while True:
+            with self.storage.engine.begin() as connection:
+                ids = connection.execute(
+                    select(SessionDB.id)
+                    .where(
+                        project_filter(SessionDB.project_name, project_name),
+                        SessionDB.start_time < cutoff,
+                        ~has_calls,
+                    )
+                    .limit(self.chunk_size)
+                ).scalars().all()
+                if ids:
+                    connection.execute(delete(SessionDB).where(SessionDB.id.in_(ids)))
+            deleted += len(ids)
+            if len(ids) < self.chunk_size:
+                return deleted
+
+    def _prune_bodies(
+        self,
+        project_name: Optional[str],
+        cutoff: datetime,
+        since: Optional[datetime],
+    ) -> int:
+        """
+        Drop prompt/response bodies of calls in [since, cutoff), in the main
+        file and in archive files.
+
+        The body row stays for prompt_breakdown and user metadata; the text
+        columns and blob references are cleared and prompt components are
+        removed from meta_data. Errors stay searchable.
+        """
+        bodies = LLMCallBodyDB
+        clear = (
+            update(bodies)
+            .where(bodies.call_id == bindparam('b_call_id'))
+            .values(
+                meta_data=bindparam('b_meta_data'),
+                **{column: None for column in BLOB_COLUMNS},
+                **{ref_column: None for ref_column in BLOB_COLUMNS.values()},
+            )
+        )
+
+        pruned = 0
+        for engine in self._call_engines(cutoff, since):
+            pruned += self._prune_bodies_in(engine, clear, project_name, cutoff, since)
+        return pruned
+
+    def _prune_bodies_in(
+        self,
+        engine,
+        clear,
+        project_name: Optional[str],
+        cutoff: datetime,
+        since: Optional[datetime],
+    ) -> int:
+        """_prune_bodies on one engine (main file or archive file)."""
+        bodies = LLMCallBodyDB
+        pruned = 0
+        after = None
+        while True:
+            stmt = (
+                select(
+                    LLMCallDB.timestamp,
+                    LLMCallDB.id,
+                    *[bodies.__table__.c[column] for column in BLOB_COLUMNS.values()],
+                    bodies.meta_data,
+                )
+                .join(bodies, bodies.call_id == LLMCallDB.id)
+                .where(project_filter(LLMCallDB.project_name, project_name), LLMCallDB.timestamp < cutoff)
+            )
+            if since is not None:
+                stmt = stmt.where(LLMCallDB.timestamp >= since)
+            if after is not None:
+                stmt = stmt.where(keyset_after(after))
+            stmt = stmt.order_by(LLMCallDB.timestamp, LLMCallDB.id).limit(self.chunk_size)
+
+            with engine.begin() as connection:
+                rows = connection.execute(stmt).all()
+                if rows:
+                    connection.execute(clear, [
+                        {'b_call_id': row.id, 'b_meta_data': strip_prompt_components(row.meta_data)}
+                        for row in rows
+                    ])
+                    self._execute_search(
+                        connection,
+                        update(LLMCallSearchDB)
+                        .where(LLMCallSearchDB.call_id.in_([row.id for row in rows]))
+                        .values(prompt=None, response=None),
+                    )
+            self._freed.update(blob_refs(rows))
+            pruned += len(rows)
+            if len(rows) < self.chunk_size:
+                return pruned
+            after = (rows[-1].timestamp, rows[-1].id)
+
+    # =========================================================================
+    # BLOB GARBAGE COLLECTION
+    # =========================================================================
+
+    def collect_garbage(self) -> int:
+        """
+        Delete blobs freed by this run that no retained body references.
+
+        Blob references in meta_data can't be indexed, so retained bodies
+        (including those in SQLite archive files) are scanned once for
+        them; the indexed *_ref columns are checked again inside each
+        delete transaction to catch bodies written meanwhile.
+
+        Returns:
+            Number of blobs deleted
+        """
+        candidates, self._freed = self._freed, set()
+        if not candidates:
+            return 0
+
+        bodies = LLMCallBodyDB
+        ref_columns = [bodies.__table__.c[column] for column in BLOB_COLUMNS.values()]
+        live = set()
+        engines = [self.storage.engine]
+        if self.storage.archive_database is not None:
+            # Archived bodies still point into the main file's blobs
+            engines += [archive_engine(path) for path in find_archives(self.storage.archive_database).values()]
+        for engine in engines:
+            with engine.connect() as connection:
+                result = connection.execution_options(yield_per=self.chunk_size).execute(
+                    select(*ref_columns, bodies.meta_data)
+                )
+                for partition in result.partitions():
+                    live.update(ref for ref in blob_refs(partition) if ref in candidates)
+            if engine is not self.storage.engine:
+                engine.dispose()
+
+        unused = sorted(candidates - live)
+        deleted = 0
+        for offset in range(0, len(unused), self.chunk_size):
+            chunk = unused[offset:offset + self.chunk_size]
+            with self.storage.engine.begin() as connection:
+                in_use = set()
+                for column in ref_columns:
+                    in_use.update(connection.execute(select(column).where(column.in_(chunk))).scalars())
+                doomed = [digest for digest in chunk if digest not in in_use]
+                if doomed:
+                    deleted += connection.execute(delete(BlobDB).where(BlobDB.hash.in_(doomed))).rowcount
+
+        # This process may have cached some of them as stored
+        self.storage._known_blobs.clear()
+        return deleted
+
+    # =========================================================================
+    # MONTHLY PARTITIONS
+    # =========================================================================
+
+    def months(self) -> List[Dict[str, Any]]:
+        """
+        Months stored apart from the live table: llm_calls partitions on
+        PostgreSQL, archive files on SQLite.
+
+        Returns:
+            [{"month": datetime, "location": partition name or file path}], oldest first
+        """
+        storage = self.storage
+        if storage.archive_database is not None:
+            archives = find_archives(storage.archive_database)
+            return [{"month": month, "location": archives[month]} for month in sorted(archives)]
+        with storage.engine.connect() as connection:
+            if not is_partitioned(connection):
+                return []
+            return [
+                {"month": month, "location": partition_name(month)}
+                for month in list_partitions(connection)
+            ]
+
+    def archive_months(self, before: datetime, now: Optional[datetime] = None) -> Dict[str, int]:
+        """
+        Move the calls (and bodies) of every month ending on or before
+        `before` from the main SQLite file to its monthly archive file,
+        oldest first. The current month is never archived.
+
+        Rows are copied into `<database>.YYYY-MM.db.partial`, which is
+        renamed into place before they are deleted from the main file, in
+        chunks. Calls arriving later for an archived month are moved by the
+        next run.
+
+        Returns:
+            {"months": archived months, "calls": calls moved}
+        """
+        if self.storage.archive_database is None:
+            raise ValueError(
+                "Only SQLite databases are archived to files; PostgreSQL partitions "
+                "are created as calls arrive (Storage(partitioned=True))"
+            )
+        limit = min(month_start(before), month_start(now or datetime.utcnow()))
+
+        stats = {"months": 0, "calls": 0}
+        while True:
+            with self.storage.engine.connect() as connection:
+                oldest = connection.execute(select(func.min(LLMCallDB.timestamp))).scalar()
+            if oldest is None or next_month(month_start(oldest)) > limit:
+                break
+            stats["calls"] += self._archive_month(month_start(oldest))
+            stats["months"] += 1
+
+        if stats["months"] and (self.vacuum or self.full_vacuum):
+            self.maintain()
+        return stats
+
+    def drop_months(self, before: datetime) -> Dict[str, int]:
+        """
+        Drop every month ending on or before `before`, oldest first: the
+        whole PostgreSQL partition or SQLite archive file. Rollups are kept.
+
+        Returns:
+            {"months": dropped months, "blobs": blobs deleted}
+        """
+        months = self._drop_months(before)
+        return {"months": months, "blobs": self.collect_garbage()}
+
+    def _drop_months(self, before: datetime) -> int:
+        dropped = 0
+        for entry in self.months():
+            month = entry["month"]
+            if next_month(month) > before:
+                break
+            # Marked first: the month's rollups must survive a rebuild
+            self._freeze_before(next_month(month))
+            if self.storage.archive_database is not None:
+                self._drop_archive(entry["location"])
+            else:
+                self._drop_partition(month)
+            self._drop_search_text(month)
+            dropped += 1
+        return dropped
+
+    def _drop_search_text(self, month: datetime):
+        """Delete a dropped month's rows of the search index, chunk by chunk."""
+        search = LLMCallSearchDB
+        while True:
+            with self.storage.engine.begin() as connection:
+                ids = connection.execute(
+                    select(search.id)
+                    .where(search.timestamp >= month, search.timestamp < next_month(month))
+                    .limit(self.chunk_size)
+                ).scalars().all()
+                if ids:
+                    connection.execute(delete(search).where(search.id.in_(ids)))
+            if len(ids) < self.chunk_size:
+                return
+
+    def _drop_partition(self, month: datetime):
+        """Delete the bodies of a partition's calls in chunks, then drop it."""
+        partition_ids = select(table(partition_name(month), column("id")).c.id)
+        bodies = LLMCallBodyDB
+        while True:
+            with self.storage.engine.begin() as connection:
+                ids = connection.execute(
+                    select(bodies.call_id).where(bodies.call_id.in_(partition_ids)).limit(self.chunk_size)
+                ).scalars().all()
+                if ids:
+                    body_rows = connection.execute(
+                        select(*[bodies.__table__.c[column] for column in BLOB_COLUMNS.values()], bodies.meta_data)
+                        .where(bodies.call_id.in_(ids))
+                    ).all()
+                    self._freed.update(blob_refs(body_rows))
+                    connection.execute(delete(bodies).where(bodies.call_id.in_(ids)))
+            if len(ids) < self.chunk_size:
+                break
+
+        with self.storage.engine.begin() as connection:
+            drop_partition(connection, month)
+        if self.storage._partition_months is not None:
+            self.storage._partition_months.discard(month)
+
+    def _drop_archive(self, path: str):
+        """Delete an archive file, after noting the blobs its bodies used."""
+        bodies = LLMCallBodyDB
+        engine = archive_engine(path)
+        try:
+            with engine.connect() as connection:
+                result = connection.execution_options(yield_per=self.chunk_size).execute(
+                    select(*[bodies.__table__.c[column] for column in BLOB_COLUMNS.values()], bodies.meta_data)
+                )
+                for partition in result.partitions():
+                    self._freed.update(blob_refs(partition))
+        finally:
+            engine.dispose()
+        os.remove(path)
+
+    def _archive_month(self, month: datetime) -> int:
+        """Move one month to its archive file; returns the calls moved."""
+        path = archive_path(self.storage.archive_database, month)
+        self._freeze_before(next_month(month))
+
+        if os.path.exists(path):
+            self._copy_to_archive(path, month)
+        else:
+            partial = f"{path}.partial"
+            if os.path.exists(partial):
+                os.remove(partial)
+            engine = archive_engine(partial)
+            try:
+                Base.metadata.create_all(engine, tables=list(ARCHIVED_TABLE_DEFS))
+            finally:
+                engine.dispose()
+            self._copy_to_archive(partial, month)
+            os.replace(partial, path)
+        return self._delete_archived(path, month)
+
+    def _copy_to_archive(self, path: str, month: datetime):
+        """Copy a month's calls and bodies into an archive file, chunk by chunk."""
+        targets = [
+            table(source.name, *[column(c.name) for c in source.columns], schema=ARCHIVE_SCHEMA)
+            for source in ARCHIVED_TABLE_DEFS
+        ]
+        with self.storage.engine.connect() as connection:
+            connection.exec_driver_sql(f"ATTACH DATABASE ? AS {ARCHIVE_SCHEMA}", (path,))
+            connection.commit()
+            try:
+                after = None
+                while True:
+                    stmt = (
+                        select(LLMCallDB.timestamp, LLMCallDB.id)
+                        .where(LLMCallDB.timestamp >= month, LLMCallDB.timestamp < next_month(month))
+                        .order_by(LLMCallDB.timestamp, LLMCallDB.id)
+                        .limit(self.chunk_size)
+                    )
+                    if after is not None:
+                        stmt = stmt.where(keyset_after(after))
+                    with connection.begin():
+                        rows = connection.execute(stmt).all()
+                        ids = [row.id for row in rows]
+                        for source, target in zip(ARCHIVED_TABLE_DEFS, targets):
+                            key = source.c.id if source is LLMCallDB.__table__ else source.c.call_id
+                            connection.execute(
+                                insert(target)
+                                .from_select([c.name for c in source.columns], select(source).where(key.in_(ids)))
+                                .prefix_with("OR IGNORE")
+                            )
+                    if len(rows) < self.chunk_size:
+                        break
+                    after = (rows[-1].timestamp, rows[-1].id)
+            finally:
+                connection.exec_driver_sql(f"DETACH DATABASE {ARCHIVE_SCHEMA}")
+                connection.commit()
+
+    def _delete_archived(self, path: str, month: datetime) -> int:
+        """Delete a month's calls and bodies from the main file once archived."""
+        archived_ids = select(table(LLMCallDB.__tablename__, column("id"), schema=ARCHIVE_SCHEMA).c.id)
+        bodies = LLMCallBodyDB
+        deleted = 0
+        with self.storage.engine.connect() as connection:
+            connection.exec_driver_sql(f"ATTACH DATABASE ? AS {ARCHIVE_SCHEMA}", (path,))
+            connection.commit()
+            try:
+                while True:
+                    with connection.begin():
+                        ids = connection.execute(
+                            select(LLMCallDB.id)
+                            .where(
+                                LLMCallDB.timestamp >= month,
+                                LLMCallDB.timestamp < next_month(month),
+                                LLMCallDB.id.in_(archived_ids),
+                            )
+                            .limit(self.chunk_size)
+                        ).scalars().all()
+                        if ids:
+                            connection.execute(delete(bodies).where(bodies.call_id.in_(ids)))
+                            connection.execute(delete(LLMCallDB).where(LLMCallDB.id.in_(ids)))
+                    deleted += len(ids)
+                    if len(ids) < self.chunk_size:
+                        return deleted
+            finally:
+                connection.exec_driver_sql(f"DETACH DATABASE {ARCHIVE_SCHEMA}")
+                connection.commit()
+
+    def _months_expired_before(self, now: datetime) -> Optional[datetime]:
+        """
+        Earliest call cutoff over every project, or None if some project
+        keeps its calls forever (months hold calls of all projects).
+        """
+        if not self.months():
+            return None
+        projects = self._all_projects()
+        cutoffs = []
+        for project_name in projects or [None]:
+            policy = self.policy_for(project_name)
+            if policy is None or policy.call_days is None:
+                return None
+            cutoffs.append(cutoff_for(now, policy.call_days))
+        return min(cutoffs)
+
+    def _freeze_before(self, before: datetime):
+        """Mark calls before `before` as gone from llm_calls for every project."""
+        for project_name in self._all_projects():
+            self._set_mark(project_name, calls_before=before)
+
+    # =========================================================================
+    # VACUUM / ANALYZE
+    # =========================================================================
+
+    def maintain(self) -> Dict[str, Any]:
+        """
+        Return free space and refresh planner statistics.
+
+        SQLite: incremental vacuum in steps of VACUUM_PAGES_PER_STEP pages
+        (each its own short write) when auto_vacuum=INCREMENTAL, then a
+        sampled ANALYZE. PostgreSQL: VACUUM (ANALYZE) on the pruned tables.
+
+        Returns:
+            {"freed_pages": int} on SQLite, {} elsewhere
+        """
+        engine = self.storage.engine
+        if engine.dialect.name == 'sqlite':
+            raw = engine.raw_connection()
+            try:
+                conn = raw.driver_connection
+                freed = 0
+                if self.full_vacuum:
+                    conn.executescript("VACUUM;")
+                elif conn.execute("PRAGMA auto_vacuum").fetchone()[0] == SQLITE_AUTO_VACUUM_INCREMENTAL:
+                    free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+                    while free:
+                        # executescript steps the pragma to completion
+                        conn.executescript(f"PRAGMA incremental_vacuum({VACUUM_PAGES_PER_STEP});")
+                        remaining = conn.execute("PRAGMA freelist_count").fetchone()[0]
+                        if remaining >= free:
+                            break
+                        freed += free - remaining
+                        free = remaining
+                conn.executescript(f"PRAGMA analysis_limit={SQLITE_ANALYSIS_LIMIT}; ANALYZE;")
+            finally:
+                raw.close()
+            return {"freed_pages": freed}
+
+        if engine.dialect.name == 'postgresql':
+            options = "FULL, ANALYZE" if self.full_vacuum else "ANALYZE"
+            with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+                connection.exec_driver_sql(f"VACUUM ({options}) {', '.join(PRUNED_TABLES)}")
+        return {}
+
+    # =========================================================================
+    # MARKS
+    # =========================================================================
+
+    def _get_mark(self, project_name: Optional[str]) -> Dict[str, Any]:
+        with self.storage.engine.connect() as connection:
+            row = connection.execute(
+                select(RetentionMarkDB.calls_before, RetentionMarkDB.bodies_before)
+                .where(RetentionMarkDB.project_name == (project_name or ''))
+            ).mappings().first()
+        return dict(row) if row else {}
+
+    def _set_mark(self, project_name: Optional[str], **marks: datetime):
+        """Advance a project's marks (they never move backwards)."""
+        key = project_name or ''
+        with self.storage.engine.begin() as connection:
+            current = connection.execute(
+                select(RetentionMarkDB.calls_before, RetentionMarkDB.bodies_before)
+                .where(RetentionMarkDB.project_name == key)
+            ).mappings().first()
+            values = {
+                name: max(value, current[name]) if current and current[name] else value
+                for name, value in marks.items()
+            }
+            values['updated_at'] = datetime.utcnow()
+            if current is None:
+                connection.execute(insert(RetentionMarkDB).values(project_name=key, **values))
+            else:
+                connection.execute(
+                    update(RetentionMarkDB).where(RetentionMarkDB.project_name == key).values(**values)
+                )
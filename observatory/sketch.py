@@ -0,0 +1,200 @@
+"""
+Sketch - Mergeable Latency Quantile Sketches
+Location: observatory/sketch.py
+
+DDSketch (Masson, Rim & Lee, VLDB 2019) for latency percentiles without
+keeping raw values.
+
+Values are counted in logarithmic bins: bin i holds values in
+(gamma^(i-1), gamma^i] with gamma = (1 + alpha) / (1 - alpha), so every
+quantile estimate is within `alpha` relative error of an actual value at
+that rank (1% by default). Sketches with the same accuracy merge by adding
+bin counts, which is what lets the storage keep one sketch per rollup
+bucket and per session: p95 over any time range is the quantile of the
+merged sketches of the buckets in that range.
+
+Usage:
+    sketch = DDSketch()
+    for latency_ms in latencies:
+        sketch.add(latency_ms)
+    sketch.quantile(0.95)
+
+    total = DDSketch.from_dict(stored_a).merge(DDSketch.from_dict(stored_b))
+    total.quantiles([0.5, 0.95, 0.99])
+"""
+
+import math
+from typing import Optional, List, Dict, Any, Iterable, Sequence
+
+
+DEFAULT_RELATIVE_ACCURACY = 0.01
+
+# Bins kept before the lowest ones are folded together. With 1% accuracy,
+# 2048 bins span ~18 orders of magnitude, so collapsing only happens for
+# pathological inputs, and it costs accuracy at the fast end, never at p99.
+DEFAULT_MAX_BINS = 2048
+
+# Values at or below this are counted in the zero bin
+MIN_INDEXABLE_VALUE = 1e-9
+
+DEFAULT_QUANTILES = (0.5, 0.95, 0.99)
+
+
+def quantile_key(quantile: float) -> str:
+    """Result key for a quantile: 0.5 -> "p50", 0.999 -> "p99.9"."""
+    return f"p{quantile * 100:g}"
+
+
+class DDSketch:
+    """Relative-error quantile sketch over non-negative values."""
+
+    def __init__(
+        self,
+        relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY,
+        max_bins: int = DEFAULT_MAX_BINS,
+    ):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be between 0 and 1")
+
+        self.relative_accuracy = relative_accuracy
+        self.max_bins = max(1, max_bins)
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+
+        self.bins: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    # =========================================================================
+    # UPDATES
+    # =========================================================================
+
+    def add(self, value: float, count: int = 1) -> 'DDSketch':
+        """Count `value` (`count` times)."""
+        if count <= 0:
+            return self
+
+        if value <= MIN_INDEXABLE_VALUE:
+            self.zero_count += count
+        else:
+            index = math.ceil(math.log(value) / self._log_gamma)
+            self.bins[index] = self.bins.get(index, 0) + count
+
+        self.count += count
+        self.sum += value * count
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+        if len(self.bins) > self.max_bins:
+            self._collapse()
+        return self
+
+    def update(self, values: Iterable[float]) -> 'DDSketch':
+        """Count every value of an iterable."""
+        for value in values:
+            self.add(value)
+        return self
+
+    def merge(self, other: 'DDSketch') -> 'DDSketch':
+        """Add another sketch's counts into this one (in place)."""
+        if not math.isclose(self.relative_accuracy, other.relative_accuracy):
+            raise ValueError(
+                f"Can't merge sketches with different accuracy "
+                f"({self.relative_accuracy} vs {other.relative_accuracy})"
+            )
+        if not other.count:
+            return self
+
+        for index, count in other.bins.items():
+            self.bins[index] = self.bins.get(index, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+
+        if len(self.bins) > self.max_bins:
+            self._collapse()
+        return self
+
+    def _collapse(self):
+        """Fold the lowest bins into one so at most `max_bins` remain."""
+        indexes = sorted(self.bins)
+        excess = len(indexes) - self.max_bins
+        folded = sum(self.bins.pop(index) for index in indexes[:excess])
+        self.bins[indexes[excess]] += folded
+
+    # =========================================================================
+    # QUERIES
+    # =========================================================================
+
+    @property
+    def avg(self) -> Optional[float]:
+        return self.sum / self.count if self.count else None
+
+    def quantile(self, quantile: float) -> Optional[float]:
+        """Estimated value at `quantile` (0-1), or None for an empty sketch."""
+        return self.quantiles([quantile])[0]
+
+    def quantiles(self, quantiles: Sequence[float]) -> List[Optional[float]]:
+        """Estimated values at several quantiles, in one pass over the bins."""
+        for quantile in quantiles:
+            if not 0 <= quantile <= 1:
+                raise ValueError(f"Quantile must be between 0 and 1, got {quantile}")
+        if not self.count:
+            return [None] * len(quantiles)
+
+        indexes = sorted(self.bins)
+        results = []
+        for quantile in quantiles:
+            rank = quantile * (self.count - 1)
+            if rank < self.zero_count:
+                results.append(self.min)
+                continue
+
+            seen = self.zero_count
+            value = self.max
+            for index in indexes:
+                seen += self.bins[index]
+                if seen > rank:
+                    value = 2 * self.gamma ** index / (self.gamma + 1)
+                    break
+            results.append(min(max(value, self.min), self.max))
+        return results
+
+    # =========================================================================
+    # SERIALIZATION
+    # =========================================================================
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serializable form (stored in `latency_sketch` columns)."""
+        return {
+            "alpha": self.relative_accuracy,
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min,
+            "max": self.max,
+            "zero": self.zero_count,
+            "bins": {str(index): count for index, count in self.bins.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> 'DDSketch':
+        """Rebuild a sketch from `to_dict` output; None gives an empty sketch."""
+        if not data:
+            return cls()
+
+        sketch = cls(relative_accuracy=data.get("alpha", DEFAULT_RELATIVE_ACCURACY))
+        sketch.bins = {int(index): count for index, count in data.get("bins", {}).items()}
+        sketch.zero_count = data.get("zero", 0)
+        sketch.count = data.get("count", 0)
+        sketch.sum = data.get("sum", 0.0)
+        sketch.min = data.get("min")
+        sketch.max = data.get("max")
+        return sketch
+
+    def __repr__(self) -> str:
+        return f"DDSketch(count={self.count}, bins={len(self.bins)}, alpha={self.relative_accuracy})"
@@ -0,0 +1,454 @@
+"""
+Spool - Crash-Safe Local Segment Files for Multi-Process Ingestion
+Location: observatory/spool.py
+
+Lets many processes (gunicorn/Celery workers, ...) record without contending
+for the database. Each process appends length-prefixed records to its own
+segment file; a separate compactor bulk-loads closed segments into the
+database in one transaction per segment and deletes them.
+
+Segment layout:
+    header:  b"OBSPOOL1" + codec byte (b"M" msgpack, b"J" JSON)
+    record:  4-byte big-endian payload length + 4-byte CRC32 + payload
+
+A record is only trusted if it is complete and its checksum matches, so a
+segment torn by a crash is loaded up to its last intact record.
+
+Usage:
+    # In each worker process
+    obs = Observatory(project_name="My App", spool_dir="/var/spool/observatory")
+
+    # In a separate process / cron job
+    observatory compact --spool-dir /var/spool/observatory
+"""
+
+import atexit
+import glob
+import json
+import os
+import socket
+import struct
+import threading
+import time
+import zlib
+from typing import Optional, List, Dict, Any, Iterator, Tuple, TYPE_CHECKING
+
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+
+from observatory.models import Session, LLMCall
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional dependency
+    msgpack = None
+
+if TYPE_CHECKING:
+    from observatory.storage import Storage
+
+
+# =============================================================================
+# DEFAULT CONFIGURATION
+# =============================================================================
+
+DEFAULT_MAX_SEGMENT_BYTES = 64 * 1024 * 1024
+DEFAULT_MAX_SEGMENT_AGE = 60.0  # seconds
+DEFAULT_STALE_AFTER = 3600.0  # seconds before an open segment of another host counts as abandoned
+
+SEGMENT_MAGIC = b"OBSPOOL1"
+OPEN_SUFFIX = ".seg.open"
+CLOSED_SUFFIX = ".seg"
+
+_RECORD_HEADER = struct.Struct(">II")
+
+
+# =============================================================================
+# RECORD CODEC
+# =============================================================================
+
+def _encode(codec: bytes, record: Dict[str, Any]) -> bytes:
+    if codec == b"M":
+        return msgpack.packb(record, use_bin_type=True)
+    return json.dumps(record, separators=(",", ":")).encode("utf-8")
+
+
+def _decode(codec: bytes, payload: bytes) -> Dict[str, Any]:
+    if codec == b"M":
+        if msgpack is None:
+            raise RuntimeError("Segment was written with msgpack; pip install msgpack to read it")
+        return msgpack.unpackb(payload, raw=False)
+    return json.loads(payload.decode("utf-8"))
+
+
+def read_segment(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Yield the records of a segment file.
+
+    Stops at the first truncated or corrupt record (the torn tail of a
+    segment whose writer crashed mid-append).
+    """
+    with open(path, "rb") as f:
+        header = f.read(len(SEGMENT_MAGIC) + 1)
+        if len(header) < len(SEGMENT_MAGIC) + 1 or not header.startswith(SEGMENT_MAGIC):
+            return
+        codec = header[-1:]
+
+        while True:
+            prefix = f.read(_RECORD_HEADER.size)
+            if len(prefix) < _RECORD_HEADER.size:
+                return
+            length, checksum = _RECORD_HEADER.unpack(prefix)
+            payload = f.read(length)
+            if len(payload) < length or zlib.crc32(payload) != checksum:
+                return
+            yield _decode(codec, payload)
+
+
+# =============================================================================
+# SPOOL WRITER
+# =============================================================================
+
+class SpoolWriter:
+    """
+    Per-process append-only writer with the write API of `Storage`.
+
+    Segments are named `<host>-<pid>-<millis>-<seq>.seg.open` while being written and
+    renamed to `.seg` once rotated (by size, by age, on `rotate()`, or at
+    exit). Age rotation runs on a timer, so a process that goes idle after a
+    burst still hands its records to the compactor. Only `.seg` files are
+    picked up by the compactor. A forked child detects the pid change and
+    starts its own segment.
+    """
+
+    def __init__(
+        self,
+        spool_dir: str,
+        max_segment_bytes: int = DEFAULT_MAX_SEGMENT_BYTES,
+        max_segment_age: float = DEFAULT_MAX_SEGMENT_AGE,
+        fsync: bool = False,
+    ):
+        """
+        Initialize the spool writer.
+
+        Args:
+            spool_dir: Directory shared with the compactor
+            max_segment_bytes: Rotate once a segment reaches this size
+            max_segment_age: Rotate once a segment is this many seconds old
+            fsync: fsync each segment when it is closed (survives OS crashes)
+        """
+        self.spool_dir = spool_dir
+        self.max_segment_bytes = max_segment_bytes
+        self.max_segment_age = max_segment_age
+        self.fsync = fsync
+        self.codec = b"M" if msgpack is not None else b"J"
+
+        os.makedirs(spool_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._file = None
+        self._path: Optional[str] = None
+        self._pid: Optional[int] = None
+        self._seq = 0
+        self._opened_at = 0.0
+        self._size = 0
+        self._age_timer: Optional[threading.Timer] = None
+
+        # Statistics
+        self._total_records = 0
+        self._total_segments = 0
+
+        atexit.register(self.close)
+
+    # =========================================================================
+    # STORAGE-COMPATIBLE WRITES
+    # =========================================================================
+
+    def save_session(self, session: Session):
+        self._append({"kind": "session", "data": session.model_dump(mode="json", exclude={"llm_calls"})})
+
+    def finalize_session(self, session: Session):
+        self._append({"kind": "end", "data": session.model_dump(mode="json", exclude={"llm_calls"})})
+
+    def record_llm_call(self, llm_call: LLMCall, session: Optional[Session] = None):
+        self._append({"kind": "call", "data": llm_call.model_dump(mode="json")})
+
+    def save_llm_calls(self, llm_calls: List[LLMCall], chunk_size: Optional[int] = None) -> int:
+        for llm_call in llm_calls:
+            self.record_llm_call(llm_call)
+        return len(llm_calls)
+
+    # =========================================================================
+    # SEGMENT MANAGEMENT
+    # =========================================================================
+
+    def _append(self, record: Dict[str, Any]):
+        payload = _encode(self.codec, record)
+        data = _RECORD_HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+        with self._lock:
+            if self._file is None or self._pid != os.getpid():
+                self._open_segment()
+            elif (
+                self._size >= self.max_segment_bytes
+                or time.monotonic() - self._opened_at >= self.max_segment_age
+            ):
+                self._close_segment()
+                self._open_segment()
+
+            # Unbuffered: one write() per record, so a crashed process
+            # leaves at most one partial record behind
+            self._file.write(data)
+            self._size += len(data)
+            self._total_records += 1
+
+    def _open_segment(self):
+        # After a fork the inherited handle belongs to the parent; drop it
+        # (the parent's age timer did not survive the fork)
+        if self._file is not None and self._pid != os.getpid():
+            self._file = None
+            self._age_timer = None
+
+        self._pid = os.getpid()
+        self._seq += 1
+        name = f"{socket.gethostname()}-{self._pid}-{int(time.time() * 1000)}-{self._seq:06d}"
+        self._path = os.path.join(self.spool_dir, name + OPEN_SUFFIX)
+        self._file = open(self._path, "ab", buffering=0)
+        self._file.write(SEGMENT_MAGIC + self.codec)
+        self._size = len(SEGMENT_MAGIC) + 1
+        self._opened_at = time.monotonic()
+
+        self._age_timer = threading.Timer(self.max_segment_age, self._expire, args=(self._path,))
+        self._age_timer.daemon = True
+        self._age_timer.start()
+
+    def _expire(self, path: str):
+        """Age timer: close the segment if it is still the one being written."""
+        with self._lock:
+            if self._path == path and self._pid == os.getpid():
+                self._close_segment()
+
+    def _close_segment(self):
+        if self._file is None:
+            return
+        if self._age_timer is not None:
+            self._age_timer.cancel()
+            self._age_timer = None
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        self._file.close()
+        os.replace(self._path, self._path[: -len(OPEN_SUFFIX)] + CLOSED_SUFFIX)
+        self._file = None
+        self._path = None
+        self._total_segments += 1
+
+    def rotate(self):
+        """Close the current segment so the compactor can pick it up."""
+        with self._lock:
+            if self._pid == os.getpid():
+                self._close_segment()
+
+    def close(self):
+        """Close the current segment."""
+        self.rotate()
+        try:
+            atexit.unregister(self.close)
+        except Exception:
+            pass
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get writer statistics."""
+        return {
+            "total_records": self._total_records,
+            "total_segments": self._total_segments,
+        }
+
+
+# =============================================================================
+# COMPACTOR
+# =============================================================================
+
+def _writer_is_dead(path: str, stale_after: float) -> bool:
+    """True if the open segment's writer crashed or abandoned it."""
+    name = _segment_name(path)
+    # Host names may contain dashes; pid is the third field from the end
+    parts = name.split("-")
+    if len(parts) < 4:
+        return False
+    host, pid = "-".join(parts[:-3]), parts[-3]
+
+    if host == socket.gethostname() and pid.isdigit():
+        try:
+            os.kill(int(pid), 0)
+        except ProcessLookupError:
+            return True
+        except PermissionError:
+            return False
+        return False
+
+    return time.time() - os.path.getmtime(path) > stale_after
+
+
+def _segment_name(path: str) -> str:
+    name = os.path.basename(path)
+    for suffix in (OPEN_SUFFIX, CLOSED_SUFFIX):
+        if name.endswith(suffix):
+            return name[: -len(suffix)]
+    return name
+
+
+def _writer_key(path: str) -> str:
+    # <host>-<pid>: the process that wrote the segment
+    return _segment_name(path).rsplit("-", 2)[0]
+
+
+def _sort_key(path: str) -> Tuple[int, str]:
+    # <host>-<pid>-<millis>-<seq>: load in creation order
+    parts = _segment_name(path).split("-")
+    millis = int(parts[-2]) if len(parts) >= 4 and parts[-2].isdigit() else 0
+    return (millis, _segment_name(path))
+
+
+class SpoolCompactor:
+    """
+    Loads closed spool segments into a `Storage` and deletes them.
+
+    Each segment is written with `Storage.save_batch` in one transaction.
+    If a previous run committed a segment but died before deleting it, the
+    retry skips sessions and calls that already exist instead of failing.
+    When a segment fails, later segments of the same writer process are left
+    for the next run, so their calls never load ahead of their session.
+    """
+
+    def __init__(
+        self,
+        storage: 'Storage',
+        spool_dir: str,
+        stale_after: float = DEFAULT_STALE_AFTER,
+    ):
+        """
+        Initialize the compactor.
+
+        Args:
+            storage: Destination storage
+            spool_dir: Directory the writers spool into
+            stale_after: Seconds after which an open segment from another
+                host is treated as abandoned (same-host segments are checked
+                by pid)
+        """
+        self.storage = storage
+        self.spool_dir = spool_dir
+        self.stale_after = stale_after
+
+    def pending_segments(self) -> List[str]:
+        """Segments ready to load, oldest first."""
+        closed = glob.glob(os.path.join(self.spool_dir, "*" + CLOSED_SUFFIX))
+        abandoned = [
+            path
+            for path in glob.glob(os.path.join(self.spool_dir, "*" + OPEN_SUFFIX))
+            if _writer_is_dead(path, self.stale_after)
+        ]
+        return sorted(closed + abandoned, key=_sort_key)
+
+    def compact(self) -> Dict[str, int]:
+        """
+        Load every pending segment.
+
+        Returns:
+            Dict with counts of segments, sessions and calls loaded, segments
+            that failed, and segments deferred behind a failed one
+        """
+        stats = {
+            "segments": 0,
+            "sessions": 0,
+            "llm_calls": 0,
+            "failed_segments": 0,
+            "deferred_segments": 0,
+        }
+        failed_writers = set()
+        for path in self.pending_segments():
+            writer = _writer_key(path)
+            if writer in failed_writers:
+                stats["deferred_segments"] += 1
+                continue
+            try:
+                sessions, llm_calls = self.load_segment(path)
+            except Exception as e:
+                stats["failed_segments"] += 1
+                failed_writers.add(writer)
+                print(f"⚠️ Observatory spool segment {os.path.basename(path)} failed: {e}")
+                continue
+            os.remove(path)
+            stats["segments"] += 1
+            stats["sessions"] += sessions
+            stats["llm_calls"] += llm_calls
+        return stats
+
+    def load_segment(self, path: str) -> Tuple[int, int]:
+        """
+        Load one segment in a single transaction.
+
+        Returns:
+            (sessions, llm_calls) written
+        """
+        sessions: Dict[str, Session] = {}
+        ended: Dict[str, Session] = {}
+        llm_calls: List[LLMCall] = []
+
+        for record in read_segment(path):
+            kind, data = record["kind"], record["data"]
+            if kind == "session":
+                sessions[data["id"]] = Session.model_validate(data)
+            elif kind == "end":
+                ended[data["id"]] = Session.model_validate(data)
+            elif kind == "call":
+                llm_calls.append(LLMCall.model_validate(data))
+
+        try:
+            self.storage.save_batch(list(sessions.values()), llm_calls, list(ended.values()))
+        except IntegrityError:
+            # Segment was (partly) loaded by an earlier run; load the rest
+            new_sessions, llm_calls = self._without_existing(list(sessions.values()), llm_calls)
+            sessions = {s.id: s for s in new_sessions}
+            self.storage.save_batch(new_sessions, llm_calls, list(ended.values()))
+
+        return len(sessions), len(llm_calls)
+
+    def _without_existing(
+        self,
+        sessions: List[Session],
+        llm_calls: List[LLMCall],
+    ) -> Tuple[List[Session], List[LLMCall]]:
+        from observatory.storage import SessionDB, LLMCallDB
+
+        db = self.storage.SessionLocal()
+        try:
+            existing_sessions = set()
+            existing_calls = set()
+            session_ids = [s.id for s in sessions]
+            call_ids = [c.id for c in llm_calls]
+            for offset in range(0, len(session_ids), 500):
+                existing_sessions.update(db.execute(
+                    select(SessionDB.id).where(SessionDB.id.in_(session_ids[offset:offset + 500]))
+                ).scalars())
+            for offset in range(0, len(call_ids), 500):
+                existing_calls.update(db.execute(
+                    select(LLMCallDB.id).where(LLMCallDB.id.in_(call_ids[offset:offset + 500]))
+                ).scalars())
+        finally:
+            db.close()
+
+        return (
+            [s for s in sessions if s.id not in existing_sessions],
+            [c for c in llm_calls if c.id not in existing_calls],
+        )
+
+    def run_forever(self, interval: float = 10.0):
+        """Compact every `interval` seconds until interrupted."""
+        while True:
+            stats = self.compact()
+            if stats["segments"] or stats["failed_segments"]:
+                print(
+                    f"Compacted {stats['segments']} segments "
+                    f"({stats['llm_calls']} calls, {stats['sessions']} sessions)"
+                )
+            time.sleep(interval)
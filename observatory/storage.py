@@ -1,12 +1,38 @@
 # observatory/storage.py
 # UPDATED: Added get_distinct_operations, enhanced get_llm_calls with time/operation filters
+# UPDATED: Session counters are applied as SQL-side deltas (record_llm_call, save_batch)
+# UPDATED: Added save_llm_calls bulk insert (Core executemany, chunked transactions)
+# UPDATED: Split engine-independent logic into BaseStorage (shared with AsyncStorage)
+# UPDATED: Prompt/response bodies stored once in a content-addressed blobs table
+# UPDATED: Pluggable compression (zlib/zstd) for blobs and large JSON columns
+# UPDATED: Bodies split off llm_calls into llm_call_bodies (loaded on demand)
+# UPDATED: Added query_calls projection API (plain rows / columns, no model hydration)
+# UPDATED: Added aggregate() - SQL GROUP BY with time buckets for dashboard metrics
+# UPDATED: Minute/hour/day rollup tables maintained at ingest (+ rebuild_rollups)
+# UPDATED: DDSketch latency sketches per rollup bucket and per session (latency_quantiles)
+# UPDATED: Hot JSON fields promoted to indexed llm_calls columns (cache_hit, judge_score, ...)
+# UPDATED: project_name denormalized onto llm_calls (+ composite project/session indexes)
+# UPDATED: Engine built by observatory.engine (SQLite WAL + pragmas, pooled, busy timeout)
+# UPDATED: Optional separate read engine (read_url) and read_only mode for dashboards
+# UPDATED: retention_marks table + indexed blob refs for the retention job (observatory/retention.py)
+# UPDATED: Monthly partitions of llm_calls (Postgres) / attached monthly archives (SQLite)
+# UPDATED: Full-text search over prompts, responses and errors (FTS5 / tsvector, search_calls)
+# UPDATED: Latency sketch deltas merged once per transaction (one SELECT + UPDATE per table)
 
 import os
 import json
-from typing import Optional, List, Dict, Any
-from datetime import datetime
-from sqlalchemy import create_engine, Column, String, Integer, Float, Boolean, DateTime, JSON, Text, distinct
-from sqlalchemy.orm import declarative_base, sessionmaker, Session as DBSession
+import zlib
+import sqlite3
+import base64
+import hashlib
+import time
+import functools
+from contextlib import contextmanager
+from typing import Optional, List, Dict, Any, Iterable, Iterator, Sequence, Union
+from datetime import datetime, timedelta
+from sqlalchemy import Column, String, Integer, Float, Boolean, DateTime, JSON, Text, LargeBinary, Index, distinct, update, insert, delete, select, func, bindparam, case, cast, literal_column, inspect, text, and_, or_
+from sqlalchemy import table as sql_table, column as sql_column
+from sqlalchemy.orm import declarative_base, sessionmaker, object_session, Session as DBSession
 
 from observatory.models import (
     Session, LLMCall, ModelProvider, AgentRole,
@@ -14,10 +40,84 @@ from observatory.models import (
     PromptBreakdown, PromptMetadata,
     RoutingMetrics, CacheMetrics
 )
+from observatory.sketch import DDSketch, DEFAULT_QUANTILES, quantile_key
+from observatory.engine import create_storage_engine
+from observatory.partitions import (
+    ARCHIVED_TABLES,
+    MAX_ATTACHED_ARCHIVES,
+    month_start,
+    next_month,
+    months_of,
+    overlapping_months,
+    is_partitioned,
+    create_partitioned_table,
+    list_partitions,
+    create_partitions,
+    sqlite_database_path,
+    find_archives,
+    attach_archives,
+    detach_archives,
+)
 
 
 Base = declarative_base()
 
+DEFAULT_BULK_CHUNK_SIZE = 5000
+
+# project_name of sessions stored from their calls before the session itself
+# arrived (see Storage.save_batch)
+PLACEHOLDER_PROJECT = ""
+
+# Bodies at least this long (in characters) are moved to the blobs table
+BLOB_MIN_LENGTH = 256
+
+# Inline columns that may be replaced by a blob reference
+BLOB_COLUMNS = {
+    'prompt': 'prompt_ref',
+    'prompt_normalized': 'prompt_normalized_ref',
+    'response_text': 'response_ref',
+}
+
+# meta_data copies of prompt components that may be moved to blobs; the
+# value is replaced by {"__blob__": hash} (plus "json": true for non-strings)
+BLOB_META_KEYS = ('system_prompt', 'user_message', 'messages')
+BLOB_REF_KEY = '__blob__'
+
+# Hashes this process has already written (skips re-sending the body).
+# Forgotten after the TTL so a blob deleted by the retention job's garbage
+# collection is written again rather than referenced while missing.
+KNOWN_BLOB_CACHE_SIZE = 100000
+KNOWN_BLOB_CACHE_TTL = 3600  # seconds
+
+# Blobs and JSON values at least this many bytes are compressed
+COMPRESS_MIN_BYTES = 1024
+
+# "auto" picks zstd when installed, else zlib; None disables compression
+DEFAULT_COMPRESSION = "auto"
+
+# JSON columns compressed inline as {"__codec__": name, "data": base64}
+COMPRESSED_JSON_COLUMNS = ('prompt_breakdown', 'meta_data')
+CODEC_KEY = '__codec__'
+
+# Columns kept in llm_call_bodies; everything else lives in the narrow
+# llm_calls table that aggregations scan
+BODY_COLUMNS = (
+    'prompt', 'prompt_normalized', 'response_text',
+    'prompt_ref', 'prompt_normalized_ref', 'response_ref',
+    'prompt_breakdown', 'meta_data',
+)
+
+# llm_calls column -> (JSON column, key) it is copied from at write time
+PROMOTED_COLUMNS = {
+    'cache_hit': ('cache_metadata', 'cache_hit'),
+    'cache_key': ('cache_metadata', 'cache_key'),
+    'judge_score': ('quality_evaluation', 'judge_score'),
+    'hallucination_flag': ('quality_evaluation', 'hallucination_flag'),
+    'routed_model': ('routing_decision', 'chosen_model'),
+    'prompt_hash': ('prompt_metadata', 'prompt_hash'),
+    'experiment_id': ('prompt_metadata', 'experiment_id'),
+}
+
 
 class SessionDB(Base):
     __tablename__ = "sessions"
@@ -52,23 +152,30 @@ class SessionDB(Base):
     
     operation_type = Column(String, nullable=True, index=True)
     meta_data = Column(JSON, default={})
+    
+    # DDSketch of call latencies (see observatory/sketch.py)
+    latency_sketch = Column(JSON, nullable=True)
 
 
 class LLMCallDB(Base):
     __tablename__ = "llm_calls"
+    __table_args__ = (
+        # Dashboard queries are project-scoped and newest-first
+        Index('ix_llm_calls_project_time', 'project_name', 'timestamp'),
+        Index('ix_llm_calls_project_operation_time', 'project_name', 'operation', 'timestamp'),
+        Index('ix_llm_calls_session_time', 'session_id', 'timestamp'),
+    )
     
     id = Column(String, primary_key=True)
     session_id = Column(String, index=True)
     timestamp = Column(DateTime, index=True)
     
+    # Copied from the session at insert, so project filters don't join sessions
+    project_name = Column(String, nullable=True)
+    
     provider = Column(String, index=True)
     model_name = Column(String, index=True)
     
-    # Prompt and response
-    prompt = Column(Text, nullable=True)
-    prompt_normalized = Column(Text, nullable=True)
-    response_text = Column(Text, nullable=True)
-    
     prompt_tokens = Column(Integer)
     completion_tokens = Column(Integer)
     total_tokens = Column(Integer)
@@ -96,24 +203,1159 @@ class LLMCallDB(Base):
     quality_evaluation = Column(JSON, nullable=True)
     
     # Enhanced fields - Prompt Analysis (stored as JSON)
-    prompt_breakdown = Column(JSON, nullable=True)
     prompt_metadata = Column(JSON, nullable=True)
     
     # Enhanced fields - Prompt Variants
     prompt_variant_id = Column(String, nullable=True, index=True)
     test_dataset_id = Column(String, nullable=True, index=True)
     
+    # Copies of hot JSON fields (PROMOTED_COLUMNS) so filters hit an index
+    # instead of extracting JSON. NULL when the source metadata is absent:
+    # cache_hit / hallucination_flag are set whenever cache_metadata /
+    # quality_evaluation is present.
+    cache_hit = Column(Boolean, nullable=True, index=True)
+    cache_key = Column(String, nullable=True, index=True)
+    judge_score = Column(Float, nullable=True, index=True)
+    hallucination_flag = Column(Boolean, nullable=True, index=True)
+    routed_model = Column(String, nullable=True, index=True)
+    prompt_hash = Column(String, nullable=True, index=True)
+    experiment_id = Column(String, nullable=True, index=True)
+
+
+class LLMCallBodyDB(Base):
+    """Bulky per-call payloads, one row per llm_calls row that has any."""
+    __tablename__ = "llm_call_bodies"
+    
+    call_id = Column(String, primary_key=True)  # llm_calls.id
+    
+    # Prompt and response
+    prompt = Column(Text, nullable=True)
+    prompt_normalized = Column(Text, nullable=True)
+    response_text = Column(Text, nullable=True)
+    
+    # Content hashes of bodies stored in the blobs table (inline column is NULL)
+    prompt_ref = Column(String(64), nullable=True, index=True)
+    prompt_normalized_ref = Column(String(64), nullable=True, index=True)
+    response_ref = Column(String(64), nullable=True, index=True)
+    
+    prompt_breakdown = Column(JSON, nullable=True)
     meta_data = Column(JSON, default={})
 
 
-class Storage:
-    def __init__(self, database_url: Optional[str] = None):
-        if database_url is None:
-            database_url = os.getenv("DATABASE_URL", "sqlite:///observatory.db")
+class BlobDB(Base):
+    """Prompt/response bodies, stored once per distinct content."""
+    __tablename__ = "blobs"
+    
+    hash = Column(String(64), primary_key=True)
+    content = Column(LargeBinary, nullable=False)
+    size = Column(Integer)  # uncompressed bytes
+    codec = Column(String(16), nullable=True)  # NULL = stored raw
+
+
+class LLMCallSearchDB(Base):
+    """
+    Prompt, response and error text of each call, for full-text search.
+    Indexed by an FTS5 table (SQLite) or a tsvector column (PostgreSQL),
+    see create_search_index.
+    """
+    __tablename__ = "llm_call_search"
+    
+    id = Column(Integer, primary_key=True)  # FTS5 rowid
+    call_id = Column(String, unique=True, nullable=False)  # llm_calls.id
+    timestamp = Column(DateTime, index=True)
+    
+    prompt = Column(Text, nullable=True)
+    response = Column(Text, nullable=True)
+    error = Column(Text, nullable=True)
+
+
+class RollupMixin:
+    """
+    Pre-aggregated call metrics per time bucket and dimension combination.
+    Missing dimensions are stored as '' (they are part of the primary key).
+    """
+    bucket = Column(DateTime, primary_key=True)
+    project_name = Column(String, primary_key=True, default='')
+    model_name = Column(String, primary_key=True, default='')
+    agent_name = Column(String, primary_key=True, default='')
+    operation = Column(String, primary_key=True, default='')
+    
+    call_count = Column(Integer, default=0)
+    prompt_tokens = Column(Integer, default=0)
+    completion_tokens = Column(Integer, default=0)
+    total_tokens = Column(Integer, default=0)
+    total_cost = Column(Float, default=0.0)
+    total_latency_ms = Column(Float, default=0.0)
+    
+    error_count = Column(Integer, default=0)
+    cache_requests = Column(Integer, default=0)
+    cache_hits = Column(Integer, default=0)
+    hallucinations = Column(Integer, default=0)
+    judge_score_count = Column(Integer, default=0)
+    judge_score_sum = Column(Float, default=0.0)
+    
+    # DDSketch of call latencies, merged read-modify-write after the
+    # additive upsert has locked the row
+    latency_sketch = Column(JSON, nullable=True)
+
+
+class MinuteRollupDB(RollupMixin, Base):
+    __tablename__ = "rollups_minute"
+
+
+class HourRollupDB(RollupMixin, Base):
+    __tablename__ = "rollups_hour"
+
+
+class DayRollupDB(RollupMixin, Base):
+    __tablename__ = "rollups_day"
+
+
+class RetentionMarkDB(Base):
+    """
+    How far the retention job has pruned each project (day-aligned).
+    
+    Rollup buckets before `calls_before` have outlived their calls, so
+    rebuild_rollups leaves them alone instead of recomputing them as empty.
+    """
+    __tablename__ = "retention_marks"
+    
+    project_name = Column(String, primary_key=True)  # '' = calls without a project
+    calls_before = Column(DateTime, nullable=True)
+    bodies_before = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, nullable=True)
+
+
+# Moved to monthly archive files on SQLite (see observatory/partitions.py)
+ARCHIVED_TABLE_DEFS = tuple(Base.metadata.tables[name] for name in ARCHIVED_TABLES)
+
+
+# =============================================================================
+# SCHEMA MIGRATION
+# =============================================================================
+
+def migrate_schema(connection):
+    """
+    Add columns and indexes that were introduced after a table was first
+    created. `create_all` only creates missing tables, so databases from
+    older versions need this to pick up new columns.
+    """
+    inspector = inspect(connection)
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
         
-        self.engine = create_engine(database_url)
-        Base.metadata.create_all(self.engine)
-        self.SessionLocal = sessionmaker(bind=self.engine)
+        existing = {column['name'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            column_type = column.type.compile(dialect=connection.dialect)
+            connection.execute(text(
+                f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'
+            ))
+        
+        for index in table.indexes:
+            index.create(connection, checkfirst=True)
+
+
+def migrate_call_bodies(connection, drop_columns: bool = False) -> Dict[str, Any]:
+    """
+    Copy body columns of a pre-split llm_calls table into llm_call_bodies.
+    
+    Copies every row that has a body and no llm_call_bodies row yet, then
+    counts the bodies still without one. With `drop_columns` and none
+    missing, the old columns are dropped (or NULLed where the database
+    can't drop columns, e.g. SQLite < 3.35). A no-op once llm_calls is
+    narrow. Run VACUUM afterwards to reclaim space on SQLite.
+    
+    Returns:
+        {"copied": bodies copied, "missing": bodies not copied,
+         "columns": old columns found, "dropped": whether they were dropped}
+    """
+    stats = {'copied': 0, 'missing': 0, 'columns': [], 'dropped': False}
+    inspector = inspect(connection)
+    if not inspector.has_table('llm_calls'):
+        return stats
+    
+    existing = {column['name'] for column in inspector.get_columns('llm_calls')}
+    legacy = [column for column in BODY_COLUMNS if column in existing]
+    if not legacy:
+        return stats
+    stats['columns'] = legacy
+    
+    columns = ', '.join(legacy)
+    has_body = ' OR '.join(f'{column} IS NOT NULL' for column in legacy)
+    uncopied = f'({has_body}) AND id NOT IN (SELECT call_id FROM llm_call_bodies)'
+    stats['copied'] = connection.execute(text(
+        f'INSERT INTO llm_call_bodies (call_id, {columns}) '
+        f'SELECT id, {columns} FROM llm_calls WHERE {uncopied}'
+    )).rowcount
+    stats['missing'] = connection.execute(text(
+        f'SELECT COUNT(*) FROM llm_calls WHERE {uncopied}'
+    )).scalar()
+    if not drop_columns or stats['missing']:
+        return stats
+    
+    can_drop = connection.dialect.name != 'sqlite' or sqlite3.sqlite_version_info >= (3, 35)
+    for column in legacy:
+        if can_drop:
+            connection.execute(text(f'ALTER TABLE llm_calls DROP COLUMN {column}'))
+        else:
+            connection.execute(text(f'UPDATE llm_calls SET {column} = NULL WHERE {column} IS NOT NULL'))
+    stats['dropped'] = True
+    return stats
+
+
+def backfill_call_projects(connection):
+    """Copy sessions.project_name onto llm_calls rows that don't have it yet."""
+    calls = LLMCallDB.__table__
+    sessions = SessionDB.__table__
+    connection.execute(
+        update(calls)
+        .where(calls.c.project_name.is_(None))
+        .values(project_name=(
+            select(sessions.c.project_name)
+            .where(sessions.c.id == calls.c.session_id)
+            .scalar_subquery()
+        ))
+    )
+
+
+def promoted_values(row: Dict[str, Any]) -> Dict[str, Any]:
+    """PROMOTED_COLUMNS values for an llm_calls row whose JSON columns are dicts."""
+    return {
+        column: (row.get(source) or {}).get(key)
+        for column, (source, key) in PROMOTED_COLUMNS.items()
+    }
+
+
+def backfill_promoted_columns(connection):
+    """Fill the PROMOTED_COLUMNS of existing rows from their JSON columns."""
+    values = {}
+    for column, (source, key) in PROMOTED_COLUMNS.items():
+        path = getattr(LLMCallDB, source)[key]
+        python_type = LLMCallDB.__table__.c[column].type.python_type
+        if python_type is bool:
+            values[column] = path.as_boolean()
+        elif python_type is float:
+            values[column] = path.as_float()
+        else:
+            values[column] = path.as_string()
+    connection.execute(update(LLMCallDB.__table__).values(**values))
+
+
+# =============================================================================
+# COMPRESSION CODECS
+# =============================================================================
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+
+def _zstd_compress(data: bytes) -> bytes:
+    return zstandard.ZstdCompressor(level=3).compress(data)
+
+
+def _zstd_decompress(data: bytes) -> bytes:
+    return zstandard.ZstdDecompressor().decompress(data)
+
+
+# name -> (compress, decompress); zlib level 1 keeps most of the ratio at a
+# fraction of the CPU cost on the ingest path
+CODECS = {
+    'zlib': (lambda data: zlib.compress(data, 1), zlib.decompress),
+}
+if zstandard is not None:
+    CODECS['zstd'] = (_zstd_compress, _zstd_decompress)
+
+
+def resolve_codec(compression: Optional[str]) -> Optional[str]:
+    """Map a `compression` setting to a registered codec name (or None)."""
+    if not compression or compression == 'none':
+        return None
+    if compression == 'auto':
+        return 'zstd' if 'zstd' in CODECS else 'zlib'
+    if compression not in CODECS:
+        raise ValueError(
+            f"Unknown compression '{compression}'. Available: {', '.join(sorted(CODECS))}"
+            + ("" if zstandard else " (pip install zstandard for zstd)")
+        )
+    return compression
+
+
+def compress(data: bytes, codec: Optional[str]):
+    """
+    Compress data at or above COMPRESS_MIN_BYTES.
+    
+    Returns:
+        (data, codec) - codec is None when stored raw (small or incompressible)
+    """
+    if codec is None or len(data) < COMPRESS_MIN_BYTES:
+        return data, None
+    packed = CODECS[codec][0](data)
+    if len(packed) >= len(data):
+        return data, None
+    return packed, codec
+
+
+def decompress(data: bytes, codec: Optional[str]) -> bytes:
+    if codec is None:
+        return data
+    if codec not in CODECS:
+        raise RuntimeError(
+            f"Data is compressed with '{codec}', which isn't available"
+            + (" (pip install zstandard)" if codec == 'zstd' else "")
+        )
+    return CODECS[codec][1](data)
+
+
+def compress_json(value: Any, codec: Optional[str]) -> Any:
+    """Replace a large JSON value with a {"__codec__": ..., "data": base64} marker."""
+    if codec is None or value is None or (isinstance(value, dict) and CODEC_KEY in value):
+        return value
+    data = json.dumps(value, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    packed, used = compress(data, codec)
+    if used is None:
+        return value
+    return {CODEC_KEY: used, 'data': base64.b64encode(packed).decode('ascii')}
+
+
+def decompress_json(value: Any) -> Any:
+    """Inverse of compress_json; values without a marker pass through."""
+    if isinstance(value, dict) and CODEC_KEY in value:
+        return json.loads(decompress(base64.b64decode(value['data']), value[CODEC_KEY]))
+    return value
+
+
+# =============================================================================
+# BLOB HELPERS
+# =============================================================================
+
+def content_hash(data: bytes) -> str:
+    """SHA-256 hex digest used as the blob key."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def externalize_bodies(row: Dict[str, Any], blobs: Dict[str, bytes]) -> Dict[str, Any]:
+    """
+    Move long bodies of an llm_calls row into `blobs` (hash -> bytes).
+    
+    Replaces each long prompt/response column with a `*_ref` hash and each
+    long `meta_data` prompt component (BLOB_META_KEYS) with a blob marker.
+    Returns the row.
+    """
+    for column, ref_column in BLOB_COLUMNS.items():
+        value = row.get(column)
+        if value is not None and len(value) >= BLOB_MIN_LENGTH:
+            data = value.encode('utf-8')
+            digest = content_hash(data)
+            blobs[digest] = data
+            row[column] = None
+            row[ref_column] = digest
+    
+    meta_data = row.get('meta_data')
+    if not meta_data:
+        return row
+    
+    moved = {}
+    for key in BLOB_META_KEYS:
+        value = meta_data.get(key)
+        if not value or is_blob_marker(value):
+            continue
+        if isinstance(value, str):
+            data, marker = value.encode('utf-8'), {}
+        else:
+            data = json.dumps(value, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+            marker = {'json': True}
+        if len(data) >= BLOB_MIN_LENGTH:
+            digest = content_hash(data)
+            blobs[digest] = data
+            moved[key] = {BLOB_REF_KEY: digest, **marker}
+    if moved:
+        row['meta_data'] = {**meta_data, **moved}
+    
+    return row
+
+
+def is_blob_marker(value: Any) -> bool:
+    return isinstance(value, dict) and BLOB_REF_KEY in value
+
+
+def blob_refs(body_dbs: Iterable[Any]) -> List[str]:
+    """Distinct blob hashes referenced by a set of llm_call_bodies rows."""
+    refs = set()
+    for body_db in body_dbs:
+        for ref_column in BLOB_COLUMNS.values():
+            ref = getattr(body_db, ref_column)
+            if ref:
+                refs.add(ref)
+        meta_data = decompress_json(body_db.meta_data) or {}
+        for key in BLOB_META_KEYS:
+            if is_blob_marker(meta_data.get(key)):
+                refs.add(meta_data[key][BLOB_REF_KEY])
+    return list(refs)
+
+
+# =============================================================================
+# PROJECTIONS
+# =============================================================================
+
+def to_columnar(columns: Sequence[str], rows: Sequence[Sequence[Any]]) -> Dict[str, List[Any]]:
+    """Turn row tuples into {column: [values...]} (one list per column)."""
+    if not rows:
+        return {column: [] for column in columns}
+    return {column: list(values) for column, values in zip(columns, zip(*rows))}
+
+
+def keyset_after(after: tuple, descending: bool = False):
+    """WHERE clause for calls after `after` = (timestamp, id) in (timestamp, id) order."""
+    timestamp, call_id = after
+    if descending:
+        return or_(
+            LLMCallDB.timestamp < timestamp,
+            and_(LLMCallDB.timestamp == timestamp, LLMCallDB.id < call_id),
+        )
+    return or_(
+        LLMCallDB.timestamp > timestamp,
+        and_(LLMCallDB.timestamp == timestamp, LLMCallDB.id > call_id),
+    )
+
+
+# =============================================================================
+# AGGREGATION
+# =============================================================================
+
+# Dimensions accepted by aggregate(group_by=...)
+AGGREGATE_DIMENSIONS = (
+    'project_name', 'session_id', 'provider', 'model_name', 'agent_name',
+    'agent_role', 'operation', 'success', 'prompt_variant_id', 'test_dataset_id',
+)
+
+# Time bucket -> (SQLite strftime format, PostgreSQL date_trunc field)
+TIME_BUCKETS = {
+    'minute': ('%Y-%m-%d %H:%M:00', 'minute'),
+    'hour': ('%Y-%m-%d %H:00:00', 'hour'),
+    'day': ('%Y-%m-%d 00:00:00', 'day'),
+}
+
+_cache_hit = LLMCallDB.cache_hit
+_judge_score = LLMCallDB.judge_score
+_hallucination = LLMCallDB.hallucination_flag
+_chosen_model = LLMCallDB.routed_model
+_routing_savings = LLMCallDB.routing_decision['estimated_cost_savings'].as_float()
+
+# Metric name -> SQL aggregate expression. JSON-backed metrics ignore calls
+# without the corresponding metadata.
+AGGREGATE_METRICS = {
+    'count': func.count(LLMCallDB.id),
+    'sum_cost': func.sum(LLMCallDB.total_cost),
+    'avg_cost': func.avg(LLMCallDB.total_cost),
+    'sum_tokens': func.sum(LLMCallDB.total_tokens),
+    'avg_tokens': func.avg(LLMCallDB.total_tokens),
+    'sum_prompt_tokens': func.sum(LLMCallDB.prompt_tokens),
+    'sum_completion_tokens': func.sum(LLMCallDB.completion_tokens),
+    'sum_latency': func.sum(LLMCallDB.latency_ms),
+    'avg_latency': func.avg(LLMCallDB.latency_ms),
+    'min_latency': func.min(LLMCallDB.latency_ms),
+    'max_latency': func.max(LLMCallDB.latency_ms),
+    'errors': func.sum(case((LLMCallDB.success == False, 1), else_=0)),
+    'cache_requests': func.count(_cache_hit),
+    'cache_hits': func.sum(case((_cache_hit == True, 1), else_=0)),
+    'evaluated': func.count(_hallucination),
+    'hallucinations': func.sum(case((_hallucination == True, 1), else_=0)),
+    'scored': func.count(_judge_score),
+    'sum_judge_score': func.sum(_judge_score),
+    'avg_judge_score': func.avg(_judge_score),
+    'routing_decisions': func.count(_chosen_model),
+    'routing_savings': func.sum(_routing_savings),
+}
+
+
+def time_bucket(bucket: str, dialect_name: str, column=None):
+    """SQL expression truncating a timestamp column to a TIME_BUCKETS size."""
+    if bucket not in TIME_BUCKETS:
+        raise ValueError(f"Unknown bucket '{bucket}'. Expected one of: {', '.join(TIME_BUCKETS)}")
+    column = LLMCallDB.timestamp if column is None else column
+    sqlite_format, pg_field = TIME_BUCKETS[bucket]
+    if dialect_name == 'sqlite':
+        return func.strftime(sqlite_format, column)
+    if dialect_name == 'postgresql':
+        # Literal field so SELECT and GROUP BY render the identical expression
+        return func.date_trunc(literal_column(f"'{pg_field}'"), column)
+    raise NotImplementedError(f"Time buckets aren't supported on {dialect_name}")
+
+
+def parse_bucket(value: Any) -> Any:
+    """SQLite returns buckets as text; normalize them to datetime."""
+    return datetime.fromisoformat(value) if isinstance(value, str) else value
+
+
+# =============================================================================
+# ROLLUPS
+# =============================================================================
+
+# Finest to coarsest
+ROLLUP_TABLES = {
+    'minute': MinuteRollupDB,
+    'hour': HourRollupDB,
+    'day': DayRollupDB,
+}
+
+ROLLUP_STEPS = {
+    'minute': timedelta(minutes=1),
+    'hour': timedelta(hours=1),
+    'day': timedelta(days=1),
+}
+
+ROLLUP_DIMENSIONS = ('project_name', 'model_name', 'agent_name', 'operation')
+ROLLUP_KEY = ('bucket',) + ROLLUP_DIMENSIONS
+
+# Rollup column -> AGGREGATE_METRICS expression that computes it from llm_calls
+ROLLUP_SOURCES = {
+    'call_count': 'count',
+    'prompt_tokens': 'sum_prompt_tokens',
+    'completion_tokens': 'sum_completion_tokens',
+    'total_tokens': 'sum_tokens',
+    'total_cost': 'sum_cost',
+    'total_latency_ms': 'sum_latency',
+    'error_count': 'errors',
+    'cache_requests': 'cache_requests',
+    'cache_hits': 'cache_hits',
+    'hallucinations': 'hallucinations',
+    'judge_score_count': 'scored',
+    'judge_score_sum': 'sum_judge_score',
+}
+
+# aggregate() metric names answerable from rollups: sums map to a column,
+# averages to (numerator metric, denominator metric)
+ROLLUP_SUM_METRICS = {metric: column for column, metric in ROLLUP_SOURCES.items()}
+ROLLUP_AVG_METRICS = {
+    'avg_cost': ('sum_cost', 'count'),
+    'avg_tokens': ('sum_tokens', 'count'),
+    'avg_latency': ('sum_latency', 'count'),
+    'avg_judge_score': ('sum_judge_score', 'scored'),
+}
+
+
+def floor_time(value: datetime, granularity: str) -> datetime:
+    """Start of the rollup bucket containing `value`."""
+    value = value.replace(second=0, microsecond=0)
+    if granularity in ('hour', 'day'):
+        value = value.replace(minute=0)
+    if granularity == 'day':
+        value = value.replace(hour=0)
+    return value
+
+
+def rollup_delta(llm_call: LLMCall) -> Dict[str, float]:
+    """Rollup column increments contributed by a single LLM call."""
+    cache = llm_call.cache_metadata
+    quality = llm_call.quality_evaluation
+    scored = quality is not None and quality.judge_score is not None
+    return {
+        'call_count': 1,
+        'prompt_tokens': llm_call.prompt_tokens,
+        'completion_tokens': llm_call.completion_tokens,
+        'total_tokens': llm_call.total_tokens,
+        'total_cost': llm_call.total_cost,
+        'total_latency_ms': llm_call.latency_ms,
+        'error_count': 0 if llm_call.success else 1,
+        'cache_requests': 1 if cache else 0,
+        'cache_hits': 1 if cache and cache.cache_hit else 0,
+        'hallucinations': 1 if quality and quality.hallucination_flag else 0,
+        'judge_score_count': 1 if scored else 0,
+        'judge_score_sum': quality.judge_score if scored else 0.0,
+    }
+
+
+def rollup_dimensions(llm_call: LLMCall, projects: Dict[str, Optional[str]]) -> tuple:
+    """ROLLUP_DIMENSIONS values of a call ('' for missing ones)."""
+    return (
+        projects.get(llm_call.session_id) or '',
+        llm_call.model_name or '',
+        llm_call.agent_name or '',
+        llm_call.operation or '',
+    )
+
+
+def merge_rollup_deltas(
+    llm_calls: List[LLMCall],
+    projects: Dict[str, Optional[str]],
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Coalesce calls into one rollup row delta per bucket and dimension key.
+    
+    Args:
+        llm_calls: Calls being inserted
+        projects: session_id -> project_name
+    
+    Returns:
+        granularity -> rollup rows (primary key columns plus increments)
+    """
+    merged: Dict[str, Dict[tuple, Dict[str, Any]]] = {granularity: {} for granularity in ROLLUP_TABLES}
+    for llm_call in llm_calls:
+        delta = rollup_delta(llm_call)
+        dimensions = rollup_dimensions(llm_call, projects)
+        for granularity, rows in merged.items():
+            bucket = floor_time(llm_call.timestamp, granularity)
+            row = rows.get((bucket,) + dimensions)
+            if row is None:
+                row = rows[(bucket,) + dimensions] = {
+                    'bucket': bucket,
+                    **dict(zip(ROLLUP_DIMENSIONS, dimensions)),
+                    **{column: 0 for column in ROLLUP_SOURCES},
+                }
+            for column, value in delta.items():
+                row[column] += value
+    return {granularity: list(rows.values()) for granularity, rows in merged.items()}
+
+
+@functools.lru_cache(maxsize=None)
+def rollup_upsert(granularity: str, dialect_name: str):
+    """
+    INSERT ... ON CONFLICT DO UPDATE that adds a delta row to a rollup, or
+    None if the dialect has no ON CONFLICT support.
+    
+    Built once per (granularity, dialect) and reused: constructing the
+    statement and its `excluded` SET clause costs more than executing it.
+    """
+    if dialect_name == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    elif dialect_name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        return None
+    table = ROLLUP_TABLES[granularity].__table__
+    stmt = dialect_insert(table)
+    return stmt.on_conflict_do_update(
+        index_elements=[column.name for column in table.primary_key],
+        set_={column: table.c[column] + stmt.excluded[column] for column in ROLLUP_SOURCES},
+    )
+
+
+def rollup_increment(granularity: str, row: Dict[str, Any]):
+    """UPDATE adding one delta row to an existing rollup row (fallback path)."""
+    table = ROLLUP_TABLES[granularity].__table__
+    return (
+        update(table)
+        .where(*[table.c[key] == row[key] for key in ('bucket',) + ROLLUP_DIMENSIONS])
+        .values(**{column: table.c[column] + row[column] for column in ROLLUP_SOURCES})
+    )
+
+
+def merge_rollup_sketches(
+    llm_calls: List[LLMCall],
+    projects: Dict[str, Optional[str]],
+) -> Dict[str, Dict[tuple, DDSketch]]:
+    """
+    Latency sketch of the calls falling into each rollup row.
+    
+    Returns:
+        granularity -> {(bucket, *ROLLUP_DIMENSIONS): sketch}
+    """
+    merged: Dict[str, Dict[tuple, DDSketch]] = {granularity: {} for granularity in ROLLUP_TABLES}
+    for llm_call in llm_calls:
+        dimensions = rollup_dimensions(llm_call, projects)
+        for granularity, sketches in merged.items():
+            key = (floor_time(llm_call.timestamp, granularity),) + dimensions
+            sketches.setdefault(key, DDSketch()).add(llm_call.latency_ms)
+    return merged
+
+
+def rebuild_rollups(
+    connection,
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+    granularities: Sequence[str] = tuple(ROLLUP_TABLES),
+) -> int:
+    """
+    Recompute rollup buckets overlapping [start_time, end_time] from llm_calls.
+    
+    Used to backfill existing databases, as the periodic job when ingest-time
+    rollups are disabled, and to repair buckets after deletes. Buckets older
+    than a project's retention mark are kept as they are: their calls have
+    been pruned and the rollups are the only history left.
+    
+    Returns:
+        Number of rollup rows written
+    """
+    marks = RetentionMarkDB.__table__
+    written = 0
+    for granularity in granularities:
+        table = ROLLUP_TABLES[granularity].__table__
+        low = floor_time(start_time, granularity) if start_time else None
+        high = floor_time(end_time, granularity) + ROLLUP_STEPS[granularity] if end_time else None
+        
+        frozen_bucket = select(marks.c.project_name).where(
+            marks.c.project_name == table.c.project_name,
+            marks.c.calls_before > table.c.bucket,
+        ).exists()
+        clear = delete(table).where(~frozen_bucket)
+        if low:
+            clear = clear.where(table.c.bucket >= low)
+        if high:
+            clear = clear.where(table.c.bucket < high)
+        connection.execute(clear)
+        
+        dimensions = [
+            func.coalesce(LLMCallDB.project_name, '').label('project_name'),
+            func.coalesce(LLMCallDB.model_name, '').label('model_name'),
+            func.coalesce(LLMCallDB.agent_name, '').label('agent_name'),
+            func.coalesce(LLMCallDB.operation, '').label('operation'),
+        ]
+        bucket = time_bucket(granularity, connection.dialect.name).label('bucket')
+        frozen_call = select(marks.c.project_name).where(
+            marks.c.project_name == func.coalesce(LLMCallDB.project_name, ''),
+            marks.c.calls_before > LLMCallDB.timestamp,
+        ).exists()
+        in_range = [~frozen_call]
+        if low:
+            in_range.append(LLMCallDB.timestamp >= low)
+        if high:
+            in_range.append(LLMCallDB.timestamp < high)
+        
+        # Sketches can't be built in SQL; stream the latencies once
+        sketches: Dict[tuple, DDSketch] = {}
+        latencies = (
+            select(bucket, *dimensions, LLMCallDB.latency_ms)
+            .where(*in_range)
+        )
+        for *key, latency in connection.execute(latencies):
+            if latency is not None:
+                key[0] = parse_bucket(key[0])
+                sketches.setdefault(tuple(key), DDSketch()).add(latency)
+        
+        stmt = (
+            select(bucket, *dimensions, *[
+                AGGREGATE_METRICS[metric].label(column) for column, metric in ROLLUP_SOURCES.items()
+            ])
+            .where(*in_range)
+            .group_by(bucket, *dimensions)
+        )
+        
+        rows = []
+        for result in connection.execute(stmt).mappings():
+            row = {key: value or 0 for key, value in result.items()}
+            row['bucket'] = parse_bucket(result['bucket'])
+            row.update({key: result[key] for key in ROLLUP_DIMENSIONS})
+            sketch = sketches.get(tuple(row[key] for key in ROLLUP_KEY))
+            row['latency_sketch'] = sketch.to_dict() if sketch else None
+            rows.append(row)
+        for offset in range(0, len(rows), DEFAULT_BULK_CHUNK_SIZE):
+            connection.execute(insert(table), rows[offset:offset + DEFAULT_BULK_CHUNK_SIZE])
+        written += len(rows)
+    return written
+
+
+# =============================================================================
+# LATENCY SKETCHES
+# =============================================================================
+
+def merge_session_sketches(llm_calls: List[LLMCall]) -> Dict[tuple, DDSketch]:
+    """Latency sketch of the calls of each session, keyed by (session_id,)."""
+    merged: Dict[tuple, DDSketch] = {}
+    for llm_call in llm_calls:
+        merged.setdefault((llm_call.session_id,), DDSketch()).add(llm_call.latency_ms)
+    return merged
+
+
+# Sketch rows looked up per SELECT
+SKETCH_LOOKUP_CHUNK = 100
+
+
+def merge_call_sketches(
+    llm_calls: List[LLMCall],
+    projects: Dict[str, Optional[str]],
+    rollups: bool = True,
+) -> Dict[str, Dict[tuple, DDSketch]]:
+    """
+    Latency sketch deltas of the calls for every sketch table: "session"
+    (keyed by (session_id,)) and, with `rollups`, each rollup granularity.
+    """
+    merged = {'session': merge_session_sketches(llm_calls)}
+    if rollups:
+        merged.update(merge_rollup_sketches(llm_calls, projects))
+    return merged
+
+
+def sketch_table(kind: str) -> tuple:
+    """(table, key columns) holding the sketches of a `merge_call_sketches` kind."""
+    if kind == 'session':
+        return SessionDB.__table__, ('id',)
+    return ROLLUP_TABLES[kind].__table__, ROLLUP_KEY
+
+
+def sketch_select(table, key_columns: Sequence[str], keys: Sequence[tuple]):
+    """
+    Key columns and stored sketch of the rows with exactly these keys,
+    locked FOR UPDATE where the dialect supports it (SQLite writers are
+    serialized anyway).
+    """
+    if len(key_columns) == 1:
+        condition = table.c[key_columns[0]].in_([key[0] for key in keys])
+    else:
+        condition = or_(*[
+            and_(*[table.c[column] == value for column, value in zip(key_columns, key)])
+            for key in keys
+        ])
+    return (
+        select(*[table.c[column] for column in key_columns], table.c.latency_sketch)
+        .where(condition)
+        .with_for_update()
+    )
+
+
+def sketch_update(table, key_columns: Sequence[str]):
+    """
+    Executemany UPDATE overwriting latency_sketch by key. Parameters are
+    `key_<column>` for each key column plus `sketch`.
+    """
+    return (
+        update(table)
+        .where(*[table.c[column] == bindparam(f'key_{column}') for column in key_columns])
+        .values(latency_sketch=bindparam('sketch'))
+    )
+
+
+def merged_sketch_params(
+    key_columns: Sequence[str],
+    stored: Iterable[Sequence[Any]],
+    deltas: Dict[tuple, DDSketch],
+) -> List[Dict[str, Any]]:
+    """
+    `sketch_update` parameters folding sketch deltas into stored sketches.
+    
+    Args:
+        key_columns: Key columns of the table
+        stored: (*key, latency_sketch) rows read with `sketch_select`
+        deltas: key -> sketch of the new calls
+    """
+    params = []
+    for row in stored:
+        key = tuple(row[:-1])
+        delta = deltas.get(key)
+        if delta is None:
+            continue
+        params.append({
+            **{f'key_{column}': value for column, value in zip(key_columns, key)},
+            'sketch': DDSketch.from_dict(row[-1]).merge(delta).to_dict(),
+        })
+    return params
+
+
+def rebuild_session_sketches(connection, session_ids: Optional[Sequence[str]] = None) -> int:
+    """
+    Recompute sessions.latency_sketch from llm_calls (every session by
+    default). Returns the number of sessions updated.
+    """
+    stmt = select(LLMCallDB.session_id, LLMCallDB.latency_ms)
+    if session_ids is not None:
+        stmt = stmt.where(LLMCallDB.session_id.in_(session_ids))
+    
+    sketches: Dict[str, DDSketch] = {}
+    for session_id, latency in connection.execute(stmt):
+        if latency is not None:
+            sketches.setdefault(session_id, DDSketch()).add(latency)
+    
+    params = [
+        {'key_id': session_id, 'sketch': sketch.to_dict()}
+        for session_id, sketch in sketches.items()
+    ]
+    update_stmt = sketch_update(SessionDB.__table__, ('id',))
+    for offset in range(0, len(params), DEFAULT_BULK_CHUNK_SIZE):
+        connection.execute(update_stmt, params[offset:offset + DEFAULT_BULK_CHUNK_SIZE])
+    return len(params)
+
+
+# =============================================================================
+# FULL-TEXT SEARCH
+# =============================================================================
+
+SEARCH_FTS_TABLE = "llm_call_search_fts"
+
+# FTS5 virtual table for queries (created by create_search_index, not create_all)
+SEARCH_FTS = sql_table(SEARCH_FTS_TABLE, sql_column('rowid'), sql_column('rank'))
+
+# Indexed text is cut to this many characters per column (long RAG prompts
+# would otherwise dominate the index)
+SEARCH_MAX_CHARS = 20000
+
+# PostgreSQL text search configuration (stemming, stop words)
+SEARCH_TEXT_CONFIG = "english"
+
+# External-content FTS5 table: the text is stored once, in llm_call_search,
+# and the triggers keep the index in step with its rows
+SQLITE_SEARCH_DDL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_FTS_TABLE} USING fts5("
+    "prompt, response, error, content='llm_call_search', content_rowid='id', "
+    "tokenize='porter unicode61')",
+    "CREATE TRIGGER IF NOT EXISTS llm_call_search_ai AFTER INSERT ON llm_call_search BEGIN "
+    f"INSERT INTO {SEARCH_FTS_TABLE}(rowid, prompt, response, error) "
+    "VALUES (new.id, new.prompt, new.response, new.error); END",
+    "CREATE TRIGGER IF NOT EXISTS llm_call_search_ad AFTER DELETE ON llm_call_search BEGIN "
+    f"INSERT INTO {SEARCH_FTS_TABLE}({SEARCH_FTS_TABLE}, rowid, prompt, response, error) "
+    "VALUES ('delete', old.id, old.prompt, old.response, old.error); END",
+    "CREATE TRIGGER IF NOT EXISTS llm_call_search_au AFTER UPDATE ON llm_call_search BEGIN "
+    f"INSERT INTO {SEARCH_FTS_TABLE}({SEARCH_FTS_TABLE}, rowid, prompt, response, error) "
+    "VALUES ('delete', old.id, old.prompt, old.response, old.error); "
+    f"INSERT INTO {SEARCH_FTS_TABLE}(rowid, prompt, response, error) "
+    "VALUES (new.id, new.prompt, new.response, new.error); END",
+)
+
+POSTGRES_SEARCH_DDL = (
+    "ALTER TABLE llm_call_search ADD COLUMN IF NOT EXISTS search_vector tsvector "
+    f"GENERATED ALWAYS AS (to_tsvector('{SEARCH_TEXT_CONFIG}', "
+    "coalesce(prompt, '') || ' ' || coalesce(response, '') || ' ' || coalesce(error, ''))) STORED",
+    "CREATE INDEX IF NOT EXISTS ix_llm_call_search_vector ON llm_call_search USING GIN (search_vector)",
+)
+
+
+def create_search_index(connection):
+    """Create the full-text index on llm_call_search if it doesn't exist."""
+    if connection.dialect.name == 'sqlite':
+        options = {row[0] for row in connection.exec_driver_sql("PRAGMA compile_options")}
+        if 'ENABLE_FTS5' not in options:
+            return  # search_calls isn't available on this SQLite build
+        statements = SQLITE_SEARCH_DDL
+    elif connection.dialect.name == 'postgresql':
+        statements = POSTGRES_SEARCH_DDL
+    else:
+        return
+    for statement in statements:
+        connection.exec_driver_sql(statement)
+
+
+def search_row(
+    call_id: str,
+    timestamp: Optional[datetime],
+    prompt: Optional[str],
+    response: Optional[str],
+    error: Optional[str],
+) -> Optional[Dict[str, Any]]:
+    """llm_call_search row for a call; None if it has no text to index."""
+    if not (prompt or response or error):
+        return None
+    return {
+        'call_id': call_id,
+        'timestamp': timestamp,
+        'prompt': prompt[:SEARCH_MAX_CHARS] if prompt else None,
+        'response': response[:SEARCH_MAX_CHARS] if response else None,
+        'error': error[:SEARCH_MAX_CHARS] if error else None,
+    }
+
+
+def fts5_query(query: str) -> str:
+    """
+    Turn free text into an FTS5 query: every word must match, a trailing *
+    keeps prefix matching. Quoting each word stops punctuation in user input
+    (-, :, quotes) from being read as FTS5 operators.
+    """
+    terms = []
+    for word in query.split():
+        prefix = word.endswith('*') and len(word) > 1
+        word = word.rstrip('*').replace('"', '""')
+        if word:
+            terms.append(f'"{word}"' + ('*' if prefix else ''))
+    return ' '.join(terms)
+
+
+def rebuild_search_index(connection, chunk_size: int = 1000) -> int:
+    """
+    Re-index the text of every call in llm_calls (bodies resolved from
+    blobs). Calls whose bodies were pruned keep only their error text.
+    
+    Returns:
+        Number of calls indexed
+    """
+    bodies = LLMCallBodyDB.__table__
+    search = LLMCallSearchDB.__table__
+    indexed = 0
+    after = None
+    while True:
+        stmt = (
+            select(
+                LLMCallDB.id, LLMCallDB.timestamp, LLMCallDB.error,
+                bodies.c.prompt, bodies.c.prompt_ref, bodies.c.response_text, bodies.c.response_ref,
+            )
+            .outerjoin(bodies, bodies.c.call_id == LLMCallDB.id)
+            .order_by(LLMCallDB.timestamp, LLMCallDB.id)
+            .limit(chunk_size)
+        )
+        if after is not None:
+            stmt = stmt.where(keyset_after(after))
+        rows = connection.execute(stmt).all()
+        if not rows:
+            return indexed
+        
+        refs = {ref for row in rows for ref in (row.prompt_ref, row.response_ref) if ref}
+        blobs = {
+            digest: decompress(content, codec).decode('utf-8')
+            for digest, content, codec in connection.execute(
+                select(BlobDB.hash, BlobDB.content, BlobDB.codec).where(BlobDB.hash.in_(refs))
+            )
+        } if refs else {}
+        
+        ids = [row.id for row in rows]
+        connection.execute(delete(search).where(search.c.call_id.in_(ids)))
+        search_rows = [
+            search_row(
+                row.id,
+                row.timestamp,
+                blobs.get(row.prompt_ref) if row.prompt_ref else row.prompt,
+                blobs.get(row.response_ref) if row.response_ref else row.response_text,
+                row.error,
+            )
+            for row in rows
+        ]
+        search_rows = [row for row in search_rows if row is not None]
+        if search_rows:
+            connection.execute(insert(search), search_rows)
+        indexed += len(search_rows)
+        
+        if len(rows) < chunk_size:
+            return indexed
+        after = (rows[-1].timestamp, rows[-1].id)
+
+
+# =============================================================================
+# SCHEMA SETUP
+# =============================================================================
+
+def has_column(inspector, table_name: str, column_name: str) -> bool:
+    return inspector.has_table(table_name) and any(
+        column['name'] == column_name for column in inspector.get_columns(table_name)
+    )
+
+
+def create_schema(connection, partitioned: bool = False):
+    """
+    Create missing tables and bring databases from older versions up to date.
+    Denormalized and promoted columns, rollup tables and latency sketches
+    added to an existing database are backfilled. Bodies of a pre-split
+    llm_calls table are copied when llm_call_bodies is first created; the
+    old columns are only dropped by `observatory migrate`.
+    
+    With `partitioned`, a new PostgreSQL database gets llm_calls partitioned
+    by month (an existing llm_calls table is left as it is).
+    """
+    inspector = inspect(connection)
+    if (
+        partitioned
+        and connection.dialect.name == 'postgresql'
+        and not inspector.has_table(LLMCallDB.__tablename__)
+    ):
+        create_partitioned_table(connection, LLMCallDB.__table__)
+        inspector = inspect(connection)
+    rollups_current = has_column(inspector, DayRollupDB.__tablename__, 'latency_sketch')
+    sessions_current = (
+        not inspector.has_table(SessionDB.__tablename__)
+        or has_column(inspector, SessionDB.__tablename__, 'latency_sketch')
+    )
+    projects_current = (
+        not inspector.has_table(LLMCallDB.__tablename__)
+        or has_column(inspector, LLMCallDB.__tablename__, 'project_name')
+    )
+    promoted_current = all(
+        not inspector.has_table(LLMCallDB.__tablename__)
+        or has_column(inspector, LLMCallDB.__tablename__, column)
+        for column in PROMOTED_COLUMNS
+    )
+    search_current = (
+        not inspector.has_table(LLMCallDB.__tablename__)
+        or inspector.has_table(LLMCallSearchDB.__tablename__)
+    )
+    bodies_current = (
+        not inspector.has_table(LLMCallDB.__tablename__)
+        or inspector.has_table(LLMCallBodyDB.__tablename__)
+    )
+    Base.metadata.create_all(connection)
+    create_search_index(connection)
+    migrate_schema(connection)
+    if not bodies_current:
+        migrate_call_bodies(connection)
+    if not projects_current:
+        backfill_call_projects(connection)
+    if not promoted_current:
+        backfill_promoted_columns(connection)
+    if not rollups_current:
+        rebuild_rollups(connection)
+    if not sessions_current:
+        rebuild_session_sketches(connection)
+    if not search_current:
+        rebuild_search_index(connection)
+
+
+# =============================================================================
+# SESSION COUNTER DELTAS
+# =============================================================================
+
+def session_delta(llm_call: LLMCall) -> Dict[str, float]:
+    """Session counter increments contributed by a single LLM call."""
+    delta = {
+        'total_llm_calls': 1,
+        'total_tokens': llm_call.total_tokens,
+        'total_cost': llm_call.total_cost,
+        'total_latency_ms': llm_call.latency_ms,
+    }
+    
+    if llm_call.routing_decision:
+        delta['total_routing_decisions'] = 1
+        if llm_call.routing_decision.estimated_cost_savings:
+            delta['routing_cost_savings'] = llm_call.routing_decision.estimated_cost_savings
+    
+    if llm_call.cache_metadata:
+        if llm_call.cache_metadata.cache_hit:
+            delta['total_cache_hits'] = 1
+        else:
+            delta['total_cache_misses'] = 1
+    
+    if llm_call.quality_evaluation and llm_call.quality_evaluation.hallucination_flag:
+        delta['total_hallucinations'] = 1
+    
+    if not llm_call.success:
+        delta['total_errors'] = 1
+    
+    return delta
+
+
+# Session columns built up only from call deltas, never from snapshots
+SESSION_COUNTERS = (
+    'total_llm_calls', 'total_tokens', 'total_cost', 'total_latency_ms',
+    'total_routing_decisions', 'routing_cost_savings', 'total_cache_hits',
+    'total_cache_misses', 'cache_cost_savings', 'total_hallucinations', 'total_errors',
+)
+
+
+def merge_session_deltas(llm_calls: List[LLMCall]) -> Dict[str, Dict[str, float]]:
+    """Coalesce the deltas of many calls into one delta per session."""
+    merged: Dict[str, Dict[str, float]] = {}
+    for llm_call in llm_calls:
+        target = merged.setdefault(llm_call.session_id, {})
+        for column, value in session_delta(llm_call).items():
+            target[column] = target.get(column, 0) + value
+    return merged
+
+
+class BaseStorage:
+    """
+    Engine-independent storage logic: row conversion, query filters and
+    session-delta statements. Shared by Storage and AsyncStorage.
+    """
+    
+    _known_blobs: set
+    _known_blobs_since: float = 0.0
+    
+    # Months with an llm_calls partition; None unless llm_calls is partitioned
+    _partition_months: Optional[set] = None
+    
+    # Maintain llm_call_search as calls are inserted
+    search_index: bool = True
+    
+    # SQLite file whose monthly archives reads attach (None: not SQLite)
+    archive_database: Optional[str] = None
+    _archive_cache: tuple = (None, {})
 
     # =========================================================================
     # SESSION CONVERSION
@@ -143,6 +1385,21 @@ class Storage:
             meta_data=session.metadata,
         )
 
+    def _new_session_row(self, session: Session) -> Dict[str, Any]:
+        """
+        sessions row for a session that isn't stored yet, with zeroed
+        counters: the deltas of its calls build the totals, whichever way
+        (direct, writer, spool, spill) and in whatever order they arrive.
+        """
+        session_db = self._to_session_db(session)
+        row = {
+            column.name: getattr(session_db, column.key)
+            for column in SessionDB.__table__.columns
+            if column.key != 'latency_sketch'
+        }
+        row.update({column: 0 for column in SESSION_COUNTERS})
+        return row
+
     def _from_session_db(self, session_db: SessionDB) -> Session:
         return Session(
             id=session_db.id,
@@ -171,7 +1428,38 @@ class Storage:
     # LLM CALL CONVERSION
     # =========================================================================
 
-    def _to_llm_call_db(self, llm_call: LLMCall) -> LLMCallDB:
+    def _to_llm_call_rows(
+        self,
+        llm_calls: List[LLMCall],
+        projects: Optional[Dict[str, Optional[str]]] = None,
+    ):
+        """
+        Rows for inserting calls, split into llm_calls and llm_call_bodies
+        rows, with long bodies moved out to blobs.
+        
+        Args:
+            llm_calls: Calls to convert
+            projects: session_id -> project_name (see `_load_projects`)
+        
+        Returns:
+            (rows, body_rows, blobs) where blobs maps content hash -> body bytes
+        """
+        blobs: Dict[str, bytes] = {}
+        rows = []
+        body_rows = []
+        for call in llm_calls:
+            row = externalize_bodies(self._to_llm_call_row(call), blobs)
+            row['project_name'] = (projects or {}).get(call.session_id)
+            for column in COMPRESSED_JSON_COLUMNS:
+                row[column] = compress_json(row[column], self.compression)
+            body = {column: row.pop(column, None) for column in BODY_COLUMNS}
+            if any(value is not None and value != {} for value in body.values()):
+                body_rows.append({'call_id': row['id'], **body})
+            rows.append(row)
+        return rows, body_rows, blobs
+
+    def _to_llm_call_row(self, llm_call: LLMCall) -> Dict[str, Any]:
+        """Column values for an llm_calls row (shared by ORM and Core inserts)."""
         # Convert nested Pydantic models to dict for JSON storage
         routing_data = llm_call.routing_decision.model_dump() if llm_call.routing_decision else None
         cache_data = llm_call.cache_metadata.model_dump() if llm_call.cache_metadata else None
@@ -181,38 +1469,75 @@ class Storage:
         breakdown_data = llm_call.prompt_breakdown.model_dump() if llm_call.prompt_breakdown else None
         metadata_data = llm_call.prompt_metadata.model_dump() if llm_call.prompt_metadata else None
         
-        return LLMCallDB(
-            id=llm_call.id,
-            session_id=llm_call.session_id,
-            timestamp=llm_call.timestamp,
-            provider=llm_call.provider.value,
-            model_name=llm_call.model_name,
-            prompt=llm_call.prompt,
-            prompt_normalized=llm_call.prompt_normalized,
-            response_text=llm_call.response_text,
-            prompt_tokens=llm_call.prompt_tokens,
-            completion_tokens=llm_call.completion_tokens,
-            total_tokens=llm_call.total_tokens,
-            prompt_cost=llm_call.prompt_cost,
-            completion_cost=llm_call.completion_cost,
-            total_cost=llm_call.total_cost,
-            latency_ms=llm_call.latency_ms,
-            agent_name=llm_call.agent_name,
-            agent_role=llm_call.agent_role.value if llm_call.agent_role else None,
-            operation=llm_call.operation,
-            success=llm_call.success,
-            error=llm_call.error,
-            routing_decision=routing_data,
-            cache_metadata=cache_data,
-            quality_evaluation=quality_data,
-            prompt_breakdown=breakdown_data,
-            prompt_metadata=metadata_data,
-            prompt_variant_id=llm_call.prompt_variant_id,
-            test_dataset_id=llm_call.test_dataset_id,
-            meta_data=llm_call.metadata,
-        )
+        row = {
+            'id': llm_call.id,
+            'session_id': llm_call.session_id,
+            'timestamp': llm_call.timestamp,
+            'provider': llm_call.provider.value,
+            'model_name': llm_call.model_name,
+            'prompt': llm_call.prompt,
+            'prompt_normalized': llm_call.prompt_normalized,
+            'response_text': llm_call.response_text,
+            'prompt_tokens': llm_call.prompt_tokens,
+            'completion_tokens': llm_call.completion_tokens,
+            'total_tokens': llm_call.total_tokens,
+            'prompt_cost': llm_call.prompt_cost,
+            'completion_cost': llm_call.completion_cost,
+            'total_cost': llm_call.total_cost,
+            'latency_ms': llm_call.latency_ms,
+            'agent_name': llm_call.agent_name,
+            'agent_role': llm_call.agent_role.value if llm_call.agent_role else None,
+            'operation': llm_call.operation,
+            'success': llm_call.success,
+            'error': llm_call.error,
+            'routing_decision': routing_data,
+            'cache_metadata': cache_data,
+            'quality_evaluation': quality_data,
+            'prompt_breakdown': breakdown_data,
+            'prompt_metadata': metadata_data,
+            'prompt_variant_id': llm_call.prompt_variant_id,
+            'test_dataset_id': llm_call.test_dataset_id,
+            'meta_data': llm_call.metadata,
+        }
+        row.update(promoted_values(row))
+        return row
 
-    def _from_llm_call_db(self, llm_call_db: LLMCallDB) -> LLMCall:
+    def _search_rows(self, llm_calls: List[LLMCall]) -> List[Dict[str, Any]]:
+        """llm_call_search rows of the calls that have text to index."""
+        if not self.search_index:
+            return []
+        rows = [
+            search_row(llm_call.id, llm_call.timestamp, llm_call.prompt, llm_call.response_text, llm_call.error)
+            for llm_call in llm_calls
+        ]
+        return [row for row in rows if row is not None]
+
+    def _from_llm_call_db(
+        self,
+        llm_call_db: LLMCallDB,
+        body_db: Optional[LLMCallBodyDB] = None,
+        blobs: Optional[Dict[str, str]] = None,
+    ) -> LLMCall:
+        """
+        Build an LLMCall from its llm_calls row and (optionally) its
+        llm_call_bodies row. Without a body row, prompt/response fields are
+        None and metadata is empty.
+        """
+        # Rehydrate bodies stored in the blobs table
+        bodies = {
+            column: self._resolve_blob(body_db, getattr(body_db, ref_column), blobs)
+            if getattr(body_db, ref_column, None) else getattr(body_db, column, None)
+            for column, ref_column in BLOB_COLUMNS.items()
+        }
+        
+        meta_data = decompress_json(getattr(body_db, 'meta_data', None)) or {}
+        markers = {key: meta_data[key] for key in BLOB_META_KEYS if is_blob_marker(meta_data.get(key))}
+        if markers:
+            meta_data = dict(meta_data)
+            for key, marker in markers.items():
+                body = self._resolve_blob(body_db, marker[BLOB_REF_KEY], blobs)
+                meta_data[key] = json.loads(body) if body is not None and marker.get('json') else body
+        
         # Convert JSON back to Pydantic models
         routing_decision = None
         if llm_call_db.routing_decision:
@@ -228,8 +1553,8 @@ class Storage:
         
         # Convert prompt analysis models
         prompt_breakdown = None
-        if llm_call_db.prompt_breakdown:
-            prompt_breakdown = PromptBreakdown(**llm_call_db.prompt_breakdown)
+        if body_db is not None and body_db.prompt_breakdown:
+            prompt_breakdown = PromptBreakdown(**decompress_json(body_db.prompt_breakdown))
         
         prompt_metadata = None
         if llm_call_db.prompt_metadata:
@@ -241,9 +1566,9 @@ class Storage:
             timestamp=llm_call_db.timestamp,
             provider=ModelProvider(llm_call_db.provider),
             model_name=llm_call_db.model_name,
-            prompt=llm_call_db.prompt,
-            prompt_normalized=llm_call_db.prompt_normalized,
-            response_text=llm_call_db.response_text,
+            prompt=bodies['prompt'],
+            prompt_normalized=bodies['prompt_normalized'],
+            response_text=bodies['response_text'],
             prompt_tokens=llm_call_db.prompt_tokens,
             completion_tokens=llm_call_db.completion_tokens,
             total_tokens=llm_call_db.total_tokens,
@@ -263,11 +1588,687 @@ class Storage:
             prompt_metadata=prompt_metadata,
             prompt_variant_id=llm_call_db.prompt_variant_id,
             test_dataset_id=llm_call_db.test_dataset_id,
-            metadata=llm_call_db.meta_data or {},
+            metadata=meta_data,
         )
 
-    # =========================================================================
-    # SESSION CRUD
+    def _resolve_blob(
+        self,
+        body_db: LLMCallBodyDB,
+        ref: str,
+        blobs: Optional[Dict[str, str]],
+    ) -> Optional[str]:
+        """Body for a blob hash, from the prefetched map or the row's session."""
+        if blobs and ref in blobs:
+            return blobs[ref]
+        
+        # Not prefetched: look it up through the session that loaded the row
+        db = object_session(body_db)
+        if db is None:
+            return None
+        try:
+            blob = db.get(BlobDB, ref)
+        except Exception:
+            return None
+        return decompress(blob.content, blob.codec).decode('utf-8') if blob else None
+
+    # =========================================================================
+    # BLOB STATEMENTS
+    # =========================================================================
+
+    def _new_blob_rows(self, blobs: Dict[str, bytes]) -> List[Dict[str, Any]]:
+        """blobs rows not yet known to be stored by this process (compressed)."""
+        self._expire_known_blobs()
+        rows = []
+        for digest, data in blobs.items():
+            if digest in self._known_blobs:
+                continue
+            content, codec = compress(data, self.compression)
+            rows.append({'hash': digest, 'content': content, 'size': len(data), 'codec': codec})
+        return rows
+
+    def _expire_known_blobs(self):
+        """Forget the known-blob cache once it is older than KNOWN_BLOB_CACHE_TTL."""
+        now = time.monotonic()
+        if now - self._known_blobs_since > KNOWN_BLOB_CACHE_TTL:
+            self._known_blobs.clear()
+            self._known_blobs_since = now
+
+    def _remember_blobs(self, hashes: Iterable[str]):
+        """Record hashes committed by this process (bounded cache)."""
+        if len(self._known_blobs) > KNOWN_BLOB_CACHE_SIZE:
+            self._known_blobs.clear()
+        self._known_blobs.update(hashes)
+
+    def _blob_insert(self, dialect_name: str):
+        """
+        INSERT for blobs that ignores hashes already stored, or None if the
+        dialect has no ON CONFLICT support (callers filter existing first).
+        """
+        if dialect_name == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        elif dialect_name == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            return None
+        return dialect_insert(BlobDB.__table__).on_conflict_do_nothing(index_elements=['hash'])
+
+    def _session_insert(self, dialect_name: str):
+        """
+        INSERT for sessions that ignores IDs already stored, or None if the
+        dialect has no ON CONFLICT support (callers filter existing first).
+        """
+        if dialect_name == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        elif dialect_name == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            return None
+        return dialect_insert(SessionDB.__table__).on_conflict_do_nothing(index_elements=['id'])
+
+    def _project_select(self, session_ids: List[str]):
+        return select(SessionDB.id, SessionDB.project_name).where(SessionDB.id.in_(session_ids))
+
+    def _blob_select(self, hashes: List[str]):
+        return select(BlobDB.hash, BlobDB.content, BlobDB.codec).where(BlobDB.hash.in_(hashes))
+
+    def _body_select(self, call_ids: List[str]):
+        return select(LLMCallBodyDB).where(LLMCallBodyDB.call_id.in_(call_ids))
+
+    # =========================================================================
+    # PARTITIONS
+    # =========================================================================
+
+    def _missing_partitions(self, llm_calls: Iterable[LLMCall]) -> set:
+        """Months of these calls without an llm_calls partition yet (PostgreSQL)."""
+        if self._partition_months is None:
+            return set()
+        return months_of(llm_call.timestamp for llm_call in llm_calls) - self._partition_months
+
+    def _archives_for(
+        self,
+        start_time: Optional[datetime],
+        end_time: Optional[datetime],
+    ) -> Dict[datetime, str]:
+        """
+        Archived months (SQLite) that a read over [start_time, end_time]
+        attaches. Reads without a start_time only see the main database.
+        """
+        if self.archive_database is None or start_time is None:
+            return {}
+        
+        # Archives appear and disappear by rename/unlink in this directory
+        try:
+            version = os.stat(os.path.dirname(self.archive_database)).st_mtime_ns
+        except OSError:
+            return {}
+        if self._archive_cache[0] != version:
+            self._archive_cache = (version, find_archives(self.archive_database))
+        archives = self._archive_cache[1]
+        
+        months = overlapping_months(archives, start_time, end_time)
+        if len(months) > MAX_ATTACHED_ARCHIVES:
+            raise ValueError(
+                f"Query spans {len(months)} archived months; SQLite attaches at most "
+                f"{MAX_ATTACHED_ARCHIVES}. Narrow start_time/end_time."
+            )
+        return {month: archives[month] for month in months}
+
+    # =========================================================================
+    # QUERY BUILDING
+    # =========================================================================
+
+    def _call_filters(
+        self,
+        session_id: Optional[str] = None,
+        project_name: Optional[str] = None,
+        provider: Optional[ModelProvider] = None,
+        model_name: Optional[str] = None,
+        agent_name: Optional[str] = None,
+        operation: Optional[str] = None,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        success_only: Optional[bool] = None,
+        cache_hit: Optional[bool] = None,
+        cache_key: Optional[str] = None,
+        hallucination_flag: Optional[bool] = None,
+        min_judge_score: Optional[float] = None,
+        max_judge_score: Optional[float] = None,
+        routed_model: Optional[str] = None,
+        prompt_hash: Optional[str] = None,
+        experiment_id: Optional[str] = None,
+        has_cache: Optional[bool] = None,
+        has_routing: Optional[bool] = None,
+        has_quality_eval: Optional[bool] = None,
+    ) -> List[Any]:
+        """Build WHERE clauses on llm_calls for the common call filters."""
+        conditions = []
+        
+        # Session filter
+        if session_id:
+            conditions.append(LLMCallDB.session_id == session_id)
+        
+        # Project name filter (denormalized from the session at insert)
+        if project_name:
+            conditions.append(LLMCallDB.project_name == project_name)
+        
+        # Basic filters
+        if provider:
+            conditions.append(LLMCallDB.provider == provider.value)
+        if model_name:
+            conditions.append(LLMCallDB.model_name == model_name)
+        if agent_name:
+            conditions.append(LLMCallDB.agent_name == agent_name)
+        if operation:
+            conditions.append(LLMCallDB.operation == operation)
+        
+        # Time filters: [start_time, end_time), the same range the rollup
+        # tables cover (see _rollup_filters)
+        if start_time:
+            conditions.append(LLMCallDB.timestamp >= start_time)
+        if end_time:
+            conditions.append(LLMCallDB.timestamp < end_time)
+        
+        # Success filter
+        if success_only is True:
+            conditions.append(LLMCallDB.success == True)
+        elif success_only is False:
+            conditions.append(LLMCallDB.success == False)
+        
+        # Promoted metadata filters (indexed columns, no JSON extraction)
+        if cache_hit is not None:
+            conditions.append(LLMCallDB.cache_hit == cache_hit)
+        if cache_key:
+            conditions.append(LLMCallDB.cache_key == cache_key)
+        if hallucination_flag is not None:
+            conditions.append(LLMCallDB.hallucination_flag == hallucination_flag)
+        if min_judge_score is not None:
+            conditions.append(LLMCallDB.judge_score >= min_judge_score)
+        if max_judge_score is not None:
+            conditions.append(LLMCallDB.judge_score <= max_judge_score)
+        if routed_model:
+            conditions.append(LLMCallDB.routed_model == routed_model)
+        if prompt_hash:
+            conditions.append(LLMCallDB.prompt_hash == prompt_hash)
+        if experiment_id:
+            conditions.append(LLMCallDB.experiment_id == experiment_id)
+        
+        # Metadata presence (the promoted column is NULL exactly when the
+        # metadata is absent)
+        for present, column in (
+            (has_cache, LLMCallDB.cache_hit),
+            (has_routing, LLMCallDB.routed_model),
+            (has_quality_eval, LLMCallDB.hallucination_flag),
+        ):
+            if present is True:
+                conditions.append(column.isnot(None))
+            elif present is False:
+                conditions.append(column.is_(None))
+        
+        return conditions
+
+    def _projection_select(
+        self,
+        columns: Sequence[str],
+        limit: Optional[int],
+        filters: Dict[str, Any],
+    ):
+        """SELECT of the given llm_calls columns, newest first."""
+        table = LLMCallDB.__table__
+        unknown = [column for column in columns if column not in table.c]
+        if not columns or unknown:
+            raise ValueError(
+                f"Unknown llm_calls column(s): {', '.join(unknown) or '(none given)'}. "
+                f"Available: {', '.join(table.c.keys())}"
+            )
+        
+        stmt = (
+            select(*[table.c[column] for column in columns])
+            .where(*self._call_filters(**filters))
+            .order_by(LLMCallDB.timestamp.desc())
+        )
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        return stmt
+
+    def _keyset_select(
+        self,
+        batch_size: int,
+        after: Optional[tuple],
+        newest_first: bool,
+        filters: Dict[str, Any],
+    ):
+        """
+        One page of `iter_llm_calls`: calls ordered by (timestamp, id) that
+        come after the `after` = (timestamp, id) of the previous page.
+        
+        The id tiebreak keeps pages exact when many calls share a timestamp,
+        and seeking past the last key costs the same on page 1 and page 10,000
+        (OFFSET re-reads every skipped row).
+        """
+        stmt = select(LLMCallDB).where(*self._call_filters(**filters))
+        if after is not None:
+            stmt = stmt.where(keyset_after(after, descending=newest_first))
+        
+        if newest_first:
+            stmt = stmt.order_by(LLMCallDB.timestamp.desc(), LLMCallDB.id.desc())
+        else:
+            stmt = stmt.order_by(LLMCallDB.timestamp, LLMCallDB.id)
+        return stmt.limit(batch_size).execution_options(yield_per=batch_size)
+
+    def _aggregate_select(
+        self,
+        group_by: Sequence[str],
+        metrics: Sequence[str],
+        bucket: Optional[str],
+        filters: Dict[str, Any],
+        dialect_name: str,
+    ):
+        """
+        GROUP BY statement for aggregate().
+        
+        Returns:
+            (statement, result keys) - keys are group_by, then "bucket" if
+            requested, then metrics
+        """
+        unknown = [name for name in group_by if name not in AGGREGATE_DIMENSIONS]
+        if unknown:
+            raise ValueError(
+                f"Can't group by: {', '.join(unknown)}. Available: {', '.join(AGGREGATE_DIMENSIONS)}"
+            )
+        unknown = [name for name in metrics if name not in AGGREGATE_METRICS]
+        if not metrics or unknown:
+            raise ValueError(
+                f"Unknown metric(s): {', '.join(unknown) or '(none given)'}. "
+                f"Available: {', '.join(AGGREGATE_METRICS)}"
+            )
+        
+        groups = [getattr(LLMCallDB, name).label(name) for name in group_by]
+        if bucket:
+            groups.append(time_bucket(bucket, dialect_name).label('bucket'))
+        
+        stmt = (
+            select(*groups, *[AGGREGATE_METRICS[name].label(name) for name in metrics])
+            .where(*self._call_filters(**filters))
+        )
+        if groups:
+            stmt = stmt.group_by(*groups).order_by(*groups)
+        
+        keys = list(group_by) + (['bucket'] if bucket else []) + list(metrics)
+        return stmt, keys
+
+    def _search_select(
+        self,
+        query: str,
+        limit: int,
+        filters: Dict[str, Any],
+        dialect_name: str,
+    ):
+        """
+        Full-text match for search_calls, best first.
+        
+        Rows are (LLMCallDB, score, snippet); a higher score is a better
+        match on both databases (negated BM25 on SQLite, ts_rank on
+        PostgreSQL). Snippets mark matched words with [brackets].
+        """
+        search = LLMCallSearchDB
+        if dialect_name == 'sqlite':
+            fts_name = literal_column(SEARCH_FTS_TABLE)
+            stmt = (
+                select(
+                    LLMCallDB,
+                    (-SEARCH_FTS.c.rank).label('score'),
+                    func.snippet(fts_name, -1, '[', ']', '...', 16).label('snippet'),
+                )
+                .select_from(SEARCH_FTS)
+                .join(search, search.id == SEARCH_FTS.c.rowid)
+                .join(LLMCallDB, LLMCallDB.id == search.call_id)
+                .where(fts_name.match(fts5_query(query)))
+                .order_by(SEARCH_FTS.c.rank)
+            )
+        elif dialect_name == 'postgresql':
+            config = literal_column(f"'{SEARCH_TEXT_CONFIG}'::regconfig")
+            tsquery = func.websearch_to_tsquery(config, query)
+            vector = literal_column(f"{search.__tablename__}.search_vector")
+            score = func.ts_rank(vector, tsquery)
+            document = func.concat_ws(' ', search.prompt, search.response, search.error)
+            stmt = (
+                select(
+                    LLMCallDB,
+                    score.label('score'),
+                    func.ts_headline(
+                        config, document, tsquery, 'StartSel=[, StopSel=], MaxFragments=1, MaxWords=20, MinWords=8'
+                    ).label('snippet'),
+                )
+                .select_from(search)
+                .join(LLMCallDB, LLMCallDB.id == search.call_id)
+                .where(vector.op('@@')(tsquery))
+                .order_by(score.desc())
+            )
+        else:
+            raise NotImplementedError(f"Full-text search isn't supported on {dialect_name}")
+        return stmt.where(*self._call_filters(**filters)).limit(limit)
+
+    def _rollup_select(
+        self,
+        group_by: Sequence[str],
+        metrics: Sequence[str],
+        bucket: Optional[str],
+        start_time: Optional[datetime],
+        end_time: Optional[datetime],
+        filters: Dict[str, Optional[str]],
+    ):
+        """
+        GROUP BY over the coarsest rollup table that answers the query.
+        
+        Returns:
+            (statement, result keys)
+        """
+        unknown = [name for name in group_by if name not in ROLLUP_DIMENSIONS]
+        if unknown:
+            raise ValueError(
+                f"Rollups can't group by: {', '.join(unknown)}. Available: {', '.join(ROLLUP_DIMENSIONS)}"
+            )
+        unknown = [
+            name for name in metrics
+            if name not in ROLLUP_SUM_METRICS and name not in ROLLUP_AVG_METRICS
+        ]
+        if not metrics or unknown:
+            raise ValueError(
+                f"Metric(s) not available from rollups: {', '.join(unknown) or '(none given)'}. "
+                f"Available: {', '.join(list(ROLLUP_SUM_METRICS) + list(ROLLUP_AVG_METRICS))}"
+            )
+        
+        granularity = self._rollup_granularity(bucket, start_time, end_time)
+        table = ROLLUP_TABLES[granularity].__table__
+        
+        def metric_expression(name):
+            if name in ROLLUP_SUM_METRICS:
+                return func.sum(table.c[ROLLUP_SUM_METRICS[name]])
+            numerator, denominator = ROLLUP_AVG_METRICS[name]
+            return (
+                cast(func.sum(table.c[ROLLUP_SUM_METRICS[numerator]]), Float)
+                / func.nullif(func.sum(table.c[ROLLUP_SUM_METRICS[denominator]]), 0)
+            )
+        
+        groups = [table.c[name].label(name) for name in group_by]
+        if bucket:
+            groups.append(table.c.bucket.label('bucket'))
+        
+        stmt = (
+            select(*groups, *[metric_expression(name).label(name) for name in metrics])
+            .where(*self._rollup_filters(granularity, start_time, end_time, filters))
+        )
+        if groups:
+            stmt = stmt.group_by(*groups).order_by(*groups)
+        
+        keys = list(group_by) + (['bucket'] if bucket else []) + list(metrics)
+        return stmt, keys
+
+    def _rollup_granularity(
+        self,
+        bucket: Optional[str],
+        start_time: Optional[datetime],
+        end_time: Optional[datetime],
+    ) -> str:
+        """Rollup table for a query: `bucket` if given, else the coarsest aligned one."""
+        if bucket:
+            if bucket not in ROLLUP_TABLES:
+                raise ValueError(f"Unknown bucket '{bucket}'. Expected one of: {', '.join(ROLLUP_TABLES)}")
+            return bucket
+        
+        # Coarsest table whose bucket edges line up with the range
+        return next(
+            (
+                name for name in reversed(list(ROLLUP_TABLES))
+                if all(t is None or floor_time(t, name) == t for t in (start_time, end_time))
+            ),
+            'minute',
+        )
+
+    def _rollup_filters(
+        self,
+        granularity: str,
+        start_time: Optional[datetime],
+        end_time: Optional[datetime],
+        filters: Dict[str, Optional[str]],
+    ) -> List[Any]:
+        """WHERE clauses selecting buckets overlapping [start_time, end_time)."""
+        table = ROLLUP_TABLES[granularity].__table__
+        conditions = []
+        if start_time:
+            conditions.append(table.c.bucket >= floor_time(start_time, granularity))
+        if end_time:
+            conditions.append(table.c.bucket < end_time)
+        for name, value in filters.items():
+            if value is not None:
+                conditions.append(table.c[name] == value)
+        return conditions
+
+    def _sketch_select(
+        self,
+        group_by: Sequence[str],
+        bucket: Optional[str],
+        start_time: Optional[datetime],
+        end_time: Optional[datetime],
+        filters: Dict[str, Optional[str]],
+    ):
+        """
+        Rollup rows (group values plus latency sketch) to merge per group.
+        
+        Returns:
+            (statement, group keys)
+        """
+        unknown = [name for name in group_by if name not in ROLLUP_DIMENSIONS]
+        if unknown:
+            raise ValueError(
+                f"Rollups can't group by: {', '.join(unknown)}. Available: {', '.join(ROLLUP_DIMENSIONS)}"
+            )
+        
+        granularity = self._rollup_granularity(bucket, start_time, end_time)
+        table = ROLLUP_TABLES[granularity].__table__
+        groups = [table.c[name] for name in group_by]
+        if bucket:
+            groups.append(table.c.bucket)
+        
+        stmt = (
+            select(*groups, table.c.latency_sketch)
+            .where(*self._rollup_filters(granularity, start_time, end_time, filters))
+        )
+        if groups:
+            stmt = stmt.order_by(*groups)
+        
+        keys = list(group_by) + (['bucket'] if bucket else [])
+        return stmt, keys
+
+    def _sketch_rows(
+        self,
+        keys: List[str],
+        rows: Iterable[Any],
+        quantiles: Sequence[float],
+    ) -> List[Dict[str, Any]]:
+        """Merge the sketches of each group and read off the quantiles."""
+        merged: Dict[tuple, DDSketch] = {}
+        for *group, stored in rows:
+            sketch = merged.setdefault(tuple(group), DDSketch())
+            if stored:
+                sketch.merge(DDSketch.from_dict(stored))
+        if not keys and not merged:
+            merged[()] = DDSketch()
+        
+        results = []
+        for group, sketch in merged.items():
+            result = dict(zip(keys, group))
+            for key in ROLLUP_DIMENSIONS:
+                if key in result:
+                    result[key] = result[key] or None
+            if 'bucket' in result:
+                result['bucket'] = parse_bucket(result['bucket'])
+            result['count'] = sketch.count
+            result.update(zip(map(quantile_key, quantiles), sketch.quantiles(quantiles)))
+            results.append(result)
+        return results
+
+    def _session_sketch_quantiles(
+        self,
+        stored: Optional[Dict[str, Any]],
+        quantiles: Sequence[float],
+    ) -> Dict[str, Any]:
+        sketch = DDSketch.from_dict(stored)
+        return {
+            'count': sketch.count,
+            **dict(zip(map(quantile_key, quantiles), sketch.quantiles(quantiles))),
+        }
+
+    def _rollup_rows(self, keys: List[str], rows: Iterable[Any], metrics: Sequence[str]) -> List[Dict[str, Any]]:
+        results = []
+        for row in rows:
+            result = dict(zip(keys, row))
+            for key in ROLLUP_DIMENSIONS:
+                if key in result:
+                    result[key] = result[key] or None
+            for metric in metrics:
+                if metric in ROLLUP_SUM_METRICS and result[metric] is None:
+                    result[metric] = 0
+            results.append(result)
+        return results
+
+    def _aggregate_rows(self, keys: List[str], rows: Iterable[Any], bucket: Optional[str]) -> List[Dict[str, Any]]:
+        results = []
+        for row in rows:
+            result = dict(zip(keys, row))
+            if bucket:
+                result['bucket'] = parse_bucket(result['bucket'])
+            results.append(result)
+        return results
+
+    def _session_delta_update(self, session_id: str, delta: Dict[str, float]):
+        """UPDATE statement that increments a session's counters in SQL."""
+        values = {
+            column: getattr(SessionDB, column) + value
+            for column, value in delta.items()
+        }
+        return update(SessionDB).where(SessionDB.id == session_id).values(**values)
+
+    def _session_end_update(self, session: Session):
+        """UPDATE statement that writes only end-of-session columns."""
+        return (
+            update(SessionDB)
+            .where(SessionDB.id == session.id)
+            .values(
+                end_time=session.end_time,
+                success=session.success,
+                error=session.error,
+                avg_quality_score=session.avg_quality_score,
+            )
+        )
+
+
+class Storage(BaseStorage):
+    def __init__(
+        self,
+        database_url: Optional[str] = None,
+        compression: Optional[str] = DEFAULT_COMPRESSION,
+        rollups: bool = True,
+        read_url: Optional[str] = None,
+        read_only: bool = False,
+        partitioned: bool = False,
+        search_index: bool = True,
+        **engine_kwargs,
+    ):
+        """
+        Args:
+            database_url: SQLAlchemy URL (default: $DATABASE_URL or sqlite:///observatory.db)
+            compression: Codec for large bodies and JSON columns - "auto",
+                "zlib", "zstd" or None. Rows are readable whatever codec
+                wrote them.
+            rollups: Update the minute/hour/day rollup tables as calls are
+                inserted. If disabled, run `observatory rebuild-rollups`
+                periodically instead.
+            read_url: URL that all read methods go through, opened read-only -
+                a Postgres replica, a SQLite snapshot
+                ("sqlite:///file:snap.db?immutable=1&uri=true"), or the
+                same SQLite file to give reads their own connection pool.
+                Replicas may lag behind the writes made through this instance.
+            read_only: Never write: open `database_url` read-only and skip
+                schema creation (the schema must already exist)
+            partitioned: Create llm_calls partitioned by month when this
+                creates a PostgreSQL database. Partitioned databases are
+                detected either way; SQLite months are archived to files by
+                the retention job (see observatory/partitions.py).
+            search_index: Index prompt/response/error text for
+                `search_calls` as calls are inserted. If disabled, run
+                `observatory rebuild-search-index` to catch up.
+            **engine_kwargs: Passed to `create_storage_engine` - e.g.
+                pragmas={"synchronous": "FULL"}, pool_size=10
+        """
+        self.compression = resolve_codec(compression)
+        self.rollups = rollups
+        self.read_only = read_only
+        self.search_index = search_index
+        
+        if database_url is None:
+            database_url = os.getenv("DATABASE_URL", "sqlite:///observatory.db")
+        
+        self.engine = create_storage_engine(database_url, read_only=read_only, **engine_kwargs)
+        if not read_only:
+            with self.engine.begin() as connection:
+                create_schema(connection, partitioned=partitioned)
+        self.SessionLocal = sessionmaker(bind=self.engine)
+        
+        with self.engine.connect() as connection:
+            if is_partitioned(connection):
+                self._partition_months = set(list_partitions(connection))
+        if self._partition_months is not None and not read_only:
+            # This month and the next up front, so ingest rarely needs DDL
+            current = month_start(datetime.utcnow())
+            self._create_partitions({current, next_month(current)} - self._partition_months)
+        self.archive_database = sqlite_database_path(self.engine.url)
+        
+        if read_url:
+            self.read_engine = create_storage_engine(read_url, read_only=True, **engine_kwargs)
+        else:
+            self.read_engine = self.engine
+        self.ReadSessionLocal = sessionmaker(bind=self.read_engine)
+        self._known_blobs = set()
+
+    @contextmanager
+    def read_session(
+        self,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+    ) -> Iterator[DBSession]:
+        """
+        Session on the read engine (see `read_url`); never commits.
+        
+        On SQLite, the archived months overlapping [start_time, end_time]
+        are attached for the duration, so llm_calls and llm_call_bodies
+        include their rows.
+        """
+        db: DBSession = self.ReadSessionLocal()
+        archives = self._archives_for(start_time, end_time)
+        try:
+            if archives:
+                attach_archives(db.connection(), archives, ARCHIVED_TABLE_DEFS)
+            yield db
+        finally:
+            if archives:
+                try:
+                    detach_archives(db.connection(), len(archives), ARCHIVED_TABLE_DEFS)
+                except Exception:
+                    # Never hand a connection with the views back to the pool
+                    db.connection().invalidate()
+            db.close()
+
+    def _create_partitions(self, months: set):
+        """Create llm_calls partitions for `months` in their own transaction."""
+        if not months:
+            return
+        with self.engine.begin() as connection:
+            create_partitions(connection, months)
+        self._partition_months.update(months)
+
+    # =========================================================================
+    # SESSION CRUD
     # =========================================================================
 
     def save_session(self, session: Session):
@@ -280,24 +2281,56 @@ class Storage:
             db.close()
 
     def update_session(self, session: Session):
+        """
+        Overwrite every column of a session with the given snapshot.
+
+        Prefer `record_llm_call` / `finalize_session` while a session is live:
+        they only touch the columns that changed and don't clobber counters
+        written concurrently by other workers.
+        """
         self.save_session(session)
 
-    def get_session(self, session_id: str) -> Optional[Session]:
+    def finalize_session(self, session: Session):
+        """
+        Persist end-of-session state without touching the call counters.
+
+        Writes end_time, success, error and avg_quality_score. If the session
+        row doesn't exist yet it is inserted with zeroed counters (its calls
+        add to them when they are written).
+        """
         db: DBSession = self.SessionLocal()
+        try:
+            updated = db.execute(self._session_end_update(session)).rowcount
+            if not updated:
+                self._insert_sessions(db, [session])
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def get_session(self, session_id: str) -> Optional[Session]:
+        db: DBSession = self.ReadSessionLocal()
         try:
             session_db = db.query(SessionDB).filter(SessionDB.id == session_id).first()
             if not session_db:
                 return None
             
             session = self._from_session_db(session_db)
-            
-            # Load LLM calls
-            llm_calls_db = db.query(LLMCallDB).filter(LLMCallDB.session_id == session_id).all()
-            session.llm_calls = [self._from_llm_call_db(call) for call in llm_calls_db]
-            
-            return session
         finally:
             db.close()
+        
+        # Load LLM calls (from archived months too, if the session is that old)
+        with self.read_session(session.start_time, session.end_time) as db:
+            llm_calls_db = db.query(LLMCallDB).filter(LLMCallDB.session_id == session_id).all()
+            bodies = self._load_bodies(db, llm_calls_db)
+            blobs = self._load_blobs(db, bodies.values())
+            session.llm_calls = [
+                self._from_llm_call_db(call, bodies.get(call.id), blobs) for call in llm_calls_db
+            ]
+        
+        return session
 
     def get_sessions(
         self,
@@ -306,7 +2339,7 @@ class Storage:
         end_time: Optional[datetime] = None,
         limit: int = 100,
     ) -> List[Session]:
-        db: DBSession = self.SessionLocal()
+        db: DBSession = self.ReadSessionLocal()
         try:
             query = db.query(SessionDB)
             
@@ -328,14 +2361,330 @@ class Storage:
     # =========================================================================
 
     def save_llm_call(self, llm_call: LLMCall):
+        """
+        Upsert a single call (no session counters, no rollups).
+        
+        Use `record_llm_call` for new calls; after overwriting existing calls
+        this way, `rebuild_rollups` for their time range.
+        """
+        self._create_partitions(self._missing_partitions([llm_call]))
+        db: DBSession = self.SessionLocal()
+        try:
+            projects = self._load_projects(db, [llm_call])
+            rows, body_rows, blobs = self._to_llm_call_rows([llm_call], projects)
+            written = self._write_blobs(db, blobs)
+            db.merge(LLMCallDB(**rows[0]))
+            for body_row in body_rows:
+                db.merge(LLMCallBodyDB(**body_row))
+            if self.search_index:
+                db.execute(delete(LLMCallSearchDB).where(LLMCallSearchDB.call_id == llm_call.id))
+                for row in self._search_rows([llm_call]):
+                    db.execute(insert(LLMCallSearchDB.__table__), row)
+            db.commit()
+            self._remember_blobs(written)
+        finally:
+            db.close()
+
+    def record_llm_call(self, llm_call: LLMCall, session: Optional[Session] = None):
+        """
+        Insert an LLM call and bump its session counters in one transaction.
+        
+        Counters are incremented in SQL (`total_cost = total_cost + :cost`)
+        rather than rewritten from an in-memory snapshot, so concurrent
+        writers sharing a session never lose each other's updates.
+        
+        Args:
+            llm_call: The call to insert
+            session: Session to insert (zeroed counters) if its row doesn't
+                exist yet, e.g. after its start was spilled during an outage
+        """
         db: DBSession = self.SessionLocal()
         try:
-            llm_call_db = self._to_llm_call_db(llm_call)
-            db.merge(llm_call_db)
+            projects = self._load_projects(db, [llm_call], [session] if session else [])
+            written = self._insert_llm_calls(db, [llm_call], projects)
+            deltas = merge_session_deltas([llm_call])
+            missing = self._apply_session_deltas(db, deltas)
+            if missing and session is not None:
+                self._insert_sessions(db, [session])
+                self._apply_session_deltas(db, {session.id: deltas[session.id]})
+            self._apply_rollups(db, [llm_call], projects)
+            self._merge_sketches(db, [llm_call], projects)
             db.commit()
+            self._remember_blobs(written)
+        except Exception:
+            db.rollback()
+            raise
         finally:
             db.close()
 
+    def save_llm_calls(
+        self,
+        llm_calls: List[LLMCall],
+        chunk_size: int = DEFAULT_BULK_CHUNK_SIZE,
+    ) -> int:
+        """
+        Bulk insert LLM calls.
+        
+        Rows are inserted with a single Core executemany per chunk, and each
+        chunk commits together with one aggregated counter update per session.
+        
+        Args:
+            llm_calls: Calls to insert
+            chunk_size: Number of calls per transaction
+        
+        Returns:
+            Number of calls inserted
+        """
+        chunk_size = max(1, chunk_size)
+        for offset in range(0, len(llm_calls), chunk_size):
+            chunk = llm_calls[offset:offset + chunk_size]
+            db: DBSession = self.SessionLocal()
+            try:
+                projects = self._load_projects(db, chunk)
+                written = self._insert_llm_calls(db, chunk, projects)
+                self._apply_session_deltas(db, merge_session_deltas(chunk))
+                self._apply_rollups(db, chunk, projects)
+                self._merge_sketches(db, chunk, projects)
+                db.commit()
+                self._remember_blobs(written)
+            except Exception:
+                db.rollback()
+                raise
+            finally:
+                db.close()
+        return len(llm_calls)
+
+    def _insert_llm_calls(
+        self,
+        db: DBSession,
+        llm_calls: List[LLMCall],
+        projects: Dict[str, Optional[str]],
+    ) -> List[str]:
+        """
+        Insert call rows with one executemany, bypassing the ORM unit of work.
+        
+        Returns:
+            Blob hashes written (pass to `_remember_blobs` after commit)
+        """
+        if not llm_calls:
+            return []
+        self._create_partitions(self._missing_partitions(llm_calls))
+        rows, body_rows, blobs = self._to_llm_call_rows(llm_calls, projects)
+        written = self._write_blobs(db, blobs)
+        db.execute(insert(LLMCallDB.__table__), rows)
+        if body_rows:
+            db.execute(insert(LLMCallBodyDB.__table__), body_rows)
+        search_rows = self._search_rows(llm_calls)
+        if search_rows:
+            db.execute(insert(LLMCallSearchDB.__table__), search_rows)
+        return written
+
+    def _insert_sessions(self, db: DBSession, sessions: List[Session]):
+        """
+        Insert rows for sessions that aren't stored yet; existing rows are
+        left alone. Session snapshots never overwrite counters.
+        """
+        rows = [self._new_session_row(session) for session in sessions]
+        if not rows:
+            return
+        
+        stmt = self._session_insert(db.get_bind().dialect.name)
+        if stmt is None:
+            ids = [row['id'] for row in rows]
+            existing = set(db.execute(select(SessionDB.id).where(SessionDB.id.in_(ids))).scalars())
+            rows = [row for row in rows if row['id'] not in existing]
+            stmt = insert(SessionDB.__table__)
+        
+        if rows:
+            db.execute(stmt, rows)
+
+    def _insert_placeholder_sessions(
+        self,
+        db: DBSession,
+        llm_calls: List[LLMCall],
+        session_ids: List[str],
+        projects: Dict[str, Optional[str]],
+    ):
+        """
+        Insert rows for sessions whose calls arrived first, so their counters
+        aren't lost. The project stays empty (and NULL on the calls) unless
+        known from the batch; `_fill_placeholder_sessions` completes the row
+        later.
+        """
+        start_times: Dict[str, datetime] = {}
+        for llm_call in llm_calls:
+            if llm_call.session_id in session_ids:
+                known = start_times.get(llm_call.session_id)
+                if known is None or llm_call.timestamp < known:
+                    start_times[llm_call.session_id] = llm_call.timestamp
+        
+        placeholders = [
+            Session.model_construct(
+                id=session_id,
+                project_name=projects.get(session_id) or PLACEHOLDER_PROJECT,
+                start_time=start_times[session_id],
+                metadata={},
+            )
+            for session_id in session_ids
+        ]
+        self._insert_sessions(db, placeholders)
+        unknown = sum(1 for session in placeholders if session.project_name == PLACEHOLDER_PROJECT)
+        if unknown:
+            print(
+                f"⚠️ Observatory stored calls of {unknown} sessions before the sessions "
+                f"themselves; their project is filled in when the session arrives"
+            )
+
+    def _fill_placeholder_sessions(self, db: DBSession, sessions: List[Session]):
+        """
+        Complete placeholder rows (see `_insert_placeholder_sessions`) from
+        session snapshots, and backfill the project on their calls.
+        """
+        snapshots = {session.id: session for session in sessions}
+        if not snapshots:
+            return
+        
+        placeholder_ids = list(db.execute(
+            select(SessionDB.id).where(
+                SessionDB.id.in_(list(snapshots)),
+                SessionDB.project_name == PLACEHOLDER_PROJECT,
+            )
+        ).scalars())
+        for session_id in placeholder_ids:
+            session = snapshots[session_id]
+            db.execute(
+                update(SessionDB)
+                .where(SessionDB.id == session_id)
+                .values(
+                    project_name=session.project_name,
+                    start_time=session.start_time,
+                    operation_type=session.operation_type,
+                    meta_data=session.metadata,
+                )
+            )
+            db.execute(
+                update(LLMCallDB)
+                .where(LLMCallDB.session_id == session_id, LLMCallDB.project_name.is_(None))
+                .values(project_name=session.project_name)
+            )
+
+    def _write_blobs(self, db: DBSession, blobs: Dict[str, bytes]) -> List[str]:
+        """Insert blob bodies that aren't stored yet."""
+        rows = self._new_blob_rows(blobs)
+        if not rows:
+            return []
+        
+        stmt = self._blob_insert(db.get_bind().dialect.name)
+        if stmt is None:
+            existing = set()
+            hashes = [row['hash'] for row in rows]
+            for offset in range(0, len(hashes), 500):
+                existing.update(db.execute(
+                    select(BlobDB.hash).where(BlobDB.hash.in_(hashes[offset:offset + 500]))
+                ).scalars())
+            rows = [row for row in rows if row['hash'] not in existing]
+            stmt = insert(BlobDB.__table__)
+        
+        if rows:
+            db.execute(stmt, rows)
+        return [row['hash'] for row in rows]
+
+    def _load_bodies(self, db: DBSession, llm_calls_db: List[LLMCallDB]) -> Dict[str, LLMCallBodyDB]:
+        """Fetch the llm_call_bodies rows of a result set, keyed by call ID."""
+        call_ids = [call.id for call in llm_calls_db]
+        bodies: Dict[str, LLMCallBodyDB] = {}
+        for offset in range(0, len(call_ids), 500):
+            for body_db in db.execute(self._body_select(call_ids[offset:offset + 500])).scalars():
+                bodies[body_db.call_id] = body_db
+        return bodies
+
+    def _load_blobs(self, db: DBSession, body_dbs: Iterable[LLMCallBodyDB]) -> Dict[str, str]:
+        """Fetch the blobs referenced by a set of body rows in a few IN queries."""
+        refs = blob_refs(body_dbs)
+        blobs: Dict[str, str] = {}
+        for offset in range(0, len(refs), 500):
+            for digest, content, codec in db.execute(self._blob_select(refs[offset:offset + 500])):
+                blobs[digest] = decompress(content, codec).decode('utf-8')
+        return blobs
+
+    def _load_projects(
+        self,
+        db: DBSession,
+        llm_calls: List[LLMCall],
+        sessions: Iterable[Session] = (),
+    ) -> Dict[str, Optional[str]]:
+        """session_id -> project_name for the calls, from session snapshots or the sessions table."""
+        projects = {session.id: session.project_name for session in sessions}
+        missing = list({call.session_id for call in llm_calls} - set(projects))
+        for offset in range(0, len(missing), 500):
+            projects.update(db.execute(self._project_select(missing[offset:offset + 500])).all())
+        return projects
+
+    def _apply_rollups(
+        self,
+        db: DBSession,
+        llm_calls: List[LLMCall],
+        projects: Dict[str, Optional[str]],
+    ):
+        """Add the calls to the minute/hour/day rollups (one upsert per bucket key)."""
+        if not self.rollups or not llm_calls:
+            return
+        
+        dialect_name = db.get_bind().dialect.name
+        for granularity, rows in merge_rollup_deltas(llm_calls, projects).items():
+            stmt = rollup_upsert(granularity, dialect_name)
+            if stmt is not None:
+                db.execute(stmt, rows)
+                continue
+            for row in rows:
+                if not db.execute(rollup_increment(granularity, row)).rowcount:
+                    db.execute(insert(ROLLUP_TABLES[granularity].__table__), [row])
+
+    def _merge_sketches(self, db: DBSession, llm_calls: List[LLMCall], projects: Dict[str, Optional[str]]):
+        """
+        Fold the calls' latencies into the session and rollup sketches, in
+        the transaction of their counter and rollup updates.
+        
+        The deltas of all calls and sketch tables are merged in memory, then
+        each table gets one SELECT of the touched rows and one executemany
+        UPDATE. The rows' earlier writes in this transaction hold their locks
+        until commit, so the read-modify-write can't interleave with another
+        writer.
+        """
+        self._write_sketches(db, merge_call_sketches(llm_calls, projects, self.rollups))
+
+    def _write_sketches(self, db: DBSession, deltas: Dict[str, Dict[tuple, DDSketch]]):
+        """Read the stored sketches of the touched rows, merge, and write them back."""
+        for kind, sketches in deltas.items():
+            if not sketches:
+                continue
+            table, key_columns = sketch_table(kind)
+            keys = list(sketches)
+            params = []
+            for offset in range(0, len(keys), SKETCH_LOOKUP_CHUNK):
+                stored = db.execute(sketch_select(table, key_columns, keys[offset:offset + SKETCH_LOOKUP_CHUNK])).all()
+                params.extend(merged_sketch_params(key_columns, stored, sketches))
+            if params:
+                db.execute(sketch_update(table, key_columns), params)
+
+    def _apply_session_deltas(
+        self,
+        db: DBSession,
+        deltas: Dict[str, Dict[str, float]],
+    ) -> List[str]:
+        """
+        Apply coalesced counter deltas, one UPDATE per session.
+        
+        Returns:
+            IDs of sessions that had no row to update
+        """
+        missing = []
+        for session_id, delta in deltas.items():
+            updated = db.execute(self._session_delta_update(session_id, delta)).rowcount
+            if not updated:
+                missing.append(session_id)
+        return missing
+
     def get_llm_calls(
         self,
         session_id: Optional[str] = None,
@@ -347,64 +2696,519 @@ class Storage:
         start_time: Optional[datetime] = None,
         end_time: Optional[datetime] = None,
         success_only: Optional[bool] = None,
+        cache_hit: Optional[bool] = None,
+        cache_key: Optional[str] = None,
+        hallucination_flag: Optional[bool] = None,
+        min_judge_score: Optional[float] = None,
+        max_judge_score: Optional[float] = None,
+        routed_model: Optional[str] = None,
+        prompt_hash: Optional[str] = None,
+        experiment_id: Optional[str] = None,
+        has_cache: Optional[bool] = None,
+        has_routing: Optional[bool] = None,
+        has_quality_eval: Optional[bool] = None,
         limit: int = 1000,
+        include_bodies: bool = True,
     ) -> List[LLMCall]:
         """
         Get LLM calls with optional filters.
         
         Args:
             session_id: Filter by session ID
-            project_name: Filter by project name (requires join with sessions)
+            project_name: Filter by project name
             provider: Filter by model provider
             model_name: Filter by model name
             agent_name: Filter by agent name
             operation: Filter by operation name
             start_time: Filter calls on or after this time
-            end_time: Filter calls on or before this time
+            end_time: Filter calls before this time
             success_only: If True, only return successful calls
+            cache_hit: Filter by cache hit (True) or miss (False)
+            cache_key: Filter by cache key
+            hallucination_flag: Filter by the judge's hallucination flag
+            min_judge_score / max_judge_score: Judge score range
+            routed_model: Filter by the router's chosen model
+            prompt_hash: Filter by prompt hash
+            experiment_id: Filter by prompt A/B experiment
+            has_cache / has_routing / has_quality_eval: Only calls with (True)
+                or without (False) cache metadata / a routing decision /
+                a quality evaluation
             limit: Maximum number of calls to return
+            include_bodies: Load prompt/response text, prompt_breakdown and
+                metadata from llm_call_bodies. Pass False for aggregations
+                that only need tokens, cost, latency and dimensions.
         
         Returns:
             List of LLMCall objects matching the filters
         """
-        db: DBSession = self.SessionLocal()
-        try:
-            query = db.query(LLMCallDB)
-            
-            # Session filter
-            if session_id:
-                query = query.filter(LLMCallDB.session_id == session_id)
-            
-            # Project name filter (requires join with sessions)
-            if project_name:
-                query = query.join(SessionDB, LLMCallDB.session_id == SessionDB.id)
-                query = query.filter(SessionDB.project_name == project_name)
+        with self.read_session(start_time, end_time) as db:
+            stmt = (
+                select(LLMCallDB)
+                .where(*self._call_filters(
+                    session_id=session_id,
+                    project_name=project_name,
+                    provider=provider,
+                    model_name=model_name,
+                    agent_name=agent_name,
+                    operation=operation,
+                    start_time=start_time,
+                    end_time=end_time,
+                    success_only=success_only,
+                    cache_hit=cache_hit,
+                    cache_key=cache_key,
+                    hallucination_flag=hallucination_flag,
+                    min_judge_score=min_judge_score,
+                    max_judge_score=max_judge_score,
+                    routed_model=routed_model,
+                    prompt_hash=prompt_hash,
+                    experiment_id=experiment_id,
+                    has_cache=has_cache,
+                    has_routing=has_routing,
+                    has_quality_eval=has_quality_eval,
+                ))
+                .order_by(LLMCallDB.timestamp.desc())
+                .limit(limit)
+            )
             
-            # Basic filters
-            if provider:
-                query = query.filter(LLMCallDB.provider == provider.value)
-            if model_name:
-                query = query.filter(LLMCallDB.model_name == model_name)
-            if agent_name:
-                query = query.filter(LLMCallDB.agent_name == agent_name)
-            if operation:
-                query = query.filter(LLMCallDB.operation == operation)
+            llm_calls_db = db.execute(stmt).scalars().all()
+            if not include_bodies:
+                return [self._from_llm_call_db(c) for c in llm_calls_db]
             
-            # Time filters
-            if start_time:
-                query = query.filter(LLMCallDB.timestamp >= start_time)
-            if end_time:
-                query = query.filter(LLMCallDB.timestamp <= end_time)
+            bodies = self._load_bodies(db, llm_calls_db)
+            blobs = self._load_blobs(db, bodies.values())
+            return [self._from_llm_call_db(c, bodies.get(c.id), blobs) for c in llm_calls_db]
+
+    def iter_llm_calls(
+        self,
+        batch_size: int = 1000,
+        include_bodies: bool = True,
+        newest_first: bool = False,
+        **filters,
+    ) -> Iterator[LLMCall]:
+        """
+        Stream every matching LLM call, oldest first, in constant memory.
+        
+        Unlike `get_llm_calls` there is no limit: calls are read in pages of
+        `batch_size` using keyset pagination on (timestamp, id), each page in
+        its own short read (so a long export never holds a transaction open
+        against writers) and streamed from the cursor with yield_per. Calls
+        recorded while iterating are picked up if they sort after the current
+        position.
+        
+        Args:
+            batch_size: Calls per page
+            include_bodies: Load prompt/response bodies (one extra query per page)
+            newest_first: Iterate from the newest call backwards
+            **filters: Any `get_llm_calls` filter (project_name, start_time, ...)
+        
+        Yields:
+            LLMCall models
+        
+        Example:
+            >>> with open("calls.jsonl", "w") as f:
+            ...     for call in storage.iter_llm_calls(project_name="My App"):
+            ...         f.write(call.model_dump_json() + "\n")
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        
+        after = None
+        while True:
+            stmt = self._keyset_select(batch_size, after, newest_first, filters)
+            with self.read_session(filters.get('start_time'), filters.get('end_time')) as db:
+                llm_calls_db = db.execute(stmt).scalars().all()
+                if include_bodies:
+                    bodies = self._load_bodies(db, llm_calls_db)
+                    blobs = self._load_blobs(db, bodies.values())
+                    page = [self._from_llm_call_db(c, bodies.get(c.id), blobs) for c in llm_calls_db]
+                else:
+                    page = [self._from_llm_call_db(c) for c in llm_calls_db]
             
-            # Success filter
-            if success_only is True:
-                query = query.filter(LLMCallDB.success == True)
-            elif success_only is False:
-                query = query.filter(LLMCallDB.success == False)
+            yield from page
+            if len(llm_calls_db) < batch_size:
+                return
+            after = (llm_calls_db[-1].timestamp, llm_calls_db[-1].id)
+
+    def query_calls(
+        self,
+        columns: Sequence[str],
+        limit: Optional[int] = None,
+        columnar: bool = False,
+        **filters,
+    ) -> Union[List[Any], Dict[str, List[Any]]]:
+        """
+        Fetch selected llm_calls columns straight from SQL.
+        
+        No bodies are read and no LLMCall models are built, which makes this
+        the cheap path for charts and aggregations. JSON columns come back as
+        plain dicts, provider/agent_role as their string values.
+        
+        Args:
+            columns: llm_calls column names, e.g. ["timestamp", "total_cost"]
+            limit: Maximum number of calls (newest first); None for all
+            columnar: Return {column: [values...]} instead of rows
+            **filters: Any `get_llm_calls` filter (project_name, start_time, ...)
+        
+        Returns:
+            List of row tuples in `columns` order, or a dict of column lists
+        
+        Example:
+            >>> data = storage.query_calls(
+            ...     ["timestamp", "total_cost", "latency_ms"],
+            ...     project_name="My App", columnar=True,
+            ... )
+            >>> sum(data["total_cost"])
+        """
+        stmt = self._projection_select(columns, limit, filters)
+        with self.read_session(filters.get('start_time'), filters.get('end_time')) as db:
+            rows = db.execute(stmt).all()
+        return to_columnar(columns, rows) if columnar else rows
+
+    def aggregate(
+        self,
+        group_by: Sequence[str] = (),
+        metrics: Sequence[str] = ('count', 'sum_cost'),
+        bucket: Optional[str] = None,
+        **filters,
+    ) -> List[Dict[str, Any]]:
+        """
+        Aggregate calls in SQL (GROUP BY) instead of loading them.
+        
+        Args:
+            group_by: Dimensions from AGGREGATE_DIMENSIONS, e.g. ["model_name"]
+            metrics: Names from AGGREGATE_METRICS, e.g. ["count", "sum_cost", "avg_latency"]
+            bucket: Optional time bucket ("minute", "hour", "day") added as a
+                "bucket" datetime key
+            **filters: Any `get_llm_calls` filter (project_name, start_time, ...)
+        
+        Returns:
+            One dict per group, ordered by group keys (and bucket). Without
+            group_by or bucket, a single dict with totals over all matching calls.
+        
+        Example:
+            >>> storage.aggregate(
+            ...     group_by=["model_name"], metrics=["count", "sum_cost"],
+            ...     bucket="day", project_name="My App",
+            ... )
+            [{"model_name": "gpt-4o", "bucket": datetime(...), "count": 42, "sum_cost": 1.23}, ...]
+        """
+        stmt, keys = self._aggregate_select(group_by, metrics, bucket, filters, self.engine.dialect.name)
+        with self.read_session(filters.get('start_time'), filters.get('end_time')) as db:
+            rows = db.execute(stmt).all()
+        return self._aggregate_rows(keys, rows, bucket)
+
+    def search_calls(
+        self,
+        query: str,
+        limit: int = 50,
+        include_bodies: bool = True,
+        **filters,
+    ) -> List[Dict[str, Any]]:
+        """
+        Full-text search over prompt, response and error text.
+        
+        SQLite matches calls containing every word (`word*` for prefixes)
+        and ranks them by BM25. PostgreSQL takes web-search syntax
+        ("exact phrase", or, -word) and ranks by ts_rank. On SQLite, calls
+        of archived months are searched when start_time reaches them.
+        
+        Args:
+            query: Words to look for
+            limit: Maximum number of hits
+            include_bodies: Load each hit's full prompt/response
+            **filters: Any `get_llm_calls` filter (project_name, start_time, ...)
+        
+        Returns:
+            Hits, best first: {"call": LLMCall, "score": float, "snippet": str}
+        
+        Example:
+            >>> hits = storage.search_calls("rate limit", project_name="My App", limit=20)
+            >>> hits[0]["snippet"]
+            '...upstream returned [rate] [limit] exceeded...'
+        """
+        if not any(character.isalnum() for character in query):
+            return []
+        stmt = self._search_select(query, limit, filters, self.read_engine.dialect.name)
+        with self.read_session(filters.get('start_time'), filters.get('end_time')) as db:
+            rows = db.execute(stmt).all()
+            llm_calls_db = [row[0] for row in rows]
+            bodies, blobs = {}, None
+            if include_bodies:
+                bodies = self._load_bodies(db, llm_calls_db)
+                blobs = self._load_blobs(db, bodies.values())
+            return [
+                {
+                    'call': self._from_llm_call_db(llm_call_db, bodies.get(llm_call_db.id), blobs),
+                    'score': score,
+                    'snippet': snippet,
+                }
+                for llm_call_db, score, snippet in rows
+            ]
+
+    def aggregate_rollups(
+        self,
+        group_by: Sequence[str] = (),
+        metrics: Sequence[str] = ('count', 'sum_cost'),
+        bucket: Optional[str] = None,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        project_name: Optional[str] = None,
+        model_name: Optional[str] = None,
+        agent_name: Optional[str] = None,
+        operation: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Like `aggregate`, but read from the rollup tables - O(buckets), not
+        O(calls).
+        
+        With `bucket`, the table of that granularity is used. Without it, the
+        coarsest table whose bucket edges line up with start_time/end_time
+        is used (e.g. the day table for all-time totals). Whole buckets
+        overlapping [start_time, end_time) are counted, so unaligned bounds
+        are rounded out to the nearest minute.
+        
+        Args:
+            group_by: Any of project_name, model_name, agent_name, operation
+            metrics: aggregate() metric names available from rollups (counts,
+                sums and averages of cost, tokens, latency, judge score)
+            bucket: "minute", "hour" or "day"
+            start_time / end_time: Time range
+            project_name / model_name / agent_name / operation: Equality filters
+        
+        Returns:
+            Same shape as `aggregate`
+        """
+        stmt, keys = self._rollup_select(
+            group_by, metrics, bucket, start_time, end_time,
+            {
+                'project_name': project_name,
+                'model_name': model_name,
+                'agent_name': agent_name,
+                'operation': operation,
+            },
+        )
+        db: DBSession = self.ReadSessionLocal()
+        try:
+            rows = db.execute(stmt).all()
+        finally:
+            db.close()
+        return self._rollup_rows(keys, rows, metrics)
+
+    def latency_quantiles(
+        self,
+        quantiles: Sequence[float] = DEFAULT_QUANTILES,
+        group_by: Sequence[str] = (),
+        bucket: Optional[str] = None,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        project_name: Optional[str] = None,
+        model_name: Optional[str] = None,
+        agent_name: Optional[str] = None,
+        operation: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Latency percentiles from the rollup sketches, without reading llm_calls.
+        
+        The DDSketches of the matching rollup rows are merged per group, so
+        estimates are within 1% relative error. Table choice and range
+        rounding are the same as `aggregate_rollups`.
+        
+        Args:
+            quantiles: Quantiles between 0 and 1
+            group_by: Any of project_name, model_name, agent_name, operation
+            bucket: "minute", "hour" or "day" to get one row per bucket
+            start_time / end_time: Time range
+            project_name / model_name / agent_name / operation: Equality filters
+        
+        Returns:
+            One dict per group: the group_by values (and "bucket"), "count"
+            and a key per quantile ("p50", "p95", "p99"; None when empty)
+        
+        Example:
+            storage.latency_quantiles(group_by=["model_name"], start_time=last_hour)
+            # [{"model_name": "gpt-4o", "count": 812, "p50": 840.2, "p95": 2210.7, "p99": 4102.3}, ...]
+        """
+        stmt, keys = self._sketch_select(
+            group_by, bucket, start_time, end_time,
+            {
+                'project_name': project_name,
+                'model_name': model_name,
+                'agent_name': agent_name,
+                'operation': operation,
+            },
+        )
+        db: DBSession = self.ReadSessionLocal()
+        try:
+            rows = db.execute(stmt).all()
+        finally:
+            db.close()
+        return self._sketch_rows(keys, rows, quantiles)
+
+    def session_latency_quantiles(
+        self,
+        session_id: str,
+        quantiles: Sequence[float] = DEFAULT_QUANTILES,
+    ) -> Optional[Dict[str, Any]]:
+        """Latency percentiles of one session from its sketch ("count", "p50", ...)."""
+        db: DBSession = self.ReadSessionLocal()
+        try:
+            row = db.execute(
+                select(SessionDB.latency_sketch).where(SessionDB.id == session_id)
+            ).first()
+        finally:
+            db.close()
+        if row is None:
+            return None
+        return self._session_sketch_quantiles(row[0], quantiles)
+
+    def rebuild_rollups(
+        self,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+    ) -> int:
+        """
+        Recompute the rollup buckets overlapping a time range (all time by
+        default) from llm_calls.
+        
+        Returns:
+            Number of rollup rows written
+        """
+        with self.engine.begin() as connection:
+            return rebuild_rollups(connection, start_time, end_time)
+
+    def rebuild_search_index(self, chunk_size: int = 1000) -> int:
+        """
+        Re-index the text of every call for `search_calls` (after ingesting
+        with search_index=False). SQLite archived months aren't touched.
+        
+        Returns:
+            Number of calls indexed
+        """
+        with self.engine.begin() as connection:
+            return rebuild_search_index(connection, chunk_size)
+
+    def migrate_call_bodies(self, drop_columns: bool = True) -> Dict[str, Any]:
+        """
+        Copy the bodies of a pre-split llm_calls table into llm_call_bodies
+        and, once every body has a copy, drop the old columns (see
+        migrate_call_bodies). Safe to re-run.
+        
+        Returns:
+            {"copied", "missing", "columns", "dropped"}
+        """
+        with self.engine.begin() as connection:
+            return migrate_call_bodies(connection, drop_columns=drop_columns)
+
+    def externalize_inline_bodies(self, chunk_size: int = 1000) -> int:
+        """
+        Move long bodies of rows written before the blob store into blobs,
+        and compress their large JSON columns.
+        
+        Safe to re-run; rows whose bodies are already references are left
+        unchanged. Run VACUUM afterwards to reclaim space on SQLite.
+        
+        Returns:
+            Number of rows rewritten
+        """
+        rewritten = 0
+        last_id = ''
+        while True:
+            db: DBSession = self.SessionLocal()
+            try:
+                body_dbs = db.execute(
+                    select(LLMCallBodyDB)
+                    .where(LLMCallBodyDB.call_id > last_id)
+                    .order_by(LLMCallBodyDB.call_id)
+                    .limit(chunk_size)
+                ).scalars().all()
+                if not body_dbs:
+                    return rewritten
+                last_id = body_dbs[-1].call_id
+                
+                blobs: Dict[str, bytes] = {}
+                for body_db in body_dbs:
+                    row = {column: getattr(body_db, column) for column in BLOB_COLUMNS}
+                    row['meta_data'] = decompress_json(body_db.meta_data)
+                    row['prompt_breakdown'] = body_db.prompt_breakdown
+                    externalize_bodies(row, blobs)
+                    for column in COMPRESSED_JSON_COLUMNS:
+                        row[column] = compress_json(row[column], self.compression)
+                    changed = {
+                        column: value for column, value in row.items()
+                        if value != getattr(body_db, column)
+                    }
+                    if changed:
+                        for column, value in changed.items():
+                            setattr(body_db, column, value)
+                        rewritten += 1
+                
+                written = self._write_blobs(db, blobs)
+                db.commit()
+                self._remember_blobs(written)
+            except Exception:
+                db.rollback()
+                raise
+            finally:
+                db.close()
+
+    # =========================================================================
+    # BATCH WRITES
+    # =========================================================================
+
+    def save_batch(
+        self,
+        sessions: List[Session],
+        llm_calls: List[LLMCall],
+        ended_sessions: Optional[List[Session]] = None,
+    ):
+        """
+        Persist sessions and LLM calls in a single transaction.
+        
+        Used by the background writer to amortize commit cost across many
+        recorded calls. Counter deltas of all calls are coalesced into one
+        UPDATE per session.
+        
+        Calls can arrive before their session, e.g. when the session start
+        was spilled during an outage and is compacted later. Their session is
+        then inserted as a placeholder (empty project, zeroed counters plus
+        the calls' deltas), and filled in with its project - also backfilled on
+        its calls - when the session snapshot arrives.
+        
+        Args:
+            sessions: New sessions, inserted if absent with zeroed counters
+                (the calls' deltas build the totals)
+            llm_calls: New LLM calls to insert
+            ended_sessions: Sessions whose end-of-session state should be
+                written (inserted if absent)
+        """
+        ended_sessions = ended_sessions or []
+        if not sessions and not llm_calls and not ended_sessions:
+            return
+        
+        db: DBSession = self.SessionLocal()
+        try:
+            self._insert_sessions(db, sessions)
+            snapshots = sessions + ended_sessions
+            self._fill_placeholder_sessions(db, snapshots)
             
-            query = query.order_by(LLMCallDB.timestamp.desc()).limit(limit)
+            projects = self._load_projects(db, llm_calls, snapshots)
+            written = self._insert_llm_calls(db, llm_calls, projects)
+            deltas = merge_session_deltas(llm_calls)
+            missing = self._apply_session_deltas(db, deltas)
+            if missing:
+                self._insert_placeholder_sessions(db, llm_calls, missing, projects)
+                self._apply_session_deltas(db, {session_id: deltas[session_id] for session_id in missing})
+            self._apply_rollups(db, llm_calls, projects)
             
-            return [self._from_llm_call_db(c) for c in query.all()]
+            for session in ended_sessions:
+                if not db.execute(self._session_end_update(session)).rowcount:
+                    self._insert_sessions(db, [session])
+            self._merge_sketches(db, llm_calls, projects)
+            db.commit()
+            self._remember_blobs(written)
+        except Exception:
+            db.rollback()
+            raise
         finally:
             db.close()
 
@@ -414,7 +3218,7 @@ class Storage:
 
     def get_distinct_projects(self) -> List[str]:
         """Get list of all unique project names."""
-        db: DBSession = self.SessionLocal()
+        db: DBSession = self.ReadSessionLocal()
         try:
             projects = db.query(distinct(SessionDB.project_name)).all()
             return sorted([p[0] for p in projects if p[0]])
@@ -423,13 +3227,12 @@ class Storage:
 
     def get_distinct_models(self, project_name: Optional[str] = None) -> List[str]:
         """Get list of all unique model names, optionally filtered by project."""
-        db: DBSession = self.SessionLocal()
+        db: DBSession = self.ReadSessionLocal()
         try:
             query = db.query(distinct(LLMCallDB.model_name))
             
             if project_name:
-                query = query.join(SessionDB, LLMCallDB.session_id == SessionDB.id)
-                query = query.filter(SessionDB.project_name == project_name)
+                query = query.filter(LLMCallDB.project_name == project_name)
             
             models = query.all()
             return sorted([m[0] for m in models if m[0]])
@@ -438,13 +3241,12 @@ class Storage:
 
     def get_distinct_agents(self, project_name: Optional[str] = None) -> List[str]:
         """Get list of all unique agent names, optionally filtered by project."""
-        db: DBSession = self.SessionLocal()
+        db: DBSession = self.ReadSessionLocal()
         try:
             query = db.query(distinct(LLMCallDB.agent_name))
             
             if project_name:
-                query = query.join(SessionDB, LLMCallDB.session_id == SessionDB.id)
-                query = query.filter(SessionDB.project_name == project_name)
+                query = query.filter(LLMCallDB.project_name == project_name)
             
             agents = query.all()
             return sorted([a[0] for a in agents if a[0]])
@@ -453,13 +3255,12 @@ class Storage:
 
     def get_distinct_operations(self, project_name: Optional[str] = None) -> List[str]:
         """Get list of all unique operation names, optionally filtered by project."""
-        db: DBSession = self.SessionLocal()
+        db: DBSession = self.ReadSessionLocal()
         try:
             query = db.query(distinct(LLMCallDB.operation))
             
             if project_name:
-                query = query.join(SessionDB, LLMCallDB.session_id == SessionDB.id)
-                query = query.filter(SessionDB.project_name == project_name)
+                query = query.filter(LLMCallDB.project_name == project_name)
             
             operations = query.all()
             return sorted([o[0] for o in operations if o[0]])
@@ -471,17 +3272,32 @@ class Storage:
     # =========================================================================
 
     def delete_session(self, session_id: str) -> bool:
-        """Delete a session and all its LLM calls."""
+        """Delete a session and all its LLM calls (and update the rollups)."""
         db: DBSession = self.SessionLocal()
         try:
-            # Delete LLM calls first
+            first_call, last_call = db.execute(
+                select(func.min(LLMCallDB.timestamp), func.max(LLMCallDB.timestamp))
+                .where(LLMCallDB.session_id == session_id)
+            ).one()
+            
+            # Delete LLM call bodies, search text and calls first
+            call_ids = select(LLMCallDB.id).where(LLMCallDB.session_id == session_id)
+            db.query(LLMCallBodyDB).filter(LLMCallBodyDB.call_id.in_(call_ids)).delete(
+                synchronize_session=False
+            )
+            db.query(LLMCallSearchDB).filter(LLMCallSearchDB.call_id.in_(call_ids)).delete(
+                synchronize_session=False
+            )
             db.query(LLMCallDB).filter(LLMCallDB.session_id == session_id).delete()
             # Delete session
             result = db.query(SessionDB).filter(SessionDB.id == session_id).delete()
             db.commit()
-            return result > 0
         finally:
             db.close()
+        
+        if first_call is not None:
+            self.rebuild_rollups(first_call, last_call)
+        return result > 0
 
     def get_call_count(
         self,
@@ -490,23 +3306,13 @@ class Storage:
         end_time: Optional[datetime] = None,
     ) -> int:
         """Get count of LLM calls matching filters."""
-        db: DBSession = self.SessionLocal()
-        try:
-            from sqlalchemy import func
-            query = db.query(func.count(LLMCallDB.id))
-            
-            if project_name:
-                query = query.join(SessionDB, LLMCallDB.session_id == SessionDB.id)
-                query = query.filter(SessionDB.project_name == project_name)
-            
-            if start_time:
-                query = query.filter(LLMCallDB.timestamp >= start_time)
-            if end_time:
-                query = query.filter(LLMCallDB.timestamp <= end_time)
-            
-            return query.scalar() or 0
-        finally:
-            db.close()
+        with self.read_session(start_time, end_time) as db:
+            stmt = select(func.count(LLMCallDB.id)).where(*self._call_filters(
+                project_name=project_name,
+                start_time=start_time,
+                end_time=end_time,
+            ))
+            return db.execute(stmt).scalar() or 0
 
     def get_total_cost(
         self,
@@ -515,20 +3321,10 @@ class Storage:
         end_time: Optional[datetime] = None,
     ) -> float:
         """Get total cost of LLM calls matching filters."""
-        db: DBSession = self.SessionLocal()
-        try:
-            from sqlalchemy import func
-            query = db.query(func.sum(LLMCallDB.total_cost))
-            
-            if project_name:
-                query = query.join(SessionDB, LLMCallDB.session_id == SessionDB.id)
-                query = query.filter(SessionDB.project_name == project_name)
-            
-            if start_time:
-                query = query.filter(LLMCallDB.timestamp >= start_time)
-            if end_time:
-                query = query.filter(LLMCallDB.timestamp <= end_time)
-            
-            return query.scalar() or 0.0
-        finally:
-            db.close()
\ No newline at end of file
+        with self.read_session(start_time, end_time) as db:
+            stmt = select(func.sum(LLMCallDB.total_cost)).where(*self._call_filters(
+                project_name=project_name,
+                start_time=start_time,
+                end_time=end_time,
+            ))
+            return db.execute(stmt).scalar() or 0.0
\ No newline at end of file
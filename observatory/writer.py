@@ -0,0 +1,397 @@
+"""
+Background Writer - Write-Behind Ingestion Queue
+Location: observatory/writer.py
+
+Moves database writes off the LLM request path. Records are pushed onto a
+bounded in-memory queue and a daemon thread drains them into the storage
+layer in batched transactions.
+
+Usage:
+    obs = Observatory(project_name="My App", background_writes=True)
+    obs.record_call(...)      # returns in microseconds
+    obs.flush()               # wait until everything queued is persisted
+    obs.close()               # drain and stop the worker (also runs at exit)
+
+What happens when the queue is full or the database is failing is governed
+by the overload policy and circuit breaker (see observatory/backpressure.py).
+"""
+
+import atexit
+import queue
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, List, Dict, TYPE_CHECKING
+
+from observatory.models import Session, LLMCall
+from observatory.backpressure import (
+    CircuitBreaker,
+    OVERLOAD_BLOCK,
+    OVERLOAD_DROP_OLDEST,
+    DEFAULT_BLOCK_TIMEOUT,
+    OVERLOAD_SPILL,
+    validate_overload_policy,
+    spill_record,
+)
+
+if TYPE_CHECKING:
+    from observatory.storage import Storage
+    from observatory.spool import SpoolWriter
+
+
+# =============================================================================
+# DEFAULT CONFIGURATION
+# =============================================================================
+
+DEFAULT_MAX_QUEUE_SIZE = 10000
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_FLUSH_INTERVAL = 1.0  # seconds
+
+# Spilled sessions remembered so their later records follow them to the
+# spill; beyond this, the least recently spilled ones go back to storage
+# (which adopts calls that arrive before their session)
+MAX_SPILLED_SESSIONS = 10000
+
+
+# =============================================================================
+# QUEUE ITEMS
+# =============================================================================
+
+class _FlushMarker:
+    """Queue item that asks the worker to write everything before it."""
+
+    def __init__(self):
+        self.done = threading.Event()
+
+
+_STOP = object()
+
+
+def _session_id(item: tuple) -> str:
+    kind, record = item
+    return record.session_id if kind == "call" else record.id
+
+
+# =============================================================================
+# BACKGROUND WRITER
+# =============================================================================
+
+class BackgroundWriter:
+    """
+    Write-behind queue that persists sessions and LLM calls in batches.
+
+    A single worker thread collects queued records until either `batch_size`
+    records are pending or `flush_interval` seconds have passed, then writes
+    them in one transaction via `Storage.save_batch`, which coalesces the
+    session counter deltas of all calls into one UPDATE per session.
+    """
+
+    def __init__(
+        self,
+        storage: 'Storage',
+        max_queue_size: int = DEFAULT_MAX_QUEUE_SIZE,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        overload_policy: str = OVERLOAD_BLOCK,
+        block_timeout: Optional[float] = DEFAULT_BLOCK_TIMEOUT,
+        spill: Optional['SpoolWriter'] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+    ):
+        """
+        Initialize and start the background writer.
+
+        Args:
+            storage: Storage instance that receives the batches
+            max_queue_size: Maximum queued records before the overload policy applies
+            batch_size: Maximum records written per transaction
+            flush_interval: Maximum seconds a record waits before being written
+            overload_policy: "block", "drop_oldest", "drop_newest" or "spill"
+            block_timeout: Seconds "block" waits for queue space before dropping
+                (None waits indefinitely, so a stalled database stalls the caller)
+            spill: Spool that receives overflow and breaker-diverted records
+            circuit_breaker: Breaker guarding the storage (a default one if None)
+        """
+        validate_overload_policy(overload_policy, spill)
+
+        self.storage = storage
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = max(0.0, flush_interval)
+        self.overload_policy = overload_policy
+        self.block_timeout = block_timeout
+        self.spill = spill
+        self.breaker = circuit_breaker or CircuitBreaker()
+
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue_size)
+        self._closed = False
+        self._lock = threading.Lock()
+
+        # Sessions whose start went to the spill; their later records follow
+        # it there, so the compactor loads a session together with its calls
+        self._spilled_sessions: OrderedDict = OrderedDict()
+
+        # Statistics
+        self._total_written = 0
+        self._total_batches = 0
+        self._total_failed = 0
+        self._total_dropped = 0
+        self._total_spilled = 0
+
+        self._thread = threading.Thread(
+            target=self._run,
+            name="observatory-writer",
+            daemon=True,
+        )
+        self._thread.start()
+        atexit.register(self.close)
+
+    # =========================================================================
+    # SUBMISSION
+    # =========================================================================
+
+    def submit_session(self, session: Session):
+        """Queue a new session for upsert."""
+        self._put(("session", session.model_copy()))
+
+    def submit_session_end(self, session: Session):
+        """Queue the end-of-session state (end time, success, error, quality)."""
+        self._put(("end", session.model_copy()))
+
+    def submit_call(self, llm_call: LLMCall):
+        """Queue an LLM call; its session counters are applied as SQL deltas."""
+        self._put(("call", llm_call))
+
+    def _put(self, item):
+        if self._closed:
+            # Records made after close() (e.g. from other atexit hooks) are lost
+            self._count("_total_dropped")
+            return
+
+        if self.overload_policy == OVERLOAD_BLOCK:
+            try:
+                self._queue.put(item, timeout=self.block_timeout)
+            except queue.Full:
+                self._count("_total_dropped")
+            return
+
+        try:
+            self._queue.put_nowait(item)
+            return
+        except queue.Full:
+            pass
+
+        if self.overload_policy == OVERLOAD_DROP_OLDEST:
+            while True:
+                try:
+                    self._discard(self._queue.get_nowait())
+                except queue.Empty:
+                    pass
+                try:
+                    self._queue.put_nowait(item)
+                    return
+                except queue.Full:
+                    continue
+        elif self.overload_policy == OVERLOAD_SPILL:
+            self._divert([item], overflow=True)
+        else:
+            self._count("_total_dropped")
+
+    def _discard(self, item):
+        """Account for a queued item evicted by the drop_oldest policy."""
+        if isinstance(item, _FlushMarker):
+            # Everything queued before the marker is gone already
+            item.done.set()
+        elif item is not _STOP:
+            self._count("_total_dropped")
+
+    def _count(self, counter: str, n: int = 1):
+        """Add to a statistics counter (records are counted from any thread)."""
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + n)
+
+    def _divert(self, batch: List[tuple], overflow: bool = False):
+        """Spill records that can't go to storage, or count them as lost."""
+        if self.spill is not None:
+            try:
+                for kind, record in batch:
+                    spill_record(self.spill, kind, record)
+                    self._remember_spilled(kind, record)
+                self._count("_total_spilled", len(batch))
+                return
+            except Exception as e:
+                print(f"⚠️ Observatory spill failed ({len(batch)} records): {e}")
+        if overflow:
+            self._count("_total_dropped", len(batch))
+        else:
+            self._count("_total_failed", len(batch))
+
+    def _remember_spilled(self, kind: str, record):
+        """Track sessions with records in the spill, most recently spilled last."""
+        session_id = _session_id((kind, record))
+        with self._lock:
+            if kind == "end":
+                self._spilled_sessions.pop(session_id, None)
+            elif kind == "session" or session_id in self._spilled_sessions:
+                self._spilled_sessions[session_id] = True
+                self._spilled_sessions.move_to_end(session_id)
+                while len(self._spilled_sessions) > MAX_SPILLED_SESSIONS:
+                    self._spilled_sessions.popitem(last=False)
+
+    def _is_spilled(self, item: tuple) -> bool:
+        with self._lock:
+            return _session_id(item) in self._spilled_sessions
+
+    # =========================================================================
+    # LIFECYCLE
+    # =========================================================================
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until every record queued before this call has been written.
+
+        Args:
+            timeout: Maximum seconds to wait (None waits indefinitely)
+
+        Returns:
+            True if the queue was drained within the timeout
+        """
+        if self._closed or not self._thread.is_alive():
+            return self._queue.empty()
+
+        marker = _FlushMarker()
+        started = time.monotonic()
+        try:
+            self._queue.put(marker, timeout=timeout)
+        except queue.Full:
+            return False
+        if timeout is not None:
+            timeout = max(0.0, timeout - (time.monotonic() - started))
+        return marker.done.wait(timeout)
+
+    def close(self, timeout: Optional[float] = 10.0):
+        """
+        Drain remaining records and stop the worker thread.
+
+        Waits at most `timeout` seconds, so a stalled database can't hang
+        process exit; records still queued after that are lost.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+
+        if self._thread.is_alive():
+            started = time.monotonic()
+            try:
+                self._queue.put(_STOP, timeout=timeout)
+            except queue.Full:
+                # The worker stops on its own once the queue runs empty
+                pass
+            if timeout is not None:
+                timeout = max(0.0, timeout - (time.monotonic() - started))
+            self._thread.join(timeout)
+
+        try:
+            atexit.unregister(self.close)
+        except Exception:
+            pass
+
+    @property
+    def pending(self) -> int:
+        """Approximate number of records waiting to be written."""
+        return self._queue.qsize()
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get writer statistics."""
+        return {
+            "pending": self.pending,
+            "total_written": self._total_written,
+            "total_batches": self._total_batches,
+            "total_failed": self._total_failed,
+            "total_dropped": self._total_dropped,
+            "total_spilled": self._total_spilled,
+            "breaker_state": self.breaker.state,
+        }
+
+    # =========================================================================
+    # WORKER
+    # =========================================================================
+
+    def _run(self):
+        batch: List[tuple] = []
+        markers: List[_FlushMarker] = []
+        deadline = time.monotonic() + self.flush_interval
+        stopping = False
+
+        while not stopping:
+            timeout = max(0.0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+                # The stop item may have been evicted by drop_oldest
+                stopping = self._closed
+
+            if item is _STOP:
+                stopping = True
+            elif isinstance(item, _FlushMarker):
+                markers.append(item)
+            elif item is not None:
+                batch.append(item)
+
+            # Keep collecting until the batch is full, the interval elapses,
+            # or someone is waiting on a flush
+            if (
+                not stopping
+                and not markers
+                and len(batch) < self.batch_size
+                and time.monotonic() < deadline
+            ):
+                continue
+
+            if batch:
+                self._write(batch)
+                batch = []
+            for marker in markers:
+                marker.done.set()
+            markers = []
+            deadline = time.monotonic() + self.flush_interval
+
+    def _write(self, batch: List[tuple]):
+        if self._spilled_sessions:
+            # Records of sessions whose start was spilled go after it
+            spilled = [self._is_spilled(item) for item in batch]
+            if any(spilled):
+                self._divert([item for item, to_spill in zip(batch, spilled) if to_spill])
+                batch = [item for item, to_spill in zip(batch, spilled) if not to_spill]
+                if not batch:
+                    return
+
+        sessions: List[Session] = []
+        ended_sessions: Dict[str, Session] = {}
+        llm_calls: List[LLMCall] = []
+
+        for kind, record in batch:
+            if kind == "session":
+                sessions.append(record)
+            elif kind == "end":
+                ended_sessions[record.id] = record
+            else:
+                llm_calls.append(record)
+
+        if not self.breaker.allow():
+            self._divert(batch)
+            return
+
+        try:
+            self.storage.save_batch(sessions, llm_calls, list(ended_sessions.values()))
+            self.breaker.record_success()
+            with self._lock:
+                self._total_written += len(batch)
+                self._total_batches += 1
+        except Exception as e:
+            if self.breaker.record_failure():
+                print(
+                    f"⚠️ Observatory storage failing, pausing writes for "
+                    f"{self.breaker.cooldown:g}s: {e}"
+                )
+            self._divert(batch)
@@ -0,0 +1,28 @@
+"""
+Shared Test Fixtures
+Location: tests/conftest.py
+"""
+
+import pytest
+
+from observatory import Storage, ModelProvider
+
+
+@pytest.fixture
+def storage(tmp_path):
+    """Storage on a fresh SQLite file."""
+    storage = Storage(f"sqlite:///{tmp_path / 'observatory.db'}")
+    yield storage
+    storage.engine.dispose()
+
+
+@pytest.fixture
+def call_kwargs():
+    """Minimal record_llm_call arguments."""
+    return dict(
+        provider=ModelProvider.OPENAI,
+        model_name="gpt-4o-mini",
+        prompt_tokens=100,
+        completion_tokens=20,
+        latency_ms=250.0,
+    )
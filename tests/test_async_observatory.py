@@ -0,0 +1,97 @@
+"""
+Async Observatory Tests
+Location: tests/test_async_observatory.py
+
+AsyncObservatory / AsyncStorage: per-task sessions, counters and sketches
+matching the sync Storage, and record_calls_bulk.
+"""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("aiosqlite")
+pytest.importorskip("greenlet")
+pytest.importorskip("pytest_asyncio")
+
+from observatory import AsyncObservatory, AsyncStorage, Observatory
+
+
+COUNTERS = ('total_llm_calls', 'total_tokens', 'total_cost', 'total_latency_ms')
+
+
+@pytest.fixture
+async def async_storage(tmp_path):
+    """AsyncStorage on a fresh SQLite file."""
+    storage = AsyncStorage(f"sqlite:///{tmp_path / 'async.db'}")
+    yield storage
+    await storage.close()
+
+
+def varied_calls(call_kwargs, count):
+    return [
+        {**call_kwargs, 'prompt_tokens': 100 + i, 'completion_tokens': 10 + i % 7, 'latency_ms': 100.0 + 37 * i}
+        for i in range(count)
+    ]
+
+
+async def test_concurrent_tracks_stay_isolated(async_storage, call_kwargs):
+    obs = AsyncObservatory(project_name="test", storage=async_storage)
+    
+    async def task(index):
+        async with obs.track(f"task-{index}") as session:
+            for _ in range(index + 1):
+                await obs.record_call(**call_kwargs)
+                await asyncio.sleep(0)  # let the other tasks interleave
+            assert obs.current_session is session
+        return session
+    
+    sessions = await asyncio.gather(*(task(index) for index in range(8)))
+    
+    assert obs.current_session is None
+    for index, session in enumerate(sessions):
+        stored = await async_storage.get_session(session.id)
+        assert stored.operation_type == f"task-{index}"
+        assert stored.total_llm_calls == index + 1
+        assert {call.session_id for call in stored.llm_calls} == {session.id}
+
+
+async def test_counters_match_sync_storage(async_storage, storage, call_kwargs):
+    calls = varied_calls(call_kwargs, 40)
+    
+    sync_obs = Observatory(project_name="test", storage=storage)
+    with sync_obs.track("compare") as sync_session:
+        for kwargs in calls:
+            sync_obs.record_call(**kwargs)
+    
+    async_obs = AsyncObservatory(project_name="test", storage=async_storage)
+    async with async_obs.track("compare") as async_session:
+        for kwargs in calls:
+            await async_obs.record_call(**kwargs)
+    
+    expected = storage.get_session(sync_session.id)
+    actual = await async_storage.get_session(async_session.id)
+    for counter in COUNTERS:
+        assert getattr(actual, counter) == pytest.approx(getattr(expected, counter))
+    
+    assert (await async_storage.session_latency_quantiles(async_session.id)) == pytest.approx(
+        storage.session_latency_quantiles(sync_session.id)
+    )
+    assert (await async_storage.latency_quantiles(group_by=["model_name"])) == (
+        storage.latency_quantiles(group_by=["model_name"])
+    )
+
+
+async def test_record_calls_bulk(async_storage, call_kwargs):
+    obs = AsyncObservatory(project_name="test", storage=async_storage)
+    calls = varied_calls(call_kwargs, 250)
+    
+    async with obs.track("import") as session:
+        recorded = await obs.record_calls_bulk(calls, chunk_size=100)
+    
+    assert recorded == 250
+    assert await async_storage.get_call_count(project_name="test") == 250
+    stored = await async_storage.get_session(session.id)
+    assert stored.total_llm_calls == 250
+    assert stored.total_tokens == sum(c['prompt_tokens'] + c['completion_tokens'] for c in calls)
+    assert (await async_storage.session_latency_quantiles(session.id))['count'] == 250
@@ -0,0 +1,215 @@
+"""
+Background Writer Tests
+Location: tests/test_background_writer.py
+
+Write-behind queue: drain, flush, close / exit and overload behaviour.
+"""
+
+import os
+import subprocess
+import sys
+import textwrap
+import threading
+import time
+
+from observatory import Observatory, Session, Storage
+from observatory.backpressure import DEFAULT_BLOCK_TIMEOUT
+from observatory.collector import build_llm_call
+from observatory.spool import SpoolWriter
+from observatory.writer import BackgroundWriter
+
+
+def test_flush_persists_everything_queued(storage, call_kwargs):
+    obs = Observatory(project_name="test", storage=storage, background_writes=True, batch_size=7)
+    
+    with obs.track("queued") as session:
+        for _ in range(50):
+            obs.record_call(**call_kwargs)
+    assert obs.flush(timeout=10)
+    
+    stored = storage.get_session(session.id)
+    assert len(stored.llm_calls) == 50
+    assert stored.total_llm_calls == 50
+    assert stored.end_time is not None
+    
+    stats = obs.get_write_stats()
+    assert stats["total_written"] == 52  # session + 50 calls + end
+    assert stats["total_dropped"] == 0
+    obs.close()
+
+
+def test_flush_from_many_threads(storage, call_kwargs):
+    obs = Observatory(project_name="test", storage=storage, background_writes=True, batch_size=16)
+    session = obs.start_session("threads")
+    
+    def work():
+        for _ in range(25):
+            obs.record_call(session=session, **call_kwargs)
+        assert obs.flush(timeout=10)
+    
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert storage.get_session(session.id).total_llm_calls == 100
+    obs.close()
+
+
+def test_close_drains_queue_and_drops_new_records(storage, call_kwargs):
+    obs = Observatory(
+        project_name="test", storage=storage, background_writes=True, flush_interval=60,
+    )
+    with obs.track("closing") as session:
+        for _ in range(20):
+            obs.record_call(**call_kwargs)
+    
+    obs.close()
+    assert storage.get_session(session.id).total_llm_calls == 20
+    assert not obs.collector.writer._thread.is_alive()
+    
+    writer = obs.collector.writer
+    writer.submit_call(build_llm_call(session_id=session.id, **call_kwargs))
+    assert writer.get_stats()["total_dropped"] == 1
+    obs.close()  # idempotent
+
+
+def test_queued_records_are_written_at_exit(tmp_path):
+    db_url = f"sqlite:///{tmp_path / 'exit.db'}"
+    script = textwrap.dedent(f"""
+        from observatory import Observatory, Storage, ModelProvider
+        obs = Observatory(project_name="test", storage=Storage({db_url!r}),
+                          background_writes=True, flush_interval=60)
+        session = obs.start_session("exiting")
+        for _ in range(30):
+            obs.record_call(provider=ModelProvider.OPENAI, model_name="gpt-4o-mini",
+                            prompt_tokens=10, completion_tokens=5, latency_ms=100.0)
+        print(session.id)
+        # no flush() / close(): the atexit hook drains the queue
+    """)
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        capture_output=True, text=True, timeout=60,
+        env={**os.environ, "PYTHONPATH": root},
+    )
+    assert result.returncode == 0, result.stderr
+    
+    storage = Storage(db_url)
+    session = storage.get_session(result.stdout.strip())
+    assert session.total_llm_calls == 30
+    assert len(session.llm_calls) == 30
+    storage.engine.dispose()
+
+
+class StalledStorage:
+    """Storage stand-in whose writes wait until released."""
+    
+    def __init__(self, storage):
+        self.storage = storage
+        self.release = threading.Event()
+    
+    def save_batch(self, *args, **kwargs):
+        self.release.wait()
+        self.storage.save_batch(*args, **kwargs)
+
+
+def test_block_policy_waits_at_most_block_timeout(storage, call_kwargs):
+    stalled = StalledStorage(storage)
+    writer = BackgroundWriter(stalled, max_queue_size=2, batch_size=1, flush_interval=0)
+    assert writer.block_timeout == DEFAULT_BLOCK_TIMEOUT
+    
+    session = Session(id="stalled", project_name="test")
+    writer.submit_session(session)
+    try:
+        # One batch held by the stalled worker, then the queue fills up
+        for _ in range(4):
+            writer.submit_call(build_llm_call(session_id=session.id, **call_kwargs))
+        
+        start = time.monotonic()
+        writer.submit_call(build_llm_call(session_id=session.id, **call_kwargs))
+        waited = time.monotonic() - start
+        
+        assert waited < DEFAULT_BLOCK_TIMEOUT + 0.5
+        assert writer.get_stats()["total_dropped"] >= 1
+    finally:
+        stalled.release.set()
+        writer.close()
+    
+    stats = writer.get_stats()
+    assert stats["total_written"] + stats["total_dropped"] == 6
+    assert storage.get_session(session.id).total_llm_calls == stats["total_written"] - 1
+
+
+def test_flush_and_close_time_out_on_full_queue(storage, call_kwargs):
+    stalled = StalledStorage(storage)
+    writer = BackgroundWriter(
+        stalled, max_queue_size=2, batch_size=1, flush_interval=0,
+        overload_policy="drop_newest",
+    )
+    session = Session(id="full", project_name="test")
+    writer.submit_session(session)
+    try:
+        for _ in range(4):
+            writer.submit_call(build_llm_call(session_id=session.id, **call_kwargs))
+        
+        start = time.monotonic()
+        assert writer.flush(timeout=0.5) is False
+        writer.close(timeout=0.5)
+        assert time.monotonic() - start < 2.0
+    finally:
+        stalled.release.set()
+    
+    # Once storage recovers the worker drains the queue and exits on its own
+    writer._thread.join(10)
+    assert not writer._thread.is_alive()
+
+
+def test_counters_are_exact_under_concurrent_overload(storage, call_kwargs):
+    stalled = StalledStorage(storage)
+    writer = BackgroundWriter(
+        stalled, max_queue_size=8, batch_size=4, flush_interval=0,
+        overload_policy="drop_newest",
+    )
+    session = Session(id="overload", project_name="test")
+    writer.submit_session(session)
+    
+    def work():
+        for _ in range(500):
+            writer.submit_call(build_llm_call(session_id=session.id, **call_kwargs))
+    
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stalled.release.set()
+    writer.close()
+    
+    stats = writer.get_stats()
+    assert stats["total_written"] + stats["total_dropped"] == 1 + 8 * 500
+
+
+def test_spilled_sessions_are_capped(storage, call_kwargs, tmp_path, monkeypatch):
+    monkeypatch.setattr("observatory.writer.MAX_SPILLED_SESSIONS", 3)
+    writer = BackgroundWriter(
+        storage, batch_size=1, flush_interval=0, spill=SpoolWriter(str(tmp_path / "spill")),
+    )
+    
+    def outage(*args, **kwargs):
+        raise ConnectionError("database unavailable")
+    
+    # Sessions spilled during an outage and never ended
+    with monkeypatch.context() as patch:
+        patch.setattr(storage, "save_batch", outage)
+        for i in range(10):
+            writer.submit_session(Session(id=f"s{i}", project_name="test"))
+        assert writer.flush(timeout=10)
+    assert list(writer._spilled_sessions) == ["s7", "s8", "s9"]
+    
+    # Ending a spilled session forgets it
+    writer.submit_session_end(Session(id="s9", project_name="test"))
+    assert writer.flush(timeout=10)
+    assert list(writer._spilled_sessions) == ["s7", "s8"]
+    writer.close()
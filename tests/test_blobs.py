@@ -0,0 +1,104 @@
+"""
+Blob Store and Compression Tests
+Location: tests/test_blobs.py
+
+Content-addressed body dedup, codec round-trips, and reading rows written
+with a different (older) compression setting.
+"""
+
+import pytest
+from sqlalchemy import func, select
+
+from observatory import Observatory, Storage
+from observatory.storage import BlobDB, LLMCallBodyDB, CODECS, CODEC_KEY, content_hash
+
+
+PROMPT = "Summarize the quarterly report. " * 60      # ~1.9 KB, compressible
+RESPONSE = "Revenue grew in every region. " * 50
+METADATA = {'customer': 'acme', 'notes': ["follow up on churn"] * 80}
+
+
+def codec_param(codec):
+    return pytest.param(codec, marks=pytest.mark.skipif(codec not in CODECS, reason=f"{codec} not installed"))
+
+
+def record_bodies(storage, call_kwargs, count=1):
+    obs = Observatory(project_name="test", storage=storage)
+    with obs.track("bodies") as session:
+        for _ in range(count):
+            obs.record_call(prompt=PROMPT, response_text=RESPONSE, metadata=dict(METADATA), **call_kwargs)
+    return session
+
+
+def blobs(storage):
+    with storage.SessionLocal() as db:
+        return db.execute(select(BlobDB)).scalars().all()
+
+
+def test_identical_bodies_are_stored_once(storage, call_kwargs, tmp_path):
+    record_bodies(storage, call_kwargs, count=3)
+    # A second writer without this process's known-blob cache
+    other = Storage(f"sqlite:///{tmp_path / 'observatory.db'}")
+    record_bodies(other, call_kwargs, count=2)
+    other.engine.dispose()
+    
+    assert {blob.hash for blob in blobs(storage)} == {
+        content_hash(PROMPT.encode('utf-8')),
+        content_hash(RESPONSE.encode('utf-8')),
+    }
+    with storage.SessionLocal() as db:
+        refs = db.execute(select(LLMCallBodyDB.prompt_ref, func.count()).group_by(LLMCallBodyDB.prompt_ref)).all()
+    assert refs == [(content_hash(PROMPT.encode('utf-8')), 5)]
+    
+    calls = storage.get_llm_calls()
+    assert len(calls) == 5
+    assert all(call.prompt == PROMPT and call.response_text == RESPONSE for call in calls)
+
+
+@pytest.mark.parametrize("codec", [codec_param("zlib"), codec_param("zstd")])
+def test_codec_round_trip(tmp_path, call_kwargs, codec):
+    storage = Storage(f"sqlite:///{tmp_path / 'observatory.db'}", compression=codec)
+    session = record_bodies(storage, call_kwargs)
+    
+    for blob in blobs(storage):
+        assert blob.codec == codec
+        assert len(blob.content) < blob.size
+    with storage.SessionLocal() as db:
+        meta_data = db.execute(select(LLMCallBodyDB.meta_data)).scalar_one()
+    assert meta_data[CODEC_KEY] == codec
+    
+    (call,) = storage.get_session(session.id).llm_calls
+    assert call.prompt == PROMPT
+    assert call.response_text == RESPONSE
+    assert call.metadata == METADATA
+    storage.engine.dispose()
+
+
+@pytest.mark.parametrize("reader_compression", [codec_param("zstd"), None])
+def test_rows_written_with_another_codec_stay_readable(tmp_path, call_kwargs, reader_compression):
+    url = f"sqlite:///{tmp_path / 'observatory.db'}"
+    old = Storage(url, compression="zlib")
+    record_bodies(old, call_kwargs)
+    old.engine.dispose()
+    raw = Storage(url, compression=None)
+    record_bodies(raw, call_kwargs)
+    raw.engine.dispose()
+    
+    storage = Storage(url, compression=reader_compression)
+    record_bodies(storage, call_kwargs)
+    
+    calls = storage.get_llm_calls()
+    assert len(calls) == 3
+    assert all(call.prompt == PROMPT and call.response_text == RESPONSE for call in calls)
+    assert all(call.metadata == METADATA for call in calls)
+    storage.engine.dispose()
+
+
+def test_unavailable_codec_is_reported(storage, call_kwargs):
+    record_bodies(storage, call_kwargs)
+    with storage.SessionLocal() as db:
+        db.execute(BlobDB.__table__.update().values(codec='lz4'))
+        db.commit()
+    
+    with pytest.raises(RuntimeError, match="lz4"):
+        storage.get_llm_calls()
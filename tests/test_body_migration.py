@@ -0,0 +1,64 @@
+"""
+Body Migration Tests
+Location: tests/test_body_migration.py
+
+Bodies of a pre-split llm_calls table: copied on startup, old columns only
+dropped by an explicit migrate_call_bodies().
+"""
+
+from sqlalchemy import inspect, text
+
+from observatory import Observatory, Storage
+
+
+def make_legacy(storage, call_kwargs, drop_bodies_table):
+    """Store a call, then put its prompt back into an old llm_calls column."""
+    obs = Observatory(project_name="test", storage=storage)
+    with obs.track("legacy"):
+        obs.record_call(prompt="old prompt", **call_kwargs)
+    with storage.engine.begin() as connection:
+        connection.execute(text("ALTER TABLE llm_calls ADD COLUMN prompt TEXT"))
+        connection.execute(text("ALTER TABLE llm_calls ADD COLUMN response_text TEXT"))
+        connection.execute(text("UPDATE llm_calls SET prompt = 'old prompt', response_text = 'old response'"))
+        if drop_bodies_table:
+            connection.execute(text("DROP TABLE llm_call_bodies"))
+        else:
+            connection.execute(text("DELETE FROM llm_call_bodies"))
+    storage.engine.dispose()
+
+
+def llm_calls_columns(storage):
+    return {column['name'] for column in inspect(storage.engine).get_columns('llm_calls')}
+
+
+def test_startup_copies_bodies_and_keeps_columns(tmp_path, call_kwargs):
+    url = f"sqlite:///{tmp_path / 'observatory.db'}"
+    make_legacy(Storage(url), call_kwargs, drop_bodies_table=True)
+    
+    storage = Storage(url)
+    
+    assert {'prompt', 'response_text'} <= llm_calls_columns(storage)
+    (call,) = storage.get_llm_calls()
+    assert call.prompt == "old prompt"
+    assert call.response_text == "old response"
+    storage.engine.dispose()
+
+
+def test_migrate_copies_missing_bodies_then_drops_columns(tmp_path, call_kwargs):
+    url = f"sqlite:///{tmp_path / 'observatory.db'}"
+    make_legacy(Storage(url), call_kwargs, drop_bodies_table=False)
+    storage = Storage(url)
+    assert {'prompt', 'response_text'} <= llm_calls_columns(storage)
+    
+    stats = storage.migrate_call_bodies(drop_columns=False)
+    assert stats == {'copied': 1, 'missing': 0, 'columns': ['prompt', 'response_text'], 'dropped': False}
+    assert {'prompt', 'response_text'} <= llm_calls_columns(storage)
+    
+    stats = storage.migrate_call_bodies()
+    assert stats['copied'] == 0 and stats['dropped']
+    assert not {'prompt', 'response_text'} & llm_calls_columns(storage)
+    (call,) = storage.get_llm_calls()
+    assert call.prompt == "old prompt"
+    
+    assert storage.migrate_call_bodies()['columns'] == []
+    storage.engine.dispose()
@@ -0,0 +1,169 @@
+"""
+Call Window Tests
+Location: tests/test_call_window.py
+
+The dashboard call window answers get_llm_calls queries exactly like
+Storage: same calls, same order, same dicts - after incremental refreshes
+and late arrivals too.
+"""
+
+import random
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("streamlit")
+
+from observatory import Session, ModelProvider
+from observatory.models import LLMCall, RoutingDecision, CacheMetadata, QualityEvaluation
+from dashboard.utils.call_window import CallWindow
+from dashboard.utils.data_fetcher import _llm_call_to_dict
+
+BASE = datetime.utcnow() - timedelta(hours=5)
+PROJECTS = {'s0': "P1", 's1': "P2", 's2': "P1", 's3': "P2", 's4': "P3"}
+
+FILTERS = [
+    {},
+    dict(project_name="P1"),
+    dict(project_name="missing"),
+    dict(model_name="gpt-4o", agent_name="planner"),
+    dict(operation="search", success_only=True),
+    dict(success_only=False),
+    dict(has_routing=True),
+    dict(has_routing=False),
+    dict(has_cache=True),
+    dict(cache_hit=True),
+    dict(cache_hit=False),
+    dict(has_quality_eval=True),
+    dict(session_id="s3", limit=100),
+    dict(start_time=BASE + timedelta(seconds=1500)),
+    dict(end_time=BASE + timedelta(seconds=1900), limit=50),
+    dict(include_bodies=False, limit=100),
+]
+
+
+def make_call(i: int, rng: random.Random) -> LLMCall:
+    extra = {}
+    if i % 3 == 0:
+        extra['routing_decision'] = RoutingDecision(chosen_model="gpt-4o-mini", reasoning="cheap")
+    if i % 4 == 0:
+        extra['cache_metadata'] = CacheMetadata(cache_hit=i % 8 == 0)
+    if i % 5 == 0:
+        extra['quality_evaluation'] = QualityEvaluation(judge_score=7.0)
+    return LLMCall(
+        id=f"call-{i:06d}",
+        session_id=f"s{i % 5}",
+        timestamp=BASE + timedelta(seconds=i),
+        provider=ModelProvider.OPENAI,
+        model_name=rng.choice(["gpt-4o", "gpt-4o-mini", "claude-sonnet-4"]),
+        agent_name=rng.choice(["planner", "writer", None]),
+        operation=rng.choice(["search", "chat"]),
+        prompt_tokens=i,
+        completion_tokens=1,
+        total_tokens=i + 1,
+        prompt_cost=0.0,
+        completion_cost=i / 1000,
+        total_cost=i / 1000,
+        latency_ms=float(i + 1),
+        success=i % 9 != 0,
+        error=None if i % 9 else "timeout",
+        prompt=f"prompt {i}",
+        response_text=f"response {i}",
+        metadata={'i': i},
+        **extra,
+    )
+
+
+@pytest.fixture
+def populated(storage):
+    for session_id, project in PROJECTS.items():
+        storage.save_session(Session(id=session_id, project_name=project))
+    rng = random.Random(1)
+    storage.save_llm_calls([make_call(i, rng) for i in range(2000)])
+    return storage
+
+
+def assert_same_as_storage(window, storage, **filters):
+    """The window's answer equals Storage's; returns False if the window deferred."""
+    limit = filters.pop('limit', 1000)
+    include_bodies = filters.pop('include_bodies', True)
+    view = window.select(limit=limit, **filters)
+    if view is None:
+        return False
+    expected = [
+        _llm_call_to_dict(call)
+        for call in storage.get_llm_calls(limit=limit, include_bodies=include_bodies, **filters)
+    ]
+    assert view.to_dicts(include_bodies=include_bodies) == expected
+    return True
+
+
+@pytest.mark.parametrize("filters", FILTERS, ids=repr)
+def test_complete_window_matches_storage(populated, filters):
+    window = CallWindow(populated, convert=_llm_call_to_dict, max_rows=5000, refresh_interval=0)
+    assert assert_same_as_storage(window, populated, **dict(filters))
+
+
+@pytest.mark.parametrize("filters", [f for f in FILTERS if f.get('project_name') != "missing"], ids=repr)
+def test_partial_window_matches_storage(populated, filters):
+    # The newest 1500 of 2000 calls hold at least 50 matches for every filter
+    window = CallWindow(populated, convert=_llm_call_to_dict, max_rows=1500, refresh_interval=0)
+    assert assert_same_as_storage(window, populated, **{**filters, 'limit': 50})
+
+
+def test_defers_when_window_cannot_answer(populated):
+    window = CallWindow(populated, convert=_llm_call_to_dict, max_rows=500, refresh_interval=60)
+    # 1000 of the 2000 calls are needed but only 500 are held
+    assert window.select(limit=1000) is None
+    assert window.select(limit=1000, start_time=BASE) is None
+    # A start time inside the window is always answerable
+    assert assert_same_as_storage(window, populated, limit=1000, start_time=BASE + timedelta(seconds=1800))
+
+
+def test_complete_window_answers_everything(populated):
+    window = CallWindow(populated, convert=_llm_call_to_dict, max_rows=10000, refresh_interval=60)
+    assert assert_same_as_storage(window, populated, limit=5000)
+    assert assert_same_as_storage(window, populated, limit=5000, session_id="s4")
+
+
+def test_incremental_refresh_and_late_arrivals(populated):
+    window = CallWindow(populated, convert=_llm_call_to_dict, max_rows=1500, refresh_interval=0)
+    window.snapshot()
+    
+    rng = random.Random(2)
+    populated.save_llm_calls([make_call(i, rng) for i in range(2000, 2100)])
+    late = make_call(5000, rng).model_copy(update={'timestamp': BASE + timedelta(seconds=1999.5)})
+    populated.save_llm_calls([late])
+    
+    for filters in ({}, dict(project_name="P3", limit=100), dict(start_time=BASE + timedelta(seconds=1990))):
+        assert assert_same_as_storage(window, populated, **filters)
+    assert window.snapshot().size == 1500
+
+
+def test_concurrent_readers_during_refresh(populated):
+    window = CallWindow(populated, convert=_llm_call_to_dict, max_rows=1500, refresh_interval=0)
+    errors = []
+    
+    def reader():
+        try:
+            for _ in range(20):
+                view = window.select(limit=200, project_name="P1")
+                rows = view.to_dicts()
+                assert len(rows) == 200
+                assert [row['timestamp'] for row in rows] == sorted((row['timestamp'] for row in rows), reverse=True)
+        except Exception as e:  # surfaced below
+            errors.append(e)
+    
+    threads = [threading.Thread(target=reader) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    rng = random.Random(3)
+    for i in range(2100, 2150):
+        populated.save_llm_calls([make_call(i, rng)])
+    for thread in threads:
+        thread.join()
+    
+    assert not errors
+    assert assert_same_as_storage(window, populated, limit=200, project_name="P1")
@@ -0,0 +1,62 @@
+"""
+Frame Aggregator Tests
+Location: tests/test_frame_aggregators.py
+
+aggregate_calls over a call-window view gives the overview the same
+routing / cache / quality metrics as the aggregators.py functions over
+get_call_metrics dicts.
+"""
+
+import math
+import random
+
+import pytest
+
+pytest.importorskip("pandas")
+pytest.importorskip("streamlit")
+
+from observatory import Session
+from dashboard.utils.aggregators import (
+    calculate_routing_metrics,
+    calculate_cache_metrics,
+    calculate_quality_metrics,
+)
+from dashboard.utils.call_window import CallWindow
+from dashboard.utils.data_fetcher import _llm_call_to_dict, OVERVIEW_WINDOW_COLUMNS
+from dashboard.utils.frame_aggregators import aggregate_calls
+from tests.test_call_window import PROJECTS, make_call
+
+
+def assert_same(expected, actual, path="metrics"):
+    if isinstance(expected, dict):
+        assert set(expected) == set(actual), path
+        for key in expected:
+            assert_same(expected[key], actual[key], f"{path}.{key}")
+    elif isinstance(expected, list):
+        assert len(expected) == len(actual), path
+        for e, a in zip(expected, actual):
+            assert_same(e, a, path)
+    elif isinstance(expected, float) or isinstance(actual, float):
+        assert math.isclose(expected, actual, rel_tol=1e-9, abs_tol=1e-12), f"{path}: {expected} != {actual}"
+    else:
+        assert expected == actual, f"{path}: {expected} != {actual}"
+
+
+@pytest.mark.parametrize("project_name", [None, "P1", "P3"])
+def test_view_metrics_match_functions(storage, project_name):
+    for session_id, project in PROJECTS.items():
+        storage.save_session(Session(id=session_id, project_name=project))
+    rng = random.Random(4)
+    storage.save_llm_calls([make_call(i, rng) for i in range(1200)])
+    
+    window = CallWindow(storage, convert=_llm_call_to_dict, refresh_interval=0)
+    view = window.select(limit=5000, project_name=project_name)
+    assert view is not None
+    rows = storage.query_calls(list(OVERVIEW_WINDOW_COLUMNS), project_name=project_name, limit=5000)
+    calls = [dict(zip(OVERVIEW_WINDOW_COLUMNS, row)) for row in rows]
+    assert len(view) == len(calls)
+    
+    metrics = aggregate_calls(view)
+    assert_same(calculate_routing_metrics(calls), metrics['routing_metrics'])
+    assert_same(calculate_cache_metrics(calls), metrics['cache_metrics'])
+    assert_same(calculate_quality_metrics(calls), metrics['quality_metrics'])
@@ -0,0 +1,116 @@
+"""
+Keyset Iteration Tests
+Location: tests/test_iter_llm_calls.py
+
+Storage.iter_llm_calls: order, page boundaries, filters, and calls
+inserted while iterating.
+"""
+
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+from observatory import Session
+from observatory.collector import build_llm_call
+
+START = datetime(2026, 1, 5, 12, 0, 0)
+
+
+@pytest.fixture
+def session(storage):
+    session = Session(id="keyset", project_name="test")
+    storage.save_session(session)
+    return session
+
+
+def make_calls(session, call_kwargs, count, offset=0, same_timestamp_every=1):
+    """Calls one second apart; `same_timestamp_every` > 1 makes runs of equal timestamps."""
+    return [
+        build_llm_call(
+            session_id=session.id,
+            timestamp=START + timedelta(seconds=(offset + i) // same_timestamp_every),
+            **call_kwargs,
+        )
+        for i in range(count)
+    ]
+
+
+def keyset_order(calls, newest_first=False):
+    return sorted((call.timestamp, call.id) for call in calls)[::-1 if newest_first else 1]
+
+
+@pytest.mark.parametrize("newest_first", [False, True])
+@pytest.mark.parametrize("batch_size", [1, 7, 50, 1000])
+def test_every_call_once_in_keyset_order(storage, session, call_kwargs, newest_first, batch_size):
+    # Runs of 4 equal timestamps, so pages split inside a timestamp
+    calls = make_calls(session, call_kwargs, 103, same_timestamp_every=4)
+    storage.save_llm_calls(calls)
+    
+    seen = [
+        (call.timestamp, call.id)
+        for call in storage.iter_llm_calls(batch_size=batch_size, newest_first=newest_first, include_bodies=False)
+    ]
+    assert seen == keyset_order(calls, newest_first)
+
+
+def test_filters_and_bodies(storage, session, call_kwargs):
+    calls = make_calls(session, {**call_kwargs, 'prompt': "x" * 400}, 20)
+    other = Session(id="other", project_name="other")
+    storage.save_session(other)
+    storage.save_llm_calls(calls + make_calls(other, call_kwargs, 10))
+    
+    seen = list(storage.iter_llm_calls(batch_size=6, project_name="test", start_time=START + timedelta(seconds=5)))
+    assert [call.id for call in seen] == [call.id for call in calls[5:]]
+    assert all(call.prompt == "x" * 400 for call in seen)
+
+
+def test_invalid_batch_size(storage):
+    with pytest.raises(ValueError):
+        next(storage.iter_llm_calls(batch_size=0))
+
+
+def test_inserts_between_pages(storage, session, call_kwargs):
+    existing = make_calls(session, call_kwargs, 30)
+    storage.save_llm_calls(existing)
+    
+    later = make_calls(session, call_kwargs, 10, offset=100)    # sort after any position
+    earlier = make_calls(session, call_kwargs, 10, offset=-100)  # sort before any position
+    
+    seen = []
+    for i, call in enumerate(storage.iter_llm_calls(batch_size=8, include_bodies=False)):
+        seen.append(call.id)
+        if i == 12:  # mid-page: the next page is read after these commits
+            storage.save_llm_calls(later + earlier)
+    
+    assert len(seen) == len(set(seen))
+    assert seen == [call.id for call in sorted(existing + later, key=lambda c: (c.timestamp, c.id))]
+
+
+def test_concurrent_writer(storage, session, call_kwargs):
+    existing = make_calls(session, call_kwargs, 200)
+    storage.save_llm_calls(existing)
+    
+    inserted = []
+    stop = threading.Event()
+    
+    def writer():
+        offset = 1000
+        while not stop.is_set():
+            batch = make_calls(session, call_kwargs, 5, offset=offset)
+            storage.save_llm_calls(batch)
+            inserted.extend(batch)
+            offset += 5
+    
+    thread = threading.Thread(target=writer)
+    thread.start()
+    try:
+        seen = [(call.timestamp, call.id) for call in storage.iter_llm_calls(batch_size=16, include_bodies=False)]
+    finally:
+        stop.set()
+        thread.join()
+    
+    # No duplicates, strictly increasing, every call that existed up front
+    assert seen == sorted(set(seen))
+    assert set(keyset_order(existing)) <= set(seen)
+    assert set(seen) <= set(keyset_order(existing + inserted))
@@ -0,0 +1,69 @@
+"""
+Retention Tests
+Location: tests/test_retention.py
+
+Per-project body and call pruning, including calls moved to SQLite month
+archive files.
+"""
+
+from datetime import datetime
+
+from observatory import Session
+from observatory.collector import build_llm_call
+from observatory.partitions import find_archives
+from observatory.retention import RetentionJob, RetentionPolicy
+
+
+NOW = datetime(2026, 10, 16, 12)
+MONTHS = [datetime(2026, month, 15) for month in (5, 6, 7, 8, 9, 10)]
+
+
+def store_monthly_calls(storage, call_kwargs, project_name):
+    """One session per project with a call in each of MONTHS; returns the session."""
+    session = Session(id=project_name, project_name=project_name, start_time=MONTHS[0])
+    calls = []
+    for timestamp in MONTHS:
+        llm_call = build_llm_call(
+            session_id=session.id,
+            prompt=f"{project_name} prompt {timestamp:%B} " + "x" * 300,
+            **call_kwargs,
+        )
+        llm_call.timestamp = timestamp
+        calls.append(llm_call)
+    storage.save_batch([session], calls)
+    return session
+
+
+def prompts_by_month(storage, session_id):
+    calls = storage.get_session(session_id).llm_calls
+    return {call.timestamp.month: call.prompt for call in calls}
+
+
+def test_body_pruning_reaches_archived_months(storage, call_kwargs):
+    session = store_monthly_calls(storage, call_kwargs, "app")
+    job = RetentionJob(storage, [RetentionPolicy(body_days=60)], vacuum=False)
+    assert job.archive_months(datetime(2026, 8, 1), now=NOW)["months"] == 3
+    assert len(find_archives(storage.archive_database)) == 3
+
+    job.run(now=NOW)
+
+    prompts = prompts_by_month(storage, session.id)
+    assert all(prompts[month] is None for month in (5, 6, 7, 8))
+    assert prompts[9] is not None and prompts[10] is not None
+
+
+def test_per_project_call_pruning_reaches_archived_months(storage, call_kwargs):
+    short = store_monthly_calls(storage, call_kwargs, "short")
+    kept = store_monthly_calls(storage, call_kwargs, "kept")
+    job = RetentionJob(storage, [
+        RetentionPolicy(project_name="short", call_days=90),
+        RetentionPolicy(project_name="kept"),
+    ], vacuum=False)
+    job.archive_months(datetime(2026, 8, 1), now=NOW)
+
+    stats = job.run(now=NOW)
+
+    # 90 days before NOW is 2026-07-18: the archived May, June and July calls go
+    assert stats["calls"] == 3
+    assert sorted(prompts_by_month(storage, short.id)) == [8, 9, 10]
+    assert sorted(prompts_by_month(storage, kept.id)) == [5, 6, 7, 8, 9, 10]
@@ -0,0 +1,51 @@
+"""
+Rollup Tests
+Location: tests/test_rollups.py
+
+Time ranges are half-open [start_time, end_time) for raw calls and rollups
+alike, so both give the same totals for bucket-aligned bounds.
+"""
+
+from datetime import datetime
+
+import pytest
+
+from observatory import Session
+from observatory.collector import build_llm_call
+
+
+BOUNDARY = datetime(2026, 10, 1, 11)
+
+
+@pytest.fixture
+def boundary_calls(storage, call_kwargs):
+    """Calls at 10:00, 10:30, exactly 11:00 and 11:30."""
+    session = Session(id="boundary", project_name="test")
+    calls = []
+    for minute in (0, 30, 60, 90):
+        llm_call = build_llm_call(session_id=session.id, **call_kwargs)
+        llm_call.timestamp = datetime(2026, 10, 1, 10 + minute // 60, minute % 60)
+        calls.append(llm_call)
+    storage.save_batch([session], calls)
+    return storage
+
+
+@pytest.mark.parametrize("bucket", [None, "minute", "hour"])
+def test_rollups_and_calls_agree_at_end_time(boundary_calls, bucket):
+    storage = boundary_calls
+    start = datetime(2026, 10, 1, 10)
+    
+    assert storage.get_call_count(start_time=start, end_time=BOUNDARY) == 2
+    assert len(storage.get_llm_calls(start_time=start, end_time=BOUNDARY)) == 2
+    assert storage.aggregate(metrics=['count'], start_time=start, end_time=BOUNDARY)[0]['count'] == 2
+    
+    rows = storage.aggregate_rollups(metrics=['count'], bucket=bucket, start_time=start, end_time=BOUNDARY)
+    assert sum(row['count'] for row in rows) == 2
+
+
+def test_call_at_end_time_starts_the_next_range(boundary_calls):
+    storage = boundary_calls
+    
+    assert storage.get_call_count(start_time=BOUNDARY, end_time=datetime(2026, 10, 1, 12)) == 2
+    rows = storage.aggregate_rollups(metrics=['count'], start_time=BOUNDARY, end_time=datetime(2026, 10, 1, 12))
+    assert sum(row['count'] for row in rows) == 2
@@ -0,0 +1,90 @@
+"""
+Full-Text Search Tests
+Location: tests/test_search.py
+
+SQLite FTS5 search_calls: indexing at insert, matching, and filters.
+"""
+
+import sqlite3
+import uuid
+from datetime import datetime
+
+import pytest
+
+from observatory import Session, Storage
+from observatory.collector import build_llm_call
+
+
+def has_fts5():
+    connection = sqlite3.connect(":memory:")
+    try:
+        return any(row[0] == 'ENABLE_FTS5' for row in connection.execute("PRAGMA compile_options"))
+    finally:
+        connection.close()
+
+
+pytestmark = pytest.mark.skipif(not has_fts5(), reason="SQLite built without FTS5")
+
+
+def record(storage, call_kwargs, project_name, timestamp=None, **texts):
+    session = Session(id=str(uuid.uuid4()), project_name=project_name)
+    llm_call = build_llm_call(session_id=session.id, timestamp=timestamp, **call_kwargs, **texts)
+    storage.save_batch([session], [llm_call])
+    return llm_call
+
+
+def hit_ids(hits):
+    return {hit['call'].id for hit in hits}
+
+
+def test_calls_are_indexed_on_insert(storage, call_kwargs):
+    llm_call = record(
+        storage, call_kwargs, "app",
+        prompt="Why did the nightly export fail?",
+        response_text="The upstream returned a rate limit error.",
+    )
+    
+    (hit,) = storage.search_calls("nightly export")
+    assert hit['call'].id == llm_call.id
+    assert hit['call'].prompt == "Why did the nightly export fail?"
+    assert "[export]" in hit['snippet']
+    assert hit_ids(storage.search_calls("rate limit")) == {llm_call.id}
+
+
+def test_matching(storage, call_kwargs):
+    both = record(storage, call_kwargs, "app", prompt="retry after the rate limit resets")
+    rate_only = record(storage, call_kwargs, "app", prompt="the exchange rate changed")
+    failed = record(storage, call_kwargs, "app", success=False, error="Connection timeout talking to vector store")
+    
+    assert hit_ids(storage.search_calls("rate limit")) == {both.id}  # every word
+    assert hit_ids(storage.search_calls("rate")) == {both.id, rate_only.id}
+    assert hit_ids(storage.search_calls("limits")) == {both.id}  # stemmed
+    assert hit_ids(storage.search_calls("exch*")) == {rate_only.id}  # prefix
+    assert storage.search_calls("exch") == []
+    assert hit_ids(storage.search_calls("timeout")) == {failed.id}  # error text
+    assert storage.search_calls("unrelated") == []
+    assert storage.search_calls('"*') == []
+
+
+def test_project_and_time_filters(storage, call_kwargs):
+    august = record(storage, call_kwargs, "app", datetime(2026, 8, 10), prompt="invoice totals mismatch")
+    september = record(storage, call_kwargs, "app", datetime(2026, 9, 10), prompt="invoice totals mismatch")
+    other = record(storage, call_kwargs, "billing", datetime(2026, 9, 10), prompt="invoice totals mismatch")
+    
+    assert hit_ids(storage.search_calls("invoice")) == {august.id, september.id, other.id}
+    assert hit_ids(storage.search_calls("invoice", project_name="app")) == {august.id, september.id}
+    assert hit_ids(storage.search_calls("invoice", start_time=datetime(2026, 9, 1))) == {september.id, other.id}
+    assert hit_ids(storage.search_calls(
+        "invoice", project_name="app", end_time=datetime(2026, 9, 1),
+    )) == {august.id}
+    assert len(storage.search_calls("invoice", limit=2)) == 2
+
+
+def test_rebuild_indexes_calls_recorded_without_search(tmp_path, call_kwargs):
+    storage = Storage(f"sqlite:///{tmp_path / 'observatory.db'}", search_index=False)
+    llm_call = record(storage, call_kwargs, "app", prompt="quarterly forecast draft")
+    assert storage.search_calls("forecast") == []
+    
+    assert storage.rebuild_search_index() == 1
+    assert hit_ids(storage.search_calls("forecast")) == {llm_call.id}
+    storage.engine.dispose()
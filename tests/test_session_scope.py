@@ -0,0 +1,113 @@
+"""
+Session Scoping Tests
+Location: tests/test_session_scope.py
+
+Current session per thread / task, and wrap() for worker threads.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from observatory import Observatory
+
+
+def sessions_by_operation(storage):
+    return {s.operation_type: s for s in storage.get_sessions(limit=100)}
+
+
+def test_wrapped_workers_record_into_enclosing_track(storage, call_kwargs):
+    obs = Observatory(project_name="test", storage=storage)
+    
+    with obs.track("batch"):
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            list(pool.map(obs.wrap(lambda _: obs.record_call(**call_kwargs)), range(8)))
+    
+    sessions = storage.get_sessions(limit=100)
+    assert len(sessions) == 1
+    assert sessions[0].operation_type == "batch"
+    assert sessions[0].total_llm_calls == 8
+    assert sessions[0].end_time is not None
+
+
+def test_wrap_binds_workers_to_their_block(storage, call_kwargs):
+    obs = Observatory(project_name="test", storage=storage)
+    started = threading.Barrier(2)
+    
+    def block(name, count):
+        with obs.track(name):
+            started.wait()  # both blocks open while the workers record
+            with ThreadPoolExecutor(max_workers=3) as pool:
+                list(pool.map(obs.wrap(lambda _: obs.record_call(**call_kwargs)), range(count)))
+    
+    threads = [threading.Thread(target=block, args=args) for args in (("a", 5), ("b", 7))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    sessions = sessions_by_operation(storage)
+    assert sessions["a"].total_llm_calls == 5
+    assert sessions["b"].total_llm_calls == 7
+
+
+def test_concurrent_tracks_keep_their_own_session(storage, call_kwargs):
+    obs = Observatory(project_name="test", storage=storage)
+    started = threading.Barrier(4)
+    
+    def block(name):
+        with obs.track(name) as session:
+            started.wait()
+            for _ in range(3):
+                call = obs.record_call(**call_kwargs)
+                assert call.session_id == session.id
+    
+    threads = [threading.Thread(target=block, args=(f"t{i}",)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert all(s.total_llm_calls == 3 for s in sessions_by_operation(storage).values())
+
+
+def test_nested_track_restores_outer_session(storage, call_kwargs):
+    obs = Observatory(project_name="test", storage=storage)
+    
+    with obs.track("outer") as outer:
+        with obs.track("inner") as inner:
+            assert obs.record_call(**call_kwargs).session_id == inner.id
+        assert obs.record_call(**call_kwargs).session_id == outer.id
+    
+    assert obs.collector.current_session is None
+
+
+def test_untracked_thread_does_not_join_another_threads_session(storage, call_kwargs):
+    obs = Observatory(project_name="test", storage=storage)
+    a_open = threading.Event()
+    c_done = threading.Event()
+    c_calls = []
+    
+    def thread_a():
+        with obs.track("A"):
+            a_open.set()
+            c_done.wait()
+    
+    def thread_c():
+        a_open.wait()
+        try:
+            with obs.track("C"):
+                pass
+        finally:
+            c_done.set()
+        c_calls.append(obs.record_call(**call_kwargs))
+    
+    threads = [threading.Thread(target=thread_a), threading.Thread(target=thread_c)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    sessions = sessions_by_operation(storage)
+    assert sessions["A"].total_llm_calls == 0
+    assert sessions["C"].total_llm_calls == 0
+    assert c_calls[0].session_id not in (sessions["A"].id, sessions["C"].id)
@@ -0,0 +1,120 @@
+"""
+Latency Sketch Tests
+Location: tests/test_sketches.py
+
+DDSketch error bounds and merging, and the sketches Storage maintains per
+rollup row and session.
+"""
+
+import random
+import pytest
+
+from observatory import Observatory
+from observatory.sketch import DDSketch, DEFAULT_RELATIVE_ACCURACY
+from observatory.storage import Storage
+
+
+def exact_quantile(values, quantile):
+    """Lower quantile (the rank DDSketch targets)."""
+    ordered = sorted(values)
+    return ordered[int(quantile * (len(ordered) - 1))]
+
+
+@pytest.mark.parametrize("distribution", ["uniform", "lognormal", "pareto"])
+def test_quantiles_within_relative_accuracy(distribution):
+    rng = random.Random(7)
+    draw = {
+        "uniform": lambda: rng.uniform(1, 5000),
+        "lognormal": lambda: rng.lognormvariate(6.5, 1.2),
+        "pareto": lambda: 50 * rng.paretovariate(1.5),
+    }[distribution]
+    values = [draw() for _ in range(20000)]
+    
+    sketch = DDSketch()
+    for value in values:
+        sketch.add(value)
+    
+    assert sketch.count == len(values)
+    for quantile in (0.5, 0.9, 0.95, 0.99):
+        exact = exact_quantile(values, quantile)
+        assert sketch.quantile(quantile) == pytest.approx(exact, rel=DEFAULT_RELATIVE_ACCURACY)
+
+
+def test_merge_matches_single_sketch():
+    rng = random.Random(3)
+    values = [rng.lognormvariate(6, 1) for _ in range(5000)]
+    
+    whole = DDSketch()
+    parts = [DDSketch() for _ in range(4)]
+    for i, value in enumerate(values):
+        whole.add(value)
+        parts[i % 4].add(value)
+    merged = DDSketch.from_dict(parts[0].to_dict())
+    for part in parts[1:]:
+        merged.merge(DDSketch.from_dict(part.to_dict()))
+    
+    assert merged.count == whole.count
+    for quantile in (0.5, 0.95, 0.99):
+        assert merged.quantile(quantile) == whole.quantile(quantile)
+
+
+def test_merge_rejects_different_accuracy():
+    with pytest.raises(ValueError):
+        DDSketch(0.01).merge(DDSketch(0.02))
+
+
+def record(obs, call_kwargs, count, **overrides):
+    rng = random.Random(count)
+    latencies = []
+    for _ in range(count):
+        latency = rng.uniform(100, 3000)
+        latencies.append(latency)
+        obs.record_call(**{**call_kwargs, 'latency_ms': latency, **overrides})
+    return latencies
+
+
+def test_direct_calls_write_sketches_per_transaction(storage, call_kwargs, tmp_path):
+    obs = Observatory(project_name="test", storage=storage)
+    count = 217
+    
+    with obs.track("load") as session:
+        latencies = record(obs, call_kwargs, count)
+        # Another reader of the database sees every committed call's latency
+        reader = Storage(f"sqlite:///{tmp_path / 'observatory.db'}", read_only=True)
+        assert reader.session_latency_quantiles(session.id)['count'] == count
+    
+    stats = storage.session_latency_quantiles(session.id)
+    assert stats['count'] == count
+    assert stats['p95'] == pytest.approx(exact_quantile(latencies, 0.95), rel=DEFAULT_RELATIVE_ACCURACY)
+    
+    rows = reader.latency_quantiles(group_by=["model_name"])
+    assert [row['count'] for row in rows] == [count]
+    reader.engine.dispose()
+
+
+def test_rollup_sketches_are_kept_per_key(storage, call_kwargs):
+    obs = Observatory(project_name="test", storage=storage)
+    with obs.track("mixed"):
+        # Same minute bucket, different models: each rollup row keeps its own sketch
+        for _ in range(30):
+            obs.record_call(**{**call_kwargs, 'model_name': "gpt-4o-mini", 'latency_ms': 100.0})
+        for _ in range(10):
+            obs.record_call(**{**call_kwargs, 'model_name': "gpt-4o", 'latency_ms': 2000.0})
+    
+    rows = {row['model_name']: row for row in storage.latency_quantiles(group_by=["model_name"])}
+    assert rows["gpt-4o-mini"]['count'] == 30
+    assert rows["gpt-4o"]['count'] == 10
+    assert rows["gpt-4o-mini"]['p99'] == pytest.approx(100.0, rel=DEFAULT_RELATIVE_ACCURACY)
+    assert rows["gpt-4o"]['p50'] == pytest.approx(2000.0, rel=DEFAULT_RELATIVE_ACCURACY)
+
+
+def test_bulk_and_direct_sketches_add_up(storage, call_kwargs):
+    obs = Observatory(project_name="test", storage=storage)
+    
+    with obs.track("bulk") as session:
+        record(obs, call_kwargs, 5)
+        obs.record_calls_bulk([call_kwargs] * 50, chunk_size=20)
+        record(obs, call_kwargs, 3)
+    
+    assert storage.session_latency_quantiles(session.id)['count'] == 58
+    assert storage.get_session(session.id).total_llm_calls == 58
@@ -0,0 +1,150 @@
+"""
+Spill Recovery Tests
+Location: tests/test_spill_recovery.py
+
+Session counters stay exact when a storage outage spills part of a
+session and the spilled records are compacted after recovery.
+"""
+
+import pytest
+
+from observatory import Observatory, Session
+from observatory.backpressure import CircuitBreaker
+from observatory.collector import build_llm_call
+from observatory.spool import SpoolCompactor
+
+
+def test_outage_recover_compact_keeps_session_counters(storage, call_kwargs, tmp_path, monkeypatch):
+    spill_dir = str(tmp_path / "spill")
+    obs = Observatory(
+        project_name="test",
+        storage=storage,
+        spill_dir=spill_dir,
+        circuit_breaker=CircuitBreaker(failure_threshold=1, cooldown=0),
+    )
+    
+    def outage(*args, **kwargs):
+        raise ConnectionError("database unavailable")
+    
+    # Outage: the session start and three calls are spilled
+    with monkeypatch.context() as patch:
+        patch.setattr(storage, "save_session", outage)
+        patch.setattr(storage, "record_llm_call", outage)
+        session = obs.start_session("batch")
+        for _ in range(3):
+            obs.record_call(**call_kwargs)
+    assert obs.get_write_stats()["total_spilled"] == 4
+    
+    # Recovery: three calls written directly (the session row is created here)
+    for _ in range(3):
+        obs.record_call(**call_kwargs)
+    stored = storage.get_session(session.id)
+    assert stored.total_llm_calls == 3
+    
+    obs.end_session(session)
+    obs.close()
+    stats = SpoolCompactor(storage, spill_dir).compact()
+    assert stats["llm_calls"] == 3
+    
+    stored = storage.get_session(session.id)
+    assert len(stored.llm_calls) == 6
+    assert stored.total_llm_calls == 6
+    assert stored.total_tokens == 6 * 120
+    assert stored.total_cost == pytest.approx(sum(call.total_cost for call in stored.llm_calls))
+    assert stored.end_time is not None
+
+
+def test_calls_of_a_spilled_session_follow_it_to_the_spill(storage, call_kwargs, tmp_path, monkeypatch):
+    spill_dir = str(tmp_path / "spill")
+    obs = Observatory(
+        project_name="proj",
+        storage=storage,
+        background_writes=True,
+        spill_dir=spill_dir,
+        circuit_breaker=CircuitBreaker(failure_threshold=1, cooldown=0),
+    )
+    
+    def outage(*args, **kwargs):
+        raise ConnectionError("database unavailable")
+    
+    # Outage: the session start is spilled
+    with monkeypatch.context() as patch:
+        patch.setattr(storage, "save_batch", outage)
+        session = obs.start_session("batch")
+        assert obs.flush(timeout=10)
+    assert obs.get_write_stats()["total_spilled"] == 1
+    
+    # Recovery: the session's calls and end still go to the spill
+    for _ in range(5):
+        obs.record_call(session=session, **call_kwargs)
+    obs.end_session(session)
+    assert obs.flush(timeout=10)
+    assert storage.get_call_count() == 0
+    
+    obs.close()
+    SpoolCompactor(storage, spill_dir).compact()
+    
+    stored = storage.get_session(session.id)
+    assert stored.total_llm_calls == 5
+    assert stored.end_time is not None
+    assert storage.get_call_count(project_name="proj") == 5
+
+
+def test_calls_stored_before_their_session_are_adopted(storage, call_kwargs):
+    session = Session(id="late", project_name="proj", operation_type="late")
+    calls = [build_llm_call(session_id=session.id, **call_kwargs) for _ in range(4)]
+    
+    # Calls first: a placeholder session keeps their counters
+    storage.save_batch([], calls)
+    placeholder = storage.get_session(session.id)
+    assert placeholder.total_llm_calls == 4
+    assert storage.get_call_count(project_name="proj") == 0
+    
+    # The session arrives: its project is filled in and backfilled on the calls
+    session.end_time = calls[-1].timestamp
+    storage.save_batch([session], [], [session])
+    stored = storage.get_session(session.id)
+    assert stored.project_name == "proj"
+    assert stored.operation_type == "late"
+    assert stored.total_llm_calls == 4
+    assert stored.end_time is not None
+    assert storage.get_call_count(project_name="proj") == 4
+
+
+def test_bulk_import_spills_during_an_outage(storage, call_kwargs, tmp_path, monkeypatch):
+    spill_dir = str(tmp_path / "spill")
+    obs = Observatory(
+        project_name="proj",
+        storage=storage,
+        spill_dir=spill_dir,
+        circuit_breaker=CircuitBreaker(failure_threshold=1, cooldown=60),
+    )
+    session = obs.start_session("bulk")
+    
+    def outage(*args, **kwargs):
+        raise ConnectionError("database unavailable")
+    
+    # The first chunk fails and trips the breaker; every chunk is spilled
+    with monkeypatch.context() as patch:
+        patch.setattr(storage, "save_batch", outage)
+        assert obs.record_calls_bulk([call_kwargs] * 25, session=session, chunk_size=10) == 25
+    assert obs.get_write_stats()["total_spilled"] == 25
+    assert storage.get_session(session.id).total_llm_calls == 0
+    
+    obs.close()
+    SpoolCompactor(storage, spill_dir).compact()
+    stored = storage.get_session(session.id)
+    assert stored.total_llm_calls == 25
+    assert storage.get_call_count(project_name="proj") == 25
+
+
+def test_compacted_snapshot_does_not_reset_counters(storage, call_kwargs, tmp_path):
+    obs = Observatory(project_name="test", storage=storage)
+    with obs.track("direct") as session:
+        for _ in range(2):
+            obs.record_call(**call_kwargs)
+    
+    # A late session record (as written by a spool) must not touch counters
+    storage.save_batch([session.model_copy(update={'total_llm_calls': 0, 'total_cost': 0.0})], [])
+    
+    assert storage.get_session(session.id).total_llm_calls == 2
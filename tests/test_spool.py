@@ -0,0 +1,166 @@
+"""
+Spool Tests
+Location: tests/test_spool.py
+
+Segment files: torn-tail and corruption recovery, age rotation, abandoned
+segments, and compaction retries.
+"""
+
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import time
+
+from observatory import Observatory, Session
+from observatory.spool import (
+    SpoolWriter,
+    SpoolCompactor,
+    read_segment,
+    OPEN_SUFFIX,
+    CLOSED_SUFFIX,
+)
+
+
+def spool_session(storage, spool_dir, call_kwargs, calls=5):
+    """Record a session into a spool and close its segment. Returns (session, segment path)."""
+    obs = Observatory(project_name="test", spool_dir=spool_dir, storage=storage)
+    with obs.track("spooled") as session:
+        for _ in range(calls):
+            obs.record_call(**call_kwargs)
+    obs.close()
+    segments = [name for name in os.listdir(spool_dir) if name.endswith(CLOSED_SUFFIX)]
+    assert len(segments) == 1
+    return session, os.path.join(spool_dir, segments[0])
+
+
+def dead_pid() -> int:
+    """A pid with no running process."""
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+def test_segment_round_trip(storage, tmp_path, call_kwargs):
+    _, path = spool_session(storage, str(tmp_path / "spool"), call_kwargs, calls=5)
+    kinds = [record["kind"] for record in read_segment(path)]
+    assert kinds == ["session"] + ["call"] * 5 + ["end"]
+
+
+def test_torn_tail_is_dropped(storage, tmp_path, call_kwargs):
+    _, path = spool_session(storage, str(tmp_path / "spool"), call_kwargs, calls=5)
+    size = os.path.getsize(path)
+    
+    # Every cut inside the last record loses only that record
+    records = list(read_segment(path))
+    for cut in (1, 5, 9, 20):
+        with open(path, "r+b") as f:
+            f.truncate(size - cut)
+        assert list(read_segment(path)) == records[:-1]
+
+
+def test_corrupt_record_stops_the_read(storage, tmp_path, call_kwargs):
+    _, path = spool_session(storage, str(tmp_path / "spool"), call_kwargs, calls=5)
+    records = list(read_segment(path))
+    
+    with open(path, "r+b") as f:
+        f.seek(-3, os.SEEK_END)  # inside the last record's payload
+        byte = f.read(1)
+        f.seek(-3, os.SEEK_END)
+        f.write(bytes([byte[0] ^ 0xFF]))
+    
+    assert list(read_segment(path)) == records[:-1]
+
+
+def test_bad_header_reads_nothing(tmp_path):
+    path = tmp_path / ("garbage" + CLOSED_SUFFIX)
+    path.write_bytes(b"not a segment")
+    assert list(read_segment(str(path))) == []
+
+
+def test_abandoned_segment_is_recovered(storage, call_kwargs, tmp_path):
+    spool_dir = str(tmp_path / "spool")
+    session, path = spool_session(storage, spool_dir, call_kwargs, calls=4)
+    
+    # Pretend the writer crashed mid-append: open segment of a dead process,
+    # torn last record (the session end)
+    name = f"{socket.gethostname()}-{dead_pid()}-1700000000000-000001"
+    abandoned = os.path.join(spool_dir, name + OPEN_SUFFIX)
+    os.replace(path, abandoned)
+    with open(abandoned, "r+b") as f:
+        f.truncate(os.path.getsize(abandoned) - 10)
+    
+    stats = SpoolCompactor(storage, spool_dir).compact()
+    assert stats == {
+        "segments": 1, "sessions": 1, "llm_calls": 4, "failed_segments": 0, "deferred_segments": 0,
+    }
+    assert not os.listdir(spool_dir)
+    
+    stored = storage.get_session(session.id)
+    assert stored.total_llm_calls == 4
+    assert stored.end_time is None  # the end record was torn
+
+
+def test_open_segment_of_live_writer_is_left_alone(storage, tmp_path):
+    spool_dir = str(tmp_path / "spool")
+    writer = SpoolWriter(spool_dir)
+    obs = Observatory(project_name="test", storage=storage)
+    writer.save_session(obs.start_session("live"))
+    
+    assert SpoolCompactor(storage, spool_dir).pending_segments() == []
+    writer.close()
+    assert len(SpoolCompactor(storage, spool_dir).pending_segments()) == 1
+
+
+def test_reloading_a_committed_segment_skips_existing_records(storage, call_kwargs, tmp_path):
+    spool_dir = str(tmp_path / "spool")
+    session, path = spool_session(storage, spool_dir, call_kwargs, calls=6)
+    backup = str(tmp_path / "backup.seg")
+    shutil.copy(path, backup)
+    
+    compactor = SpoolCompactor(storage, spool_dir)
+    assert compactor.compact()["llm_calls"] == 6
+    
+    # A run that committed but died before deleting the segment
+    shutil.copy(backup, path)
+    stats = compactor.compact()
+    assert stats["segments"] == 1
+    assert stats["llm_calls"] == 0
+    
+    stored = storage.get_session(session.id)
+    assert len(stored.llm_calls) == 6
+    assert stored.total_llm_calls == 6
+
+
+def test_idle_writer_rotates_on_age(tmp_path):
+    spool_dir = str(tmp_path / "spool")
+    writer = SpoolWriter(spool_dir, max_segment_age=0.2)
+    writer.save_session(Session(id="idle", project_name="test"))
+    
+    # No further appends: the age timer closes the segment
+    deadline = time.monotonic() + 5
+    while not SpoolCompactor(None, spool_dir).pending_segments() and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert len(SpoolCompactor(None, spool_dir).pending_segments()) == 1
+    assert not [name for name in os.listdir(spool_dir) if name.endswith(OPEN_SUFFIX)]
+    writer.close()
+
+
+def test_failed_segment_defers_later_segments_of_its_writer(storage, call_kwargs, tmp_path):
+    spool_dir = str(tmp_path / "spool")
+    obs = Observatory(project_name="test", spool_dir=spool_dir, storage=storage)
+    session = obs.start_session("split")
+    obs.collector.spool._append({"kind": "call", "data": {"id": "broken"}})
+    obs.collector.spool.rotate()
+    for _ in range(3):
+        obs.record_call(**call_kwargs)
+    obs.close()
+    
+    compactor = SpoolCompactor(storage, spool_dir)
+    stats = compactor.compact()
+    assert stats["failed_segments"] == 1
+    assert stats["deferred_segments"] == 1
+    assert stats["llm_calls"] == 0
+    assert len(compactor.pending_segments()) == 2
+    assert storage.get_session(session.id) is None